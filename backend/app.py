@@ -19,6 +19,8 @@ from interfaces.controllers.cr_point_controller import CRPointController
 from interfaces.controllers.daily_chance_controller import DailyChanceController
 from interfaces.controllers.config_controller import ConfigController
 from interfaces.controllers.backtest_controller import BacktestController
+from interfaces.controllers.screener_controller import ScreenerController
+from interfaces.http.json_provider import FastJSONProvider, register_response_compression
 from infrastructure.config.app_config import SERVER_CONFIG
 
 # 初始化日志
@@ -26,6 +28,8 @@ logger = get_app_logger()
 
 # 创建Flask应用
 app = Flask(__name__, static_folder='../frontend', static_url_path='')
+app.json = FastJSONProvider(app)
+register_response_compression(app)
 CORS(app, resources={r"/api/*": {"origins": "*", "methods": ["GET", "POST", "OPTIONS"], "allow_headers": "*"}})
 
 # 实例化控制器
@@ -36,6 +40,7 @@ cr_point_controller = CRPointController()
 daily_chance_controller = DailyChanceController()
 config_controller = ConfigController()
 backtest_controller = BacktestController()
+screener_controller = ScreenerController()
 
 
 # ============ 路由定义 ============
@@ -65,6 +70,26 @@ def debug_routes():
     return jsonify({'routes': routes}), 200
 
 
+@app.route('/api/debug/db_pool')
+def debug_db_pool():
+    """调试：显示数据库连接池指标"""
+    from infrastructure.persistence.database import DatabaseConnection
+    return jsonify({'pool': DatabaseConnection.get_pool_stats()}), 200
+
+
+@app.route('/api/debug/cr_cache')
+def debug_cr_cache():
+    """调试：显示CR分析结果缓存、增量分析检查点指标（含磁盘缓存）"""
+    from application.services.cr_point_service import get_cr_result_cache, get_cr_checkpoint_store
+    from infrastructure.persistence.disk_cache import get_disk_cache
+    disk_cache = get_disk_cache()
+    return jsonify({
+        'cache': get_cr_result_cache().get_stats(),
+        'checkpoints': get_cr_checkpoint_store().get_stats(),
+        'disk': disk_cache.get_stats() if disk_cache is not None else None
+    }), 200
+
+
 @app.route('/api/stock_groups', methods=['GET'])
 def get_stock_groups():
     """获取股票分组信息"""
@@ -153,6 +178,28 @@ def run_backtest():
     return backtest_controller.run_backtest()
 
 
+@app.route('/api/backtest/batch', methods=['POST', 'OPTIONS'])
+def run_batch_backtest():
+    """批量回测（服务端并行，NDJSON/SSE流式返回）"""
+    if request.method == 'OPTIONS':
+        return '', 204
+    return backtest_controller.run_batch_backtest()
+
+
+@app.route('/api/screener/signals', methods=['GET'])
+def list_screener_signals():
+    """获取可筛选的信号列表"""
+    return screener_controller.list_signals()
+
+
+@app.route('/api/screener/scan', methods=['POST', 'OPTIONS'])
+def run_screener_scan():
+    """信号筛选（插件/策略信号，多进程并行）"""
+    if request.method == 'OPTIONS':
+        return '', 204
+    return screener_controller.scan()
+
+
 if __name__ == '__main__':
     logger.info("=" * 50)
     logger.info("阿尔法策略2.0系统启动")
@@ -1,7 +1,9 @@
 """回测服务"""
+from bisect import bisect_left
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from infrastructure.persistence.database import DatabaseConnection
+from infrastructure.persistence.kline_storage import get_kline_source
 from infrastructure.logging.logger import get_logger
 import pymysql
 
@@ -39,9 +41,13 @@ class BacktestService:
                     'summary': {}
                 }
             
+            # 一次查询加载回测所需的全部价格，之后买卖价均在内存中二分查找
+            prices = self._load_prices(
+                table_name, [c['triggerDate'] for c in c_points] + [r['triggerDate'] for r in r_points]
+            )
+            
             # 先检查表中是否有30分钟K线数据
-            has_30min_data = self._check_30min_data(table_name)
-            if not has_30min_data:
+            if not prices.has_30min_data:
                 logger.error(f"❌ 表{table_name}中没有30分钟K线数据（peroid_type='30min'）")
                 return {
                     'success': False,
@@ -94,7 +100,7 @@ class BacktestService:
                     logger.info(f"找到配对: C{c_date} -> R{r_date}")
                     
                     # 获取C点后第二天第一根30分钟K线的开盘价作为买入价
-                    buy_price = self._get_next_day_30min_open(table_name, c_date)
+                    buy_price = prices.next_day_open(c_date)
                     
                     if buy_price is None:
                         logger.warning(f"⚠️ 无法获取C点{c_date}后的买入价，跳过此交易")
@@ -102,7 +108,7 @@ class BacktestService:
                         continue
                     
                     # 获取R点后第二天第一根30分钟K线的开盘价作为卖出价
-                    sell_price = self._get_next_day_30min_open(table_name, r_date)
+                    sell_price = prices.next_day_open(r_date)
                     
                     if sell_price is None:
                         logger.warning(f"⚠️ 无法获取R点{r_date}后的卖出价，跳过此交易")
@@ -136,11 +142,11 @@ class BacktestService:
             # 检查是否还有未卖出的C点（持仓中）
             if current_c is not None:
                 c_date = current_c['triggerDate']
-                buy_price = self._get_next_day_30min_open(table_name, c_date)
+                buy_price = prices.next_day_open(c_date)
                 
                 if buy_price is not None:
                     # 获取最新价格（日K线的最新收盘价）
-                    current_price = self._get_latest_price(table_name)
+                    current_price = prices.latest_close
                     
                     if current_price is not None:
                         # 计算当前收益率
@@ -194,152 +200,71 @@ class BacktestService:
                 'summary': {}
             }
     
-    def _check_30min_data(self, table_name: str) -> bool:
+    def _load_prices(self, table_name: str, trigger_dates: List[str]) -> '_BacktestPrices':
         """
-        检查表中是否有30分钟K线数据
+        一次连接加载回测所需的全部价格
         
-        Args:
-            table_name: 数据库表名
-            
-        Returns:
-            True if 有30分钟数据, False otherwise
-        """
-        conn = None
-        try:
-            conn = DatabaseConnection.get_connection()
-            cursor = conn.cursor()
-            
-            # 检查是否有peroid_type='30min'的数据
-            query = f"""
-                SELECT COUNT(*) as count
-                FROM {table_name}
-                WHERE peroid_type = '30min'
-                LIMIT 1
-            """
-            
-            cursor.execute(query)
-            result = cursor.fetchone()
-            count = result[0] if result else 0
-            
-            logger.info(f"表{table_name}中30分钟K线数据（peroid_type='30min'）数量: {count}")
-            
-            return count > 0
-            
-        except Exception as e:
-            logger.error(f"检查30分钟K线数据失败: {e}", exc_info=True)
-            return False
-        finally:
-            if conn:
-                cursor.close()
-                conn.close()
-    
-    def _get_latest_price(self, table_name: str) -> Optional[float]:
-        """
-        获取最新的日K线收盘价（作为当前价格）
+        - 最早触发日第二天起的全部30分钟K线开盘价（按时间升序，供二分查找）
+        - 最新日K线收盘价（持仓中交易的当前价格）
+        - 窗口内没有30分钟K线时，再确认整张表是否有30分钟数据
         
         Args:
             table_name: 数据库表名
+            trigger_dates: C点和R点的触发日期 (YYYY-MM-DD格式)
             
         Returns:
-            最新收盘价，如果找不到返回None
+            回测价格数据，查询失败时返回空数据（视为没有30分钟K线）
         """
-        conn = None
+        prices = _BacktestPrices()
+        start_dt = datetime.strptime(min(trigger_dates), '%Y-%m-%d') + timedelta(days=1)
+        source = get_kline_source(table_name)
+        
         try:
-            conn = DatabaseConnection.get_connection()
-            cursor = conn.cursor(pymysql.cursors.DictCursor)
-            
-            # 查询最新的日K线收盘价
-            query = f"""
-                SELECT shou_pan_jia, shi_jian
-                FROM {table_name}
-                WHERE peroid_type = '1day'
-                ORDER BY shi_jian DESC
-                LIMIT 1
-            """
-            
-            cursor.execute(query)
-            result = cursor.fetchone()
+            with DatabaseConnection.get_connection_context() as conn:
+                cursor = conn.cursor(pymysql.cursors.DictCursor)
+                
+                # 30分钟K线的peroid_type是'30min'（字符串）
+                cursor.execute(f"""
+                    SELECT shi_jian, kai_pan_jia
+                    FROM {source.table}
+                    {source.where("peroid_type = '30min'", 'shi_jian >= %s')}
+                    ORDER BY shi_jian ASC
+                """, source.params(start_dt.strftime('%Y-%m-%d 00:00:00')))
+                for row in cursor.fetchall():
+                    prices.times.append(row['shi_jian'])
+                    prices.opens.append(row['kai_pan_jia'])
+                
+                if prices.times:
+                    prices.has_30min_data = True
+                else:
+                    cursor.execute(f"""
+                        SELECT 1 FROM {source.table} {source.where("peroid_type = '30min'")} LIMIT 1
+                    """, source.params() or None)
+                    prices.has_30min_data = cursor.fetchone() is not None
+                
+                # 查询最新的日K线收盘价
+                cursor.execute(f"""
+                    SELECT shou_pan_jia, shi_jian
+                    FROM {source.table}
+                    {source.where("peroid_type = '1day'")}
+                    ORDER BY shi_jian DESC
+                    LIMIT 1
+                """, source.params() or None)
+                result = cursor.fetchone()
+                cursor.close()
             
             if result and result['shou_pan_jia']:
+                prices.latest_close = float(result['shou_pan_jia'])
                 logger.info(f"获取最新价格: {result['shi_jian']} 收盘价={result['shou_pan_jia']}")
-                return float(result['shou_pan_jia'])
             else:
                 logger.warning(f"未找到最新日K线数据")
-                return None
-                
-        except Exception as e:
-            logger.error(f"获取最新价格失败: {e}", exc_info=True)
-            return None
-        finally:
-            if conn:
-                cursor.close()
-                conn.close()
-    
-    def _get_next_day_30min_open(self, table_name: str, trigger_date: str) -> Optional[float]:
-        """
-        获取触发日期后第二天第一根30分钟K线的开盘价
-        
-        Args:
-            table_name: 数据库表名
-            trigger_date: 触发日期 (YYYY-MM-DD格式)
-            
-        Returns:
-            开盘价，如果找不到返回None
-        """
-        conn = None
-        try:
-            # 计算第二天的日期
-            trigger_dt = datetime.strptime(trigger_date, '%Y-%m-%d')
-            next_day = trigger_dt + timedelta(days=1)
-            next_day_str = next_day.strftime('%Y-%m-%d 00:00:00')
-            
-            logger.info(f"查询{trigger_date}后的30分钟K线开盘价...")
-            logger.info(f"  表名: {table_name}")
-            logger.info(f"  查询条件: peroid_type='30min' AND shi_jian >= '{next_day_str}'")
-            
-            # 查询第二天及之后的第一根30分钟K线
-            conn = DatabaseConnection.get_connection()
-            cursor = conn.cursor(pymysql.cursors.DictCursor)
             
-            # 30分钟K线的peroid_type是'30min'（字符串）
-            query = f"""
-                SELECT kai_pan_jia, shi_jian, peroid_type
-                FROM {table_name}
-                WHERE peroid_type = '30min'
-                  AND shi_jian >= %s
-                ORDER BY shi_jian ASC
-                LIMIT 1
-            """
-            
-            cursor.execute(query, (next_day_str,))
-            result = cursor.fetchone()
-            
-            if result and result['kai_pan_jia']:
-                logger.info(f"✅ 找到{trigger_date}后的30分钟K线:")
-                logger.info(f"  时间: {result['shi_jian']}")
-                logger.info(f"  开盘价: {result['kai_pan_jia']}")
-                logger.info(f"  周期类型: {result['peroid_type']}")
-                return float(result['kai_pan_jia'])
-            else:
-                logger.warning(f"⚠️ 未找到{trigger_date}后的30分钟K线数据")
-                logger.warning(f"  查询表: {table_name}")
-                logger.warning(f"  查询条件: peroid_type='30min' AND shi_jian >= '{next_day_str}'")
-                
-                # 额外检查：看看这个日期范围内有没有任何数据
-                cursor.execute(f"SELECT COUNT(*) as cnt FROM {table_name} WHERE shi_jian >= %s LIMIT 1", (next_day_str,))
-                count_result = cursor.fetchone()
-                total_count = count_result['cnt'] if count_result else 0
-                logger.warning(f"  该日期后总K线数: {total_count}")
-                
-                return None
-                
+            logger.info(f"表{table_name}加载30分钟K线{len(prices.times)}根（{start_dt.strftime('%Y-%m-%d')}起）")
         except Exception as e:
-            logger.error(f"获取30分钟K线开盘价失败: {e}", exc_info=True)
-            return None
-        finally:
-            if conn:
-                cursor.close()
-                conn.close()
+            logger.error(f"加载回测价格数据失败: {e}", exc_info=True)
+            return _BacktestPrices()
+        
+        return prices
     
     def _calculate_summary(self, trades: List[Dict]) -> Dict[str, Any]:
         """
@@ -396,3 +321,33 @@ class BacktestService:
             'holding_return': round(holding_return, 2)  # 持仓总收益
         }
 
+
+
+class _BacktestPrices:
+    """单次回测的价格数据（30分钟开盘价序列 + 最新日K收盘价）"""
+    
+    def __init__(self):
+        self.times: List[datetime] = []  # 30分钟K线时间（升序）
+        self.opens: List[Any] = []       # 对应的开盘价（数据库原值）
+        self.latest_close: Optional[float] = None
+        self.has_30min_data = False
+    
+    def next_day_open(self, trigger_date: str) -> Optional[float]:
+        """
+        获取触发日期后第二天（含之后）第一根30分钟K线的开盘价
+        
+        Args:
+            trigger_date: 触发日期 (YYYY-MM-DD格式)
+            
+        Returns:
+            开盘价，如果找不到返回None
+        """
+        next_day = datetime.strptime(trigger_date, '%Y-%m-%d') + timedelta(days=1)
+        index = bisect_left(self.times, next_day)
+        
+        if index < len(self.times) and self.opens[index]:
+            logger.info(f"✅ 找到{trigger_date}后的30分钟K线: 时间{self.times[index]}, 开盘价{self.opens[index]}")
+            return float(self.opens[index])
+        
+        logger.warning(f"⚠️ 未找到{trigger_date}后的30分钟K线数据")
+        return None
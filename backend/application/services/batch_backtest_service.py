@@ -0,0 +1,223 @@
+"""批量回测应用服务 - 多进程并行执行CR分析和回测"""
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Optional, Iterator
+from infrastructure.config.app_config import BATCH_BACKTEST_CONFIG
+from infrastructure.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 工作进程内复用的服务实例（每个进程各自持有连接池和插件服务）
+_worker_services = None
+
+
+def _get_worker_services():
+    """获取当前工作进程的服务实例，首次调用时创建"""
+    global _worker_services
+    if _worker_services is None:
+        from application.services.cr_point_service import CRPointService
+        from application.services.backtest_service import BacktestService
+        _worker_services = (CRPointService(), BacktestService())
+    return _worker_services
+
+
+def backtest_stock(stock: Dict[str, str], period: str) -> Dict[str, Any]:
+    """
+    单只股票：CR分析 + 回测（在工作进程中执行）
+
+    只返回回测汇总和交易明细，C点/R点列表留在工作进程内，不再往返传输
+
+    Args:
+        stock: 股票信息 {'code', 'name', 'table_name'}
+        period: 分析周期
+
+    Returns:
+        {'success': bool, 'data': {...}} 或 {'success': False, 'error': str}
+    """
+    start = time.time()
+    try:
+        cr_service, backtest_service = _get_worker_services()
+        cr_result = cr_service.analyze_stock(stock['code'], stock.get('name', ''), stock['table_name'], period)
+        if cr_result is None:
+            return {'success': False, 'error': 'K线数据为空', 'elapsed': round(time.time() - start, 3)}
+
+        c_points = cr_result.get('c_points', [])
+        r_points = cr_result.get('r_points', [])
+        if not c_points:
+            return {'success': False, 'error': '没有C点数据', 'elapsed': round(time.time() - start, 3)}
+
+        result = backtest_service.calculate_backtest(stock['code'], stock['table_name'], c_points, r_points)
+        if not result['success']:
+            return {'success': False, 'error': result.get('message', '回测失败'),
+                    'elapsed': round(time.time() - start, 3)}
+
+        return {
+            'success': True,
+            'data': {
+                'summary': result['summary'],
+                'trades': result['trades'],
+                'c_points_count': len(c_points),
+                'r_points_count': len(r_points)
+            },
+            'elapsed': round(time.time() - start, 3)
+        }
+    except Exception as e:
+        logger.error(f"批量回测单只股票失败: {stock.get('code')} {e}", exc_info=True)
+        return {'success': False, 'error': str(e), 'elapsed': round(time.time() - start, 3)}
+
+
+class BatchBacktestService:
+    """
+    批量回测应用服务
+
+    进程池在所有请求间共享并常驻，工作进程只初始化一次服务和数据库连接池。
+    使用 spawn 方式启动进程，避免在多线程的 Flask 进程中 fork。
+    """
+
+    _executor: Optional[ProcessPoolExecutor] = None
+    _executor_lock = threading.Lock()
+
+    def __init__(self, stock_service=None):
+        """
+        Args:
+            stock_service: 股票应用服务（可选，用于按分组名解析股票列表）
+        """
+        if stock_service is None:
+            from application.services.stock_service import StockApplicationService
+            stock_service = StockApplicationService()
+        self.stock_service = stock_service
+
+    @classmethod
+    def get_executor(cls) -> ProcessPoolExecutor:
+        """获取共享进程池"""
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    max_workers = max(1, min(BATCH_BACKTEST_CONFIG['max_workers'], os.cpu_count() or 1))
+                    cls._executor = ProcessPoolExecutor(
+                        max_workers=max_workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+                    logger.info(f"批量回测进程池已创建: max_workers={max_workers}")
+        return cls._executor
+
+    @classmethod
+    def _reset_executor(cls):
+        """进程池损坏（工作进程异常退出）后丢弃，下次请求重新创建"""
+        with cls._executor_lock:
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=False)
+                cls._executor = None
+
+    def resolve_stocks(self, stocks: Optional[List[Dict]] = None, group: Optional[str] = None,
+                       limit: Optional[int] = None) -> List[Dict[str, str]]:
+        """
+        解析待回测的股票列表
+
+        Args:
+            stocks: 显式指定的股票列表 [{'code', 'name', 'table_name'}]
+            group: 分组名，'all' 表示全部分组
+            limit: 最多回测的股票数量
+
+        Returns:
+            股票列表
+
+        Raises:
+            ValueError: 未指定股票、分组不存在或股票信息缺少必要字段
+        """
+        if stocks:
+            selected = [{'code': s.get('code'), 'name': s.get('name', ''),
+                         'table_name': s.get('table_name') or s.get('tableName')} for s in stocks]
+            for stock in selected:
+                if not stock['code'] or not stock['table_name']:
+                    raise ValueError('股票信息缺少code或table_name')
+        elif group:
+            groups = self.stock_service.get_all_stock_groups()
+            if group == 'all':
+                selected = [stock for group_stocks in groups.values() for stock in group_stocks]
+            elif group in groups:
+                selected = list(groups[group])
+            else:
+                raise ValueError(f'股票分组不存在: {group}')
+        else:
+            raise ValueError('请指定股票列表或股票分组')
+
+        if limit:
+            selected = selected[:limit]
+        return selected
+
+    def run(self, stocks: List[Dict[str, str]], period: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        并行回测，按完成顺序逐只产出结果，最后产出汇总
+
+        Args:
+            stocks: 股票列表
+            period: 分析周期
+
+        Yields:
+            {'event': 'result', 'index', 'stock', 'success', 'data'/'error', 'elapsed'}，
+            最后一条为 {'event': 'summary', ...}
+        """
+        period = period or BATCH_BACKTEST_CONFIG['default_period']
+        start = time.time()
+        logger.info(f"开始批量回测: {len(stocks)}只股票, 周期{period}")
+
+        results: List[Dict[str, Any]] = []
+        executor = self.get_executor()
+        futures = {executor.submit(backtest_stock, stock, period): index for index, stock in enumerate(stocks)}
+        pool_broken = False
+
+        try:
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    pool_broken = pool_broken or isinstance(e, BrokenProcessPool)
+                    logger.error(f"批量回测进程异常: {stocks[index].get('code')} {e}", exc_info=True)
+                    outcome = {'success': False, 'error': f'回测进程异常: {str(e)}', 'elapsed': None}
+
+                event = {'event': 'result', 'index': index, 'stock': stocks[index]}
+                event.update(outcome)
+                results.append(event)
+                yield event
+        finally:
+            # 客户端断开时取消尚未开始的任务
+            for future in futures:
+                future.cancel()
+            if pool_broken:
+                self._reset_executor()
+
+        summary = self.summarize(results)
+        summary['elapsed'] = round(time.time() - start, 3)
+        logger.info(f"批量回测完成: {summary}")
+        yield summary
+
+    @staticmethod
+    def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        汇总批量回测结果（口径与批量回测页面一致：收益率/胜率为成功股票的简单平均）
+        """
+        success_results = [r for r in results if r.get('success')]
+        summaries = [r['data']['summary'] for r in success_results if r.get('data', {}).get('summary')]
+
+        total_trades = sum(s.get('total_trades', 0) or 0 for s in summaries)
+        total_return = sum(s.get('total_return', 0) or 0 for s in summaries)
+        avg_return_sum = sum(s.get('avg_return', 0) or 0 for s in summaries)
+        win_rate_sum = sum(s.get('win_rate', 0) or 0 for s in summaries)
+        count = len(success_results)
+
+        return {
+            'event': 'summary',
+            'total_stocks': len(results),
+            'success_count': count,
+            'fail_count': len(results) - count,
+            'total_trades': total_trades,
+            'total_return': round(total_return, 2),
+            'avg_return': round(avg_return_sum / count, 2) if count else 0,
+            'avg_win_rate': round(win_rate_sum / count, 2) if count else 0
+        }
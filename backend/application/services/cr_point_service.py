@@ -1,23 +1,341 @@
-"""CR点应用服务 - 实时计算，不存储"""
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+"""CR点应用服务 - 实时计算，不存储（分析结果按数据和配置版本缓存在内存中，新K线到来后从检查点续算）"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta
 from domain.models.cr_point import CRPoint, ABCComponents
+from domain.models.cr_analysis_state import CRAnalysisState
 from domain.models.kline import KLineData
+from domain.models.analysis_context import AnalysisContext
+from domain.models.bar_series import BarSeries
 from domain.services.cr_strategy_service import CRStrategyService
 from domain.services.r_point_plugin_service import RPointPluginService
 from domain.services.strategy2_service import Strategy2Service
+from domain.services.config_service import get_config_service
+from infrastructure.config.app_config import CR_RESULT_CACHE_CONFIG, CR_INCREMENTAL_CONFIG
+from infrastructure.persistence.disk_cache import DiskCache, get_disk_cache
 from infrastructure.logging.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+class CRResultCache:
+    """
+    CR点分析结果缓存（LRU，线程安全）
+
+    键为 (股票代码, 周期)，值带版本（K线窗口、每日机会数据、策略配置的版本）；版本变化后旧结果自动失效。
+    缓存的结果在请求间共享，调用方不能修改。
+    传入磁盘缓存时作为下一层：内存未命中再按同一版本查磁盘，写入时两层都写。
+    也用于保存增量分析的检查点（namespace 区分磁盘缓存中的记录）。
+    """
+
+    def __init__(self, max_entries: int = 300, max_bytes: int = 256 * 1024 * 1024,
+                 disk: Optional[DiskCache] = None, namespace: str = 'cr'):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk = disk
+        self.namespace = namespace
+        self._data: 'OrderedDict[Tuple[str, str], Tuple[tuple, Dict[str, Any], int]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'stale': 0, 'disk_hits': 0, 'puts': 0, 'evictions': 0,
+                       'invalidations': 0}
+
+    def get(self, stock_code: str, period: str, version: tuple) -> Optional[Dict[str, Any]]:
+        """获取缓存结果，不存在或版本已变化返回None"""
+        key = (stock_code, period)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] == version:
+                self._data.move_to_end(key)
+                self._stats['hits'] += 1
+                return entry[1]
+            if entry is not None:
+                self._stats['stale'] += 1
+
+        result = self.disk.get(self.namespace, f"{stock_code}:{period}", version) if self.disk is not None else None
+        with self._lock:
+            if result is None:
+                self._stats['misses'] += 1
+                return None
+            self._stats['disk_hits'] += 1
+        self._put_memory(key, version, result)
+        return result
+
+    def put(self, stock_code: str, period: str, version: tuple, result: Dict[str, Any]):
+        """写入缓存，超出条数或大小上限时淘汰最久未使用的条目（单条超过大小上限时不缓存）"""
+        self._put_memory((stock_code, period), version, result)
+        if self.disk is not None:
+            self.disk.put(self.namespace, f"{stock_code}:{period}", version, result)
+
+    def _put_memory(self, key: Tuple[str, str], version: tuple, result: Dict[str, Any]):
+        size = self.estimate_size(result)
+        if size > self.max_bytes:
+            logger.warning(f"CR分析结果过大，不缓存: {key[0]} {key[1]} 约{size}字节")
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._data[key] = (version, result, size)
+            self._bytes += size
+            self._stats['puts'] += 1
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self._stats['evictions'] += 1
+
+    def invalidate(self, stock_code: Optional[str] = None) -> int:
+        """使指定股票（None表示全部）的缓存失效，返回移除的条目数"""
+        with self._lock:
+            keys = [key for key in self._data if stock_code is None or key[0] == stock_code]
+            for key in keys:
+                self._bytes -= self._data.pop(key)[2]
+            self._stats['invalidations'] += len(keys)
+        if self.disk is not None:
+            self.disk.invalidate(self.namespace, f"{stock_code}:" if stock_code else '')
+        if keys:
+            logger.info(f"CR分析结果缓存失效: {stock_code or '全部'} {len(keys)}条")
+        return len(keys)
+
+    def clear(self):
+        """清空缓存（策略配置更新、重新加载时调用）"""
+        self.invalidate()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计指标"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'entries': len(self._data),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes
+            })
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0
+        return stats
+
+    @staticmethod
+    def estimate_size(result: Dict[str, Any]) -> int:
+        """按JSON序列化长度估算结果大小（与接口响应体大小同一量级）"""
+        return len(json.dumps(result, default=str))
+
+
+_result_cache: Optional[CRResultCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def get_cr_result_cache() -> CRResultCache:
+    """获取进程内共享的CR分析结果缓存，策略配置更新或重新加载时自动清空"""
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                cache = CRResultCache(CR_RESULT_CACHE_CONFIG['max_entries'], CR_RESULT_CACHE_CONFIG['max_bytes'],
+                                      get_disk_cache())
+                get_config_service().add_change_listener(cache.clear)
+                _result_cache = cache
+    return _result_cache
+
+
+_checkpoint_store: Optional[CRResultCache] = None
+
+
+def get_cr_checkpoint_store() -> CRResultCache:
+    """
+    获取进程内共享的CR增量分析检查点存储，策略配置更新或重新加载时自动清空
+
+    同步任务写入数据后不清空：检查点按已分析部分的输入数据摘要校验，追加新K线正是续算的场景
+    """
+    global _checkpoint_store
+    if _checkpoint_store is None:
+        with _result_cache_lock:
+            if _checkpoint_store is None:
+                store = CRResultCache(CR_INCREMENTAL_CONFIG['max_entries'], CR_INCREMENTAL_CONFIG['max_bytes'],
+                                      get_disk_cache(), namespace='cr_checkpoint')
+                get_config_service().add_change_listener(store.clear)
+                _checkpoint_store = store
+    return _checkpoint_store
+
+
+def invalidate_cr_results(stock_code: Optional[str] = None):
+    """同步任务写入数据后调用，使相关股票的CR分析结果失效（未启用缓存时不做任何事）"""
+    if _result_cache is not None:
+        _result_cache.invalidate(stock_code)
+
+
 class CRPointService:
     """CR点应用服务 - 实时计算C点和R点"""
     
-    def __init__(self):
+    def __init__(self, kline_service=None, daily_chance_repo=None, result_cache: Optional[CRResultCache] = None,
+                 checkpoint_store: Optional[CRResultCache] = None):
+        """
+        Args:
+            kline_service: K线应用服务（可选，analyze_stock 使用，不传则按需创建）
+            daily_chance_repo: 每日机会仓储（可选，analyze_stock 使用，不传则按需创建）
+            result_cache: 分析结果缓存（可选，不传则按配置使用进程内共享缓存）
+            checkpoint_store: 增量分析检查点存储（可选，不传则按配置使用进程内共享存储）
+        """
         self.strategy_service = CRStrategyService()
         self.r_point_service = RPointPluginService()
         self.strategy2_service = Strategy2Service()
+        self.kline_service = kline_service
+        self.daily_chance_repo = daily_chance_repo
+        if result_cache is None and CR_RESULT_CACHE_CONFIG['enabled']:
+            result_cache = get_cr_result_cache()
+        self.result_cache = result_cache
+        if checkpoint_store is None and CR_INCREMENTAL_CONFIG['enabled']:
+            checkpoint_store = get_cr_checkpoint_store()
+        self.checkpoint_store = checkpoint_store
+    
+    def analyze_stock(self, stock_code: str, stock_name: str, table_name: str,
+                      period: str = 'day') -> Optional[Dict[str, Any]]:
+        """
+        加载K线、技术指标和策略2所需数据后实时分析CR点
+        
+        Args:
+            stock_code: 股票代码
+            stock_name: 股票名称
+            table_name: K线数据表名
+            period: 周期类型（day/week/month等）
+            
+        Returns:
+            CR点分析结果（附带macd和ma，命中缓存时为共享对象，不能修改），K线数据为空时返回None
+        """
+        if self.kline_service is None:
+            from application.services.kline_service import KLineApplicationService
+            from application.services.indicator_service import IndicatorApplicationService
+            from infrastructure.persistence.kline_repository_impl import KLineRepositoryImpl
+            from infrastructure.persistence.indicator_repository_impl import IndicatorRepositoryImpl
+            kline_repository = KLineRepositoryImpl()
+            self.kline_service = KLineApplicationService(
+                kline_repository, IndicatorApplicationService(kline_repository, IndicatorRepositoryImpl()))
+        if self.daily_chance_repo is None:
+            from infrastructure.persistence.daily_chance_repository_impl import DailyChanceRepositoryImpl
+            self.daily_chance_repo = DailyChanceRepositoryImpl()
+        
+        # K线窗口、每日机会数据和策略配置都未变化时直接返回上次的分析结果
+        start_date = self.kline_service.get_window_start(period)
+        kline_version = self._get_kline_version(table_name, period, start_date)
+        version = self._get_result_version(stock_code, stock_name, table_name, kline_version)
+        if version is not None:
+            cached = self.result_cache.get(stock_code, period, version)
+            if cached is not None:
+                logger.debug(f"CR分析结果命中缓存: {stock_code} {period}")
+                return cached
+        
+        # 获取K线数据及技术指标
+        result = self.kline_service.get_kline_data(table_name, period, start_date, kline_version)
+        kline_data_list = result.get('kline_data', [])
+        macd_data = result.get('macd', {})
+        ma_data = result.get('ma', {})
+        
+        if not kline_data_list:
+            return None
+        
+        # 转换为KLineData对象
+        kline_objects = []
+        for kline in kline_data_list:
+            kline_obj = KLineData(
+                time=datetime.strptime(kline['time'], '%Y-%m-%d %H:%M:%S'),
+                open=kline['open'],
+                high=kline['high'],
+                low=kline['low'],
+                close=kline['close'],
+                volume=kline['volume'],
+                liangbi=kline.get('liangbi', 0),
+                weibi=kline.get('weibi', 0)
+            )
+            kline_objects.append(kline_obj)
+        
+        # 加载成交量类型和多头组合（用于策略2）
+        # 注意：所有周期都加载，因为策略2需要根据日期匹配成交量数据
+        volume_types = {}
+        bullish_patterns = {}
+        daily_chances = None
+        try:
+            start_date = kline_data_list[0]['time'].split(' ')[0]
+            end_date = kline_data_list[-1]['time'].split(' ')[0]
+            
+            daily_chances = self.daily_chance_repo.find_by_stock_code(stock_code, start_date, end_date)
+            
+            for dc in daily_chances:
+                date_str = dc.date.strftime('%Y-%m-%d')
+                if dc.volume_type:
+                    volume_types[date_str] = dc.volume_type
+                if dc.bullish_pattern:
+                    bullish_patterns[date_str] = dc.bullish_pattern
+            
+            logger.info(f"[策略2] 加载数据成功(周期:{period}): 成交量{len(volume_types)}个, 多头组合{len(bullish_patterns)}个")
+        except Exception as e:
+            logger.error(f"[策略2] 加载数据失败: {e}", exc_info=True)
+        
+        # 实时分析CR点（不保存）：已分析部分的输入未变化时从检查点续算，只分析新增的K线
+        checkpoint_version = None
+        if self.checkpoint_store is not None and daily_chances is not None:
+            checkpoint_version = (table_name, stock_name, get_config_service().version)
+        checkpoint = None
+        if checkpoint_version is not None:
+            checkpoint = self._load_checkpoint(stock_code, period, checkpoint_version, kline_objects,
+                                               kline_data_list, ma_data, macd_data, daily_chances)
+        resumed_from = checkpoint.bar_count if checkpoint is not None else 0
+        
+        state = self.resume_cr_analysis(
+            stock_code,
+            stock_name,
+            kline_objects,
+            checkpoint,
+            ma_data=ma_data,
+            macd_data=macd_data,
+            volume_types=volume_types,
+            bullish_patterns=bullish_patterns
+        )
+        if resumed_from:
+            logger.info(f"CR分析从检查点续算: {stock_code} {period} 已分析{resumed_from}根, "
+                        f"新增{len(kline_objects) - resumed_from}根")
+            if CR_INCREMENTAL_CONFIG['verify']:
+                state = self._verify_resumed(stock_code, stock_name, period, state, kline_objects, ma_data,
+                                             macd_data, volume_types, bullish_patterns)
+        if checkpoint_version is not None:
+            self.checkpoint_store.put(stock_code, period, checkpoint_version, {
+                'digest': self._input_digest(kline_data_list, ma_data, macd_data, daily_chances, state.bar_count),
+                'state': state.to_dict()
+            })
+        cr_result = self._build_result(stock_code, state)
+        
+        # 将MACD和MA数据添加到返回结果中
+        cr_result['macd'] = macd_data
+        cr_result['ma'] = ma_data
+        if version is not None:
+            self.result_cache.put(stock_code, period, version, cr_result)
+        return cr_result
+    
+    def _get_kline_version(self, table_name: str, period: str, start_date: datetime) -> Optional[tuple]:
+        """K线窗口版本（结果缓存和磁盘缓存都未启用时不查询），查询失败返回None"""
+        if self.result_cache is None and getattr(self.kline_service, 'disk_cache', None) is None:
+            return None
+        try:
+            return self.kline_service.get_kline_version(table_name, period, start_date)
+        except Exception as e:
+            logger.warning(f"获取K线窗口版本失败，不使用缓存: {table_name} {period}: {e}")
+            return None
+    
+    def _get_result_version(self, stock_code: str, stock_name: str, table_name: str,
+                            kline_version: Optional[tuple]) -> Optional[tuple]:
+        """
+        分析结果的版本：K线窗口版本 + 每日机会数据版本 + 策略配置版本
+        
+        未启用缓存、窗口内没有K线或查询失败时返回None（不使用缓存）
+        """
+        if self.result_cache is None or kline_version is None:
+            return None
+        daily_chance_version = self.daily_chance_repo.find_version(stock_code)
+        if daily_chance_version is None:
+            return None
+        return (table_name, stock_name, kline_version, daily_chance_version, get_config_service().version)
     
     def analyze_cr_points(self, stock_code: str, stock_name: str, kline_data: List[KLineData],
                          ma_data: Optional[Dict] = None, macd_data: Optional[Dict] = None,
@@ -37,42 +355,74 @@ class CRPointService:
         Returns:
             分析结果统计
         """
-        # 性能优化：批量预加载数据到缓存
-        if kline_data:
-            # 计算数据日期范围（往前多取15天以支持插件查询历史数据）
-            from datetime import timedelta
-            start_date = (kline_data[0].time - timedelta(days=15)).strftime('%Y-%m-%d')
-            end_date = kline_data[-1].time.strftime('%Y-%m-%d')
+        state = self.resume_cr_analysis(
+            stock_code, stock_name, kline_data,
+            ma_data=ma_data, macd_data=macd_data,
+            volume_types=volume_types, bullish_patterns=bullish_patterns
+        )
+        return self._build_result(stock_code, state)
+    
+    def resume_cr_analysis(self, stock_code: str, stock_name: str, kline_data: List[KLineData],
+                           state: Optional[CRAnalysisState] = None,
+                           ma_data: Optional[Dict] = None, macd_data: Optional[Dict] = None,
+                           volume_types: Optional[Dict] = None,
+                           bullish_patterns: Optional[Dict] = None) -> CRAnalysisState:
+        """
+        推进C/R点状态机：从检查点（已分析前 state.bar_count 根K线）继续分析到 kline_data 末尾
+        
+        state 为None时从头分析。kline_data 的前 bar_count 根及其指标、每日机会数据须与生成检查点时相同，
+        此时结果与对全部K线从头分析完全一致；传入的 state 不会被修改。
+        
+        Args:
+            stock_code: 股票代码
+            stock_name: 股票名称
+            kline_data: 全部K线数据列表（含已分析部分，策略2按下标取均线、MACD和前30日窗口）
+            state: 检查点（可选）
+            ma_data/macd_data/volume_types/bullish_patterns: 同 analyze_cr_points
             
-            logger.info(f"初始化C点和R点缓存: {stock_code} {start_date} 至 {end_date}")
-            # 初始化C点策略缓存
-            self.strategy_service.init_cache(stock_code, start_date, end_date)
-            # 初始化R点插件缓存
-            self.r_point_service.init_cache(stock_code, start_date, end_date)
+        Returns:
+            推进到最后一根K线的状态
+        """
+        if state is None:
+            state = CRAnalysisState()
+        else:
+            state = CRAnalysisState.from_dict(state.to_dict())
+        start_index = state.bar_count
         
-        c_points = []
-        r_points = []
-        rejected_c_points = []  # 被插件否决的C点
-        strategy2_c_points = []  # 策略2触发的C点
-        strategy2_scores = {}  # 记录所有K线的策略2评分 {date_str: {score, reason}}
-        strategy1_scores = {}  # 记录所有K线的策略1评分和插件信息 {date_str: {score, base_score, plugins}}
-        last_c_point_date: Optional[datetime] = None  # 记录最近的C点日期（用于R点判断）
+        # 性能优化：批量预加载数据到本次分析独占的上下文（不挂在共享服务上，支持并发分析）
+        if start_index < len(kline_data):
+            context = self._load_context(stock_code, kline_data, state)
+        else:
+            context = AnalysisContext(stock_code)
+        context.bonus_records.update(state.bonus_records)
+        # 分析用K线的列式序列（策略2按下标取前30日窗口，不再逐K线构造字典列表）
+        kline_bars = BarSeries.from_klines(stock_code, kline_data)
+        
+        c_points = state.c_points
+        r_points = state.r_points
+        rejected_c_points = state.rejected_c_points  # 被插件否决的C点
+        strategy2_c_points = state.strategy2_c_points  # 策略2触发的C点
+        strategy2_scores = state.strategy2_scores  # 记录所有K线的策略2评分 {date_str: {score, reason}}
+        strategy1_scores = state.strategy1_scores  # 记录所有K线的策略1评分和插件信息 {date_str: {score, base_score, plugins}}
+        last_c_point_date = state.last_c_point_date  # 记录最近的C点日期（用于R点判断）
         
         # CR关系校验：记录最后一个有效点的类型和日期
-        last_valid_point_type: Optional[str] = None  # 'C' 或 'R'
-        last_valid_point_date: Optional[datetime] = None
+        last_valid_point_type = state.last_valid_point_type  # 'C' 或 'R'
+        last_valid_point_date = state.last_valid_point_date
         
-        for index, kline in enumerate(kline_data):
+        for index in range(start_index, len(kline_data)):
+            kline = kline_data[index]
             # 检查C点策略1（新逻辑：基于赔率分+胜率分+插件）
             is_c_point, c_score, c_strategy, c_plugins, base_score, is_rejected = self.strategy_service.check_c_point_strategy_1(
                 stock_code, 
                 kline.time,
                 historical_r_points=r_points,
-                historical_c_points=c_points
+                historical_c_points=c_points,
+                context=context
             )
             
             # 记录所有K线的策略1评分和插件信息（用于前端显示）
-            date_str = kline.time.strftime('%Y-%m-%d')
+            date_str = kline_bars.dates[index]
             strategy1_scores[date_str] = {
                 'score': c_score,
                 'base_score': base_score,
@@ -96,20 +446,9 @@ class CRPointService:
             
             if ma_data and macd_data:
                 # 准备策略2所需数据
-                date_str = kline.time.strftime('%Y-%m-%d')
                 volume_type = volume_types.get(date_str) if volume_types else None
                 bullish_pattern = bullish_patterns.get(date_str) if bullish_patterns else None
                 
-                # 获取前30个交易日数据（用于判断低位）
-                daily_data_30 = []
-                if index >= 29:
-                    for i in range(index - 29, index + 1):
-                        daily_data_30.append({
-                            'high': kline_data[i].high,
-                            'low': kline_data[i].low,
-                            'close': kline_data[i].close
-                        })
-                
                 # 检查策略2
                 is_strategy2_c, strategy2_score, strategy2_reason = self.strategy2_service.check_strategy2(
                     stock_code=stock_code,
@@ -119,12 +458,13 @@ class CRPointService:
                     macd_data=macd_data,
                     volume_type=volume_type,
                     bullish_pattern=bullish_pattern,
-                    daily_data_30=daily_data_30,
-                    index=index
+                    daily_data_30=None,  # 前30日窗口由kline_bars按下标提供
+                    index=index,
+                    context=context,
+                    bars=kline_bars
                 )
                 
                 # 记录所有K线的策略2评分（用于前端显示）
-                date_str = kline.time.strftime('%Y-%m-%d')
                 strategy2_scores[date_str] = {
                     'score': strategy2_score,
                     'reason': strategy2_reason,
@@ -278,7 +618,8 @@ class CRPointService:
             is_r_point, r_plugins = self.r_point_service.check_r_point(
                 stock_code, 
                 kline.time, 
-                last_c_point_date  # 传入最近的C点日期（用于"上冲乏力"判断）
+                last_c_point_date,  # 传入最近的C点日期（用于"上冲乏力"判断）
+                context=context
             )
             
             if is_r_point:
@@ -341,33 +682,106 @@ class CRPointService:
                     )
                     rejected_c_points.append(rejected_r_point)
         
-        # 计算总C点数（策略1 + 策略2）
-        total_c_count = len(c_points) + len(strategy2_c_points)
+        state.last_c_point_date = last_c_point_date
+        state.last_valid_point_type = last_valid_point_type
+        state.last_valid_point_date = last_valid_point_date
+        state.bonus_records = dict(context.bonus_records)
+        if kline_data:
+            state.bar_count = len(kline_data)
+            state.first_bar_time = kline_data[0].time
+            state.last_bar_time = kline_data[-1].time
+        return state
+    
+    def _load_context(self, stock_code: str, kline_data: List[KLineData],
+                      state: CRAnalysisState) -> AnalysisContext:
+        """
+        加载分析上下文（日线和每日机会数据）
         
-        logger.info(f"CR点实时分析完成: {stock_code} - C点:{total_c_count}个 (策略1:{len(c_points)}个, 策略2:{len(strategy2_c_points)}个), 被否决:{len(rejected_c_points)}个, R点:{len(r_points)}个")
+        从头分析时从第一根K线往前多取15天以支持插件查询历史数据；
+        续算时只需覆盖新K线往前 lookback_days 天和最近C点当日（不早于从头分析时的起点，保证插件看到的历史相同）
+        """
+        start = kline_data[0].time - timedelta(days=15)
+        if state.bar_count:
+            resume_start = kline_data[state.bar_count].time - timedelta(days=CR_INCREMENTAL_CONFIG['lookback_days'])
+            if state.last_c_point_date is not None:
+                resume_start = min(resume_start, state.last_c_point_date)
+            start = max(start, resume_start)
+        return AnalysisContext.load(stock_code, start.strftime('%Y-%m-%d'), kline_data[-1].time.strftime('%Y-%m-%d'),
+                                    daily_chance_repo=self.daily_chance_repo)
+    
+    def _build_result(self, stock_code: str, state: CRAnalysisState) -> Dict[str, Any]:
+        """由状态机状态生成分析结果"""
+        result = state.to_result()
         
-        # 清空缓存，释放内存
-        self.strategy_service.clear_cache()
-        self.r_point_service.clear_cache()
-        self.strategy2_service.clear_cache()
+        logger.info(f"CR点实时分析完成: {stock_code} - C点:{result['c_points_count']}个 "
+                    f"(策略1:{result['strategy1_c_points_count']}个, 策略2:{result['strategy2_c_points_count']}个), "
+                    f"被否决:{result['rejected_c_points_count']}个, R点:{result['r_points_count']}个")
         
         # 日志输出：确认数据
+        strategy1_scores = result['strategy1_scores']
         logger.info(f"strategy1_scores 数量: {len(strategy1_scores)}")
         if strategy1_scores:
-            first_date = list(strategy1_scores.keys())[0]
+            first_date = next(iter(strategy1_scores))
             logger.info(f"示例数据 {first_date}: {strategy1_scores[first_date]}")
         
-        return {
-            'c_points_count': total_c_count,  # 总C点数（策略1+策略2）
-            'r_points_count': len(r_points),
-            'rejected_c_points_count': len(rejected_c_points),
-            'strategy1_c_points_count': len(c_points),  # 策略1 C点数
-            'strategy2_c_points_count': len(strategy2_c_points),  # 策略2 C点数
-            'c_points': [cp.to_dict() for cp in c_points],  # 策略1的C点
-            'r_points': [rp.to_dict() for rp in r_points],
-            'rejected_c_points': [rcp.to_dict() for rcp in rejected_c_points],
-            'strategy2_c_points': [s2p.to_dict() for s2p in strategy2_c_points],  # 策略2的C点
-            'strategy2_scores': strategy2_scores,  # 所有K线的策略2评分
-            'strategy1_scores': strategy1_scores  # 所有K线的策略1评分和插件信息
+        return result
+    
+    def _load_checkpoint(self, stock_code: str, period: str, version: tuple, kline_objects: List[KLineData],
+                         kline_data_list: List[Dict], ma_data: Dict, macd_data: Dict,
+                         daily_chances: List[Any]) -> Optional[CRAnalysisState]:
+        """
+        读取可续算的检查点：窗口起点相同、已分析的K线仍在且输入数据摘要一致，否则返回None（全量分析）
+        """
+        stored = self.checkpoint_store.get(stock_code, period, version)
+        if stored is None:
+            return None
+        try:
+            state = CRAnalysisState.from_dict(stored['state'])
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"CR分析检查点格式无效，全量分析: {stock_code} {period}: {e}")
+            return None
+        count = state.bar_count
+        if not 0 < count <= len(kline_objects) or kline_objects[0].time != state.first_bar_time \
+                or kline_objects[count - 1].time != state.last_bar_time:
+            logger.info(f"K线窗口已变化，CR分析不使用检查点: {stock_code} {period}")
+            return None
+        if self._input_digest(kline_data_list, ma_data, macd_data, daily_chances, count) != stored['digest']:
+            logger.info(f"已分析部分的K线、指标或每日机会数据有变化，CR分析不使用检查点: {stock_code} {period}")
+            return None
+        return state
+    
+    @staticmethod
+    def _input_digest(kline_data_list: List[Dict], ma_data: Dict, macd_data: Dict,
+                      daily_chances: List[Any], count: int) -> str:
+        """前 count 根K线的分析输入摘要（K线、均线、MACD，以及截至最后一根K线日期的每日机会数据）"""
+        last_date = kline_data_list[count - 1]['time'].split(' ')[0]
+        # 每日机会按插件读取的字段取值（数值字段用同步时的内容哈希）
+        chances = sorted(
+            (dc.date.strftime('%Y-%m-%d'), dc.content_hash(), dc.volume_type, dc.bullish_pattern, dc.bearish_pattern)
+            for dc in daily_chances if dc.date.strftime('%Y-%m-%d') <= last_date
+        )
+        payload = {
+            'kline': kline_data_list[:count],
+            'ma': {name: values[:count] for name, values in (ma_data or {}).items()},
+            'macd': {name: values[:count] for name, values in (macd_data or {}).items()},
+            'daily_chance': chances
         }
-
+        return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    
+    def _verify_resumed(self, stock_code: str, stock_name: str, period: str, resumed: CRAnalysisState,
+                        kline_data: List[KLineData], ma_data: Dict, macd_data: Dict,
+                        volume_types: Dict, bullish_patterns: Dict) -> CRAnalysisState:
+        """校验模式：全量分析一次并与续算结果比较，不一致时记录错误并返回全量结果"""
+        full = self.resume_cr_analysis(stock_code, stock_name, kline_data, ma_data=ma_data, macd_data=macd_data,
+                                       volume_types=volume_types, bullish_patterns=bullish_patterns)
+        resumed_result, full_result = resumed.to_result(), full.to_result()
+        different = [key for key in full_result
+                     if json.dumps(resumed_result[key], sort_keys=True, default=str)
+                     != json.dumps(full_result[key], sort_keys=True, default=str)]
+        if resumed.to_dict() != full.to_dict() and not different:
+            different = ['state']
+        if different:
+            logger.error(f"[增量校验] CR分析续算结果与全量分析不一致: {stock_code} {period} 字段{different}")
+            return full
+        logger.info(f"[增量校验] CR分析续算结果与全量分析一致: {stock_code} {period}")
+        return resumed
@@ -0,0 +1,143 @@
+"""每日机会衍生特征应用服务 - 增量计算成交量类型、多头组合、空头组合"""
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+from typing import List, Dict, Optional
+from application.services.cr_point_service import invalidate_cr_results
+from domain.repositories.daily_chance_repository import IDailyChanceRepository
+from domain.services.volume_type_service import VolumeTypeService
+from domain.services.bullish_pattern_service import BullishPatternService
+from domain.services.bearish_pattern_service import BearishPatternService
+from domain.services.pattern_window import load_daily_data, to_datetime
+from infrastructure.config.app_config import FEATURE_PIPELINE_CONFIG
+from infrastructure.config.stock_registry import get_stock_registry
+from infrastructure.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class DailyChanceFeatureService:
+    """
+    每日机会衍生特征应用服务
+
+    每只股票：
+    - 只处理水位（上次计算到的日期）往前 overlap_days 天之后的daily_chance记录
+    - 日线只查询一次（额外加载 history_days 天历史），三种特征共用
+    - 计算结果和新水位一次批量upsert写回
+    首次运行（无水位）或 full=True 时从最早的K线全量计算。
+    """
+
+    def __init__(self, repository: IDailyChanceRepository, max_workers: Optional[int] = None):
+        self.repository = repository
+        self.max_workers = max_workers or FEATURE_PIPELINE_CONFIG['max_workers']
+        self.overlap_days = FEATURE_PIPELINE_CONFIG['overlap_days']
+        self.history_days = FEATURE_PIPELINE_CONFIG['history_days']
+
+    def refresh_stock(self, stock_code: str, table_name: str, full: bool = False) -> int:
+        """
+        增量计算单只股票的衍生特征
+
+        Args:
+            stock_code: 股票代码
+            table_name: 日线所在表名
+            full: 是否忽略水位全量重算
+
+        Returns:
+            写回的记录数
+        """
+        watermark = None if full else self.repository.find_feature_watermark(stock_code)
+        refresh_start = watermark - timedelta(days=self.overlap_days) if watermark else None
+
+        daily_chances = self.repository.find_by_stock_code(
+            stock_code, refresh_start.strftime('%Y-%m-%d') if refresh_start else None
+        )
+        daily_chances = [dc for dc in daily_chances if dc.date]
+        if not daily_chances:
+            logger.info(f"股票 {stock_code} 没有需要计算衍生特征的记录")
+            return 0
+
+        target_dates = [to_datetime(dc.date) for dc in daily_chances]
+        load_start = min(target_dates) - timedelta(days=self.history_days) if refresh_start else None
+        daily_data = load_daily_data(table_name, load_start, max(target_dates))
+        if not daily_data:
+            logger.warning(f"股票 {stock_code} 没有日线数据: {table_name}")
+            return 0
+
+        volume_types = self._classify_volume_types(daily_data)
+        bullish = BullishPatternService.identify_bullish_patterns_series(
+            stock_code, table_name, target_dates, volume_types, daily_data=daily_data
+        )
+        bearish = BearishPatternService.identify_bearish_patterns_series(
+            stock_code, table_name, target_dates, daily_data=daily_data
+        )
+
+        for dc, target_date in zip(daily_chances, target_dates):
+            dc.volume_type = volume_types.get(target_date.date())
+            dc.bullish_pattern = ','.join(bullish[target_date]) if target_date in bullish else None
+            dc.bearish_pattern = ','.join(bearish[target_date]) if target_date in bearish else None
+
+        # 水位不超过最后一根日线，K线晚于daily_chance同步时下次会重算这些日期
+        last_date = min(max(target_dates), to_datetime(daily_data[-1]['date']))
+        saved = self.repository.save_features(stock_code, daily_chances, last_date)
+        invalidate_cr_results(stock_code)
+        logger.info(f"股票 {stock_code} 衍生特征计算完成: {saved} 条记录, "
+                    f"{'全量' if refresh_start is None else '自' + refresh_start.strftime('%Y-%m-%d')}, "
+                    f"水位 {last_date.strftime('%Y-%m-%d')}")
+        return saved
+
+    @staticmethod
+    def _classify_volume_types(daily_data: List[Dict]) -> Dict[date, Optional[str]]:
+        """整段日线一次计算成交量类型，同一自然日取第一条"""
+        classified = VolumeTypeService.classify_series([day['volume'] for day in daily_data])
+        volume_types = {}
+        for day, volume_type in zip(daily_data, classified):
+            volume_types.setdefault(to_datetime(day['date']).date(), volume_type)
+        return volume_types
+
+    def refresh_all_stocks(self, full: bool = False, stock_codes: Optional[List[str]] = None) -> dict:
+        """
+        并行增量计算所有股票的衍生特征
+
+        股票范围取daily_chance表中出现的所有股票（不限于股票分组配置），
+        名称和K线表名从股票注册表获取，未注册的按代码推导
+
+        Args:
+            full: 是否忽略水位全量重算
+            stock_codes: 只处理指定股票（None表示全部）
+
+        Returns:
+            计算结果统计
+        """
+        registry = get_stock_registry()
+        codes = self.repository.find_stock_codes() if stock_codes is None else stock_codes
+        stocks = [registry.info(code) for code in codes]
+
+        logger.info(f"开始计算衍生特征: 共 {len(stocks)} 只股票, {'全量' if full else '增量'}, "
+                    f"并发 {self.max_workers}")
+        start_time = time.time()
+        total_updated = 0
+        failed_stocks = []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.refresh_stock, stock.code, stock.table_name, full): stock
+                for stock in stocks
+            }
+            for future in as_completed(futures):
+                stock = futures[future]
+                try:
+                    total_updated += future.result()
+                except Exception as e:
+                    logger.error(f"计算衍生特征失败: {stock.code}({stock.name}): {e}", exc_info=True)
+                    failed_stocks.append(f"{stock.code}({stock.name})")
+
+        result = {
+            'total_stocks': len(stocks),
+            'success_count': len(stocks) - len(failed_stocks),
+            'failed_stocks': failed_stocks,
+            'total_updated': total_updated,
+            'elapsed': round(time.time() - start_time, 2)
+        }
+        logger.info(f"衍生特征计算完成: 共 {result['total_stocks']} 只股票，成功 {result['success_count']} 只，"
+                    f"失败 {len(failed_stocks)} 只，写回 {total_updated} 条记录，耗时 {result['elapsed']}秒")
+        return result
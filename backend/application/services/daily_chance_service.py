@@ -1,10 +1,14 @@
 """每日机会应用服务"""
-from typing import List, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 from domain.models.daily_chance import DailyChance
 from domain.models.stock import StockGroups
+from application.services.cr_point_service import invalidate_cr_results
 from domain.repositories.daily_chance_repository import IDailyChanceRepository
 from infrastructure.external_apis.daily_chance_api import DailyChanceApiClient
+from infrastructure.config.api_config import DAILY_CHANCE_API_CONFIG
 from infrastructure.logging.logger import get_logger
 
 logger = get_logger(__name__)
@@ -13,10 +17,12 @@ logger = get_logger(__name__)
 class DailyChanceService:
     """每日机会应用服务"""
     
-    def __init__(self, repository: IDailyChanceRepository):
+    def __init__(self, repository: IDailyChanceRepository,
+                 api_client: Optional[DailyChanceApiClient] = None,
+                 stock_groups: Optional[StockGroups] = None):
         self.repository = repository
-        self.api_client = DailyChanceApiClient()
-        self.stock_groups = StockGroups()
+        self.api_client = api_client or DailyChanceApiClient()
+        self.stock_groups = stock_groups or StockGroups()
     
     def sync_stock_daily_chance(self, stock_code: str, stock_name: str, stock_nature: str) -> int:
         """
@@ -28,97 +34,189 @@ class DailyChanceService:
             stock_nature: 股性
             
         Returns:
-            保存的记录数
+            同步的记录数（含内容未变化而跳过写入的记录），失败返回0
         """
+        stats = self.sync_stock_with_stats(stock_code, stock_name, stock_nature)
+        return 0 if stats['error'] else stats['records']
+    
+    def sync_stock_with_stats(self, stock_code: str, stock_name: str, stock_nature: str) -> Dict[str, Any]:
+        """
+        同步单个股票的每日机会数据并返回耗时统计
+        
+        只写入新增或内容哈希变化的记录，未变化的记录跳过
+        
+        Returns:
+            {'stock_code', 'records', 'inserted', 'updated', 'skipped', 'saved', 'attempts', 'status',
+             'fetch_time', 'rate_wait', 'save_time', 'elapsed', 'error'}，saved = inserted + updated，
+            时间单位为秒，成功时error为None
+        """
+        start_time = time.time()
+        stats = {'stock_code': stock_code, 'records': 0, 'inserted': 0, 'updated': 0, 'skipped': 0, 'saved': 0,
+                 'attempts': 0, 'status': None, 'fetch_time': 0.0, 'rate_wait': 0.0, 'save_time': 0.0,
+                 'elapsed': 0.0, 'error': None}
         try:
             logger.info(f"开始同步股票每日机会数据: {stock_code} ({stock_name})")
             
             # 调用API获取数据
-            api_data = self.api_client.get_daily_chance(stock_code)
+            api_data, fetch_stats = self.api_client.fetch_daily_chance(stock_code)
+            stats.update(attempts=fetch_stats['attempts'], status=fetch_stats['status'],
+                         fetch_time=fetch_stats['elapsed'], rate_wait=round(fetch_stats['rate_wait'], 3),
+                         error=fetch_stats['error'])
             
             if not api_data:
                 logger.warning(f"未获取到数据: {stock_code}")
-                return 0
+                stats['error'] = stats['error'] or '无数据'
+                return stats
             
-            # 转换为领域模型
-            daily_chances = []
-            for item in api_data:
-                try:
-                    # 解析日期
-                    date_str = item.get('day', '')
-                    if not date_str:
-                        continue
-                    
-                    # 处理日期格式 "2024-06-07 00:00:00" -> "2024-06-07"
-                    date_obj = datetime.strptime(date_str.split()[0], '%Y-%m-%d')
-                    
-                    # 解析赔率描述
-                    win_ratio_desc = item.get('winRatioDescription', '')
-                    day_score, week_score, total_score = self.api_client.parse_win_ratio_description(win_ratio_desc)
-                    
-                    # 创建模型
-                    daily_chance = DailyChance(
-                        stock_code=stock_code,
-                        stock_name=stock_name,
-                        stock_nature=stock_nature,
-                        date=date_obj,
-                        chance=float(item.get('chance', 0)),
-                        day_win_ratio_score=day_score,
-                        week_win_ratio_score=week_score,
-                        total_win_ratio_score=total_score,
-                        support_price=float(item.get('supportPrice')) if item.get('supportPrice') else None,
-                        pressure_price=float(item.get('pressurePrice')) if item.get('pressurePrice') else None
-                    )
-                    
-                    daily_chances.append(daily_chance)
-                    
-                except Exception as e:
-                    logger.warning(f"解析数据项失败: {item}, 错误={str(e)}")
-                    continue
+            daily_chances = self._to_daily_chances(stock_code, stock_name, stock_nature, api_data)
+            stats['records'] = len(daily_chances)
+            if not daily_chances:
+                stats['error'] = '无有效数据'
+                return stats
             
-            # 批量保存
-            saved_count = self.repository.save_batch(daily_chances)
-            logger.info(f"同步完成: {stock_code}, 保存 {saved_count} 条记录")
-            return saved_count
+            # 只保存新增或变化的记录
+            save_start = time.time()
+            changed, counts = self._select_changed(stock_code, daily_chances)
+            stats.update(counts)
+            if changed:
+                if self.repository.save_batch(changed) <= 0:
+                    stats['error'] = '保存失败'
+                    return stats
+                stats['saved'] = len(changed)
+                invalidate_cr_results(stock_code)
+            stats['save_time'] = round(time.time() - save_start, 3)
+            logger.info(f"同步完成: {stock_code}, 新增 {counts['inserted']} 条, 更新 {counts['updated']} 条, "
+                        f"未变化跳过 {counts['skipped']} 条")
+            return stats
             
         except Exception as e:
+            stats['error'] = str(e)
             logger.error(f"同步股票每日机会数据失败: {stock_code}, 错误={str(e)}", exc_info=True)
-            return 0
+            return stats
+        finally:
+            stats['elapsed'] = round(time.time() - start_time, 3)
     
-    def sync_all_stocks_daily_chance(self) -> dict:
+    def _select_changed(self, stock_code: str,
+                        daily_chances: List[DailyChance]) -> Tuple[List[DailyChance], Dict[str, int]]:
         """
-        同步所有股票的每日机会数据
+        按内容哈希筛选需要写入的记录
+        
+        晚于库中最新日期的记录直接视为新增；其余与库中的内容哈希比较，哈希不同（含历史记录尚无哈希）才更新。
         
         Returns:
-            同步结果统计
+            (需要写入的记录, {'inserted', 'updated', 'skipped'})
         """
-        logger.info("开始同步所有股票的每日机会数据")
+        # 同一日期多条时以最后一条为准（与upsert的最终结果一致）
+        by_date = {dc.date.strftime('%Y-%m-%d'): dc for dc in daily_chances}
         
-        all_groups = self.stock_groups.get_all_groups()
-        total_stocks = 0
-        total_saved = 0
-        failed_stocks = []
+        latest_date = self.repository.find_latest_date(stock_code)
+        stored_hashes = self.repository.find_content_hashes(stock_code) if latest_date else {}
         
-        for stock_nature, stocks in all_groups.items():
-            logger.info(f"开始同步 {stock_nature} 组股票，共 {len(stocks)} 只")
-            
-            for stock in stocks:
-                total_stocks += 1
-                saved_count = self.sync_stock_daily_chance(stock.code, stock.name, stock_nature)
+        changed = []
+        counts = {'inserted': 0, 'updated': 0, 'skipped': 0}
+        for date_str, dc in by_date.items():
+            if latest_date is None or date_str > latest_date or date_str not in stored_hashes:
+                counts['inserted'] += 1
+                changed.append(dc)
+            elif stored_hashes[date_str] != dc.content_hash():
+                counts['updated'] += 1
+                changed.append(dc)
+            else:
+                counts['skipped'] += 1
+        return changed, counts
+    
+    def _to_daily_chances(self, stock_code: str, stock_name: str, stock_nature: str,
+                          api_data: List[Dict[str, Any]]) -> List[DailyChance]:
+        """将API返回数据转换为领域模型"""
+        daily_chances = []
+        for item in api_data:
+            try:
+                # 解析日期
+                date_str = item.get('day', '')
+                if not date_str:
+                    continue
+                
+                # 处理日期格式 "2024-06-07 00:00:00" -> "2024-06-07"
+                date_obj = datetime.strptime(date_str.split()[0], '%Y-%m-%d')
+                
+                # 解析赔率描述
+                win_ratio_desc = item.get('winRatioDescription', '')
+                day_score, week_score, total_score = self.api_client.parse_win_ratio_description(win_ratio_desc)
                 
-                if saved_count > 0:
-                    total_saved += saved_count
-                else:
-                    failed_stocks.append(f"{stock.code}({stock.name})")
+                # 创建模型
+                daily_chance = DailyChance(
+                    stock_code=stock_code,
+                    stock_name=stock_name,
+                    stock_nature=stock_nature,
+                    date=date_obj,
+                    chance=float(item.get('chance', 0)),
+                    day_win_ratio_score=day_score,
+                    week_win_ratio_score=week_score,
+                    total_win_ratio_score=total_score,
+                    support_price=float(item.get('supportPrice')) if item.get('supportPrice') else None,
+                    pressure_price=float(item.get('pressurePrice')) if item.get('pressurePrice') else None
+                )
+                
+                daily_chances.append(daily_chance)
+                
+            except Exception as e:
+                logger.warning(f"解析数据项失败: {item}, 错误={str(e)}")
+                continue
+        
+        return daily_chances
+    
+    def sync_all_stocks_daily_chance(self, max_workers: Optional[int] = None) -> dict:
+        """
+        同步所有股票的每日机会数据
+        
+        Args:
+            max_workers: 并发同步的股票数，None使用配置，1为串行
+            
+        Returns:
+            同步结果统计（含每只股票的耗时统计 stock_stats）
+        """
+        max_workers = max_workers or DAILY_CHANCE_API_CONFIG['max_workers']
+        
+        stocks = [(stock, stock_nature)
+                  for stock_nature, stock_list in self.stock_groups.get_all_groups().items()
+                  for stock in stock_list]
+        logger.info(f"开始同步所有股票的每日机会数据: 共 {len(stocks)} 只，并发 {max_workers}")
+        
+        start_time = time.time()
+        stock_stats = []
+        if max_workers <= 1:
+            for stock, stock_nature in stocks:
+                stock_stats.append(self.sync_stock_with_stats(stock.code, stock.name, stock_nature))
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(self.sync_stock_with_stats, stock.code, stock.name, stock_nature)
+                           for stock, stock_nature in stocks]
+                stock_stats = [future.result() for future in futures]
+        
+        total_saved = sum(stats['saved'] for stats in stock_stats)
+        failed_stocks = [f"{stock.code}({stock.name})"
+                         for (stock, _), stats in zip(stocks, stock_stats) if stats['error']]
         
         result = {
-            'total_stocks': total_stocks,
+            'total_stocks': len(stocks),
             'total_saved': total_saved,
+            'total_inserted': sum(stats['inserted'] for stats in stock_stats),
+            'total_updated': sum(stats['updated'] for stats in stock_stats),
+            'total_skipped': sum(stats['skipped'] for stats in stock_stats),
             'failed_stocks': failed_stocks,
-            'success_count': total_stocks - len(failed_stocks)
+            'success_count': len(stocks) - len(failed_stocks),
+            'elapsed': round(time.time() - start_time, 3),
+            'total_attempts': sum(stats['attempts'] for stats in stock_stats),
+            'stock_stats': stock_stats
         }
         
-        logger.info(f"同步完成: 共 {total_stocks} 只股票，成功 {result['success_count']} 只，失败 {len(failed_stocks)} 只，保存 {total_saved} 条记录")
+        logger.info(f"同步完成: 共 {len(stocks)} 只股票，成功 {result['success_count']} 只，失败 {len(failed_stocks)} 只，"
+                    f"新增 {result['total_inserted']} 条，更新 {result['total_updated']} 条，"
+                    f"跳过 {result['total_skipped']} 条，请求 {result['total_attempts']} 次，耗时 {result['elapsed']}秒")
+        slowest = sorted(stock_stats, key=lambda stats: stats['elapsed'], reverse=True)[:5]
+        if slowest:
+            logger.info("最慢的股票: " + ", ".join(
+                f"{stats['stock_code']}({stats['elapsed']}秒/{stats['attempts']}次)" for stats in slowest))
         
         return result
     
@@ -0,0 +1,93 @@
+"""技术指标应用服务 - 增量维护MA/MACD"""
+import threading
+from typing import List, Dict, Optional, Any
+from domain.models.kline import KLineData
+from domain.repositories.kline_repository import IKLineRepository
+from domain.repositories.indicator_repository import IIndicatorRepository
+from domain.services.indicator_engine import IndicatorEngine
+from infrastructure.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class IndicatorApplicationService:
+    """
+    技术指标应用服务
+
+    按 表名+周期 持久化 IndicatorState 和逐K线指标值：
+    - 冷启动（无状态）时从该表该周期的第一根K线开始全量计算一次
+    - 之后只推进 last_time 之后的新K线，每根O(1)
+    - 读取时按K线时间取已计算好的指标，不再对请求窗口重算
+    """
+
+    def __init__(self, kline_repository: IKLineRepository, indicator_repository: IIndicatorRepository):
+        self.kline_repository = kline_repository
+        self.indicator_repository = indicator_repository
+        self.engine = IndicatorEngine()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _get_lock(self, table_name: str, period_type: str) -> threading.Lock:
+        """同一 表名+周期 的刷新串行执行，避免并发请求重复冷启动"""
+        key = f"{table_name}:{period_type}"
+        with self._locks_guard:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    def refresh(self, table_name: str, period_type: str, rebuild: bool = False) -> int:
+        """
+        将指标推进到最新K线
+
+        Args:
+            table_name: 表名
+            period_type: 周期类型
+            rebuild: 是否丢弃已有状态重新全量计算（历史K线被修正时使用）
+
+        Returns:
+            新计算的K线数量
+        """
+        with self._get_lock(table_name, period_type):
+            state = None if rebuild else self.indicator_repository.find_state(table_name, period_type)
+            if state is not None and state.ma_periods != self.engine.get_ma_periods(period_type):
+                logger.info(f"均线配置已变化，重建指标: {table_name} {period_type}")
+                state = None
+
+            if state is None:
+                self.indicator_repository.delete(table_name, period_type)
+                state = self.engine.new_state(period_type)
+                logger.info(f"指标冷启动全量计算: {table_name} {period_type}")
+
+            klines = self.kline_repository.get_kline_data_after(table_name, period_type, state.last_time)
+            if not klines:
+                return 0
+
+            points = self.engine.replay(state, klines)
+            self.indicator_repository.save(table_name, period_type, state, points)
+            logger.info(f"指标增量计算完成: {table_name} {period_type} 新增{len(points)}根K线, "
+                        f"最新时间{state.last_time}")
+            return len(points)
+
+    def get_indicators(self, table_name: str, period_type: str,
+                       kline_list: List[KLineData]) -> Optional[Dict[str, Any]]:
+        """
+        获取与K线列表逐根对齐的MA/MACD指标
+
+        Returns:
+            {'ma': {...}, 'macd': {...}}；存在未计算到的K线时返回None，由调用方回退为全量计算
+        """
+        if not kline_list:
+            return {'ma': {}, 'macd': {'dif': [], 'dea': [], 'macd': []}}
+
+        self.refresh(table_name, period_type)
+        stored = self.indicator_repository.find_points(table_name, period_type, kline_list[0].time)
+
+        points = []
+        for kline in kline_list:
+            point = stored.get(kline.time)
+            if point is None:
+                logger.warning(f"指标缺失: {table_name} {period_type} {kline.time}")
+                return None
+            points.append(point)
+
+        return self.engine.to_series(self.engine.get_ma_periods(period_type), points)
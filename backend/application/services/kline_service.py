@@ -1,37 +1,84 @@
 """K线数据应用服务"""
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 from domain.repositories.kline_repository import IKLineRepository
 from domain.services.period_service import PeriodService
 from domain.services.macd_service import MACDService
 from domain.services.ma_service import MAService
+from domain.services.indicator_engine import IndicatorEngine
+from infrastructure.persistence.disk_cache import DiskCache, get_disk_cache
 from infrastructure.logging.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 窗口起点对齐网格的起算日（周一）
+_WINDOW_ALIGN_EPOCH = datetime(2000, 1, 3)
+
 
 class KLineApplicationService:
     """K线数据应用服务"""
     
-    def __init__(self, kline_repository: IKLineRepository):
+    def __init__(self, kline_repository: IKLineRepository, indicator_service=None,
+                 disk_cache: Optional[DiskCache] = None):
+        """
+        Args:
+            kline_repository: K线仓储
+            indicator_service: 增量指标服务（IndicatorApplicationService，可选，不传则每次全量计算）
+            disk_cache: 磁盘缓存（可选，不传则按 DISK_CACHE_CONFIG 使用进程内共享实例，未启用时不缓存）
+        """
         self.kline_repository = kline_repository
+        self.indicator_service = indicator_service
+        self.disk_cache = disk_cache if disk_cache is not None else get_disk_cache()
         self.macd_service = MACDService()
         self.ma_service = MAService()
     
-    def get_kline_data(self, table_name: str, period_type: str) -> Dict[str, any]:
+    @staticmethod
+    def get_window_start(period_type: str) -> datetime:
+        """
+        根据周期类型计算K线窗口的开始时间
+        
+        起点按对齐天数向前取整到固定网格，网格周期内窗口起点不变（新K线只追加在末尾）
+        """
+        days = PeriodService.get_time_range_days(period_type)
+        start = datetime.now() - timedelta(days=days)
+        align_days = PeriodService.get_time_range_align_days(period_type)
+        if align_days > 0:
+            offset = (start - _WINDOW_ALIGN_EPOCH).days // align_days * align_days
+            start = _WINDOW_ALIGN_EPOCH + timedelta(days=offset)
+        return start
+    
+    def get_kline_version(self, table_name: str, period_type: str, start_date: datetime) -> Optional[Tuple]:
+        """K线窗口版本（窗口内K线数量、首尾时间、各行内容校验和），无数据返回None"""
+        return self.kline_repository.get_kline_version(table_name, period_type, start_date)
+    
+    def get_kline_data(self, table_name: str, period_type: str,
+                       start_date: Optional[datetime] = None,
+                       kline_version: Optional[Tuple] = None) -> Dict[str, any]:
         """
         获取K线数据及技术指标
         
+        启用磁盘缓存时，K线窗口版本未变化则直接读取上次的结果（服务重启后也不再查询K线和指标）
+        
         Args:
             table_name: 表名
             period_type: 周期类型
+            start_date: 窗口开始时间（None则按周期类型计算）
+            kline_version: 调用方已查询的K线窗口版本（可选，避免重复查询）
             
         Returns:
             包含K线数据和技术指标的字典
         """
-        # 根据周期类型计算时间范围
-        days = PeriodService.get_time_range_days(period_type)
-        start_date = datetime.now() - timedelta(days=days)
+        if start_date is None:
+            start_date = self.get_window_start(period_type)
+        
+        cache_key = f"{table_name}:{period_type}"
+        if self.disk_cache is not None and kline_version is None:
+            kline_version = self.get_kline_version(table_name, period_type, start_date)
+        if self.disk_cache is not None and kline_version is not None:
+            cached = self.disk_cache.get('kline', cache_key, kline_version)
+            if cached is not None:
+                logger.debug(f"K线和指标命中磁盘缓存: {table_name} {period_type}")
+                return cached
         
         # 获取数据
         kline_list = self.kline_repository.get_kline_data(
@@ -44,7 +91,35 @@ class KLineApplicationService:
         # 转换为字典列表
         kline_data = [kline.to_dict() for kline in kline_list]
         
-        # 计算MACD技术指标
+        # 优先读取增量维护的指标，不可用时对当前窗口全量计算
+        indicators = None
+        if kline_data and self.indicator_service is not None:
+            try:
+                indicators = self.indicator_service.get_indicators(table_name, period_type, kline_list)
+            except Exception as e:
+                logger.error(f"读取增量指标失败，回退为全量计算: {e}")
+        
+        if indicators is not None:
+            macd_data = indicators['macd']
+            ma_data = indicators['ma']
+            logger.info(f"使用增量指标: 股票{table_name}, 周期{period_type}, 数据点{len(kline_data)}")
+        else:
+            macd_data = self._calculate_macd(table_name, period_type, kline_data)
+            ma_data = self._calculate_ma(table_name, period_type, kline_data)
+        
+        result = {
+            'kline_data': kline_data,
+            'macd': macd_data,
+            'ma': ma_data
+        }
+        # 增量指标不可用而回退为窗口全量计算的结果与增量结果不同，不写入缓存
+        if self.disk_cache is not None and kline_version is not None and kline_data \
+                and (indicators is not None or self.indicator_service is None):
+            self.disk_cache.put('kline', cache_key, kline_version, result)
+        return result
+    
+    def _calculate_macd(self, table_name: str, period_type: str, kline_data: List[Dict]) -> Dict[str, any]:
+        """对K线窗口全量计算MACD"""
         macd_data = {}
         if kline_data:
             try:
@@ -57,34 +132,20 @@ class KLineApplicationService:
                     'dea': [None] * len(kline_data),
                     'macd': [None] * len(kline_data)
                 }
-        
-        # 计算移动平均线（MA5, MA10, MA20）
+        return macd_data
+    
+    def _calculate_ma(self, table_name: str, period_type: str, kline_data: List[Dict]) -> Dict[str, any]:
+        """对K线窗口全量计算移动平均线"""
         ma_data = {}
-        if kline_data:
+        if kline_data and period_type in IndicatorEngine.MA_PERIODS:
             try:
-                # 日K线计算5、10、20日均线
-                if period_type == 'day':
-                    ma_data = self.ma_service.calculate_ma_for_kline_data(kline_data, periods=[5, 10, 20])
-                # 30分钟K线计算不同周期的均线
-                elif period_type == '30min':
-                    ma_data = self.ma_service.calculate_ma_for_kline_data(kline_data, periods=[10, 20, 40])
-                # 周K线
-                elif period_type == 'week':
-                    ma_data = self.ma_service.calculate_ma_for_kline_data(kline_data, periods=[5, 10, 20])
-                # 月K线
-                elif period_type == 'month':
-                    ma_data = self.ma_service.calculate_ma_for_kline_data(kline_data, periods=[3, 6, 12])
-                
+                ma_data = self.ma_service.calculate_ma_for_kline_data(
+                    kline_data, periods=IndicatorEngine.get_ma_periods(period_type))
                 logger.info(f"MA计算成功: 股票{table_name}, 周期{period_type}, 均线{list(ma_data.keys())}")
             except Exception as e:
                 logger.error(f"MA计算失败: {e}")
                 ma_data = {}
-        
-        return {
-            'kline_data': kline_data,
-            'macd': macd_data,
-            'ma': ma_data
-        }
+        return ma_data
     
     def get_available_periods(self, table_name: str) -> Dict[str, int]:
         """
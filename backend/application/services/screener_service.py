@@ -0,0 +1,326 @@
+"""信号筛选应用服务 - 对任意股票范围按日期区间筛选插件/策略信号，多进程并行"""
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+from infrastructure.config.app_config import SCREENER_CONFIG
+from infrastructure.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 可筛选的信号
+# - c_plugin / r_plugin: C点插件1-5、R点插件1-3，逐交易日检查（与历史C/R点无关，只需日线和每日机会）
+# - strategy: CR点分析结果中的C点（策略1/策略2）和R点（按K线窗口完整分析后取区间内的点）
+SCREENER_SIGNALS = {
+    'bearish_line': {'type': 'c_plugin', 'index': 0, 'name': 'C点插件-阴线'},
+    'high_ratio_low_win': {'type': 'c_plugin', 'index': 1, 'name': 'C点插件-赔率高胜率低'},
+    'risk_kline': {'type': 'c_plugin', 'index': 2, 'name': 'C点插件-风险K线'},
+    'no_chase_high': {'type': 'c_plugin', 'index': 3, 'name': 'C点插件-不追涨'},
+    'sharp_drop_rebound': {'type': 'c_plugin', 'index': 4, 'name': 'C点插件-急跌抢反弹'},
+    'deviation': {'type': 'r_plugin', 'index': 0, 'name': 'R点插件-乖离率偏离'},
+    'pressure_stagnation': {'type': 'r_plugin', 'index': 1, 'name': 'R点插件-临近压力位滞涨'},
+    'fundamental_negative': {'type': 'r_plugin', 'index': 2, 'name': 'R点插件-基本面突发利空'},
+    'c_point': {'type': 'strategy', 'key': 'c_points', 'name': 'C点（策略1）'},
+    'strategy2': {'type': 'strategy', 'key': 'strategy2_c_points', 'name': 'C点（策略2）'},
+    'r_point': {'type': 'strategy', 'key': 'r_points', 'name': 'R点'}
+}
+
+# 工作进程内复用的服务实例（每个进程各自持有连接池和插件服务）
+_worker_services = None
+
+
+def _get_worker_services():
+    """获取当前工作进程的服务实例，首次调用时创建"""
+    global _worker_services
+    if _worker_services is None:
+        from application.services.cr_point_service import CRPointService
+        from domain.services.c_point_plugin_service import CPointPluginService
+        from domain.services.r_point_plugin_service import RPointPluginService
+        from infrastructure.persistence.daily_repository_impl import DailyRepositoryImpl
+        from infrastructure.persistence.daily_chance_repository_impl import DailyChanceRepositoryImpl
+        _worker_services = {
+            'cr': CRPointService(),
+            'c_plugin': CPointPluginService(),
+            'r_plugin': RPointPluginService(),
+            'daily_repo': DailyRepositoryImpl(),
+            'daily_chance_repo': DailyChanceRepositoryImpl()
+        }
+    return _worker_services
+
+
+def screen_chunk(stocks: List[Dict[str, str]], signals: List[str], start_date: str,
+                 end_date: str, period: str = 'day') -> Dict[str, Any]:
+    """
+    筛选一批股票（在工作进程中执行）
+
+    插件信号：整批股票的日线和每日机会各用一次批量查询加载（开始日期前多取 lookback_days 天），
+    每只股票创建一个分析上下文，插件按整段序列批量计算；
+    策略信号：逐只股票执行CR点分析（复用结果缓存和检查点），取区间内的C/R点。
+
+    Args:
+        stocks: 股票列表 [{'code', 'name', 'table_name'}]
+        signals: 信号键列表（SCREENER_SIGNALS 的键）
+        start_date: 开始日期（含，YYYY-MM-DD）
+        end_date: 结束日期（含，YYYY-MM-DD）
+        period: 策略信号的分析周期
+
+    Returns:
+        {'hits': [{'code', 'name', 'date', 'signal', 'score', 'reason'}], 'errors': [{'code', 'error'}],
+         'scanned': 股票数, 'elapsed': 秒}
+    """
+    from domain.models.analysis_context import AnalysisContext
+
+    start = time.time()
+    services = _get_worker_services()
+    hits: List[Dict[str, Any]] = []
+    errors: List[Dict[str, str]] = []
+    codes = [stock['code'] for stock in stocks]
+
+    plugin_signals = [s for s in signals if SCREENER_SIGNALS[s]['type'] != 'strategy']
+    strategy_signals = [s for s in signals if SCREENER_SIGNALS[s]['type'] == 'strategy']
+
+    if plugin_signals:
+        load_start = (datetime.strptime(start_date, '%Y-%m-%d')
+                      - timedelta(days=SCREENER_CONFIG['lookback_days'])).strftime('%Y-%m-%d')
+        daily_by_code = services['daily_repo'].find_by_date_range_batch(codes, load_start, end_date)
+        chance_by_code = services['daily_chance_repo'].find_by_stock_codes(codes, load_start, end_date)
+        for stock in stocks:
+            code = stock['code']
+            try:
+                daily_list = daily_by_code.get(code)
+                if not daily_list:
+                    continue
+                context = AnalysisContext(code, daily_list=daily_list,
+                                          daily_chance_list=chance_by_code.get(code, []))
+                for signal in plugin_signals:
+                    spec = SCREENER_SIGNALS[signal]
+                    plugin_service = services[spec['type']]
+                    for date_str, result in plugin_service.check_plugin_range(
+                            code, spec['index'], context, start_date, end_date):
+                        if result.triggered:
+                            hits.append({
+                                'code': code, 'name': stock.get('name', ''), 'date': date_str,
+                                'signal': signal, 'score': getattr(result, 'score_adjustment', None),
+                                'reason': result.reason
+                            })
+            except Exception as e:
+                logger.error(f"插件信号筛选失败: {code} {e}", exc_info=True)
+                errors.append({'code': code, 'error': str(e)})
+
+    for stock in stocks if strategy_signals else []:
+        code = stock['code']
+        try:
+            cr_result = services['cr'].analyze_stock(code, stock.get('name', ''), stock['table_name'], period)
+            if cr_result is None:
+                continue
+            for signal in strategy_signals:
+                for point in cr_result.get(SCREENER_SIGNALS[signal]['key'], []):
+                    date_str = point.get('triggerDate')
+                    if date_str and start_date <= date_str <= end_date:
+                        hits.append({
+                            'code': code, 'name': stock.get('name', ''), 'date': date_str,
+                            'signal': signal, 'score': point.get('score'),
+                            'reason': point.get('strategyName', '')
+                        })
+        except Exception as e:
+            logger.error(f"策略信号筛选失败: {code} {e}", exc_info=True)
+            errors.append({'code': code, 'error': str(e)})
+
+    return {'hits': hits, 'errors': errors, 'scanned': len(stocks), 'elapsed': round(time.time() - start, 3)}
+
+
+class ScreenerService:
+    """
+    信号筛选应用服务
+
+    股票按 chunk_size 分批提交到进程池，每批一次批量查询日线和每日机会；
+    进程池在所有请求间共享并常驻，使用 spawn 方式启动（与批量回测一致）。
+    max_workers 为 1 时在当前进程内逐批执行。
+    """
+
+    _executor: Optional[ProcessPoolExecutor] = None
+    _executor_lock = threading.Lock()
+
+    @classmethod
+    def get_max_workers(cls) -> int:
+        return max(1, min(SCREENER_CONFIG['max_workers'], os.cpu_count() or 1))
+
+    @classmethod
+    def get_executor(cls) -> ProcessPoolExecutor:
+        """获取共享进程池"""
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    max_workers = cls.get_max_workers()
+                    cls._executor = ProcessPoolExecutor(
+                        max_workers=max_workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+                    logger.info(f"信号筛选进程池已创建: max_workers={max_workers}")
+        return cls._executor
+
+    @classmethod
+    def _reset_executor(cls):
+        """进程池损坏（工作进程异常退出）后丢弃，下次请求重新创建"""
+        with cls._executor_lock:
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=False)
+                cls._executor = None
+
+    @staticmethod
+    def list_signals() -> List[Dict[str, str]]:
+        """可筛选的信号列表"""
+        return [{'key': key, 'type': spec['type'], 'name': spec['name']} for key, spec in SCREENER_SIGNALS.items()]
+
+    @staticmethod
+    def resolve_universe(universe: Optional[str] = None, group: Optional[str] = None,
+                         codes: Optional[List[str]] = None) -> List[Dict[str, str]]:
+        """
+        解析股票范围
+
+        Args:
+            universe: 'database'（basic_stock 全部股票）、'config'（配置文件全部分组）、'group'（单个分组）
+                      或 'codes'（指定代码），默认 SCREENER_CONFIG['default_universe']
+            group: universe 为 'group' 时的分组名
+            codes: universe 为 'codes' 时的股票代码列表
+
+        Returns:
+            股票列表 [{'code', 'name', 'table_name'}]
+
+        Raises:
+            ValueError: 范围不支持、分组不存在或未指定股票代码
+        """
+        from infrastructure.config.stock_registry import get_stock_registry, load_stock_registry
+
+        universe = universe or ('codes' if codes else 'group' if group else SCREENER_CONFIG['default_universe'])
+        if universe in ('database', 'config'):
+            infos = load_stock_registry(universe).all_stocks()
+        elif universe == 'group':
+            groups = get_stock_registry().get_all_groups()
+            if group not in groups:
+                raise ValueError(f'股票分组不存在: {group}')
+            registry = get_stock_registry()
+            infos = [registry.info(stock.code) for stock in groups[group]]
+        elif universe == 'codes':
+            if not codes:
+                raise ValueError('请指定股票代码')
+            registry = get_stock_registry()
+            infos = [registry.info(code.strip().upper()) for code in codes if code.strip()]
+        else:
+            raise ValueError(f'不支持的股票范围: {universe}')
+        return [{'code': info.code, 'name': info.name, 'table_name': info.table_name} for info in infos]
+
+    @staticmethod
+    def validate_signals(signals: List[str]) -> List[str]:
+        """校验信号键，去重并保持顺序"""
+        if not signals:
+            raise ValueError('请指定要筛选的信号')
+        unknown = [s for s in signals if s not in SCREENER_SIGNALS]
+        if unknown:
+            raise ValueError(f"不支持的信号: {', '.join(unknown)}，可选: {', '.join(SCREENER_SIGNALS)}")
+        return list(dict.fromkeys(signals))
+
+    def scan(self, stocks: List[Dict[str, str]], signals: List[str], start_date: str, end_date: str,
+             period: str = 'day', top: Optional[int] = None,
+             max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        筛选信号并排序
+
+        Args:
+            stocks: 股票列表 [{'code', 'name', 'table_name'}]
+            signals: 信号键列表
+            start_date: 开始日期（含，YYYY-MM-DD）
+            end_date: 结束日期（含，YYYY-MM-DD）
+            period: 策略信号的分析周期
+            top: 最多返回的排序结果数（None为全部）
+            max_workers: 进程数（None按配置，1为当前进程内执行）
+
+        Returns:
+            {'ranked': [...], 'hits_count', 'scanned', 'errors', 'elapsed'}
+            ranked 每项为同一股票同一交易日的全部信号：{'code', 'name', 'date', 'signals', 'score', 'reasons'}，
+            按命中信号数、日期（新在前）、策略得分排序
+        """
+        signals = self.validate_signals(signals)
+        if start_date > end_date:
+            raise ValueError('开始日期不能晚于结束日期')
+        start = time.time()
+        chunk_size = max(1, SCREENER_CONFIG['chunk_size'])
+        chunks = [stocks[i:i + chunk_size] for i in range(0, len(stocks), chunk_size)]
+        workers = self.get_max_workers() if max_workers is None else max(1, max_workers)
+        logger.info(f"开始信号筛选: {len(stocks)}只股票, {len(chunks)}批, 信号{signals}, "
+                    f"{start_date} 至 {end_date}, 进程数{workers}")
+
+        hits: List[Dict[str, Any]] = []
+        errors: List[Dict[str, str]] = []
+        scanned = 0
+        if workers <= 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                outcome = screen_chunk(chunk, signals, start_date, end_date, period)
+                hits.extend(outcome['hits'])
+                errors.extend(outcome['errors'])
+                scanned += outcome['scanned']
+        else:
+            executor = self.get_executor()
+            futures = {executor.submit(screen_chunk, chunk, signals, start_date, end_date, period): chunk
+                       for chunk in chunks}
+            pool_broken = False
+            try:
+                for future in as_completed(futures):
+                    try:
+                        outcome = future.result()
+                    except Exception as e:
+                        pool_broken = pool_broken or isinstance(e, BrokenProcessPool)
+                        logger.error(f"信号筛选进程异常: {e}", exc_info=True)
+                        errors.extend({'code': stock['code'], 'error': f'筛选进程异常: {str(e)}'}
+                                      for stock in futures[future])
+                        continue
+                    hits.extend(outcome['hits'])
+                    errors.extend(outcome['errors'])
+                    scanned += outcome['scanned']
+            finally:
+                for future in futures:
+                    future.cancel()
+                if pool_broken:
+                    self._reset_executor()
+
+        ranked = self.rank(hits)
+        result = {
+            'ranked': ranked[:top] if top else ranked,
+            'hits_count': len(hits),
+            'scanned': scanned,
+            'errors': errors,
+            'elapsed': round(time.time() - start, 3)
+        }
+        logger.info(f"信号筛选完成: 扫描{scanned}只, 命中{len(hits)}次/{len(ranked)}个股票交易日, "
+                    f"失败{len(errors)}只, 耗时{result['elapsed']}秒")
+        return result
+
+    @staticmethod
+    def rank(hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        按 股票+交易日 合并信号，按命中信号数、日期（新在前）、得分排序
+
+        得分取当日C/R点的最高策略得分（插件的加减分只在原因中体现，否决类插件的-999不参与排序）
+        """
+        grouped: Dict[tuple, Dict[str, Any]] = {}
+        for hit in hits:
+            key = (hit['code'], hit['date'])
+            entry = grouped.get(key)
+            if entry is None:
+                entry = grouped[key] = {'code': hit['code'], 'name': hit['name'], 'date': hit['date'],
+                                        'signals': [], 'score': 0, 'reasons': {}}
+            entry['signals'].append(hit['signal'])
+            if SCREENER_SIGNALS[hit['signal']]['type'] == 'strategy':
+                entry['score'] = max(entry['score'], hit['score'] or 0)
+            entry['reasons'][hit['signal']] = hit['reason']
+        return sorted(grouped.values(),
+                      key=lambda e: (-len(e['signals']), _negate_date(e['date']), -e['score'], e['code']))
+
+
+def _negate_date(date_str: str) -> int:
+    """日期降序排序键"""
+    return -int(date_str.replace('-', ''))
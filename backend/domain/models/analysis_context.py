@@ -0,0 +1,88 @@
+"""CR分析上下文 - 单次分析独占的预加载数据和状态"""
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+from domain.models.bar_series import BarSeries, to_date_str
+from infrastructure.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class AnalysisContext:
+    """
+    CR分析上下文
+
+    每次分析创建一个实例，显式传给C点/R点插件和策略2，
+    替代原先挂在服务实例上的共享缓存，使分析可以在多线程下并发执行。
+    实例本身不做线程同步，不要在多个分析之间共享。
+    """
+
+    def __init__(self, stock_code: str, daily_list: Optional[List[Any]] = None,
+                 daily_chance_list: Optional[List[Any]] = None):
+        """
+        Args:
+            stock_code: 股票代码
+            daily_list: 日线数据列表（DailyData）
+            daily_chance_list: 每日机会数据列表（DailyChance）
+        """
+        self.stock_code = stock_code
+        # 日线数据（列式存储，C点/R点插件共享）
+        self.bars = BarSeries.from_daily_list(stock_code, daily_list)
+        self.daily_chance_cache: Dict[str, Any] = {}  # {date_str: DailyChance}
+        # 策略2加分时间窗口 {bonus_key: end_date}
+        self.bonus_records: Dict[str, datetime] = {}
+        # 插件整段序列批量计算结果 {插件服务名: 批量结果}，由各插件服务按需填充
+        self.plugin_batches: Dict[str, Any] = {}
+
+        for dc in daily_chance_list or []:
+            self.daily_chance_cache[to_date_str(dc.date)] = dc
+
+    @classmethod
+    def load(cls, stock_code: str, start_date: str, end_date: str,
+             daily_repo=None, daily_chance_repo=None) -> 'AnalysisContext':
+        """
+        批量查询日线和daily_chance数据，创建分析上下文
+
+        Args:
+            stock_code: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+            daily_repo: 日线仓储（可选）
+            daily_chance_repo: 每日机会仓储（可选）
+        """
+        if daily_repo is None:
+            from infrastructure.persistence.daily_repository_impl import DailyRepositoryImpl
+            daily_repo = DailyRepositoryImpl()
+        if daily_chance_repo is None:
+            from infrastructure.persistence.daily_chance_repository_impl import DailyChanceRepositoryImpl
+            daily_chance_repo = DailyChanceRepositoryImpl()
+
+        logger.info(f"开始加载分析上下文: {stock_code} {start_date} 至 {end_date}")
+        context = cls(
+            stock_code,
+            daily_list=daily_repo.find_by_date_range(stock_code, start_date, end_date),
+            daily_chance_list=daily_chance_repo.find_by_stock_code(stock_code, start_date, end_date)
+        )
+        logger.info(f"分析上下文加载完成: daily={len(context.bars)}条, "
+                    f"daily_chance={len(context.daily_chance_cache)}条")
+        return context
+
+    def get_daily(self, date_str: str):
+        """获取日线数据，未加载返回None"""
+        return self.bars.get_row(date_str)
+
+    def get_daily_chance(self, date_str: str):
+        """获取daily_chance数据，未加载返回None"""
+        return self.daily_chance_cache.get(date_str)
+
+    def get_previous_trading_dates(self, current_date_str: str, limit: Optional[int] = None) -> List[str]:
+        """
+        获取当前日期之前的交易日
+
+        Args:
+            current_date_str: 当前日期
+            limit: 最多返回的天数，None 表示全部
+
+        Returns:
+            交易日列表（按日期倒序，最近的在前）
+        """
+        return self.bars.previous_dates(current_date_str, limit)
@@ -0,0 +1,130 @@
+"""按股票组织的列式K线序列"""
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+
+def to_date_str(date) -> str:
+    """日期统一转换为 'YYYY-MM-DD' 字符串"""
+    return date.strftime('%Y-%m-%d') if isinstance(date, datetime) else str(date)
+
+
+class BarSeries:
+    """
+    单只股票的列式K线序列（只读）
+
+    - open/high/low/close/pre_close 为 array('d')，volume 为 array('q')，按日期升序排列
+    - 日期字符串只在构建时格式化一次，date -> 下标 为O(1)查询
+    - "前N个交易日"直接按下标切片，不再对日期排序
+
+    构建后不要修改各列，多个插件/服务共享同一份序列。
+    """
+
+    def __init__(self, stock_code: str, dates: List[str],
+                 open: array, high: array, low: array, close: array,
+                 volume: array, pre_close: array, rows: Optional[List[Any]] = None):
+        """
+        Args:
+            stock_code: 股票代码
+            dates: 日期字符串列表（升序、唯一）
+            open/high/low/close/volume/pre_close: 各价格列，长度与dates一致
+            rows: 原始行对象列表（可选，供仍按行访问的逻辑使用）
+        """
+        self.stock_code = stock_code
+        self.dates = dates
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.pre_close = pre_close
+        self._rows = rows
+        self._index: Dict[str, int] = {d: i for i, d in enumerate(dates)}
+
+    @classmethod
+    def empty(cls, stock_code: str) -> 'BarSeries':
+        """空序列"""
+        return cls(stock_code, [], array('d'), array('d'), array('d'), array('d'), array('q'), array('d'), [])
+
+    @classmethod
+    def from_daily_list(cls, stock_code: str, daily_list: List[Any]) -> 'BarSeries':
+        """
+        从日线数据列表（DailyData）构建
+
+        同一日期出现多条时保留最后一条，与原先按日期建字典缓存的行为一致
+        """
+        by_date: Dict[str, Any] = {}
+        for daily in daily_list or []:
+            by_date[to_date_str(daily.date)] = daily
+        dates = sorted(by_date)
+        rows = [by_date[d] for d in dates]
+        return cls(
+            stock_code, dates,
+            array('d', (r.open for r in rows)),
+            array('d', (r.high for r in rows)),
+            array('d', (r.low for r in rows)),
+            array('d', (r.close for r in rows)),
+            array('q', (int(r.volume) for r in rows)),
+            array('d', (r.pre_close or 0 for r in rows)),
+            rows
+        )
+
+    @classmethod
+    def from_klines(cls, stock_code: str, kline_data: List[Any]) -> 'BarSeries':
+        """
+        从K线数据列表（KLineData，已按时间升序）构建
+
+        KLineData 没有昨收价，pre_close 取前一根K线收盘价，第一根为0
+        """
+        closes = array('d', (k.close for k in kline_data))
+        pre_close = array('d', [0.0]) + closes[:-1] if closes else array('d')
+        return cls(
+            stock_code,
+            [to_date_str(k.time) for k in kline_data],
+            array('d', (k.open for k in kline_data)),
+            array('d', (k.high for k in kline_data)),
+            array('d', (k.low for k in kline_data)),
+            closes,
+            array('q', (int(k.volume) for k in kline_data)),
+            pre_close,
+            list(kline_data)
+        )
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def index_of(self, date_str: str) -> Optional[int]:
+        """日期对应的下标，非交易日返回None"""
+        return self._index.get(date_str)
+
+    def position(self, date_str: str) -> int:
+        """严格早于该日期的交易日数量（即该日期在序列中的插入位置）"""
+        index = self._index.get(date_str)
+        if index is not None:
+            return index
+        return bisect_left(self.dates, date_str)
+
+    def previous_dates(self, date_str: str, limit: Optional[int] = None) -> List[str]:
+        """
+        获取该日期之前的交易日
+
+        Args:
+            date_str: 当前日期
+            limit: 最多返回的天数，None 表示全部
+
+        Returns:
+            交易日列表（按日期倒序，最近的在前）
+        """
+        end = self.position(date_str)
+        start = 0 if limit is None else max(0, end - limit)
+        return self.dates[start:end][::-1]
+
+    def row(self, index: int):
+        """按下标获取原始行对象"""
+        return self._rows[index]
+
+    def get_row(self, date_str: str):
+        """按日期获取原始行对象，不存在返回None"""
+        index = self._index.get(date_str)
+        return None if index is None else self._rows[index]
@@ -0,0 +1,107 @@
+"""CR分析状态 - C/R点状态机推进到某根K线时的快照（检查点），用于新K线到来后续算"""
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from domain.models.cr_point import CRPoint
+
+_POINT_DATE_FIELDS = ('trigger_date', 'created_at')
+
+
+def _datetime_to_str(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _datetime_from_str(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value is not None else None
+
+
+def _point_to_state(point: CRPoint) -> Dict[str, Any]:
+    """CRPoint完整序列化（to_dict只保留日期，续算时插件按时间比较需要完整的触发时间）"""
+    data = {f.name: getattr(point, f.name) for f in fields(CRPoint)}
+    for name in _POINT_DATE_FIELDS:
+        data[name] = _datetime_to_str(data[name])
+    return data
+
+
+def _point_from_state(data: Dict[str, Any]) -> CRPoint:
+    data = dict(data)
+    for name in _POINT_DATE_FIELDS:
+        data[name] = _datetime_from_str(data[name])
+    return CRPoint(**data)
+
+
+@dataclass
+class CRAnalysisState:
+    """
+    C/R点状态机状态
+
+    包含已分析的前 bar_count 根K线产生的全部C/R点、逐K线评分，以及影响后续K线判断的状态：
+    最近C点日期（R点"上冲乏力"）、最后一个有效点（CR关系校验）、历史C/R点（C点插件6-8）、
+    策略2的加分时间窗口。从快照继续推进与对全部K线从头分析的结果完全一致。
+    """
+    bar_count: int = 0  # 已分析的K线数
+    first_bar_time: Optional[datetime] = None
+    last_bar_time: Optional[datetime] = None
+    c_points: List[CRPoint] = field(default_factory=list)  # 策略1的C点
+    r_points: List[CRPoint] = field(default_factory=list)
+    rejected_c_points: List[CRPoint] = field(default_factory=list)  # 被否决的C点和被CR关系校验拒绝的R点
+    strategy2_c_points: List[CRPoint] = field(default_factory=list)  # 策略2的C点
+    strategy1_scores: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # {date_str: {score, base_score, plugins, ...}}
+    strategy2_scores: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # {date_str: {score, reason, triggered}}
+    last_c_point_date: Optional[datetime] = None  # 最近的C点日期（用于R点判断）
+    last_valid_point_type: Optional[str] = None  # CR关系校验：最后一个有效点的类型 'C' 或 'R'
+    last_valid_point_date: Optional[datetime] = None
+    bonus_records: Dict[str, datetime] = field(default_factory=dict)  # 策略2加分时间窗口 {bonus_key: end_date}
+
+    def to_result(self) -> Dict[str, Any]:
+        """分析结果（接口返回格式）"""
+        return {
+            'c_points_count': len(self.c_points) + len(self.strategy2_c_points),  # 总C点数（策略1+策略2）
+            'r_points_count': len(self.r_points),
+            'rejected_c_points_count': len(self.rejected_c_points),
+            'strategy1_c_points_count': len(self.c_points),  # 策略1 C点数
+            'strategy2_c_points_count': len(self.strategy2_c_points),  # 策略2 C点数
+            'c_points': [cp.to_dict() for cp in self.c_points],  # 策略1的C点
+            'r_points': [rp.to_dict() for rp in self.r_points],
+            'rejected_c_points': [rcp.to_dict() for rcp in self.rejected_c_points],
+            'strategy2_c_points': [s2p.to_dict() for s2p in self.strategy2_c_points],  # 策略2的C点
+            'strategy2_scores': dict(self.strategy2_scores),  # 所有K线的策略2评分
+            'strategy1_scores': dict(self.strategy1_scores)  # 所有K线的策略1评分和插件信息
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """序列化为可JSON存储的字典"""
+        return {
+            'bar_count': self.bar_count,
+            'first_bar_time': _datetime_to_str(self.first_bar_time),
+            'last_bar_time': _datetime_to_str(self.last_bar_time),
+            'c_points': [_point_to_state(p) for p in self.c_points],
+            'r_points': [_point_to_state(p) for p in self.r_points],
+            'rejected_c_points': [_point_to_state(p) for p in self.rejected_c_points],
+            'strategy2_c_points': [_point_to_state(p) for p in self.strategy2_c_points],
+            'strategy1_scores': self.strategy1_scores,
+            'strategy2_scores': self.strategy2_scores,
+            'last_c_point_date': _datetime_to_str(self.last_c_point_date),
+            'last_valid_point_type': self.last_valid_point_type,
+            'last_valid_point_date': _datetime_to_str(self.last_valid_point_date),
+            'bonus_records': {key: _datetime_to_str(end) for key, end in self.bonus_records.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CRAnalysisState':
+        """从 to_dict 的结果恢复（返回新对象，继续推进不会修改传入的字典）"""
+        return cls(
+            bar_count=data['bar_count'],
+            first_bar_time=_datetime_from_str(data['first_bar_time']),
+            last_bar_time=_datetime_from_str(data['last_bar_time']),
+            c_points=[_point_from_state(p) for p in data['c_points']],
+            r_points=[_point_from_state(p) for p in data['r_points']],
+            rejected_c_points=[_point_from_state(p) for p in data['rejected_c_points']],
+            strategy2_c_points=[_point_from_state(p) for p in data['strategy2_c_points']],
+            strategy1_scores=dict(data['strategy1_scores']),
+            strategy2_scores=dict(data['strategy2_scores']),
+            last_c_point_date=_datetime_from_str(data['last_c_point_date']),
+            last_valid_point_type=data['last_valid_point_type'],
+            last_valid_point_date=_datetime_from_str(data['last_valid_point_date']),
+            bonus_records={key: _datetime_from_str(end) for key, end in data['bonus_records'].items()}
+        )
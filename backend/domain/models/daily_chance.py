@@ -1,4 +1,5 @@
 """每日机会领域模型"""
+import hashlib
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
@@ -23,6 +24,22 @@ class DailyChance:
     bearish_pattern: Optional[str] = None  # 空头组合
     created_at: Optional[datetime] = None  # 创建时间
     
+    def content_hash(self) -> str:
+        """
+        API数据内容哈希（MD5）
+        
+        只覆盖接口返回的字段，数值按数据库精度（2位小数）格式化，用于同步时跳过未变化的记录
+        """
+        def fmt(value) -> str:
+            return '' if value is None else f"{value:.2f}"
+        
+        content = '|'.join([
+            self.stock_name or '', self.stock_nature or '', fmt(self.chance),
+            fmt(self.day_win_ratio_score), fmt(self.week_win_ratio_score), fmt(self.total_win_ratio_score),
+            fmt(self.support_price), fmt(self.pressure_price)
+        ])
+        return hashlib.md5(content.encode('utf-8')).hexdigest()
+    
     def to_dict(self) -> dict:
         """转换为字典"""
         return {
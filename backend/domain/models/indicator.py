@@ -0,0 +1,76 @@
+"""技术指标（MA/MACD）领域模型"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional, Dict, Any
+
+
+@dataclass
+class IndicatorPoint:
+    """单根K线的MA/MACD指标值"""
+    time: datetime
+    ma: List[Optional[float]]  # 与 IndicatorState.ma_periods 一一对应
+    dif: Optional[float] = None
+    dea: Optional[float] = None
+    macd: Optional[float] = None
+
+
+@dataclass
+class IndicatorState:
+    """
+    增量指标计算状态（按 表名+周期 持久化）
+
+    保存继续计算下一根K线所需的全部信息：
+    - recent_closes: 最近 max(最长均线周期, 慢线周期) 个收盘价，用于均线窗口和EMA首值（SMA）
+    - ema_fast/ema_slow/dea: 当前EMA值，未满周期前为None
+    - pending_difs: DEA首值之前累积的DIF值（满signal_period个后求SMA作为DEA首值）
+    """
+    ma_periods: List[int]
+    fast_period: int = 12
+    slow_period: int = 26
+    signal_period: int = 9
+    count: int = 0
+    recent_closes: List[float] = field(default_factory=list)
+    ema_fast: Optional[float] = None
+    ema_slow: Optional[float] = None
+    pending_difs: List[float] = field(default_factory=list)
+    dea: Optional[float] = None
+    last_time: Optional[datetime] = None
+
+    @property
+    def window_size(self) -> int:
+        """需要保留的收盘价数量"""
+        return max(max(self.ma_periods), self.slow_period, self.fast_period)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（用于JSON持久化）"""
+        return {
+            'ma_periods': self.ma_periods,
+            'fast_period': self.fast_period,
+            'slow_period': self.slow_period,
+            'signal_period': self.signal_period,
+            'count': self.count,
+            'recent_closes': self.recent_closes,
+            'ema_fast': self.ema_fast,
+            'ema_slow': self.ema_slow,
+            'pending_difs': self.pending_difs,
+            'dea': self.dea,
+            'last_time': self.last_time.strftime('%Y-%m-%d %H:%M:%S') if self.last_time else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'IndicatorState':
+        """从字典恢复"""
+        last_time = data.get('last_time')
+        return cls(
+            ma_periods=list(data['ma_periods']),
+            fast_period=data.get('fast_period', 12),
+            slow_period=data.get('slow_period', 26),
+            signal_period=data.get('signal_period', 9),
+            count=data.get('count', 0),
+            recent_closes=list(data.get('recent_closes', [])),
+            ema_fast=data.get('ema_fast'),
+            ema_slow=data.get('ema_slow'),
+            pending_difs=list(data.get('pending_difs', [])),
+            dea=data.get('dea'),
+            last_time=datetime.strptime(last_time, '%Y-%m-%d %H:%M:%S') if last_time else None
+        )
@@ -1,9 +1,12 @@
 """股票领域模型"""
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import List, Dict, Optional
 import json
 from pathlib import Path
 
+# 主板代码前缀（C/R点插件的涨跌幅、振幅阈值按此区分主板/非主板）
+MAIN_BOARD_PREFIXES = ('SH600', 'SH601', 'SH603', 'SH605', 'SZ000', 'SZ001')
+
 
 @dataclass
 class Stock:
@@ -20,6 +23,63 @@ class StockGroup:
     stocks: List[Stock]
 
 
+def classify_board(stock_code: str) -> str:
+    """按代码前缀划分板块：main 主板、chinext 创业板、star 科创板、other 其他（如深市002/003、北交所）"""
+    if stock_code.startswith(MAIN_BOARD_PREFIXES):
+        return 'main'
+    code = stock_code.upper()
+    digits = code[2:] if code.startswith(('SH', 'SZ', 'BJ')) else code
+    if digits.startswith(('300', '301')):
+        return 'chinext'
+    if digits.startswith(('688', '689')):
+        return 'star'
+    return 'other'
+
+
+def is_pattern_main_board(stock_code: str) -> bool:
+    """
+    K线形态识别（涨停/跌停判断）使用的主板口径：688、300开头为非主板，其余按主板处理
+    
+    与 MAIN_BOARD_PREFIXES 口径不同（如深市002、创业板301），两处阈值均按原口径保留
+    """
+    code = stock_code.upper()
+    if code.startswith('SH') or code.startswith('SZ'):
+        code = code[2:]
+    return not (code.startswith('688') or code.startswith('300'))
+
+
+@dataclass(frozen=True)
+class StockInfo:
+    """股票注册信息（不可变，进程内共享）"""
+    code: str
+    name: str
+    table_name: str
+    group: str
+    board: str
+    is_main_board: bool          # 插件口径：主板涨跌幅限制10%，非主板20%
+    pattern_main_board: bool     # K线形态识别口径，见 is_pattern_main_board
+    limit_pct: float             # 涨跌停幅度（%）
+    amplitude_threshold: float   # 大振幅阈值（%）
+
+    @classmethod
+    def create(cls, code: str, name: Optional[str] = None, table_name: Optional[str] = None,
+               group: str = '') -> 'StockInfo':
+        """由代码推导板块和阈值，未提供表名时按 basic_data_<代码小写> 约定"""
+        board = classify_board(code)
+        is_main_board = board == 'main'
+        return cls(
+            code=code,
+            name=name or code,
+            table_name=table_name or f"basic_data_{code.lower()}",
+            group=group,
+            board=board,
+            is_main_board=is_main_board,
+            pattern_main_board=is_pattern_main_board(code),
+            limit_pct=10 if is_main_board else 20,
+            amplitude_threshold=6 if is_main_board else 8
+        )
+
+
 class StockGroups:
     """股票分组值对象"""
     
@@ -28,16 +88,18 @@ class StockGroups:
         初始化股票分组
         
         Args:
-            config_path: 配置文件路径，如果为None则使用默认路径
+            config_path: 配置文件路径，如果为None则使用进程内共享的股票注册表（不重复解析配置文件）
         """
-        if config_path is None:
-            # 获取当前文件的目录，然后找到配置文件
-            current_dir = Path(__file__).parent.parent.parent
-            config_path = current_dir / 'infrastructure' / 'config' / 'stock_config.json'
-        
-        self._groups = self._load_from_config(config_path)
+        self._groups = None if config_path is None else self.load_from_config(config_path)
+    
+    @staticmethod
+    def default_config_path() -> Path:
+        """默认股票配置文件路径"""
+        current_dir = Path(__file__).parent.parent.parent
+        return current_dir / 'infrastructure' / 'config' / 'stock_config.json'
     
-    def _load_from_config(self, config_path: str) -> Dict[str, List[Stock]]:
+    @staticmethod
+    def load_from_config(config_path: str) -> Dict[str, List[Stock]]:
         """
         从JSON配置文件加载股票分组
         
@@ -77,9 +139,12 @@ class StockGroups:
     
     def get_all_groups(self) -> Dict[str, List[Stock]]:
         """获取所有股票分组"""
+        if self._groups is None:
+            from infrastructure.config.stock_registry import get_stock_registry
+            return get_stock_registry().get_all_groups()
         return self._groups
     
     def get_group(self, group_name: str) -> List[Stock]:
         """根据名称获取股票分组"""
-        return self._groups.get(group_name, [])
+        return self.get_all_groups().get(group_name, [])
 
@@ -1,6 +1,7 @@
 """每日机会仓储接口"""
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Dict, Tuple
 from domain.models.daily_chance import DailyChance
 
 
@@ -27,6 +28,12 @@ class IDailyChanceRepository(ABC):
         """根据股票代码查询"""
         pass
     
+    @abstractmethod
+    def find_by_stock_codes(self, stock_codes: List[str], start_date: str,
+                            end_date: str) -> Dict[str, List[DailyChance]]:
+        """批量查询多只股票同一日期范围的数据（{股票代码: 数据列表}）"""
+        pass
+    
     @abstractmethod
     def find_by_date(self, date: str) -> List[DailyChance]:
         """根据日期查询"""
@@ -37,6 +44,21 @@ class IDailyChanceRepository(ABC):
         """获取股票最新的数据日期"""
         pass
     
+    @abstractmethod
+    def find_version(self, stock_code: str) -> Optional[Tuple]:
+        """获取股票每日机会数据的版本（记录数、最新日期、最近更新时间、内容校验和），用于判断分析结果缓存是否失效"""
+        pass
+    
+    @abstractmethod
+    def find_stock_codes(self) -> List[str]:
+        """获取有每日机会数据的所有股票代码"""
+        pass
+    
+    @abstractmethod
+    def find_content_hashes(self, stock_code: str) -> Dict[str, Optional[str]]:
+        """获取股票每个日期已保存的内容哈希（日期格式YYYY-MM-DD）"""
+        pass
+    
     @abstractmethod
     def update_volume_type(self, stock_code: str, date: str, volume_type: str) -> bool:
         """更新成交量类型"""
@@ -57,3 +79,13 @@ class IDailyChanceRepository(ABC):
         """批量更新空头组合"""
         pass
 
+    
+    @abstractmethod
+    def find_feature_watermark(self, stock_code: str) -> Optional[datetime]:
+        """获取衍生特征（成交量类型、多空组合）已计算到的最后日期"""
+        pass
+    
+    @abstractmethod
+    def save_features(self, stock_code: str, daily_chances: List[DailyChance], last_date: datetime) -> int:
+        """批量写入衍生特征并更新已计算到的最后日期"""
+        pass
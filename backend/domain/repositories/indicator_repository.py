@@ -0,0 +1,31 @@
+"""技术指标仓储接口"""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional, Dict
+from domain.models.indicator import IndicatorState, IndicatorPoint
+
+
+class IIndicatorRepository(ABC):
+    """技术指标仓储接口（按 表名+周期 存储增量状态和逐K线指标值）"""
+    
+    @abstractmethod
+    def find_state(self, table_name: str, period_type: str) -> Optional[IndicatorState]:
+        """查询增量计算状态，不存在返回None"""
+        pass
+    
+    @abstractmethod
+    def save(self, table_name: str, period_type: str, state: IndicatorState,
+             points: List[IndicatorPoint]) -> int:
+        """在同一事务中保存新增的指标值和最新状态，返回保存的指标条数"""
+        pass
+    
+    @abstractmethod
+    def find_points(self, table_name: str, period_type: str,
+                    start_time: datetime) -> Dict[datetime, IndicatorPoint]:
+        """查询 start_time 及之后的指标值 {K线时间: 指标值}"""
+        pass
+    
+    @abstractmethod
+    def delete(self, table_name: str, period_type: str) -> None:
+        """删除状态和指标值（用于重建）"""
+        pass
@@ -1,6 +1,6 @@
 """K线数据仓储接口"""
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional, Dict, Tuple
 from datetime import datetime
 from domain.models.kline import KLineData, PeriodInfo
 
@@ -25,6 +25,55 @@ class IKLineRepository(ABC):
         """
         pass
     
+    @abstractmethod
+    def get_kline_data_after(self, table_name: str, period_type: str,
+                             after_time: Optional[datetime] = None) -> List[KLineData]:
+        """
+        获取指定时间之后的全部K线数据（用于增量指标计算）
+        
+        Args:
+            table_name: 表名
+            period_type: 周期类型
+            after_time: 起始时间（不含），None表示全部
+            
+        Returns:
+            K线数据列表（按时间升序）
+        """
+        pass
+    
+    @abstractmethod
+    def get_kline_data_batch(self, table_names: List[str], period_type: str,
+                             start_date: datetime, end_date: Optional[datetime] = None) -> Dict[str, List[KLineData]]:
+        """
+        获取多只股票同一时间范围的K线数据
+        
+        Args:
+            table_names: 表名列表
+            period_type: 周期类型
+            start_date: 开始时间（含）
+            end_date: 结束时间（含），None表示不限
+            
+        Returns:
+            {表名: K线数据列表（按时间升序）}
+        """
+        pass
+    
+    @abstractmethod
+    def get_kline_version(self, table_name: str, period_type: str,
+                          start_date: datetime) -> Optional[Tuple]:
+        """
+        获取K线窗口的版本（用于判断分析结果缓存是否失效）
+        
+        Args:
+            table_name: 表名
+            period_type: 周期类型
+            start_date: 窗口开始时间（含）
+            
+        Returns:
+            (K线数量, 第一根时间, 最后一根时间, 窗口内各行内容的校验和)，窗口内没有K线返回None
+        """
+        pass
+    
     @abstractmethod
     def get_available_periods(self, table_name: str) -> List[PeriodInfo]:
         """
@@ -2,10 +2,8 @@
 from typing import Optional, List, Dict
 from datetime import datetime, timedelta
 from domain.services.kline_pattern_service import KLinePatternService
-from infrastructure.persistence.database import DatabaseConnection
+from domain.services.pattern_window import iter_pattern_windows, load_daily_data, to_datetime
 from infrastructure.logging.logger import get_logger
-from domain.services.period_service import PeriodService
-import pymysql.cursors
 
 logger = get_logger(__name__)
 
@@ -13,6 +11,9 @@ logger = get_logger(__name__)
 class BearishPatternService:
     """空头组合识别服务"""
     
+    # 识别窗口：目标日期往前的自然日数
+    WINDOW_DAYS = 10
+    
     @staticmethod
     def identify_bearish_patterns(
         stock_code: str,
@@ -32,7 +33,7 @@ class BearishPatternService:
         """
         try:
             # 获取足够的历史数据（需要前5天的数据）
-            start_date = target_date - timedelta(days=10)
+            start_date = target_date - timedelta(days=BearishPatternService.WINDOW_DAYS)
             
             daily_data = BearishPatternService._get_daily_data(
                 table_name, start_date, target_date
@@ -65,116 +66,166 @@ class BearishPatternService:
             if target_idx is None or target_idx < 1:
                 return []
             
-            matched_patterns = []
-            
-            # 获取目标日期的数据
-            today = daily_data[target_idx]
-            prev_day = daily_data[target_idx - 1] if target_idx >= 1 else None
-            
-            # 1. 十字星+中阴
-            pattern1 = BearishPatternService._check_pattern1(
-                stock_code, prev_day, today
-            )
-            if pattern1:
-                matched_patterns.append(pattern1)
-            
-            # 2. 冲高回落阴线+阴线
-            pattern2 = BearishPatternService._check_pattern2(
-                stock_code, prev_day, today
-            )
-            if pattern2:
-                matched_patterns.append(pattern2)
-            
-            # 3. 带上影线的阴线/阳线+阴线
-            pattern3 = BearishPatternService._check_pattern3(
-                stock_code, prev_day, today
-            )
-            if pattern3:
-                matched_patterns.append(pattern3)
-            
-            # 4. 带上影阳线+十字星+（阴线或带上影线阴线）
-            pattern4 = BearishPatternService._check_pattern4(
-                stock_code, daily_data, target_idx
-            )
-            if pattern4:
-                matched_patterns.append(pattern4)
-            
-            # 5. 双针探顶
-            pattern5 = BearishPatternService._check_pattern5(
-                stock_code, daily_data, target_idx
-            )
-            if pattern5:
-                matched_patterns.append(pattern5)
-            
-            # 6. 触底反弹阳线+吞没阴线
-            pattern6 = BearishPatternService._check_pattern6(
-                stock_code, prev_day, today
-            )
-            if pattern6:
-                matched_patterns.append(pattern6)
-            
-            # 7. 阴包阳
-            pattern7 = BearishPatternService._check_pattern7(
-                stock_code, prev_day, today
-            )
-            if pattern7:
-                matched_patterns.append(pattern7)
-            
-            # 8. T字板/一字板+带上影阴线/高开回落阴线
-            pattern8 = BearishPatternService._check_pattern8(
-                stock_code, prev_day, today
-            )
-            if pattern8:
-                matched_patterns.append(pattern8)
-            
-            # 9. 乌云盖顶
-            pattern9 = BearishPatternService._check_pattern9(
-                stock_code, prev_day, today
-            )
-            if pattern9:
-                matched_patterns.append(pattern9)
-            
-            # 10. 触底反弹十字星+吞没阴线
-            pattern10 = BearishPatternService._check_pattern10(
-                stock_code, prev_day, today
-            )
-            if pattern10:
-                matched_patterns.append(pattern10)
-            
-            # 11. 放量冲高回落阴线+次日未反包
-            pattern11 = BearishPatternService._check_pattern11(
-                stock_code, prev_day, today
-            )
-            if pattern11:
-                matched_patterns.append(pattern11)
-            
-            # 12. 一阴穿三阳
-            pattern12 = BearishPatternService._check_pattern12(
-                stock_code, daily_data, target_idx
-            )
-            if pattern12:
-                matched_patterns.append(pattern12)
-            
-            # 13. 吞没阴线（二阴或三阴）吞一根阳线
-            pattern13 = BearishPatternService._check_pattern13(
-                stock_code, daily_data, target_idx
-            )
-            if pattern13:
-                matched_patterns.append(pattern13)
-            
-            # 14. 吞没阴线（1-3根最终吞没一根阳线）
-            pattern14 = BearishPatternService._check_pattern14(
-                stock_code, daily_data, target_idx
-            )
-            if pattern14:
-                matched_patterns.append(pattern14)
-            
-            return matched_patterns
+            return BearishPatternService._match_patterns(stock_code, daily_data, target_idx)
             
         except Exception as e:
             logger.error(f"识别空头组合失败: {stock_code} {target_date}: {e}", exc_info=True)
             return []
     
+    @staticmethod
+    def identify_bearish_patterns_series(
+        stock_code: str,
+        table_name: str,
+        target_dates: List[datetime],
+        daily_data: Optional[List[Dict]] = None
+    ) -> Dict[datetime, List[str]]:
+        """
+        一次加载整段日线，按滑动窗口识别多个日期的空头组合
+        
+        每个日期的窗口与 identify_bearish_patterns 相同（目标日期往前10天），结果与逐日调用一致，
+        但整只股票只查询一次日线。
+        
+        Args:
+            stock_code: 股票代码
+            table_name: 股票表名
+            target_dates: 目标日期列表
+            daily_data: 已加载的按日期升序的日线（需覆盖所有目标日期的窗口），为None时自动查询
+            
+        Returns:
+            目标日期到匹配的空头组合列表的字典（只包含有匹配的日期）
+        """
+        if not target_dates:
+            return {}
+        
+        if daily_data is None:
+            start_date = min(to_datetime(d) for d in target_dates) - timedelta(days=BearishPatternService.WINDOW_DAYS)
+            end_date = max(to_datetime(d) for d in target_dates)
+            daily_data = BearishPatternService._get_daily_data(table_name, start_date, end_date)
+        
+        result = {}
+        for target_date, window, target_idx in iter_pattern_windows(
+                daily_data, target_dates, BearishPatternService.WINDOW_DAYS):
+            if target_idx is None or target_idx < 1:
+                continue
+            try:
+                patterns = BearishPatternService._match_patterns(stock_code, window, target_idx)
+            except Exception as e:
+                logger.error(f"识别空头组合失败: {stock_code} {target_date}: {e}", exc_info=True)
+                continue
+            if patterns:
+                result[target_date] = patterns
+        
+        return result
+    
+    @staticmethod
+    def _match_patterns(stock_code: str, daily_data: List[Dict], target_idx: int) -> List[str]:
+        """依次检查14种空头组合"""
+        matched_patterns = []
+        
+        # 获取目标日期的数据
+        today = daily_data[target_idx]
+        prev_day = daily_data[target_idx - 1] if target_idx >= 1 else None
+        
+        # 1. 十字星+中阴
+        pattern1 = BearishPatternService._check_pattern1(
+            stock_code, prev_day, today
+        )
+        if pattern1:
+            matched_patterns.append(pattern1)
+        
+        # 2. 冲高回落阴线+阴线
+        pattern2 = BearishPatternService._check_pattern2(
+            stock_code, prev_day, today
+        )
+        if pattern2:
+            matched_patterns.append(pattern2)
+        
+        # 3. 带上影线的阴线/阳线+阴线
+        pattern3 = BearishPatternService._check_pattern3(
+            stock_code, prev_day, today
+        )
+        if pattern3:
+            matched_patterns.append(pattern3)
+        
+        # 4. 带上影阳线+十字星+（阴线或带上影线阴线）
+        pattern4 = BearishPatternService._check_pattern4(
+            stock_code, daily_data, target_idx
+        )
+        if pattern4:
+            matched_patterns.append(pattern4)
+        
+        # 5. 双针探顶
+        pattern5 = BearishPatternService._check_pattern5(
+            stock_code, daily_data, target_idx
+        )
+        if pattern5:
+            matched_patterns.append(pattern5)
+        
+        # 6. 触底反弹阳线+吞没阴线
+        pattern6 = BearishPatternService._check_pattern6(
+            stock_code, prev_day, today
+        )
+        if pattern6:
+            matched_patterns.append(pattern6)
+        
+        # 7. 阴包阳
+        pattern7 = BearishPatternService._check_pattern7(
+            stock_code, prev_day, today
+        )
+        if pattern7:
+            matched_patterns.append(pattern7)
+        
+        # 8. T字板/一字板+带上影阴线/高开回落阴线
+        pattern8 = BearishPatternService._check_pattern8(
+            stock_code, prev_day, today
+        )
+        if pattern8:
+            matched_patterns.append(pattern8)
+        
+        # 9. 乌云盖顶
+        pattern9 = BearishPatternService._check_pattern9(
+            stock_code, prev_day, today
+        )
+        if pattern9:
+            matched_patterns.append(pattern9)
+        
+        # 10. 触底反弹十字星+吞没阴线
+        pattern10 = BearishPatternService._check_pattern10(
+            stock_code, prev_day, today
+        )
+        if pattern10:
+            matched_patterns.append(pattern10)
+        
+        # 11. 放量冲高回落阴线+次日未反包
+        pattern11 = BearishPatternService._check_pattern11(
+            stock_code, prev_day, today
+        )
+        if pattern11:
+            matched_patterns.append(pattern11)
+        
+        # 12. 一阴穿三阳
+        pattern12 = BearishPatternService._check_pattern12(
+            stock_code, daily_data, target_idx
+        )
+        if pattern12:
+            matched_patterns.append(pattern12)
+        
+        # 13. 吞没阴线（二阴或三阴）吞一根阳线
+        pattern13 = BearishPatternService._check_pattern13(
+            stock_code, daily_data, target_idx
+        )
+        if pattern13:
+            matched_patterns.append(pattern13)
+        
+        # 14. 吞没阴线（1-3根最终吞没一根阳线）
+        pattern14 = BearishPatternService._check_pattern14(
+            stock_code, daily_data, target_idx
+        )
+        if pattern14:
+            matched_patterns.append(pattern14)
+        
+        return matched_patterns
+    
     @staticmethod
     def _check_pattern1(stock_code: str, prev_day: Optional[Dict], today: Dict) -> Optional[str]:
         """1. 十字星+中阴"""
@@ -722,58 +773,7 @@ class BearishPatternService:
         return ((high - low) / prev_close) * 100
     
     @staticmethod
-    def _get_daily_data(table_name: str, start_date: datetime, end_date: datetime) -> List[Dict]:
+    def _get_daily_data(table_name: str, start_date: Optional[datetime],
+                        end_date: Optional[datetime]) -> List[Dict]:
         """获取日线数据"""
-        try:
-            period_code = PeriodService.get_period_code('day')
-            
-            with DatabaseConnection.get_connection_context() as conn:
-                cursor = conn.cursor(pymysql.cursors.DictCursor)
-                
-                query = f"""
-                    SELECT shi_jian as date, kai_pan_jia as open, shou_pan_jia as close,
-                           zui_gao_jia as high, zui_di_jia as low, cheng_jiao_liang as volume
-                    FROM {table_name}
-                    WHERE peroid_type = %s 
-                      AND shi_jian >= %s 
-                      AND shi_jian <= %s
-                    ORDER BY shi_jian ASC
-                """
-                
-                cursor.execute(query, (period_code, start_date, end_date))
-                results = cursor.fetchall()
-                
-                daily_list = []
-                for i, row in enumerate(results):
-                    # 统一处理日期类型
-                    date_value = row['date']
-                    if isinstance(date_value, datetime):
-                        date_obj = date_value
-                    else:
-                        try:
-                            if isinstance(date_value, str):
-                                date_obj = datetime.strptime(date_value.split()[0], '%Y-%m-%d')
-                            else:
-                                date_obj = datetime.combine(date_value, datetime.min.time())
-                        except:
-                            date_obj = date_value
-                    
-                    daily_item = {
-                        'date': date_obj,
-                        'open': float(row['open']) if row['open'] else 0,
-                        'close': float(row['close']) if row['close'] else 0,
-                        'high': float(row['high']) if row['high'] else 0,
-                        'low': float(row['low']) if row['low'] else 0,
-                        'volume': int(row['volume']) if row['volume'] else 0
-                    }
-                    # 添加前一日收盘价
-                    if i > 0:
-                        daily_item['prev_close'] = float(results[i-1]['close']) if results[i-1]['close'] else 0
-                    daily_list.append(daily_item)
-                
-                return daily_list
-                
-        except Exception as e:
-            logger.error(f"获取日线数据失败: {table_name}: {e}", exc_info=True)
-            return []
-
+        return load_daily_data(table_name, start_date, end_date)
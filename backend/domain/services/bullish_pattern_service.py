@@ -1,11 +1,9 @@
 """多头组合识别服务"""
 from typing import Optional, List, Dict
-from datetime import datetime, timedelta
+from datetime import datetime, date, timedelta
 from domain.services.kline_pattern_service import KLinePatternService
-from infrastructure.persistence.database import DatabaseConnection
+from domain.services.pattern_window import iter_pattern_windows, load_daily_data, to_datetime
 from infrastructure.logging.logger import get_logger
-from domain.services.period_service import PeriodService
-import pymysql.cursors
 
 logger = get_logger(__name__)
 
@@ -13,6 +11,9 @@ logger = get_logger(__name__)
 class BullishPatternService:
     """多头组合识别服务"""
     
+    # 识别窗口：目标日期往前的自然日数
+    WINDOW_DAYS = 5
+    
     @staticmethod
     def identify_bullish_patterns(
         stock_code: str,
@@ -32,7 +33,7 @@ class BullishPatternService:
         """
         try:
             # 获取足够的历史数据（需要前3天的数据）
-            start_date = target_date - timedelta(days=5)
+            start_date = target_date - timedelta(days=BullishPatternService.WINDOW_DAYS)
             
             daily_data = BullishPatternService._get_daily_data(
                 table_name, start_date, target_date
@@ -65,67 +66,127 @@ class BullishPatternService:
             if target_idx is None or target_idx < 1:
                 return []
             
-            matched_patterns = []
-            
-            # 获取目标日期的数据
-            today = daily_data[target_idx]
-            prev_day = daily_data[target_idx - 1] if target_idx >= 1 else None
-            
-            # 1. 十字星+中阳线
-            pattern1 = BullishPatternService._check_pattern1(
-                stock_code, prev_day, today
-            )
-            if pattern1:
-                matched_patterns.append(pattern1)
-            
-            # 2. 触底反弹阳线+阳线
-            pattern2 = BullishPatternService._check_pattern2(
-                stock_code, prev_day, today
-            )
-            if pattern2:
-                matched_patterns.append(pattern2)
-            
-            # 3. 触底反弹阴线+中阳
-            pattern3 = BullishPatternService._check_pattern3(
-                stock_code, prev_day, today
-            )
-            if pattern3:
-                matched_patterns.append(pattern3)
-            
-            # 4. 阳包阴
-            pattern4 = BullishPatternService._check_pattern4(
-                stock_code, prev_day, today
-            )
-            if pattern4:
-                matched_patterns.append(pattern4)
-            
-            # 5. 刺透
-            pattern5 = BullishPatternService._check_pattern5(
-                stock_code, prev_day, today
-            )
-            if pattern5:
-                matched_patterns.append(pattern5)
-            
-            # 6. 双针探底
-            pattern6 = BullishPatternService._check_pattern6(
-                stock_code, daily_data, target_idx
-            )
-            if pattern6:
-                matched_patterns.append(pattern6)
-            
-            # 7. 一阳穿三阴
-            pattern7 = BullishPatternService._check_pattern7(
-                stock_code, table_name, daily_data, target_idx
-            )
-            if pattern7:
-                matched_patterns.append(pattern7)
-            
-            return matched_patterns
+            return BullishPatternService._match_patterns(stock_code, table_name, daily_data, target_idx)
             
         except Exception as e:
             logger.error(f"识别多头组合失败: {stock_code} {target_date}: {e}", exc_info=True)
             return []
     
+    @staticmethod
+    def identify_bullish_patterns_series(
+        stock_code: str,
+        table_name: str,
+        target_dates: List[datetime],
+        volume_types: Optional[Dict[date, Optional[str]]] = None,
+        daily_data: Optional[List[Dict]] = None
+    ) -> Dict[datetime, List[str]]:
+        """
+        一次加载整段日线，按滑动窗口识别多个日期的多头组合
+        
+        每个日期的窗口与 identify_bullish_patterns 相同（目标日期往前5天），结果与逐日调用一致，
+        但整只股票只查询一次日线。
+        
+        Args:
+            stock_code: 股票代码
+            table_name: 股票表名
+            target_dates: 目标日期列表
+            volume_types: 日期到成交量类型的映射（一阳穿三阴使用），为None时逐日查询daily_chance
+            daily_data: 已加载的按日期升序的日线（需覆盖所有目标日期的窗口），为None时自动查询
+            
+        Returns:
+            目标日期到匹配的多头组合列表的字典（只包含有匹配的日期）
+        """
+        if not target_dates:
+            return {}
+        
+        if daily_data is None:
+            start_date = min(to_datetime(d) for d in target_dates) - timedelta(days=BullishPatternService.WINDOW_DAYS)
+            end_date = max(to_datetime(d) for d in target_dates)
+            daily_data = BullishPatternService._get_daily_data(table_name, start_date, end_date)
+        
+        result = {}
+        for target_date, window, target_idx in iter_pattern_windows(
+                daily_data, target_dates, BullishPatternService.WINDOW_DAYS):
+            if target_idx is None or target_idx < 1:
+                continue
+            try:
+                patterns = BullishPatternService._match_patterns(
+                    stock_code, table_name, window, target_idx, volume_types
+                )
+            except Exception as e:
+                logger.error(f"识别多头组合失败: {stock_code} {target_date}: {e}", exc_info=True)
+                continue
+            if patterns:
+                result[target_date] = patterns
+        
+        return result
+    
+    @staticmethod
+    def _match_patterns(
+        stock_code: str,
+        table_name: str,
+        daily_data: List[Dict],
+        target_idx: int,
+        volume_types: Optional[Dict[date, Optional[str]]] = None
+    ) -> List[str]:
+        """依次检查7种多头组合"""
+        matched_patterns = []
+        
+        # 获取目标日期的数据
+        today = daily_data[target_idx]
+        prev_day = daily_data[target_idx - 1] if target_idx >= 1 else None
+        
+        # 1. 十字星+中阳线
+        pattern1 = BullishPatternService._check_pattern1(
+            stock_code, prev_day, today
+        )
+        if pattern1:
+            matched_patterns.append(pattern1)
+        
+        # 2. 触底反弹阳线+阳线
+        pattern2 = BullishPatternService._check_pattern2(
+            stock_code, prev_day, today
+        )
+        if pattern2:
+            matched_patterns.append(pattern2)
+        
+        # 3. 触底反弹阴线+中阳
+        pattern3 = BullishPatternService._check_pattern3(
+            stock_code, prev_day, today
+        )
+        if pattern3:
+            matched_patterns.append(pattern3)
+        
+        # 4. 阳包阴
+        pattern4 = BullishPatternService._check_pattern4(
+            stock_code, prev_day, today
+        )
+        if pattern4:
+            matched_patterns.append(pattern4)
+        
+        # 5. 刺透
+        pattern5 = BullishPatternService._check_pattern5(
+            stock_code, prev_day, today
+        )
+        if pattern5:
+            matched_patterns.append(pattern5)
+        
+        # 6. 双针探底
+        pattern6 = BullishPatternService._check_pattern6(
+            stock_code, daily_data, target_idx
+        )
+        if pattern6:
+            matched_patterns.append(pattern6)
+        
+        # 7. 一阳穿三阴
+        pattern7 = BullishPatternService._check_pattern7(
+            stock_code, table_name, daily_data, target_idx, volume_types
+        )
+        if pattern7:
+            matched_patterns.append(pattern7)
+        
+        return matched_patterns
+    
     @staticmethod
     def _check_pattern1(stock_code: str, prev_day: Optional[Dict], today: Dict) -> Optional[str]:
         """1. 十字星+中阳线"""
@@ -327,7 +388,8 @@ class BullishPatternService:
         return None
     
     @staticmethod
-    def _check_pattern7(stock_code: str, table_name: str, daily_data: List[Dict], target_idx: int) -> Optional[str]:
+    def _check_pattern7(stock_code: str, table_name: str, daily_data: List[Dict], target_idx: int,
+                        volume_types: Optional[Dict[date, Optional[str]]] = None) -> Optional[str]:
         """
         7. 一阳穿三阴
         
@@ -412,10 +474,13 @@ class BullishPatternService:
         if not is_today_positive:
             return None
         
-        # 检查成交量类型（需要从数据库获取）
-        today_volume_type = BullishPatternService._get_volume_type(
-            table_name, stock_code, daily_data[target_idx]['date']
-        )
+        # 检查成交量类型（未传入映射时从数据库获取）
+        if volume_types is not None:
+            today_volume_type = volume_types.get(daily_data[target_idx]['date'].date())
+        else:
+            today_volume_type = BullishPatternService._get_volume_type(
+                table_name, stock_code, daily_data[target_idx]['date']
+            )
         has_xy = today_volume_type and ('X' in today_volume_type or 'Y' in today_volume_type)
         
         if not has_xy:
@@ -435,61 +500,10 @@ class BullishPatternService:
         return ((high - low) / prev_close) * 100
     
     @staticmethod
-    def _get_daily_data(table_name: str, start_date: datetime, end_date: datetime) -> List[Dict]:
+    def _get_daily_data(table_name: str, start_date: Optional[datetime],
+                        end_date: Optional[datetime]) -> List[Dict]:
         """获取日线数据"""
-        try:
-            period_code = PeriodService.get_period_code('day')
-            
-            with DatabaseConnection.get_connection_context() as conn:
-                cursor = conn.cursor(pymysql.cursors.DictCursor)
-                
-                query = f"""
-                    SELECT shi_jian as date, kai_pan_jia as open, shou_pan_jia as close,
-                           zui_gao_jia as high, zui_di_jia as low, cheng_jiao_liang as volume
-                    FROM {table_name}
-                    WHERE peroid_type = %s 
-                      AND shi_jian >= %s 
-                      AND shi_jian <= %s
-                    ORDER BY shi_jian ASC
-                """
-                
-                cursor.execute(query, (period_code, start_date, end_date))
-                results = cursor.fetchall()
-                
-                daily_list = []
-                for i, row in enumerate(results):
-                    # 统一处理日期类型
-                    date_value = row['date']
-                    if isinstance(date_value, datetime):
-                        date_obj = date_value
-                    else:
-                        # 如果是date类型或其他格式，转换为datetime
-                        try:
-                            if isinstance(date_value, str):
-                                date_obj = datetime.strptime(date_value.split()[0], '%Y-%m-%d')
-                            else:
-                                date_obj = datetime.combine(date_value, datetime.min.time())
-                        except:
-                            date_obj = date_value
-                    
-                    daily_item = {
-                        'date': date_obj,
-                        'open': float(row['open']) if row['open'] else 0,
-                        'close': float(row['close']) if row['close'] else 0,
-                        'high': float(row['high']) if row['high'] else 0,
-                        'low': float(row['low']) if row['low'] else 0,
-                        'volume': int(row['volume']) if row['volume'] else 0
-                    }
-                    # 添加前一日收盘价
-                    if i > 0:
-                        daily_item['prev_close'] = float(results[i-1]['close']) if results[i-1]['close'] else 0
-                    daily_list.append(daily_item)
-                
-                return daily_list
-                
-        except Exception as e:
-            logger.error(f"获取日线数据失败: {table_name}: {e}", exc_info=True)
-            return []
+        return load_daily_data(table_name, start_date, end_date)
     
     @staticmethod
     def _get_volume_type(table_name: str, stock_code: str, date: datetime) -> Optional[str]:
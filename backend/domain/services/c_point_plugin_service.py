@@ -1,6 +1,8 @@
 """C点插件服务 - 优先级高于基础分数"""
-from typing import Tuple, List, Optional
+from typing import Tuple, List, Optional, Callable
 from datetime import datetime, timedelta
+from domain.models.analysis_context import AnalysisContext
+from infrastructure.config.stock_registry import get_stock_registry
 from infrastructure.logging.logger import get_logger
 
 logger = get_logger(__name__)
@@ -23,56 +25,50 @@ class CPointPluginResult:
         }
 
 
+class CPointPluginBatch:
+    """
+    C点路径无关插件（插件1-5）的整段序列批量结果
+    
+    results[k][i] 为第k个插件（0起）在序列第i根K线上的结果：
+    - CPointPluginResult：批量计算得出的结果
+    - None：该K线依赖分析上下文之外的数据，需逐日计算（查询数据库）
+    """
+    
+    PLUGIN_NAMES = ("阴线", "赔率高胜率低", "风险K线", "不追涨", "急跌抢反弹")
+    
+    def __init__(self, size: int):
+        # 未触发的结果各插件共用一个实例，避免逐K线创建对象
+        self.not_triggered = [CPointPluginResult(name, False, 0, "") for name in self.PLUGIN_NAMES]
+        self.results: List[List[Optional[CPointPluginResult]]] = [
+            [not_triggered] * size for not_triggered in self.not_triggered
+        ]
+
+
 class CPointPluginService:
     """C点插件服务 - 计算层"""
     
-    def __init__(self):
-        """初始化插件服务"""
+    # 分析上下文中批量结果的键
+    BATCH_KEY = 'c_point_plugins'
+    
+    def __init__(self, use_batch: bool = True):
+        """
+        初始化插件服务
+        
+        Args:
+            use_batch: 传入分析上下文时，是否对路径无关插件（1-5）整段序列批量计算
+        """
         from infrastructure.persistence.daily_repository_impl import DailyRepositoryImpl
         from infrastructure.persistence.daily_chance_repository_impl import DailyChanceRepositoryImpl
         from domain.services.config_service import get_config_service
         self.daily_repo = DailyRepositoryImpl()
         self.daily_chance_repo = DailyChanceRepositoryImpl()
         self.config_service = get_config_service()
-        # 数据缓存
-        self._daily_cache = {}  # {date_str: DailyData}
-        self._daily_chance_cache = {}  # {date_str: DailyChance}
-    
-    def init_cache(self, stock_code: str, start_date: str, end_date: str):
-        """
-        初始化数据缓存（批量查询）
-        
-        Args:
-            stock_code: 股票代码
-            start_date: 开始日期
-            end_date: 结束日期
-        """
-        logger.info(f"开始初始化插件缓存: {stock_code} {start_date} 至 {end_date}")
-        
-        # 批量查询 daily 数据
-        daily_list = self.daily_repo.find_by_date_range(stock_code, start_date, end_date)
-        self._daily_cache = {}
-        for daily in daily_list:
-            date_str = daily.date.strftime('%Y-%m-%d') if isinstance(daily.date, datetime) else str(daily.date)
-            self._daily_cache[date_str] = daily
-        
-        # 批量查询 daily_chance 数据
-        daily_chance_list = self.daily_chance_repo.find_by_stock_code(stock_code, start_date, end_date)
-        self._daily_chance_cache = {}
-        for dc in daily_chance_list:
-            date_str = dc.date.strftime('%Y-%m-%d') if isinstance(dc.date, datetime) else str(dc.date)
-            self._daily_chance_cache[date_str] = dc
-        
-        logger.info(f"插件缓存初始化完成: daily={len(self._daily_cache)}条, daily_chance={len(self._daily_chance_cache)}条")
-    
-    def clear_cache(self):
-        """清空缓存"""
-        self._daily_cache = {}
-        self._daily_chance_cache = {}
+        self.use_batch = use_batch
     
     def apply_plugins(self, stock_code: str, date: datetime, base_score: float, 
                      historical_r_points: Optional[List] = None, 
-                     historical_c_points: Optional[List] = None) -> Tuple[float, List[CPointPluginResult], bool]:
+                     historical_c_points: Optional[List] = None,
+                     context: Optional[AnalysisContext] = None) -> Tuple[float, List[CPointPluginResult], bool]:
         """
         应用所有插件，返回调整后的分数、触发的插件列表和是否强制发C的标志
         
@@ -82,6 +78,7 @@ class CPointPluginService:
             base_score: 基础分数（赔率分+胜率分）
             historical_r_points: 历史R点列表（可选，用于新插件）
             historical_c_points: 历史C点列表（可选，用于新插件）
+            context: 分析上下文（可选，未传入时直接查询数据库）
             
         Returns:
             Tuple[final_score, triggered_plugins, force_c_point]: 
@@ -91,36 +88,43 @@ class CPointPluginService:
         adjusted_score = base_score
         force_c_point = False  # 是否强制发C点
         
+        # 插件1-5与历史CR点无关，优先使用整段序列的批量结果
+        batch = self._get_batch(stock_code, context)
+        index = None
+        if batch is not None:
+            date_str = date.strftime('%Y-%m-%d') if isinstance(date, datetime) else date
+            index = context.bars.index_of(date_str)
+        
         # 插件1: 阴线检查（一票否决）
-        plugin1 = self._check_bearish_line(stock_code, date)
+        plugin1 = self._batch_or_check(batch, 0, index, self._check_bearish_line, stock_code, date, context)
         if plugin1.triggered:
             triggered_plugins.append(plugin1)
             logger.info(f"[插件-阴线] {stock_code} {date}: {plugin1.reason}")
             return 0, triggered_plugins, False  # 直接返回0分，不再检查其他插件
         
         # 插件2: 赔率高胜率低
-        plugin2 = self._check_high_ratio_low_win(stock_code, date)
+        plugin2 = self._batch_or_check(batch, 1, index, self._check_high_ratio_low_win, stock_code, date, context)
         if plugin2.triggered:
             triggered_plugins.append(plugin2)
             adjusted_score += plugin2.score_adjustment
             logger.info(f"[插件-赔率高胜率低] {stock_code} {date}: {plugin2.reason}, 扣分{abs(plugin2.score_adjustment)}")
         
         # 插件3: 风险K线
-        plugin3 = self._check_risk_kline(stock_code, date)
+        plugin3 = self._batch_or_check(batch, 2, index, self._check_risk_kline, stock_code, date, context)
         if plugin3.triggered:
             triggered_plugins.append(plugin3)
             logger.info(f"[插件-风险K线] {stock_code} {date}: {plugin3.reason}")
             return 0, triggered_plugins, False  # 一票否决
         
         # 插件4: 不追涨
-        plugin4 = self._check_no_chase_high(stock_code, date)
+        plugin4 = self._batch_or_check(batch, 3, index, self._check_no_chase_high, stock_code, date, context)
         if plugin4.triggered:
             triggered_plugins.append(plugin4)
             adjusted_score += plugin4.score_adjustment
             logger.info(f"[插件-不追涨] {stock_code} {date}: {plugin4.reason}, 扣分{abs(plugin4.score_adjustment)}")
         
         # 插件5: 急跌抢反弹（直接发C）
-        plugin5 = self._check_sharp_drop_rebound(stock_code, date)
+        plugin5 = self._batch_or_check(batch, 4, index, self._check_sharp_drop_rebound, stock_code, date, context)
         if plugin5.triggered:
             triggered_plugins.append(plugin5)
             logger.info(f"[插件-急跌抢反弹] {stock_code} {date}: {plugin5.reason}, 强制发C")
@@ -128,7 +132,7 @@ class CPointPluginService:
         
         # 插件6: R后回支撑位发C（直接发C）
         if historical_r_points is not None:
-            plugin6 = self._check_r_back_to_support(stock_code, date, historical_r_points)
+            plugin6 = self._check_r_back_to_support(stock_code, date, historical_r_points, context)
             if plugin6.triggered:
                 triggered_plugins.append(plugin6)
                 logger.info(f"[插件-R后回支撑位] {stock_code} {date}: {plugin6.reason}, 强制发C")
@@ -136,7 +140,7 @@ class CPointPluginService:
         
         # 插件7: 阳包阴发C（直接发C）
         if historical_r_points is not None:
-            plugin7 = self._check_yang_bao_yin(stock_code, date, historical_r_points)
+            plugin7 = self._check_yang_bao_yin(stock_code, date, historical_r_points, context)
             if plugin7.triggered:
                 triggered_plugins.append(plugin7)
                 logger.info(f"[插件-阳包阴] {stock_code} {date}: {plugin7.reason}, 强制发C")
@@ -144,7 +148,7 @@ class CPointPluginService:
         
         # 插件8: 横盘修整后突破发C（直接发C）
         if historical_r_points is not None and historical_c_points is not None:
-            plugin8 = self._check_consolidation_breakout(stock_code, date, historical_r_points, historical_c_points)
+            plugin8 = self._check_consolidation_breakout(stock_code, date, historical_r_points, historical_c_points, context)
             if plugin8.triggered:
                 triggered_plugins.append(plugin8)
                 logger.info(f"[插件-横盘修整后突破] {stock_code} {date}: {plugin8.reason}, 强制发C")
@@ -152,7 +156,252 @@ class CPointPluginService:
         
         return adjusted_score, triggered_plugins, False
     
-    def _check_bearish_line(self, stock_code: str, date: datetime) -> CPointPluginResult:
+    def _get_batch(self, stock_code: str, context: Optional[AnalysisContext]) -> Optional[CPointPluginBatch]:
+        """获取（首次调用时计算）分析上下文中的批量结果"""
+        if not self.use_batch or context is None or context.stock_code != stock_code:
+            return None
+        batch = context.plugin_batches.get(self.BATCH_KEY)
+        if batch is None:
+            try:
+                batch = self.build_batch(stock_code, context)
+            except Exception as e:
+                logger.error(f"C点插件批量计算失败，改为逐日计算: {e}", exc_info=True)
+                batch = False
+            context.plugin_batches[self.BATCH_KEY] = batch
+        return batch or None
+    
+    @staticmethod
+    def _batch_or_check(batch: Optional[CPointPluginBatch], plugin_index: int, index: Optional[int],
+                        check: Callable, stock_code: str, date: datetime,
+                        context: Optional[AnalysisContext]) -> CPointPluginResult:
+        """有批量结果时直接取用，否则逐日计算"""
+        if batch is not None and index is not None:
+            result = batch.results[plugin_index][index]
+            if result is not None:
+                return result
+        return check(stock_code, date, context)
+    
+    def check_plugin_range(self, stock_code: str, plugin_index: int, context: AnalysisContext,
+                           start_date: str, end_date: str) -> List[Tuple[str, CPointPluginResult]]:
+        """
+        对分析上下文中 [start_date, end_date] 内的每个交易日检查单个插件（插件1-5，与历史C/R点无关）
+        
+        优先取整段序列的批量结果，批量结果缺失的K线逐日计算（用于全市场信号筛选）
+        
+        Args:
+            stock_code: 股票代码
+            plugin_index: 插件下标（0起，与 CPointPluginBatch.PLUGIN_NAMES 一致）
+            context: 分析上下文
+            start_date: 开始日期（含，YYYY-MM-DD）
+            end_date: 结束日期（含，YYYY-MM-DD）
+            
+        Returns:
+            [(日期, 插件结果)]，按日期升序
+        """
+        checks = (self._check_bearish_line, self._check_high_ratio_low_win, self._check_risk_kline,
+                  self._check_no_chase_high, self._check_sharp_drop_rebound)
+        check = checks[plugin_index]
+        batch = self._get_batch(stock_code, context)
+        results = []
+        for index, date_str in enumerate(context.bars.dates):
+            if start_date <= date_str <= end_date:
+                date = datetime.strptime(date_str, '%Y-%m-%d')
+                results.append((date_str, self._batch_or_check(batch, plugin_index, index, check,
+                                                               stock_code, date, context)))
+        return results
+    
+    def build_batch(self, stock_code: str, context: AnalysisContext) -> CPointPluginBatch:
+        """
+        对分析上下文中的整段日线序列批量计算插件1-5
+        
+        先一次遍历算出涨跌幅、振幅、实体占比、上影线占比、阴阳线等列，
+        再按各插件规则在列上取窗口判断。结果与逐日调用 _check_* 完全一致；
+        需要上下文之外数据（daily_chance缺失会回查数据库）的K线标记为None，由逐日计算兜底。
+        """
+        bars = context.bars
+        n = len(bars)
+        opens, highs, lows, closes = bars.open, bars.high, bars.low, bars.close
+        volumes, pre_closes = bars.volume, bars.pre_close
+        is_main_board = get_stock_registry().is_main_board(stock_code)
+        
+        # === 列计算（一次遍历） ===
+        change_pct = [0.0] * n  # 昨收>0时的涨跌幅（插件4、5口径）
+        change_pct_raw = [0.0] * n  # 昨收非0时的涨跌幅（插件2口径）
+        amplitude = [0.0] * n  # 振幅%
+        body_ratio = [0.0] * n  # 实体占收盘价%
+        upper_shadow_ratio = [0.0] * n  # 上影线占振幅比例
+        is_bullish = [False] * n  # 阳线（收盘>=开盘）
+        for i in range(n):
+            o, h, l, c, pc = opens[i], highs[i], lows[i], closes[i], pre_closes[i]
+            if pc:
+                change_pct_raw[i] = (c - pc) / pc * 100
+                amplitude[i] = (h - l) / pc * 100
+                if pc > 0:
+                    change_pct[i] = change_pct_raw[i]
+            body_ratio[i] = (abs(c - o) / c * 100) if c else 0
+            upper_shadow_ratio[i] = ((h - max(o, c)) / (h - l)) if (h - l) > 0 else 0
+            is_bullish[i] = c >= o
+        
+        batch = CPointPluginBatch(n)
+        r1, r2, r3, r4, r5 = batch.results
+        chance_cache = context.daily_chance_cache
+        dates = bars.dates
+        good_volume_types = ['A', 'B', 'C', 'D']
+        
+        for i in range(n):
+            o, c = opens[i], closes[i]
+            
+            # 插件1: 阴线
+            if c < o:
+                r1[i] = CPointPluginResult("阴线", True, -999, f"阴线不发C (开盘:{o:.2f}, 收盘:{c:.2f})")
+            
+            # 插件2: 赔率高胜率低
+            daily_chance = chance_cache.get(dates[i])
+            if not daily_chance:
+                r2[i] = None
+            else:
+                current_volume_type = daily_chance.volume_type or ""
+                has_good_volume = any(t in current_volume_type for t in good_volume_types)
+                pct = change_pct_raw[i]
+                if not has_good_volume and pct < 2:
+                    r2[i] = CPointPluginResult(
+                        "赔率高胜率低", True, -30,
+                        f"当日无放量且涨幅<2% (成交量类型:{current_volume_type}, 涨幅:{pct:.2f}%)"
+                    )
+                elif not has_good_volume:
+                    prev_has_good_volume = False
+                    for j in range(i - 1, max(i - 4, -1), -1):
+                        prev_chance = chance_cache.get(dates[j])
+                        if not prev_chance:
+                            r2[i] = None
+                            break
+                        if prev_chance.volume_type and any(t in prev_chance.volume_type for t in good_volume_types):
+                            prev_has_good_volume = True
+                            break
+                    if r2[i] is not None and not prev_has_good_volume:
+                        r2[i] = CPointPluginResult(
+                            "赔率高胜率低", True, -30,
+                            f"前三日及当日均无放量 (当日类型:{current_volume_type})"
+                        )
+            
+            # 插件3: 风险K线
+            if is_bullish[i] and amplitude[i] > (6 if is_main_board else 8) and upper_shadow_ratio[i] > 0.3:
+                r3[i] = CPointPluginResult(
+                    "风险K线", True, -999,
+                    f"冲高回落带上影线 (振幅:{amplitude[i]:.2f}%, 上影线比例:{upper_shadow_ratio[i]*100:.1f}%)"
+                )
+            
+            # 插件4: 不追涨（前5个交易日，最近的在前）
+            if i >= 2:
+                prev = range(i - 1, max(i - 6, -1), -1)
+                result = self._evaluate_no_chase_high(is_main_board, [change_pct[j] for j in prev],
+                                                      [is_bullish[j] for j in prev])
+                if result is not None:
+                    r4[i] = result
+            
+            # 插件5: 急跌抢反弹
+            if i >= 5:
+                result = self._evaluate_sharp_drop_rebound(
+                    is_main_board, i, change_pct, is_bullish, amplitude, body_ratio, volumes
+                )
+                if result is not None:
+                    r5[i] = result
+        
+        logger.debug(f"C点插件批量计算完成: {stock_code}, {n}根K线")
+        return batch
+    
+    @staticmethod
+    def _evaluate_no_chase_high(is_main_board: bool, change_pcts: List[float],
+                                bullish_flags: List[bool]) -> Optional[CPointPluginResult]:
+        """插件4判断（批量版本，规则同 _check_no_chase_high），未触发返回None"""
+        # 情况1: 连续2个涨停
+        limit_threshold = 10 if is_main_board else 20
+        if change_pcts[0] >= limit_threshold * 0.95 and change_pcts[1] >= limit_threshold * 0.95:
+            return CPointPluginResult("不追涨", True, -50,
+                                      f"连续2个涨停 ({change_pcts[0]:.2f}%, {change_pcts[1]:.2f}%)")
+        
+        # 情况2: 前2日累计涨幅过大
+        cum_2days = sum(change_pcts[:2])
+        threshold_2days = 15 if is_main_board else 25
+        if cum_2days > threshold_2days:
+            return CPointPluginResult("不追涨", True, -50,
+                                      f"前2日累计涨幅过大 (累计:{cum_2days:.2f}%, 阈值:{threshold_2days}%)")
+        
+        # 情况3: 前3天累计涨幅过大
+        if len(change_pcts) >= 3:
+            cum_3days = sum(change_pcts[:3])
+            threshold_3days = 20 if is_main_board else 30
+            if cum_3days > threshold_3days:
+                return CPointPluginResult("不追涨", True, -50,
+                                          f"前3日累计涨幅过大 (累计:{cum_3days:.2f}%, 阈值:{threshold_3days}%)")
+        
+        # 情况4: 连续5天涨幅过大
+        if len(change_pcts) >= 5:
+            cum_5days = sum(change_pcts[:5])
+            threshold_5days = 30 if is_main_board else 40
+            if cum_5days > threshold_5days:
+                return CPointPluginResult("不追涨", True, -50,
+                                          f"前5日累计涨幅过大 (累计:{cum_5days:.2f}%, 阈值:{threshold_5days}%)")
+        
+        # 情况5: 前两日连阳，且每日涨幅均大于5%
+        if change_pcts[0] > 5 and change_pcts[1] > 5 and bullish_flags[0] and bullish_flags[1]:
+            return CPointPluginResult("不追涨", True, -50,
+                                      f"前两日连阳且每日涨幅>5% ({change_pcts[0]:.2f}%, {change_pcts[1]:.2f}%)")
+        
+        return None
+    
+    @staticmethod
+    def _evaluate_sharp_drop_rebound(is_main_board: bool, i: int, change_pct: List[float],
+                                     is_bullish: List[bool], amplitude: List[float],
+                                     body_ratio: List[float], volumes) -> Optional[CPointPluginResult]:
+        """插件5判断（批量版本，规则同 _check_sharp_drop_rebound），未触发返回None"""
+        # 前5个交易日涨跌幅，change_pcts[0]是最近的一天
+        change_pcts = [change_pct[i - 1], change_pct[i - 2], change_pct[i - 3], change_pct[i - 4], change_pct[i - 5]]
+        
+        main_reason = ""
+        first_day_volume = 0
+        
+        # 条件1: 连续4日急跌且累计跌幅过大
+        cum_4days = sum(change_pcts[:4])
+        if cum_4days < (-20 if is_main_board else -25):
+            main_reason = f"连续4日急跌(累计跌幅:{cum_4days:.2f}%)"
+            first_day_volume = volumes[i - 4]
+        else:
+            # 条件2: 连续5日连续阴线且累计跌幅过大
+            all_bearish = not any(is_bullish[i - 5:i])
+            cum_5days = sum(change_pcts)
+            if all_bearish and cum_5days < (-20 if is_main_board else -30):
+                main_reason = f"连续5日阴线(累计跌幅:{cum_5days:.2f}%)"
+                first_day_volume = volumes[i - 5]
+            else:
+                return None
+        
+        if first_day_volume == 0:
+            return None
+        
+        # 条件A: 今日成交量极度萎缩 + 振幅>5%的触底反弹十字星或阳线
+        is_current_doji = body_ratio[i] < 1
+        current_volume_shrink = volumes[i] / first_day_volume
+        if current_volume_shrink <= 0.2 and amplitude[i] > 5:
+            if is_current_doji or is_bullish[i]:
+                pattern_type = "十字星" if is_current_doji else "阳线"
+                return CPointPluginResult(
+                    "急跌抢反弹", True, 0,
+                    f"{main_reason}, 今日量缩至{current_volume_shrink*100:.1f}%, 振幅{amplitude[i]:.2f}%, {pattern_type}反弹"
+                )
+        
+        # 条件B: 昨日成交量极度萎缩且昨日为十字星，今日为阳线
+        yesterday_volume_shrink = volumes[i - 1] / first_day_volume
+        if yesterday_volume_shrink <= 0.2 and body_ratio[i - 1] < 1 and is_bullish[i]:
+            return CPointPluginResult(
+                "急跌抢反弹", True, 0,
+                f"{main_reason}, 昨日量缩至{yesterday_volume_shrink*100:.1f}%且为十字星, 今日阳线反弹"
+            )
+        
+        return None
+    
+    def _check_bearish_line(self, stock_code: str, date: datetime,
+                            context: Optional[AnalysisContext] = None) -> CPointPluginResult:
         """
         插件1: 阴线检查
         任意阴线当日均不发C
@@ -160,11 +409,7 @@ class CPointPluginService:
         try:
             date_str = date.strftime('%Y-%m-%d') if isinstance(date, datetime) else date
             
-            # 优先使用缓存
-            daily_data = self._daily_cache.get(date_str)
-            if not daily_data:
-                # 缓存未命中，查询数据库
-                daily_data = self.daily_repo.find_by_date(stock_code, date_str)
+            daily_data = self._get_daily(stock_code, date_str, context)
             
             if not daily_data:
                 return CPointPluginResult("阴线", False, 0, "")
@@ -184,7 +429,8 @@ class CPointPluginService:
             logger.error(f"插件-阴线检查失败: {e}")
             return CPointPluginResult("阴线", False, 0, "")
     
-    def _check_high_ratio_low_win(self, stock_code: str, date: datetime) -> CPointPluginResult:
+    def _check_high_ratio_low_win(self, stock_code: str, date: datetime,
+                                  context: Optional[AnalysisContext] = None) -> CPointPluginResult:
         """
         插件2: 赔率高胜率低
         如果因赔率较大带来的分值，且符合发C分值，但：
@@ -195,14 +441,9 @@ class CPointPluginService:
         try:
             date_str = date.strftime('%Y-%m-%d') if isinstance(date, datetime) else date
             
-            # 优先使用缓存
-            daily_data = self._daily_cache.get(date_str)
-            if not daily_data:
-                daily_data = self.daily_repo.find_by_date(stock_code, date_str)
+            daily_data = self._get_daily(stock_code, date_str, context)
             
-            daily_chance = self._daily_chance_cache.get(date_str)
-            if not daily_chance:
-                daily_chance = self.daily_chance_repo.find_by_stock_and_date(stock_code, date_str)
+            daily_chance = self._get_daily_chance(stock_code, date_str, context)
             
             if not daily_data or not daily_chance:
                 return CPointPluginResult("赔率高胜率低", False, 0, "")
@@ -225,14 +466,11 @@ class CPointPluginService:
             # 情况2: 前三天+当日都无ABCD
             if not has_good_volume:
                 # 获取前三个交易日
-                prev_dates = self._get_previous_trading_dates_from_cache(date_str)
+                prev_dates = self._get_previous_trading_dates_from_cache(date_str, context, limit=3)
                 prev_has_good_volume = False
                 
                 for prev_date in prev_dates[:3]:
-                    # 优先使用缓存
-                    prev_chance = self._daily_chance_cache.get(prev_date)
-                    if not prev_chance:
-                        prev_chance = self.daily_chance_repo.find_by_stock_and_date(stock_code, prev_date)
+                    prev_chance = self._get_daily_chance(stock_code, prev_date, context)
                     
                     if prev_chance and prev_chance.volume_type:
                         if any(t in prev_chance.volume_type for t in ['A', 'B', 'C', 'D']):
@@ -253,7 +491,8 @@ class CPointPluginService:
             logger.error(f"插件-赔率高胜率低检查失败: {e}")
             return CPointPluginResult("赔率高胜率低", False, 0, "")
     
-    def _check_risk_kline(self, stock_code: str, date: datetime) -> CPointPluginResult:
+    def _check_risk_kline(self, stock_code: str, date: datetime,
+                          context: Optional[AnalysisContext] = None) -> CPointPluginResult:
         """
         插件3: 风险K线
         振幅＞6%/8%的冲高回落阳线、冲高回落阳十字星、带上影线的阳线不发C
@@ -261,10 +500,7 @@ class CPointPluginService:
         try:
             date_str = date.strftime('%Y-%m-%d') if isinstance(date, datetime) else date
             
-            # 优先使用缓存
-            daily_data = self._daily_cache.get(date_str)
-            if not daily_data:
-                daily_data = self.daily_repo.find_by_date(stock_code, date_str)
+            daily_data = self._get_daily(stock_code, date_str, context)
             
             if not daily_data:
                 return CPointPluginResult("风险K线", False, 0, "")
@@ -278,8 +514,9 @@ class CPointPluginService:
             amplitude_pct = ((daily_data.high - daily_data.low) / daily_data.pre_close * 100) if daily_data.pre_close else 0
             
             # 判断振幅阈值（主板6%，非主板8%）
-            is_main_board = stock_code.startswith(('SH600', 'SH601', 'SH603', 'SH605', 'SZ000', 'SZ001'))
-            amplitude_threshold = 6 if is_main_board else 8
+            stock_info = get_stock_registry().info(stock_code)
+            is_main_board = stock_info.is_main_board
+            amplitude_threshold = stock_info.amplitude_threshold
             
             if amplitude_pct <= amplitude_threshold:
                 return CPointPluginResult("风险K线", False, 0, "")
@@ -304,7 +541,8 @@ class CPointPluginService:
             logger.error(f"插件-风险K线检查失败: {e}")
             return CPointPluginResult("风险K线", False, 0, "")
     
-    def _check_no_chase_high(self, stock_code: str, date: datetime) -> CPointPluginResult:
+    def _check_no_chase_high(self, stock_code: str, date: datetime,
+                             context: Optional[AnalysisContext] = None) -> CPointPluginResult:
         """
         插件4: 不追涨
         如果当日符合发C的条件，但往前数三天涨幅过大，扣减50分
@@ -327,19 +565,16 @@ class CPointPluginService:
             #     return CPointPluginResult("不追涨", False, 0, "")
             
             # 判断主板还是非主板
-            is_main_board = stock_code.startswith(('SH600', 'SH601', 'SH603', 'SH605', 'SZ000', 'SZ001'))
+            is_main_board = get_stock_registry().is_main_board(stock_code)
             
             # 获取前5个交易日数据（从缓存）
-            prev_dates = self._get_previous_trading_dates_from_cache(date_str)
+            prev_dates = self._get_previous_trading_dates_from_cache(date_str, context, limit=5)
             if len(prev_dates) < 2:
                 return CPointPluginResult("不追涨", False, 0, "")
             
             daily_data_list = []
             for prev_date in prev_dates[:5]:
-                # 优先使用缓存
-                data = self._daily_cache.get(prev_date)
-                if not data:
-                    data = self.daily_repo.find_by_date(stock_code, prev_date)
+                data = self._get_daily(stock_code, prev_date, context)
                 if data:
                     daily_data_list.append(data)
             
@@ -420,31 +655,37 @@ class CPointPluginService:
             logger.error(f"插件-不追涨检查失败: {e}")
             return CPointPluginResult("不追涨", False, 0, "")
     
-    def _get_previous_trading_dates_from_cache(self, current_date_str: str) -> List[str]:
+    def _get_daily(self, stock_code: str, date_str: str, context: Optional[AnalysisContext] = None):
+        """获取日线数据：优先使用分析上下文，未命中时查询数据库"""
+        daily_data = context.get_daily(date_str) if context else None
+        if not daily_data:
+            daily_data = self.daily_repo.find_by_date(stock_code, date_str)
+        return daily_data
+    
+    def _get_daily_chance(self, stock_code: str, date_str: str, context: Optional[AnalysisContext] = None):
+        """获取daily_chance数据：优先使用分析上下文，未命中时查询数据库"""
+        daily_chance = context.get_daily_chance(date_str) if context else None
+        if not daily_chance:
+            daily_chance = self.daily_chance_repo.find_by_stock_and_date(stock_code, date_str)
+        return daily_chance
+    
+    def _get_previous_trading_dates_from_cache(self, current_date_str: str,
+                                               context: Optional[AnalysisContext] = None,
+                                               limit: Optional[int] = None) -> List[str]:
         """
-        从缓存中获取前N个交易日的日期列表（性能优化版）
+        从分析上下文中获取前N个交易日的日期列表
         
         Args:
             current_date_str: 当前日期字符串 'YYYY-MM-DD'
+            context: 分析上下文（未传入时返回空列表）
+            limit: 最多返回的天数（按需截取，避免每次复制全部历史日期）
             
         Returns:
             前N个交易日的日期列表（按日期倒序）
         """
-        try:
-            # 从缓存中获取所有日期并排序
-            all_dates = sorted(self._daily_cache.keys(), reverse=True)
-            
-            # 找到当前日期的位置，返回之前的日期
-            result = []
-            for date_str in all_dates:
-                if date_str < current_date_str:
-                    result.append(date_str)
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"从缓存获取前N个交易日失败: {e}")
+        if context is None:
             return []
+        return context.get_previous_trading_dates(current_date_str, limit)
     
     def _get_previous_trading_dates(self, stock_code: str, current_date: datetime, days: int) -> List[str]:
         """获取前N个交易日的日期列表（降级方案，当缓存未初始化时使用）"""
@@ -474,7 +715,8 @@ class CPointPluginService:
             logger.error(f"获取前N个交易日失败: {e}")
             return []
     
-    def _check_sharp_drop_rebound(self, stock_code: str, date: datetime) -> CPointPluginResult:
+    def _check_sharp_drop_rebound(self, stock_code: str, date: datetime,
+                                  context: Optional[AnalysisContext] = None) -> CPointPluginResult:
         """
         插件5: 急跌抢反弹
         
@@ -492,26 +734,22 @@ class CPointPluginService:
             date_str = date.strftime('%Y-%m-%d') if isinstance(date, datetime) else date
             
             # 判断主板还是非主板
-            is_main_board = stock_code.startswith(('SH600', 'SH601', 'SH603', 'SH605', 'SZ000', 'SZ001'))
+            is_main_board = get_stock_registry().is_main_board(stock_code)
             
             # 获取当日数据
-            current_data = self._daily_cache.get(date_str)
-            if not current_data:
-                current_data = self.daily_repo.find_by_date(stock_code, date_str)
+            current_data = self._get_daily(stock_code, date_str, context)
             if not current_data:
                 return CPointPluginResult("急跌抢反弹", False, 0, "")
             
             # 获取前5个交易日数据
-            prev_dates = self._get_previous_trading_dates_from_cache(date_str)
+            prev_dates = self._get_previous_trading_dates_from_cache(date_str, context, limit=5)
             if len(prev_dates) < 5:
                 return CPointPluginResult("急跌抢反弹", False, 0, "")
             
             # 获取历史数据
             prev_data_list = []
             for prev_date in prev_dates[:5]:
-                data = self._daily_cache.get(prev_date)
-                if not data:
-                    data = self.daily_repo.find_by_date(stock_code, prev_date)
+                data = self._get_daily(stock_code, prev_date, context)
                 if data:
                     prev_data_list.append(data)
             
@@ -603,7 +841,8 @@ class CPointPluginService:
             logger.error(f"插件-急跌抢反弹检查失败: {e}")
             return CPointPluginResult("急跌抢反弹", False, 0, "")
     
-    def _check_r_back_to_support(self, stock_code: str, date: datetime, historical_r_points: List) -> CPointPluginResult:
+    def _check_r_back_to_support(self, stock_code: str, date: datetime, historical_r_points: List,
+                                 context: Optional[AnalysisContext] = None) -> CPointPluginResult:
         """
         插件6: R后回支撑位发C
         
@@ -633,16 +872,12 @@ class CPointPluginService:
                 return CPointPluginResult("R后回支撑位", False, 0, "")
             
             # 获取当日数据
-            current_data = self._daily_cache.get(date_str)
-            if not current_data:
-                current_data = self.daily_repo.find_by_date(stock_code, date_str)
+            current_data = self._get_daily(stock_code, date_str, context)
             if not current_data:
                 return CPointPluginResult("R后回支撑位", False, 0, "")
             
             # 获取支撑价格
-            daily_chance = self._daily_chance_cache.get(date_str)
-            if not daily_chance:
-                daily_chance = self.daily_chance_repo.find_by_stock_and_date(stock_code, date_str)
+            daily_chance = self._get_daily_chance(stock_code, date_str, context)
             if not daily_chance or not daily_chance.support_price:
                 return CPointPluginResult("R后回支撑位", False, 0, "")
             
@@ -687,7 +922,8 @@ class CPointPluginService:
             logger.error(f"插件-R后回支撑位检查失败: {e}")
             return CPointPluginResult("R后回支撑位", False, 0, "")
     
-    def _check_yang_bao_yin(self, stock_code: str, date: datetime, historical_r_points: List) -> CPointPluginResult:
+    def _check_yang_bao_yin(self, stock_code: str, date: datetime, historical_r_points: List,
+                            context: Optional[AnalysisContext] = None) -> CPointPluginResult:
         """
         插件7: 阳包阴发C
         
@@ -712,14 +948,12 @@ class CPointPluginService:
             date_str = date.strftime('%Y-%m-%d') if isinstance(date, datetime) else date
             
             # 获取当日数据
-            current_data = self._daily_cache.get(date_str)
-            if not current_data:
-                current_data = self.daily_repo.find_by_date(stock_code, date_str)
+            current_data = self._get_daily(stock_code, date_str, context)
             if not current_data:
                 return CPointPluginResult("阳包阴", False, 0, "")
             
             # 获取前15个交易日
-            prev_dates = self._get_previous_trading_dates_from_cache(date_str)
+            prev_dates = self._get_previous_trading_dates_from_cache(date_str, context, limit=15)
             if len(prev_dates) < 1:
                 return CPointPluginResult("阳包阴", False, 0, "")
             
@@ -732,9 +966,7 @@ class CPointPluginService:
                 # 检查R点是否在前15个交易日内
                 if r_date_str in prev_dates[:15]:
                     # 检查R日是否放量（XYZH）
-                    r_daily_chance = self._daily_chance_cache.get(r_date_str)
-                    if not r_daily_chance:
-                        r_daily_chance = self.daily_chance_repo.find_by_stock_and_date(stock_code, r_date_str)
+                    r_daily_chance = self._get_daily_chance(stock_code, r_date_str, context)
                     
                     if r_daily_chance and r_daily_chance.volume_type:
                         has_r_volume = any(t in r_daily_chance.volume_type for t in ['X', 'Y', 'Z', 'H'])
@@ -758,9 +990,7 @@ class CPointPluginService:
             prev_bullish_condition = False
             if len(prev_dates) >= 1:
                 prev_date = prev_dates[0]
-                prev_chance = self._daily_chance_cache.get(prev_date)
-                if not prev_chance:
-                    prev_chance = self.daily_chance_repo.find_by_stock_and_date(stock_code, prev_date)
+                prev_chance = self._get_daily_chance(stock_code, prev_date, context)
                 
                 # 前一日有多头组合（任意组合都算，不限定1234）
                 if prev_chance and prev_chance.bullish_pattern:
@@ -790,7 +1020,8 @@ class CPointPluginService:
             return CPointPluginResult("阳包阴", False, 0, "")
     
     def _check_consolidation_breakout(self, stock_code: str, date: datetime, 
-                                     historical_r_points: List, historical_c_points: List) -> CPointPluginResult:
+                                     historical_r_points: List, historical_c_points: List,
+                                     context: Optional[AnalysisContext] = None) -> CPointPluginResult:
         """
         插件8: 横盘修整后突破发C
         
@@ -813,16 +1044,12 @@ class CPointPluginService:
             date_str = date.strftime('%Y-%m-%d') if isinstance(date, datetime) else date
             
             # 获取当日数据
-            current_data = self._daily_cache.get(date_str)
-            if not current_data:
-                current_data = self.daily_repo.find_by_date(stock_code, date_str)
+            current_data = self._get_daily(stock_code, date_str, context)
             if not current_data:
                 return CPointPluginResult("横盘修整后突破", False, 0, "")
             
             # 获取当日成交量类型
-            daily_chance = self._daily_chance_cache.get(date_str)
-            if not daily_chance:
-                daily_chance = self.daily_chance_repo.find_by_stock_and_date(stock_code, date_str)
+            daily_chance = self._get_daily_chance(stock_code, date_str, context)
             if not daily_chance:
                 return CPointPluginResult("横盘修整后突破", False, 0, "")
             
@@ -834,7 +1061,7 @@ class CPointPluginService:
                 return CPointPluginResult("横盘修整后突破", False, 0, "")
             
             # 获取前30个交易日
-            prev_dates = self._get_previous_trading_dates_from_cache(date_str)
+            prev_dates = self._get_previous_trading_dates_from_cache(date_str, context, limit=30)
             if len(prev_dates) < 1:
                 return CPointPluginResult("横盘修整后突破", False, 0, "")
             
@@ -871,9 +1098,7 @@ class CPointPluginService:
             
             all_volume_less_than_r = True
             for check_date in dates_after_r:
-                check_data = self._daily_cache.get(check_date)
-                if not check_data:
-                    check_data = self.daily_repo.find_by_date(stock_code, check_date)
+                check_data = self._get_daily(stock_code, check_date, context)
                 
                 if check_data and check_data.volume >= r_volume:
                     all_volume_less_than_r = False
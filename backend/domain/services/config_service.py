@@ -2,10 +2,12 @@
 配置管理服务
 负责读取和保存策略配置
 """
+import hashlib
 import json
 import os
+import threading
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Callable, List
 from infrastructure.logging.logger import get_logger
 
 logger = get_logger(__name__)
@@ -21,8 +23,34 @@ class ConfigService:
             'strategy_config.json'
         )
         self._config_cache = None
+        self._version = ''  # 配置内容指纹，用作分析结果缓存键的一部分（重启后内容不变则版本不变）
+        self._listeners: List[Callable[[], None]] = []
+        self._listeners_lock = threading.Lock()
         self._load_config()
     
+    @property
+    def version(self) -> str:
+        """配置版本（配置内容的哈希）"""
+        return self._version
+    
+    def _update_version(self):
+        content = json.dumps(self._config_cache, ensure_ascii=False, sort_keys=True, default=str)
+        self._version = hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]
+    
+    def add_change_listener(self, listener: Callable[[], None]):
+        """注册配置变化回调（update_config / reload_config 后调用）"""
+        with self._listeners_lock:
+            self._listeners.append(listener)
+    
+    def _notify_changed(self):
+        with self._listeners_lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener()
+            except Exception as e:
+                logger.error(f"配置变化回调执行失败: {e}", exc_info=True)
+    
     def _load_config(self) -> Dict[str, Any]:
         """加载配置文件"""
         try:
@@ -48,6 +76,7 @@ class ConfigService:
                 self._save_config()
                 logger.warning(f"配置文件不存在，已创建默认配置: {self.config_path}")
             
+            self._update_version()
             return self._config_cache
         except Exception as e:
             logger.error(f"配置加载失败: {e}")
@@ -113,7 +142,9 @@ class ConfigService:
         config['last_updated'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         self._config_cache = config
+        self._update_version()
         self._save_config()
+        self._notify_changed()
         
         return config
     
@@ -121,6 +152,7 @@ class ConfigService:
         """重新加载配置（用于热更新）"""
         self._config_cache = None
         self._load_config()
+        self._notify_changed()
         logger.info("配置已重新加载")
 
 
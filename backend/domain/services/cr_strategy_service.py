@@ -2,6 +2,7 @@
 from typing import Optional, Tuple, List, Dict, Any
 from datetime import datetime
 from domain.models.cr_point import ABCComponents
+from domain.models.analysis_context import AnalysisContext
 from domain.services.c_point_plugin_service import CPointPluginService, CPointPluginResult
 from infrastructure.logging.logger import get_logger
 
@@ -18,37 +19,6 @@ class CRStrategyService:
         self.daily_chance_repo = DailyChanceRepositoryImpl()
         self.plugin_service = CPointPluginService()  # 插件服务
         self.config_service = get_config_service()  # 配置服务
-        # 数据缓存
-        self._daily_chance_cache = {}  # {date_str: DailyChance}
-    
-    def init_cache(self, stock_code: str, start_date: str, end_date: str):
-        """
-        初始化数据缓存（批量查询）
-        
-        Args:
-            stock_code: 股票代码
-            start_date: 开始日期
-            end_date: 结束日期
-        """
-        logger.info(f"开始初始化CR策略缓存: {stock_code} {start_date} 至 {end_date}")
-        
-        # 批量查询 daily_chance 数据
-        daily_chance_list = self.daily_chance_repo.find_by_stock_code(stock_code, start_date, end_date)
-        self._daily_chance_cache = {}
-        for dc in daily_chance_list:
-            from datetime import datetime
-            date_str = dc.date.strftime('%Y-%m-%d') if isinstance(dc.date, datetime) else str(dc.date)
-            self._daily_chance_cache[date_str] = dc
-        
-        logger.info(f"CR策略缓存初始化完成: daily_chance={len(self._daily_chance_cache)}条")
-        
-        # 同时初始化插件服务的缓存
-        self.plugin_service.init_cache(stock_code, start_date, end_date)
-    
-    def clear_cache(self):
-        """清空缓存"""
-        self._daily_chance_cache = {}
-        self.plugin_service.clear_cache()
     
     @staticmethod
     def calculate_abc(open_price: float, high_price: float, low_price: float, close_price: float) -> ABCComponents:
@@ -78,7 +48,8 @@ class CRStrategyService:
     def check_c_point_strategy_1(self, stock_code: str, date: datetime, volume_type: Optional[str] = None, 
                                   total_win_rate_score: Optional[float] = None,
                                   historical_r_points: Optional[List] = None,
-                                  historical_c_points: Optional[List] = None) -> Tuple[bool, float, str, List[Dict[str, Any]], float, bool]:
+                                  historical_c_points: Optional[List] = None,
+                                  context: Optional[AnalysisContext] = None) -> Tuple[bool, float, str, List[Dict[str, Any]], float, bool]:
         """
         检查是否满足C点策略1（新逻辑 + 插件系统）
         
@@ -101,6 +72,7 @@ class CRStrategyService:
             total_win_rate_score: 赔率分（可选，如果不传则从数据库查询）
             historical_r_points: 历史R点列表（可选，用于新插件）
             historical_c_points: 历史C点列表（可选，用于新插件）
+            context: 分析上下文（可选，未传入时直接查询数据库）
             
         Returns:
             Tuple[bool, float, str, List[Dict], float, bool]: 
@@ -108,14 +80,14 @@ class CRStrategyService:
         """
         strategy_name = "策略一-赔率+胜率综合评分+插件"
         
-        # 如果没有传入参数，从缓存或数据库查询
+        # 如果没有传入参数，从分析上下文或数据库查询
         if volume_type is None or total_win_rate_score is None:
             date_str = date.strftime('%Y-%m-%d') if isinstance(date, datetime) else date
             
-            # 优先使用缓存
-            daily_chance = self._daily_chance_cache.get(date_str)
+            # 优先使用分析上下文
+            daily_chance = context.get_daily_chance(date_str) if context else None
             if not daily_chance:
-                # 缓存未命中，查询数据库
+                # 上下文未命中，查询数据库
                 daily_chance = self.daily_chance_repo.find_by_stock_and_date(stock_code, date_str)
             
             if not daily_chance:
@@ -137,7 +109,7 @@ class CRStrategyService:
         
         # === 计算层（插件）===
         final_score, triggered_plugins, force_c_point = self.plugin_service.apply_plugins(
-            stock_code, date, base_score, historical_r_points, historical_c_points
+            stock_code, date, base_score, historical_r_points, historical_c_points, context=context
         )
         
         # 从配置读取触发阈值
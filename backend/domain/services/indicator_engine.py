@@ -0,0 +1,116 @@
+"""增量MA/MACD指标计算引擎"""
+from typing import List, Dict, Optional, Iterable
+from domain.models.indicator import IndicatorState, IndicatorPoint
+
+
+class IndicatorEngine:
+    """
+    增量MA/MACD指标计算引擎
+
+    按K线逐根推进 IndicatorState，每根K线O(1)（均线窗口求和长度固定为周期数）。
+    计算口径与 MAService.calculate_sma / MACDService.calculate_macd 完全一致：
+    - MA: 最近N个收盘价之和 / N，求和顺序与切片求和相同，结果逐位相等
+    - EMA: 首值为前N个收盘价的SMA，之后 (价格 - 前值) * 2/(N+1) + 前值
+    - DEA: 对有效DIF序列做同样的EMA，MACD柱 = 2 * (DIF - DEA)
+    因此从空状态推进整段序列，结果等于对整段序列做一次全量计算。
+    """
+
+    # 各周期的均线配置
+    MA_PERIODS = {
+        'day': [5, 10, 20],
+        '30min': [10, 20, 40],
+        'week': [5, 10, 20],
+        'month': [3, 6, 12]
+    }
+
+    @classmethod
+    def get_ma_periods(cls, period_type: str) -> List[int]:
+        """获取周期类型对应的均线周期，未知周期使用日线配置"""
+        return cls.MA_PERIODS.get(period_type, cls.MA_PERIODS['day'])
+
+    @classmethod
+    def new_state(cls, period_type: str) -> IndicatorState:
+        """创建空状态（冷启动）"""
+        return IndicatorState(ma_periods=list(cls.get_ma_periods(period_type)))
+
+    @staticmethod
+    def update(state: IndicatorState, time, close: float) -> IndicatorPoint:
+        """
+        推进一根K线
+
+        Args:
+            state: 指标状态（原地修改）
+            time: K线时间
+            close: 收盘价
+
+        Returns:
+            该K线的指标值
+        """
+        state.count += 1
+        state.recent_closes.append(close)
+        if len(state.recent_closes) > state.window_size:
+            del state.recent_closes[0]
+        state.last_time = time
+
+        closes = state.recent_closes
+        ma_values = [sum(closes[-period:]) / period if state.count >= period else None
+                     for period in state.ma_periods]
+
+        state.ema_fast = IndicatorEngine._next_ema(state.ema_fast, close, closes, state.count, state.fast_period)
+        state.ema_slow = IndicatorEngine._next_ema(state.ema_slow, close, closes, state.count, state.slow_period)
+
+        point = IndicatorPoint(time=time, ma=ma_values)
+        if state.ema_fast is None or state.ema_slow is None:
+            return point
+
+        dif = state.ema_fast - state.ema_slow
+        point.dif = dif
+
+        if state.dea is None:
+            state.pending_difs.append(dif)
+            if len(state.pending_difs) >= state.signal_period:
+                state.dea = sum(state.pending_difs) / state.signal_period
+                state.pending_difs = []
+        else:
+            multiplier = 2 / (state.signal_period + 1)
+            state.dea = (dif - state.dea) * multiplier + state.dea
+
+        if state.dea is not None:
+            point.dea = state.dea
+            point.macd = 2 * (dif - state.dea)
+        return point
+
+    @staticmethod
+    def _next_ema(prev: Optional[float], close: float, closes: List[float], count: int, period: int) -> Optional[float]:
+        """EMA推进一步：不足周期为None，满周期时取SMA作为首值"""
+        if count < period:
+            return None
+        if count == period:
+            return sum(closes[-period:]) / period
+        return (close - prev) * (2 / (period + 1)) + prev
+
+    @staticmethod
+    def replay(state: IndicatorState, klines: Iterable) -> List[IndicatorPoint]:
+        """
+        按时间顺序推进多根K线（KLineData）
+
+        Returns:
+            每根K线的指标值
+        """
+        return [IndicatorEngine.update(state, kline.time, float(kline.close)) for kline in klines]
+
+    @staticmethod
+    def to_series(ma_periods: List[int], points: List[IndicatorPoint]) -> Dict[str, Dict[str, List[Optional[float]]]]:
+        """
+        将指标值转换为接口使用的列格式
+
+        Returns:
+            {'ma': {'ma5': [...], ...}, 'macd': {'dif': [...], 'dea': [...], 'macd': [...]}}
+        """
+        ma_data = {f'ma{period}': [p.ma[k] for p in points] for k, period in enumerate(ma_periods)}
+        macd_data = {
+            'dif': [p.dif for p in points],
+            'dea': [p.dea for p in points],
+            'macd': [p.macd for p in points]
+        }
+        return {'ma': ma_data, 'macd': macd_data}
@@ -1,6 +1,7 @@
 """K线形态识别服务"""
 from typing import Optional, List
 from dataclasses import dataclass
+from infrastructure.config.stock_registry import get_stock_registry
 
 
 @dataclass
@@ -60,21 +61,8 @@ class KLinePatternService:
         Returns:
             True表示主板，False表示非主板（创业、科创）
         """
-        # 去掉前缀，只取数字部分
-        code = stock_code.upper()
-        if code.startswith('SH') or code.startswith('SZ'):
-            code = code[2:]
-        
-        # 主板：600, 000开头
-        if code.startswith('600') or code.startswith('000'):
-            return True
-        
-        # 非主板：688（科创）, 300（创业）开头
-        if code.startswith('688') or code.startswith('300'):
-            return False
-        
-        # 默认按主板处理
-        return True
+        # 688（科创）、300（创业）开头为非主板，其余按主板处理；结果由股票注册表缓存
+        return get_stock_registry().info(stock_code).pattern_main_board
     
     @staticmethod
     def get_limit_up_threshold(stock_code: str) -> float:
@@ -0,0 +1,141 @@
+"""K线组合识别的日线加载与滑动窗口工具"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime, date, timedelta
+from typing import List, Dict, Iterable, Iterator, Tuple, Optional
+from domain.services.period_service import PeriodService
+from infrastructure.persistence.database import DatabaseConnection
+from infrastructure.persistence.kline_storage import get_kline_source
+from infrastructure.logging.logger import get_logger
+import pymysql.cursors
+
+logger = get_logger(__name__)
+
+
+def to_datetime(value) -> datetime:
+    """日期统一转换为datetime（date按当天0点，与SQL中DATE与DATETIME比较的口径一致）"""
+    if isinstance(value, datetime):
+        return value
+    return datetime.combine(value, datetime.min.time())
+
+
+def _date_only(value) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return None
+
+
+def load_daily_data(table_name: str, start_date: Optional[datetime],
+                    end_date: Optional[datetime]) -> List[Dict]:
+    """
+    获取日线数据（按日期升序，除第一根外带前一日收盘价 prev_close）
+
+    Args:
+        table_name: 股票表名
+        start_date: 开始日期（None表示不限）
+        end_date: 结束日期（None表示不限）
+    """
+    try:
+        period_code = PeriodService.get_period_code('day')
+        
+        with DatabaseConnection.get_connection_context() as conn:
+            cursor = conn.cursor(pymysql.cursors.DictCursor)
+            
+            where_clauses = ["peroid_type = %s"]
+            params = [period_code]
+            if start_date:
+                where_clauses.append("shi_jian >= %s")
+                params.append(start_date)
+            if end_date:
+                where_clauses.append("shi_jian <= %s")
+                params.append(end_date)
+            
+            source = get_kline_source(table_name)
+            query = f"""
+                SELECT shi_jian as date, kai_pan_jia as open, shou_pan_jia as close,
+                       zui_gao_jia as high, zui_di_jia as low, cheng_jiao_liang as volume
+                FROM {source.table}
+                {source.where(*where_clauses)}
+                ORDER BY shi_jian ASC
+            """
+            
+            cursor.execute(query, source.params(*params))
+            results = cursor.fetchall()
+            
+            daily_list = []
+            for i, row in enumerate(results):
+                # 统一处理日期类型
+                date_value = row['date']
+                if isinstance(date_value, datetime):
+                    date_obj = date_value
+                else:
+                    try:
+                        if isinstance(date_value, str):
+                            date_obj = datetime.strptime(date_value.split()[0], '%Y-%m-%d')
+                        else:
+                            date_obj = datetime.combine(date_value, datetime.min.time())
+                    except:
+                        date_obj = date_value
+                
+                daily_item = {
+                    'date': date_obj,
+                    'open': float(row['open']) if row['open'] else 0,
+                    'close': float(row['close']) if row['close'] else 0,
+                    'high': float(row['high']) if row['high'] else 0,
+                    'low': float(row['low']) if row['low'] else 0,
+                    'volume': int(row['volume']) if row['volume'] else 0
+                }
+                # 添加前一日收盘价
+                if i > 0:
+                    daily_item['prev_close'] = float(results[i-1]['close']) if results[i-1]['close'] else 0
+                daily_list.append(daily_item)
+            
+            return daily_list
+            
+    except Exception as e:
+        logger.error(f"获取日线数据失败: {table_name}: {e}", exc_info=True)
+        return []
+
+
+def iter_pattern_windows(
+    daily_data: List[Dict],
+    target_dates: Iterable,
+    window_days: int
+) -> Iterator[Tuple[object, List[Dict], Optional[int]]]:
+    """
+    在整段日线上按目标日期滑动窗口
+
+    每个目标日期的窗口与逐日查询 [目标日期 - window_days天, 目标日期] 得到的数据完全相同：
+    窗口第一根K线不带 prev_close（逐日查询时它没有前一行），其余K线原样复用。
+
+    Args:
+        daily_data: 按日期升序的整段日线（_get_daily_data 的结果，覆盖所有窗口）
+        target_dates: 目标日期
+        window_days: 窗口往前的自然日数
+
+    Yields:
+        (目标日期, 窗口K线, 目标日期在窗口中的索引)；窗口不足2根或找不到目标日期时索引为None
+    """
+    times = [to_datetime(day['date']) for day in daily_data]
+
+    for target_date in sorted(target_dates, key=to_datetime):
+        end_time = to_datetime(target_date)
+        lo = bisect_left(times, end_time - timedelta(days=window_days))
+        hi = bisect_right(times, end_time)
+
+        window = daily_data[lo:hi]
+        if len(window) < 2:
+            yield target_date, window, None
+            continue
+
+        first_day = dict(window[0])
+        first_day.pop('prev_close', None)
+        window[0] = first_day
+
+        target_date_only = _date_only(target_date)
+        target_idx = next(
+            (i for i, day in enumerate(window) if _date_only(day['date']) == target_date_only),
+            None
+        )
+        yield target_date, window, target_idx
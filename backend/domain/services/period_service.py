@@ -1,5 +1,5 @@
 """周期服务 - 领域服务"""
-from infrastructure.config.app_config import PERIOD_TYPE_MAP, TIME_RANGE_CONFIG
+from infrastructure.config.app_config import PERIOD_TYPE_MAP, TIME_RANGE_CONFIG, TIME_RANGE_ALIGN_CONFIG
 
 
 class PeriodService:
@@ -44,4 +44,16 @@ class PeriodService:
             天数
         """
         return TIME_RANGE_CONFIG.get(period_type, 730)
-
+    
+    @staticmethod
+    def get_time_range_align_days(period_type: str) -> int:
+        """
+        获取时间范围起点的对齐天数
+        
+        Args:
+            period_type: 周期类型
+            
+        Returns:
+            天数（0表示不对齐）
+        """
+        return TIME_RANGE_ALIGN_CONFIG.get(period_type, 0)
@@ -1,6 +1,8 @@
 """R点插件服务 - 风险信号检测"""
-from typing import Tuple, List, Optional
+from typing import Tuple, List, Optional, Callable
 from datetime import datetime, timedelta
+from domain.models.analysis_context import AnalysisContext
+from infrastructure.config.stock_registry import get_stock_registry
 from infrastructure.logging.logger import get_logger
 
 logger = get_logger(__name__)
@@ -21,54 +23,55 @@ class RPointPluginResult:
         }
 
 
+class RPointPluginBatch:
+    """
+    R点插件的整段序列批量结果
+    
+    - K线形态列：空头分歧、空头十字星、高开低走、阴线跌幅超3%，以及涨跌幅
+    - results[k][i]：插件1-3（与C点无关）在第i根K线上的结果，
+      None 表示该K线依赖分析上下文之外的数据，需逐日计算（查询数据库）
+    - 插件4（上冲乏力）依赖最近的C点日期，调用时基于上述列计算
+    """
+    
+    PLUGIN_NAMES = ("乖离率偏离", "临近压力位滞涨", "基本面突发利空")
+    
+    def __init__(self, size: int):
+        self.change_pct = [0.0] * size  # 昨收>0时的涨跌幅
+        self.change_pct_raw = [0.0] * size  # 昨收非0时的涨跌幅
+        self.is_bearish_divergence = [False] * size
+        self.is_bearish_doji = [False] * size
+        self.is_high_open_low_close = [False] * size
+        self.is_bearish_line_3pct = [False] * size
+        # 未触发的结果各插件共用一个实例，避免逐K线创建对象
+        self.not_triggered = [RPointPluginResult(name, False, "") for name in self.PLUGIN_NAMES]
+        self.results: List[List[Optional[RPointPluginResult]]] = [
+            [not_triggered] * size for not_triggered in self.not_triggered
+        ]
+
+
 class RPointPluginService:
     """R点插件服务 - 风险信号检测"""
     
-    def __init__(self):
-        """初始化R点插件服务"""
-        from infrastructure.persistence.daily_repository_impl import DailyRepositoryImpl
-        from infrastructure.persistence.daily_chance_repository_impl import DailyChanceRepositoryImpl
-        from domain.services.config_service import ConfigService
-        self.daily_repo = DailyRepositoryImpl()
-        self.daily_chance_repo = DailyChanceRepositoryImpl()
-        self.config_service = ConfigService()
-        # 数据缓存
-        self._daily_cache = {}  # {date_str: DailyData}
-        self._daily_chance_cache = {}  # {date_str: DailyChance}
+    # 分析上下文中批量结果的键
+    BATCH_KEY = 'r_point_plugins'
     
-    def init_cache(self, stock_code: str, start_date: str, end_date: str):
+    def __init__(self, use_batch: bool = True):
         """
-        初始化数据缓存（批量查询）
+        初始化R点插件服务
         
         Args:
-            stock_code: 股票代码
-            start_date: 开始日期
-            end_date: 结束日期
+            use_batch: 传入分析上下文时，是否整段序列预先计算K线形态和插件1-3
         """
-        logger.info(f"开始初始化R点插件缓存: {stock_code} {start_date} 至 {end_date}")
-        
-        # 批量查询 daily 数据
-        daily_list = self.daily_repo.find_by_date_range(stock_code, start_date, end_date)
-        self._daily_cache = {}
-        for daily in daily_list:
-            date_str = daily.date.strftime('%Y-%m-%d') if isinstance(daily.date, datetime) else str(daily.date)
-            self._daily_cache[date_str] = daily
-        
-        # 批量查询 daily_chance 数据
-        daily_chance_list = self.daily_chance_repo.find_by_stock_code(stock_code, start_date, end_date)
-        self._daily_chance_cache = {}
-        for dc in daily_chance_list:
-            date_str = dc.date.strftime('%Y-%m-%d') if isinstance(dc.date, datetime) else str(dc.date)
-            self._daily_chance_cache[date_str] = dc
-        
-        logger.info(f"R点插件缓存初始化完成: daily={len(self._daily_cache)}条, daily_chance={len(self._daily_chance_cache)}条")
-    
-    def clear_cache(self):
-        """清空缓存"""
-        self._daily_cache = {}
-        self._daily_chance_cache = {}
+        from infrastructure.persistence.daily_repository_impl import DailyRepositoryImpl
+        from infrastructure.persistence.daily_chance_repository_impl import DailyChanceRepositoryImpl
+        from domain.services.config_service import get_config_service
+        self.daily_repo = DailyRepositoryImpl()
+        self.daily_chance_repo = DailyChanceRepositoryImpl()
+        self.config_service = get_config_service()  # 与C点插件共用配置单例，更新配置后立即生效
+        self.use_batch = use_batch
     
-    def check_r_point(self, stock_code: str, date: datetime, c_point_date: Optional[datetime] = None) -> Tuple[bool, List[RPointPluginResult]]:
+    def check_r_point(self, stock_code: str, date: datetime, c_point_date: Optional[datetime] = None,
+                      context: Optional[AnalysisContext] = None) -> Tuple[bool, List[RPointPluginResult]]:
         """
         检查是否触发R点（卖出信号）
         
@@ -76,28 +79,36 @@ class RPointPluginService:
             stock_code: 股票代码
             date: 检查日期
             c_point_date: C点触发日期（用于"上冲乏力"判断）
+            context: 分析上下文（可选，未传入时直接查询数据库）
             
         Returns:
             Tuple[bool, List[RPointPluginResult]]: (是否触发R点, 触发的插件列表)
         """
         triggered_plugins = []
         
+        # 有分析上下文时，直接读取整段序列的预计算结果
+        batch = self._get_batch(stock_code, context)
+        index = None
+        if batch is not None:
+            date_str = date.strftime('%Y-%m-%d') if isinstance(date, datetime) else date
+            index = context.bars.index_of(date_str)
+        
         # 插件1: 乖离率偏离
-        plugin1 = self._check_deviation(stock_code, date)
+        plugin1 = self._batch_or_check(batch, 0, index, self._check_deviation, stock_code, date, context)
         if plugin1.triggered:
             triggered_plugins.append(plugin1)
             logger.info(f"[R点插件-乖离率偏离] {stock_code} {date}: {plugin1.reason}")
             return True, triggered_plugins
         
         # 插件2: 临近压力位滞涨
-        plugin2 = self._check_pressure_stagnation(stock_code, date)
+        plugin2 = self._batch_or_check(batch, 1, index, self._check_pressure_stagnation, stock_code, date, context)
         if plugin2.triggered:
             triggered_plugins.append(plugin2)
             logger.info(f"[R点插件-临近压力位滞涨] {stock_code} {date}: {plugin2.reason}")
             return True, triggered_plugins
         
         # 插件3: 基本面突发利空
-        plugin3 = self._check_fundamental_negative(stock_code, date)
+        plugin3 = self._batch_or_check(batch, 2, index, self._check_fundamental_negative, stock_code, date, context)
         if plugin3.triggered:
             triggered_plugins.append(plugin3)
             logger.info(f"[R点插件-基本面突发利空] {stock_code} {date}: {plugin3.reason}")
@@ -105,7 +116,11 @@ class RPointPluginService:
         
         # 插件4: 上冲乏力
         if c_point_date:
-            plugin4 = self._check_weak_breakout(stock_code, date, c_point_date)
+            plugin4 = None
+            if batch is not None and index is not None:
+                plugin4 = self._evaluate_weak_breakout(stock_code, batch, context, index, c_point_date)
+            if plugin4 is None:
+                plugin4 = self._check_weak_breakout(stock_code, date, c_point_date, context)
             if plugin4.triggered:
                 triggered_plugins.append(plugin4)
                 logger.info(f"[R点插件-上冲乏力] {stock_code} {date}: {plugin4.reason}")
@@ -113,7 +128,269 @@ class RPointPluginService:
         
         return False, triggered_plugins
     
-    def _check_deviation(self, stock_code: str, date: datetime) -> RPointPluginResult:
+    def _get_batch(self, stock_code: str, context: Optional[AnalysisContext]) -> Optional[RPointPluginBatch]:
+        """获取（首次调用时计算）分析上下文中的批量结果"""
+        if not self.use_batch or context is None or context.stock_code != stock_code:
+            return None
+        batch = context.plugin_batches.get(self.BATCH_KEY)
+        if batch is None:
+            try:
+                batch = self.build_batch(stock_code, context)
+            except Exception as e:
+                logger.error(f"R点插件批量计算失败，改为逐日计算: {e}", exc_info=True)
+                batch = False
+            context.plugin_batches[self.BATCH_KEY] = batch
+        return batch or None
+    
+    @staticmethod
+    def _batch_or_check(batch: Optional[RPointPluginBatch], plugin_index: int, index: Optional[int],
+                        check: Callable, stock_code: str, date: datetime,
+                        context: Optional[AnalysisContext]) -> RPointPluginResult:
+        """有批量结果时直接取用，否则逐日计算"""
+        if batch is not None and index is not None:
+            result = batch.results[plugin_index][index]
+            if result is not None:
+                return result
+        return check(stock_code, date, context)
+    
+    def check_plugin_range(self, stock_code: str, plugin_index: int, context: AnalysisContext,
+                           start_date: str, end_date: str) -> List[Tuple[str, RPointPluginResult]]:
+        """
+        对分析上下文中 [start_date, end_date] 内的每个交易日检查单个插件（插件1-3，与历史C/R点无关）
+        
+        优先取整段序列的批量结果，批量结果缺失的K线逐日计算（用于全市场信号筛选）
+        
+        Args:
+            stock_code: 股票代码
+            plugin_index: 插件下标（0起，与 RPointPluginBatch.PLUGIN_NAMES 一致）
+            context: 分析上下文
+            start_date: 开始日期（含，YYYY-MM-DD）
+            end_date: 结束日期（含，YYYY-MM-DD）
+            
+        Returns:
+            [(日期, 插件结果)]，按日期升序
+        """
+        checks = (self._check_deviation, self._check_pressure_stagnation, self._check_fundamental_negative)
+        check = checks[plugin_index]
+        batch = self._get_batch(stock_code, context)
+        results = []
+        for index, date_str in enumerate(context.bars.dates):
+            if start_date <= date_str <= end_date:
+                date = datetime.strptime(date_str, '%Y-%m-%d')
+                results.append((date_str, self._batch_or_check(batch, plugin_index, index, check,
+                                                               stock_code, date, context)))
+        return results
+    
+    def build_batch(self, stock_code: str, context: AnalysisContext) -> RPointPluginBatch:
+        """
+        对分析上下文中的整段日线序列批量计算K线形态和插件1-3
+        
+        K线形态判断与 _check_bearish_divergence_kline 等辅助方法一致，只在列上算一次；
+        插件结果与逐日调用 _check_* 完全一致，需要上下文之外数据的K线标记为None，由逐日计算兜底。
+        市场类型（插件2条件2）在计算时读取一次。
+        """
+        bars = context.bars
+        n = len(bars)
+        opens, highs, lows, closes = bars.open, bars.high, bars.low, bars.close
+        volumes, pre_closes = bars.volume, bars.pre_close
+        stock_info = get_stock_registry().info(stock_code)
+        is_main_board = stock_info.is_main_board
+        amplitude_threshold = stock_info.amplitude_threshold
+        bearish_line_threshold = 3 if is_main_board else (3 * 5 / 3)
+        
+        batch = RPointPluginBatch(n)
+        change_pct, change_pct_raw = batch.change_pct, batch.change_pct_raw
+        is_divergence, is_doji = batch.is_bearish_divergence, batch.is_bearish_doji
+        is_holc, is_line_3pct = batch.is_high_open_low_close, batch.is_bearish_line_3pct
+        is_bullish = [False] * n
+        
+        # === K线形态列（一次遍历） ===
+        for i in range(n):
+            o, h, l, c, pc = opens[i], highs[i], lows[i], closes[i], pre_closes[i]
+            is_bullish[i] = c >= o
+            if not pc:
+                continue
+            change_pct_raw[i] = (c - pc) / pc * 100
+            if pc > 0:
+                change_pct[i] = change_pct_raw[i]
+            is_line_3pct[i] = c < o and change_pct_raw[i] < -bearish_line_threshold
+            
+            amplitude = (h - l) / pc * 100
+            if amplitude < amplitude_threshold:
+                continue
+            range_val = h - l
+            is_divergence[i] = ((h - max(o, c)) / range_val if range_val > 0 else 0) > 0.3
+            is_doji[i] = ((abs(c - o) / c * 100) if c else 0) < 1
+            if range_val != 0:
+                is_holc[i] = (o - l) / range_val > 0.7 and (c - l) / range_val < 0.3
+        
+        # === 插件1-3 ===
+        r1, r2, r3 = batch.results
+        chance_cache = context.daily_chance_cache
+        dates = bars.dates
+        market_type = self.config_service.get_market_type()
+        limit_down = -9.9 if is_main_board else -19.8
+        
+        for i in range(n):
+            current_chance = chance_cache.get(dates[i])
+            
+            # 插件1: 乖离率偏离（需要前20个交易日）
+            if i >= 20:
+                if not current_chance:
+                    r1[i] = None
+                else:
+                    result = self._evaluate_deviation(is_main_board, current_chance, batch,
+                                                      is_bullish, i)
+                    if result is not None:
+                        r1[i] = result
+            
+            # 插件2: 临近压力位滞涨
+            if not current_chance:
+                r2[i] = None
+            else:
+                r2[i] = self._evaluate_pressure_stagnation(current_chance, batch, chance_cache,
+                                                           dates, i, market_type)
+            
+            # 插件3: 基本面突发利空
+            o, h, l, c = opens[i], highs[i], lows[i], closes[i]
+            if pre_closes[i] > 0 and change_pct[i] <= limit_down:
+                is_one_line = o == h == l == c
+                is_t_line = o == l == c and h > c
+                if is_one_line or is_t_line:
+                    limit_type = "一字跌停" if is_one_line else "T字跌停"
+                    r3[i] = RPointPluginResult("基本面突发利空", True, f"{limit_type}(需AI确认基本面利空)")
+        
+        logger.debug(f"R点插件批量计算完成: {stock_code}, {n}根K线")
+        return batch
+    
+    def _evaluate_deviation(self, is_main_board: bool, current_chance, batch: RPointPluginBatch,
+                            is_bullish: List[bool], i: int) -> Optional[RPointPluginResult]:
+        """插件1判断（批量版本，规则同 _check_deviation），未触发返回None"""
+        is_volume_xyh = self._check_volume_type(current_chance, ['X', 'Y', 'H'])
+        is_volume_xyzh = self._check_volume_type(current_chance, ['X', 'Y', 'Z', 'H'])
+        is_bearish_divergence = batch.is_bearish_divergence[i]
+        is_bearish_line = batch.is_bearish_line_3pct[i]
+        has_bearish_pattern = self._check_bearish_pattern(current_chance)
+        volume_and_bearish = (is_volume_xyh and is_bearish_divergence) or (is_volume_xyh and is_bearish_line)
+        
+        # 前20个交易日涨跌幅，最近的在前
+        change_pct = batch.change_pct
+        change_pcts = [change_pct[j] for j in range(i - 1, i - 21, -1)]
+        
+        # 条件1: 连续2个以上涨停
+        limit_threshold = 9.9 if is_main_board else 19.8
+        consecutive_limits = 0
+        for pct in change_pcts[:5]:
+            if pct >= limit_threshold:
+                consecutive_limits += 1
+            else:
+                break
+        if consecutive_limits >= 2 and volume_and_bearish:
+            return RPointPluginResult("乖离率偏离", True, f"条件1: 连续{consecutive_limits}个涨停+放量+空头K线")
+        
+        # 条件2: 前3日累计涨幅过大
+        cum_3days = sum(change_pcts[:3])
+        if cum_3days > (15 if is_main_board else 20) and volume_and_bearish:
+            return RPointPluginResult("乖离率偏离", True, f"条件2: 前3日涨幅{cum_3days:.2f}%+放量+空头K线")
+        
+        # 条件3: 前5日累计涨幅过大
+        cum_5days = sum(change_pcts[:5])
+        if cum_5days > (20 if is_main_board else 25) and volume_and_bearish:
+            return RPointPluginResult("乖离率偏离", True, f"条件3: 前5日涨幅{cum_5days:.2f}%+放量+空头K线")
+        
+        # 条件4: 连续5连阳+涨幅过大
+        all_bullish = all(is_bullish[i - 5:i])
+        if all_bullish and cum_5days > (20 if is_main_board else 25) and volume_and_bearish:
+            return RPointPluginResult("乖离率偏离", True, f"条件4: 连续5连阳+涨幅{cum_5days:.2f}%+放量+空头K线")
+        
+        # 条件5、6: 前15日/前20日累计涨幅>50%
+        volume_and_signal = is_volume_xyzh and (is_bearish_divergence or has_bearish_pattern)
+        cum_15days = sum(change_pcts[:15])
+        if cum_15days > 50 and volume_and_signal:
+            return RPointPluginResult("乖离率偏离", True, f"条件5: 前15日涨幅{cum_15days:.2f}%+放量+空头信号")
+        
+        cum_20days = sum(change_pcts)
+        if cum_20days > 50 and volume_and_signal:
+            return RPointPluginResult("乖离率偏离", True, f"条件6: 前20日涨幅{cum_20days:.2f}%+放量+空头信号")
+        
+        return None
+    
+    def _evaluate_pressure_stagnation(self, current_chance, batch: RPointPluginBatch, chance_cache: dict,
+                                      dates: List[str], i: int, market_type: str) -> Optional[RPointPluginResult]:
+        """插件2判断（批量版本，规则同 _check_pressure_stagnation），依赖上下文之外数据时返回None"""
+        not_triggered = batch.not_triggered[1]
+        day_win_ratio_score = current_chance.day_win_ratio_score or 0
+        if not day_win_ratio_score < 6:
+            return not_triggered
+        
+        # 条件1: 放量 + 特定K线
+        if self._check_volume_type(current_chance, ['X', 'Y', 'Z', 'H']):
+            if (batch.is_bearish_divergence[i] or batch.is_bearish_doji[i] or
+                    batch.is_high_open_low_close[i] or batch.is_bearish_line_3pct[i]):
+                return RPointPluginResult("临近压力位滞涨", True,
+                                          f"条件1: 距压力位近(赔率{day_win_ratio_score:.1f}<6)+放量+空头K线")
+        
+        # 条件2: 前3日无AXYZ放量 + 空头组合（仅熊市生效）
+        if market_type == 'bear' and i >= 3:
+            for j in range(i - 1, i - 4, -1):
+                prev_chance = chance_cache.get(dates[j])
+                if not prev_chance:
+                    return None
+                if self._check_volume_type(prev_chance, ['A', 'X', 'Y', 'Z']):
+                    return not_triggered
+            if self._check_bearish_pattern(current_chance):
+                return RPointPluginResult("临近压力位滞涨", True,
+                                          f"条件2(熊市): 距压力位近(赔率{day_win_ratio_score:.1f}<6)+前3日无放量+空头组合")
+        
+        return not_triggered
+    
+    def _evaluate_weak_breakout(self, stock_code: str, batch: RPointPluginBatch, context: AnalysisContext,
+                                index: int, c_point_date: datetime) -> Optional[RPointPluginResult]:
+        """
+        插件4判断（基于批量结果，规则同 _check_weak_breakout）
+        
+        C点日期不在序列中或缺少daily_chance时返回None，由逐日计算兜底
+        """
+        bars = context.bars
+        c_date_str = c_point_date.strftime('%Y-%m-%d') if isinstance(c_point_date, datetime) else c_point_date
+        c_index = bars.index_of(c_date_str)
+        if c_index is None:
+            return None
+        
+        not_triggered = RPointPluginResult("上冲乏力", False, "")
+        c_close = bars.close[c_index]
+        cumulative_gain = ((bars.close[index] - c_close) / c_close * 100) if c_close else 0
+        if cumulative_gain <= 15:
+            return not_triggered
+        
+        current_chance = context.daily_chance_cache.get(bars.dates[index])
+        if not current_chance:
+            return None
+        
+        day_win_ratio_score = current_chance.day_win_ratio_score or 0
+        if day_win_ratio_score >= 10 or index < 1:
+            return not_triggered
+        
+        is_main_board = get_stock_registry().is_main_board(stock_code)
+        yesterday_change = batch.change_pct_raw[index - 1]
+        if yesterday_change < (6 if is_main_board else 8):
+            return not_triggered
+        
+        if not self._check_volume_type(current_chance, ['A', 'X', 'Y', 'Z', 'H']):
+            return not_triggered
+        
+        if (batch.is_bearish_divergence[index] or batch.is_bearish_doji[index] or
+                batch.is_high_open_low_close[index] or batch.is_bearish_line_3pct[index]):
+            return RPointPluginResult(
+                "上冲乏力",
+                True,
+                f"从C点涨幅{cumulative_gain:.2f}%+赔率{day_win_ratio_score:.1f}+昨日涨{yesterday_change:.2f}%+今日放量+空头K线"
+            )
+        
+        return not_triggered
+    
+    def _check_deviation(self, stock_code: str, date: datetime,
+                         context: Optional[AnalysisContext] = None) -> RPointPluginResult:
         """
         插件1: 乖离率偏离
         
@@ -129,19 +406,15 @@ class RPointPluginService:
             date_str = date.strftime('%Y-%m-%d') if isinstance(date, datetime) else date
             
             # 判断主板还是非主板
-            is_main_board = stock_code.startswith(('SH600', 'SH601', 'SH603', 'SH605', 'SZ000', 'SZ001'))
+            is_main_board = get_stock_registry().is_main_board(stock_code)
             
             # 获取当日数据
-            current_data = self._daily_cache.get(date_str)
-            if not current_data:
-                current_data = self.daily_repo.find_by_date(stock_code, date_str)
+            current_data = self._get_daily(stock_code, date_str, context)
             if not current_data:
                 return RPointPluginResult("乖离率偏离", False, "")
             
             # 获取当日daily_chance（成交量类型、空头组合）
-            current_chance = self._daily_chance_cache.get(date_str)
-            if not current_chance:
-                current_chance = self.daily_chance_repo.find_by_stock_and_date(stock_code, date_str)
+            current_chance = self._get_daily_chance(stock_code, date_str, context)
             
             # 如果没有daily_chance数据，无法判断成交量和空头组合，记录日志
             if not current_chance:
@@ -149,7 +422,7 @@ class RPointPluginService:
                 return RPointPluginResult("乖离率偏离", False, "")
             
             # 获取历史数据
-            prev_dates = self._get_previous_trading_dates_from_cache(date_str)
+            prev_dates = self._get_previous_trading_dates_from_cache(date_str, context, limit=20)
             if len(prev_dates) < 20:
                 logger.debug(f"[R点-乖离率偏离] {stock_code} {date_str} 历史数据不足20天({len(prev_dates)}天)")
                 return RPointPluginResult("乖离率偏离", False, "")
@@ -173,9 +446,7 @@ class RPointPluginService:
             # 获取前N日数据
             prev_data_list = []
             for prev_date in prev_dates[:20]:
-                data = self._daily_cache.get(prev_date)
-                if not data:
-                    data = self.daily_repo.find_by_date(stock_code, prev_date)
+                data = self._get_daily(stock_code, prev_date, context)
                 if data:
                     prev_data_list.append(data)
             
@@ -285,7 +556,8 @@ class RPointPluginService:
             logger.error(f"R点插件-乖离率偏离检查失败: {e}")
             return RPointPluginResult("乖离率偏离", False, "")
     
-    def _check_pressure_stagnation(self, stock_code: str, date: datetime) -> RPointPluginResult:
+    def _check_pressure_stagnation(self, stock_code: str, date: datetime,
+                                   context: Optional[AnalysisContext] = None) -> RPointPluginResult:
         """
         插件2: 临近压力位滞涨
         
@@ -296,19 +568,15 @@ class RPointPluginService:
             date_str = date.strftime('%Y-%m-%d') if isinstance(date, datetime) else date
             
             # 判断主板还是非主板
-            is_main_board = stock_code.startswith(('SH600', 'SH601', 'SH603', 'SH605', 'SZ000', 'SZ001'))
+            is_main_board = get_stock_registry().is_main_board(stock_code)
             
             # 获取当日数据
-            current_data = self._daily_cache.get(date_str)
-            if not current_data:
-                current_data = self.daily_repo.find_by_date(stock_code, date_str)
+            current_data = self._get_daily(stock_code, date_str, context)
             if not current_data:
                 return RPointPluginResult("临近压力位滞涨", False, "")
             
             # 获取当日daily_chance
-            current_chance = self._daily_chance_cache.get(date_str)
-            if not current_chance:
-                current_chance = self.daily_chance_repo.find_by_stock_and_date(stock_code, date_str)
+            current_chance = self._get_daily_chance(stock_code, date_str, context)
             if not current_chance:
                 return RPointPluginResult("临近压力位滞涨", False, "")
             
@@ -342,13 +610,11 @@ class RPointPluginService:
             
             # 条件2仅在熊市生效
             if market_type == 'bear':
-                prev_dates = self._get_previous_trading_dates_from_cache(date_str)
+                prev_dates = self._get_previous_trading_dates_from_cache(date_str, context, limit=3)
                 if len(prev_dates) >= 3:
                     has_good_volume = False
                     for prev_date in prev_dates[:3]:
-                        prev_chance = self._daily_chance_cache.get(prev_date)
-                        if not prev_chance:
-                            prev_chance = self.daily_chance_repo.find_by_stock_and_date(stock_code, prev_date)
+                        prev_chance = self._get_daily_chance(stock_code, prev_date, context)
                         if prev_chance:
                             if self._check_volume_type(prev_chance, ['A', 'X', 'Y', 'Z']):
                                 has_good_volume = True
@@ -369,7 +635,8 @@ class RPointPluginService:
             logger.error(f"R点插件-临近压力位滞涨检查失败: {e}")
             return RPointPluginResult("临近压力位滞涨", False, "")
     
-    def _check_fundamental_negative(self, stock_code: str, date: datetime) -> RPointPluginResult:
+    def _check_fundamental_negative(self, stock_code: str, date: datetime,
+                                    context: Optional[AnalysisContext] = None) -> RPointPluginResult:
         """
         插件3: 基本面突发利空
         
@@ -379,14 +646,12 @@ class RPointPluginService:
             date_str = date.strftime('%Y-%m-%d') if isinstance(date, datetime) else date
             
             # 获取当日数据
-            current_data = self._daily_cache.get(date_str)
-            if not current_data:
-                current_data = self.daily_repo.find_by_date(stock_code, date_str)
+            current_data = self._get_daily(stock_code, date_str, context)
             if not current_data:
                 return RPointPluginResult("基本面突发利空", False, "")
             
             # 判断是否跌停
-            is_main_board = stock_code.startswith(('SH600', 'SH601', 'SH603', 'SH605', 'SZ000', 'SZ001'))
+            is_main_board = get_stock_registry().is_main_board(stock_code)
             limit_threshold = -9.9 if is_main_board else -19.8
             
             if current_data.pre_close and current_data.pre_close > 0:
@@ -416,7 +681,8 @@ class RPointPluginService:
             logger.error(f"R点插件-基本面突发利空检查失败: {e}")
             return RPointPluginResult("基本面突发利空", False, "")
     
-    def _check_weak_breakout(self, stock_code: str, date: datetime, c_point_date: datetime) -> RPointPluginResult:
+    def _check_weak_breakout(self, stock_code: str, date: datetime, c_point_date: datetime,
+                            context: Optional[AnalysisContext] = None) -> RPointPluginResult:
         """
         插件4: 上冲乏力
         
@@ -427,19 +693,15 @@ class RPointPluginService:
             c_date_str = c_point_date.strftime('%Y-%m-%d') if isinstance(c_point_date, datetime) else c_point_date
             
             # 判断主板还是非主板
-            is_main_board = stock_code.startswith(('SH600', 'SH601', 'SH603', 'SH605', 'SZ000', 'SZ001'))
+            is_main_board = get_stock_registry().is_main_board(stock_code)
             
             # 获取C点日期的数据
-            c_data = self._daily_cache.get(c_date_str)
-            if not c_data:
-                c_data = self.daily_repo.find_by_date(stock_code, c_date_str)
+            c_data = self._get_daily(stock_code, c_date_str, context)
             if not c_data:
                 return RPointPluginResult("上冲乏力", False, "")
             
             # 获取当日数据
-            current_data = self._daily_cache.get(date_str)
-            if not current_data:
-                current_data = self.daily_repo.find_by_date(stock_code, date_str)
+            current_data = self._get_daily(stock_code, date_str, context)
             if not current_data:
                 return RPointPluginResult("上冲乏力", False, "")
             
@@ -450,9 +712,7 @@ class RPointPluginService:
                 return RPointPluginResult("上冲乏力", False, "")
             
             # 获取当日daily_chance
-            current_chance = self._daily_chance_cache.get(date_str)
-            if not current_chance:
-                current_chance = self.daily_chance_repo.find_by_stock_and_date(stock_code, date_str)
+            current_chance = self._get_daily_chance(stock_code, date_str, context)
             if not current_chance:
                 return RPointPluginResult("上冲乏力", False, "")
             
@@ -462,13 +722,11 @@ class RPointPluginService:
                 return RPointPluginResult("上冲乏力", False, "")
             
             # 获取前一日数据
-            prev_dates = self._get_previous_trading_dates_from_cache(date_str)
+            prev_dates = self._get_previous_trading_dates_from_cache(date_str, context, limit=1)
             if len(prev_dates) < 1:
                 return RPointPluginResult("上冲乏力", False, "")
             
-            yesterday_data = self._daily_cache.get(prev_dates[0])
-            if not yesterday_data:
-                yesterday_data = self.daily_repo.find_by_date(stock_code, prev_dates[0])
+            yesterday_data = self._get_daily(stock_code, prev_dates[0], context)
             if not yesterday_data:
                 return RPointPluginResult("上冲乏力", False, "")
             
@@ -505,18 +763,27 @@ class RPointPluginService:
     
     # ========== 辅助方法 ==========
     
-    def _get_previous_trading_dates_from_cache(self, current_date_str: str) -> List[str]:
-        """从缓存中获取前N个交易日的日期列表"""
-        try:
-            all_dates = sorted(self._daily_cache.keys(), reverse=True)
-            result = []
-            for date_str in all_dates:
-                if date_str < current_date_str:
-                    result.append(date_str)
-            return result
-        except Exception as e:
-            logger.error(f"从缓存获取前N个交易日失败: {e}")
+    def _get_daily(self, stock_code: str, date_str: str, context: Optional[AnalysisContext] = None):
+        """获取日线数据：优先使用分析上下文，未命中时查询数据库"""
+        daily_data = context.get_daily(date_str) if context else None
+        if not daily_data:
+            daily_data = self.daily_repo.find_by_date(stock_code, date_str)
+        return daily_data
+    
+    def _get_daily_chance(self, stock_code: str, date_str: str, context: Optional[AnalysisContext] = None):
+        """获取daily_chance数据：优先使用分析上下文，未命中时查询数据库"""
+        daily_chance = context.get_daily_chance(date_str) if context else None
+        if not daily_chance:
+            daily_chance = self.daily_chance_repo.find_by_stock_and_date(stock_code, date_str)
+        return daily_chance
+    
+    def _get_previous_trading_dates_from_cache(self, current_date_str: str,
+                                               context: Optional[AnalysisContext] = None,
+                                               limit: Optional[int] = None) -> List[str]:
+        """从分析上下文中获取前N个交易日的日期列表（按日期倒序）"""
+        if context is None:
             return []
+        return context.get_previous_trading_dates(current_date_str, limit)
     
     def _check_volume_type(self, daily_chance, target_types: List[str]) -> bool:
         """检查成交量类型是否在目标类型中"""
@@ -2,6 +2,8 @@
 from typing import List, Dict, Tuple, Optional
 from datetime import datetime, timedelta
 from infrastructure.logging.logger import get_logger
+from domain.models.analysis_context import AnalysisContext
+from domain.models.bar_series import BarSeries
 from domain.models.stock import StockGroups
 
 logger = get_logger(__name__)
@@ -13,8 +15,6 @@ class Strategy2Service:
     def __init__(self):
         from domain.services.config_service import get_config_service
         self.config_service = get_config_service()  # 配置服务
-        # 用于记录加分的时间窗口（MA、MACD等）
-        self._bonus_records = {}  # {stock_code: {bonus_type: end_date}}
     
     def check_strategy2(self, 
                        stock_code: str, 
@@ -24,8 +24,10 @@ class Strategy2Service:
                        macd_data: Dict[str, List[Optional[float]]],
                        volume_type: Optional[str],
                        bullish_pattern: Optional[str],
-                       daily_data_30: List[Dict],  # 前30个交易日数据
-                       index: int) -> Tuple[bool, float, str]:
+                       daily_data_30: Optional[List[Dict]],  # 前30个交易日数据
+                       index: int,
+                       context: Optional[AnalysisContext] = None,
+                       bars: Optional[BarSeries] = None) -> Tuple[bool, float, str]:
         """
         检查策略2是否触发C点
         
@@ -39,23 +41,26 @@ class Strategy2Service:
             bullish_pattern: 多头K线组合
             daily_data_30: 前30个交易日数据（用于判断低位）
             index: 当前K线在数据中的索引
+            context: 分析上下文（用于记录MA、MACD加分的时间窗口，不传则不跨日保留）
+            bars: K线列式序列（可选，传入时按index直接取前30日窗口，代替daily_data_30）
             
         Returns:
             (是否触发, 总分, 详细原因)
         """
         total_score = 0
         details = []
+        bonus_records = context.bonus_records if context is not None else {}
         
         # 检查数据完整性
         if not self._check_data_validity(ma_data, macd_data, index):
             return False, 0, "数据不完整"
         
         # 1. 均线总分：30分
-        ma_score = self._calculate_ma_score(stock_code, date, ma_data, close_price, index, details)
+        ma_score = self._calculate_ma_score(stock_code, date, ma_data, close_price, index, details, bonus_records)
         total_score += ma_score
         
         # 2. MACD总分：30分
-        macd_score = self._calculate_macd_score(stock_code, date, macd_data, index, details)
+        macd_score = self._calculate_macd_score(stock_code, date, macd_data, index, details, bonus_records)
         total_score += macd_score
         
         # 3. 成交量总分：30分
@@ -63,7 +68,7 @@ class Strategy2Service:
         total_score += volume_score
         
         # 4. K线组合：10分
-        kline_score = self._calculate_kline_score(daily_data_30, bullish_pattern, details)
+        kline_score = self._calculate_kline_score(daily_data_30, bullish_pattern, details, bars, index)
         total_score += kline_score
         
         # 5. 减分：股价偏离10日均线超过20%
@@ -110,7 +115,8 @@ class Strategy2Service:
         return True
     
     def _calculate_ma_score(self, stock_code: str, date: datetime, ma_data: Dict, 
-                           close_price: float, index: int, details: List[str]) -> float:
+                           close_price: float, index: int, details: List[str],
+                           bonus_records: Dict[str, datetime]) -> float:
         """
         计算均线得分：30分
         条件：5日线上穿10日线 且 K线当前价格 > 20日均线价格
@@ -134,7 +140,7 @@ class Strategy2Service:
         
         # 检查是否在5日有效期内
         bonus_key = f"{stock_code}_ma_golden_cross"
-        if self._check_time_window_bonus(stock_code, date, bonus_key, 5):
+        if self._check_time_window_bonus(bonus_records, date, bonus_key):
             score = 30
             details.append("均线30分(MA5金叉MA10+价格>MA20)")
             return score
@@ -149,12 +155,13 @@ class Strategy2Service:
             score = 30
             details.append("均线30分(MA5金叉MA10+价格>MA20)")
             # 记录这个加分，5日内有效
-            self._record_bonus(stock_code, bonus_key, date, 5)
+            self._record_bonus(bonus_records, bonus_key, date, 5)
         
         return score
     
     def _calculate_macd_score(self, stock_code: str, date: datetime, macd_data: Dict, 
-                             index: int, details: List[str]) -> float:
+                             index: int, details: List[str],
+                             bonus_records: Dict[str, datetime]) -> float:
         """
         计算MACD得分：最高30分
         
@@ -207,7 +214,7 @@ class Strategy2Service:
         
         # 4. 强势多头（5分）- 当日和前一日DIF > 前8日所有DIF（5日内有效）
         bonus_key = f"{stock_code}_strong_bull"
-        if self._check_time_window_bonus(stock_code, date, bonus_key, 5):
+        if self._check_time_window_bonus(bonus_records, date, bonus_key):
             score += 5
             macd_details.append("强势多头5分")
         elif index >= 10:
@@ -219,11 +226,11 @@ class Strategy2Service:
                     score += 5
                     macd_details.append("强势多头5分")
                     # 记录这个加分，5日内有效
-                    self._record_bonus(stock_code, bonus_key, date, 5)
+                    self._record_bonus(bonus_records, bonus_key, date, 5)
         
         # 5. 柱状图反转（5分）- 前日蓝柱今日红柱（5日内有效）
         bonus_key2 = f"{stock_code}_bar_reverse"
-        if self._check_time_window_bonus(stock_code, date, bonus_key2, 5):
+        if self._check_time_window_bonus(bonus_records, date, bonus_key2):
             score += 5
             macd_details.append("柱反转5分")
         else:
@@ -234,7 +241,7 @@ class Strategy2Service:
                 score += 5
                 macd_details.append("柱反转5分")
                 # 记录这个加分，5日内有效
-                self._record_bonus(stock_code, bonus_key2, date, 5)
+                self._record_bonus(bonus_records, bonus_key2, date, 5)
         
         if macd_details:
             details.append(f"MACD{score}分({'+'.join(macd_details)})")
@@ -276,7 +283,8 @@ class Strategy2Service:
         return score
     
     def _calculate_kline_score(self, daily_data_30: List[Dict], bullish_pattern: Optional[str], 
-                               details: List[str]) -> float:
+                               details: List[str], bars: Optional[BarSeries] = None,
+                               index: int = 0) -> float:
         """
         计算K线组合得分：10分
         
@@ -285,14 +293,20 @@ class Strategy2Service:
         """
         score = 0
         
-        if not daily_data_30 or len(daily_data_30) < 30:
+        if bars is not None:
+            if index < 29:
+                return score
+        elif not daily_data_30 or len(daily_data_30) < 30:
             return score
         
         if not bullish_pattern:
             return score
         
         # 判断是否处于低位
-        is_low_position = self._check_low_position(daily_data_30)
+        if bars is not None:
+            is_low_position = self._check_low_position_from_bars(bars, index)
+        else:
+            is_low_position = self._check_low_position(daily_data_30)
         
         if is_low_position:
             score = 10
@@ -336,6 +350,28 @@ class Strategy2Service:
         
         return is_low
     
+    def _check_low_position_from_bars(self, bars: BarSeries, index: int) -> bool:
+        """
+        判断是否处于低位（列式序列版本，逻辑同 _check_low_position）
+        
+        窗口为 index 往前30个交易日（含当日），直接对列切片求最值
+        """
+        if index < 29:
+            return False
+        
+        start = index - 29
+        max_high = max(bars.high[start:index + 1])
+        min_low = min(bars.low[start:index + 1])
+        
+        amplitude = (max_high - min_low) / min_low if min_low > 0 else 0
+        if amplitude <= 0.20:
+            return False
+        
+        current_price = bars.close[index]
+        water_level_10 = min_low + (max_high - min_low) * 0.10
+        
+        return min_low <= current_price <= water_level_10
+    
     def _calculate_penalty(self, ma_data: Dict, close_price: float, index: int, 
                           details: List[str]) -> float:
         """
@@ -357,29 +393,17 @@ class Strategy2Service:
         
         return penalty
     
-    def _check_time_window_bonus(self, stock_code: str, date: datetime, bonus_key: str, 
-                                 window_days: int) -> bool:
+    def _check_time_window_bonus(self, bonus_records: Dict[str, datetime], date: datetime,
+                                 bonus_key: str) -> bool:
         """检查时间窗口内的加分是否有效"""
-        if stock_code not in self._bonus_records:
-            return False
-        
-        if bonus_key not in self._bonus_records[stock_code]:
+        end_date = bonus_records.get(bonus_key)
+        if end_date is None:
             return False
-        
-        end_date = self._bonus_records[stock_code][bonus_key]
         return date <= end_date
     
-    def _record_bonus(self, stock_code: str, bonus_key: str, trigger_date: datetime, 
+    def _record_bonus(self, bonus_records: Dict[str, datetime], bonus_key: str, trigger_date: datetime, 
                      window_days: int):
         """记录加分，设置有效期"""
-        if stock_code not in self._bonus_records:
-            self._bonus_records[stock_code] = {}
-        
         end_date = trigger_date + timedelta(days=window_days)
-        self._bonus_records[stock_code][bonus_key] = end_date
+        bonus_records[bonus_key] = end_date
         logger.debug(f"记录加分: {bonus_key}, 有效期至 {end_date.strftime('%Y-%m-%d')}")
-    
-    def clear_cache(self):
-        """清空缓存"""
-        self._bonus_records.clear()
-
@@ -1,4 +1,5 @@
 """支撑压力线计算算法"""
+from collections import deque
 from typing import List, Optional, Tuple, Dict
 from dataclasses import dataclass, field
 from domain.models.kline import KLineData
@@ -26,7 +27,93 @@ class SupportLinesResult:
 
 
 class ExtremeValueAlgorithm:
-    """极值点计算算法"""
+    """
+    极值点计算算法
+
+    波峰 = 价格等于所在窗口的最大值，波谷 = 价格等于所在窗口的最小值。
+    窗口最值用单调队列滑动计算，整体O(n)，与逐点比较窗口内所有K线的结果完全一致。
+    """
+    
+    @staticmethod
+    def _price_arrays(klines: List[KLineData], use_min_max: bool) -> Tuple[List[float], List[float]]:
+        """
+        一次性提取波峰/波谷比较用的价格数组
+        
+        Returns:
+            (波峰价格, 波谷价格)：use_min_max 时为最高价/最低价，否则为实体上沿/下沿
+        """
+        if use_min_max:
+            return [k.high for k in klines], [k.low for k in klines]
+        return [max(k.open, k.close) for k in klines], [min(k.open, k.close) for k in klines]
+    
+    @staticmethod
+    def _rolling_extreme(values: List[float], before: int, after: int,
+                         start: int, stop: int, find_max: bool) -> List[float]:
+        """
+        滑动窗口最值（单调队列）
+        
+        对 i in [start, stop)，计算 values 在窗口 [i - before, i + after]（截断到序列范围）内的最大/最小值
+        
+        Returns:
+            窗口最值列表，第k个元素对应 i = start + k
+        """
+        n = len(values)
+        window = deque()  # 下标队列，对应的值单调（求最大时递减，求最小时递增）
+        result = []
+        right = 0
+        
+        for i in range(start, stop):
+            window_end = min(n, i + after + 1)
+            while right < window_end:
+                value = values[right]
+                if find_max:
+                    while window and values[window[-1]] <= value:
+                        window.pop()
+                else:
+                    while window and values[window[-1]] >= value:
+                        window.pop()
+                window.append(right)
+                right += 1
+            
+            window_start = max(0, i - before)
+            while window[0] < window_start:
+                window.popleft()
+            result.append(values[window[0]])
+        
+        return result
+    
+    @staticmethod
+    def _find_extremes(
+        klines: List[KLineData],
+        before: int,
+        after: int,
+        start: int,
+        stop: int,
+        peak_enabled: bool,
+        valley_enabled: bool,
+        use_min_max: bool
+    ) -> List[IndexedLine]:
+        """在 [start, stop) 范围内查找窗口 [i - before, i + after] 内的波峰和波谷"""
+        peak_values, valley_values = ExtremeValueAlgorithm._price_arrays(klines, use_min_max)
+        result = []
+        
+        # 查找波峰：价格不低于窗口内任何一根K线
+        if peak_enabled:
+            window_max = ExtremeValueAlgorithm._rolling_extreme(peak_values, before, after, start, stop, True)
+            for i, max_price in zip(range(start, stop), window_max):
+                if peak_values[i] == max_price:
+                    result.append(IndexedLine(index=i, price=peak_values[i]))
+        
+        # 查找波谷：价格不高于窗口内任何一根K线
+        if valley_enabled:
+            window_min = ExtremeValueAlgorithm._rolling_extreme(valley_values, before, after, start, stop, False)
+            for i, min_price in zip(range(start, stop), window_min):
+                if valley_values[i] == min_price:
+                    result.append(IndexedLine(index=i, price=valley_values[i]))
+        
+        # 按索引排序（稳定排序，同一索引波峰在前）
+        result.sort(key=lambda x: x.index)
+        return result
     
     @staticmethod
     def calculate_extreme_points(
@@ -55,60 +142,16 @@ class ExtremeValueAlgorithm:
             return []
         
         half_window = window_size // 2
-        result = []
-        
-        # 提取价格数组
-        high_values = [k.high for k in klines]
-        low_values = [k.low for k in klines]
-        close_values = [k.close for k in klines]
-        
-        # 查找波峰
-        if peak_enabled:
-            for i in range(half_window, len(klines) - half_window):
-                if i < side_ignored_count:
-                    continue
-                
-                # 获取当前点的价格
-                current_price = high_values[i] if use_min_max else max(klines[i].open, klines[i].close)
-                
-                # 检查是否是波峰
-                is_peak = True
-                for j in range(max(0, i - half_window), min(len(klines), i + half_window + 1)):
-                    if j == i:
-                        continue
-                    compare_price = high_values[j] if use_min_max else max(klines[j].open, klines[j].close)
-                    if current_price < compare_price:
-                        is_peak = False
-                        break
-                
-                if is_peak:
-                    result.append(IndexedLine(index=i, price=current_price))
-        
-        # 查找波谷
-        if valley_enabled:
-            for i in range(half_window, len(klines) - half_window):
-                if i < side_ignored_count:
-                    continue
-                
-                # 获取当前点的价格
-                current_price = low_values[i] if use_min_max else min(klines[i].open, klines[i].close)
-                
-                # 检查是否是波谷
-                is_valley = True
-                for j in range(max(0, i - half_window), min(len(klines), i + half_window + 1)):
-                    if j == i:
-                        continue
-                    compare_price = low_values[j] if use_min_max else min(klines[j].open, klines[j].close)
-                    if current_price > compare_price:
-                        is_valley = False
-                        break
-                
-                if is_valley:
-                    result.append(IndexedLine(index=i, price=current_price))
-        
-        # 按索引排序
-        result.sort(key=lambda x: x.index)
-        return result
+        return ExtremeValueAlgorithm._find_extremes(
+            klines,
+            before=half_window,
+            after=half_window,
+            start=max(half_window, side_ignored_count),
+            stop=len(klines) - half_window,
+            peak_enabled=peak_enabled,
+            valley_enabled=valley_enabled,
+            use_min_max=use_min_max
+        )
     
     @staticmethod
     def calculate_extreme_points_asymmetric(
@@ -138,68 +181,18 @@ class ExtremeValueAlgorithm:
         if len(klines) < (left_window + right_window):
             return []
         
-        result = []
-        start_index = left_window // 2
-        
-        # 提取价格数组
-        high_values = [k.high for k in klines]
-        low_values = [k.low for k in klines]
-        close_values = [k.close for k in klines]
-        
-        # 查找波峰
-        if peak_enabled:
-            for i in range(start_index, len(klines) - 2):
-                if i < side_ignored_count:
-                    continue
-                
-                # 使用最高价判断波峰（use_min_max=False时用max(open, close)）
-                current_price = high_values[i] if use_min_max else max(klines[i].open, klines[i].close)
-                
-                is_peak = True
-                # 窗口范围：从 i - right_window（未来，索引更小）到 i + left_window（历史，索引更大）
-                # 注意：K线数据是倒序的（最新在前），所以 i 越小越新，i 越大越旧
-                window_start = max(0, i - right_window)
-                window_end = min(len(klines), i + left_window + 1)
-                
-                for j in range(window_start, window_end):
-                    if j == i:
-                        continue
-                    compare_price = high_values[j] if use_min_max else max(klines[j].open, klines[j].close)
-                    if current_price < compare_price:
-                        is_peak = False
-                        break
-                
-                if is_peak:
-                    result.append(IndexedLine(index=i, price=current_price))
-        
-        # 查找波谷
-        if valley_enabled:
-            for i in range(start_index, len(klines) - 2):
-                if i < side_ignored_count:
-                    continue
-                
-                # 使用最低价判断波谷（use_min_max=False时用min(open, close)）
-                current_price = low_values[i] if use_min_max else min(klines[i].open, klines[i].close)
-                
-                is_valley = True
-                # 窗口范围：从 i - right_window（未来，索引更小）到 i + left_window（历史，索引更大）
-                window_start = max(0, i - right_window)
-                window_end = min(len(klines), i + left_window + 1)
-                
-                for j in range(window_start, window_end):
-                    if j == i:
-                        continue
-                    compare_price = low_values[j] if use_min_max else min(klines[j].open, klines[j].close)
-                    if current_price > compare_price:
-                        is_valley = False
-                        break
-                
-                if is_valley:
-                    result.append(IndexedLine(index=i, price=current_price))
-        
-        # 按索引排序
-        result.sort(key=lambda x: x.index)
-        return result
+        # 窗口范围：从 i - right_window（未来，索引更小）到 i + left_window（历史，索引更大）
+        # 注意：K线数据是倒序的（最新在前），所以 i 越小越新，i 越大越旧
+        return ExtremeValueAlgorithm._find_extremes(
+            klines,
+            before=right_window,
+            after=left_window,
+            start=max(left_window // 2, side_ignored_count),
+            stop=len(klines) - 2,
+            peak_enabled=peak_enabled,
+            valley_enabled=valley_enabled,
+            use_min_max=use_min_max
+        )
 
 
 class ClusterAlgorithm:
@@ -3,6 +3,7 @@ from typing import Optional, List, Dict
 from datetime import datetime, timedelta
 import pymysql.cursors
 from infrastructure.persistence.database import DatabaseConnection
+from infrastructure.persistence.kline_storage import get_kline_source
 from infrastructure.logging.logger import get_logger
 from domain.services.period_service import PeriodService
 
@@ -12,6 +13,111 @@ logger = get_logger(__name__)
 class VolumeTypeService:
     """成交量类型计算服务"""
     
+    # 输出顺序
+    TYPE_ORDER = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'X', 'Y', 'Z']
+    
+    @staticmethod
+    def classify_series(volumes: List[int]) -> List[Optional[str]]:
+        """
+        一次遍历计算整段成交量序列每一天的成交量类型
+        
+        前1/3/5日均量用滑动窗口累加（成交量为整数，累加和与切片求和完全相等），
+        A/B/C、ABCD放量标记逐日计算一次后供后续D-H、Z的回看窗口直接复用。
+        
+        Args:
+            volumes: 按日期升序的日成交量
+            
+        Returns:
+            与volumes等长的类型列表，每个元素为 'A,B,...' 或 None（第一天恒为None）
+        """
+        n = len(volumes)
+        result: List[Optional[str]] = [None] * n
+        is_abc = [False] * n   # 当日是否为A/B/C放量
+        is_abcd = [False] * n  # 当日是否为A/B/C/D放量
+        
+        sum_3 = 0  # 前3日成交量之和（不含当日）
+        sum_5 = 0  # 前5日成交量之和（不含当日）
+        
+        for t in range(n):
+            if t >= 1:
+                sum_3 += volumes[t - 1]
+                sum_5 += volumes[t - 1]
+            if t >= 4:
+                sum_3 -= volumes[t - 4]
+            if t >= 6:
+                sum_5 -= volumes[t - 6]
+            
+            if t < 1:
+                continue
+            
+            volume = volumes[t]
+            matched = []
+            
+            # 类型A: 当日为前1日成交均量的2倍-3倍
+            prev_volume = volumes[t - 1]
+            type_a = prev_volume > 0 and 2.0 <= volume / prev_volume <= 3.0
+            
+            # 类型B/X: 当日为前3日成交均量的2倍及以上 / 1.5倍及以上
+            type_b = type_x = False
+            if t >= 3:
+                avg_3 = sum_3 / 3
+                if avg_3 > 0:
+                    type_b = volume / avg_3 >= 2.0
+                    type_x = volume / avg_3 >= 1.5
+            
+            # 类型C/Y: 当日为前5日成交均量的2倍及以上 / 1.5倍及以上
+            type_c = type_y = False
+            avg_5 = 0
+            if t >= 5:
+                avg_5 = sum_5 / 5
+                if avg_5 > 0:
+                    type_c = volume / avg_5 >= 2.0
+                    type_y = volume / avg_5 >= 1.5
+            
+            is_abc[t] = type_a or type_b or type_c
+            
+            type_d = type_e = type_f = type_g = type_h = False
+            if t >= 5:
+                window = range(t - 5, t)
+                
+                # 类型D: 前五日最早一次ABC放量（X日），今日成交量为X日的1.2倍以上
+                x_abc = next((volumes[i] for i in window if is_abc[i]), None)
+                type_d = bool(x_abc) and x_abc > 0 and volume / x_abc >= 1.2
+                
+                abcd_volumes = [volumes[i] for i in window if is_abcd[i]]
+                
+                # 类型E: 前五日未出现ABCD放量，当日为前1日以及前五日均值的4倍以上
+                if not abcd_volumes and prev_volume > 0 and avg_5 > 0:
+                    type_e = volume / prev_volume >= 4.0 and volume / avg_5 >= 4.0
+                
+                # 类型F: 今日为前五日最早一次ABCD放量（X日）的3倍以上，或为前5日均量的3倍以上
+                x_abcd = abcd_volumes[0] if abcd_volumes else None
+                type_f = (bool(x_abcd) and x_abcd > 0 and volume / x_abcd >= 3.0) or \
+                         (avg_5 > 0 and volume / avg_5 >= 3.0)
+                
+                # 类型G: 前五日某次ABCD放量（X日），今日量能为X日的0.7倍及以上
+                type_g = any(x > 0 and volume / x >= 0.7 for x in abcd_volumes)
+                
+                # 类型H: 前五日某次ABCD放量（X日），今日量能大于X日
+                type_h = any(volume > x for x in abcd_volumes)
+            
+            is_abcd[t] = is_abc[t] or type_d
+            
+            # 类型Z: 前10日出现过ABC放量，昨日为其前3日均量的1.3倍以上，今日为昨日的1.08倍以上
+            type_z = False
+            if t >= 10 and any(is_abc[i] for i in range(t - 10, t)):
+                avg_3_before_yesterday = (volumes[t - 4] + volumes[t - 3] + volumes[t - 2]) / 3
+                condition1 = avg_3_before_yesterday > 0 and prev_volume / avg_3_before_yesterday >= 1.3
+                condition2 = prev_volume > 0 and volume / prev_volume >= 1.08
+                type_z = condition1 and condition2
+            
+            flags = (type_a, type_b, type_c, type_d, type_e, type_f, type_g, type_h, type_x, type_y, type_z)
+            matched = [name for name, flag in zip(VolumeTypeService.TYPE_ORDER, flags) if flag]
+            if matched:
+                result[t] = ','.join(matched)
+        
+        return result
+    
     @staticmethod
     def calculate_volume_type(table_name: str, target_date: datetime) -> Optional[str]:
         """
@@ -49,323 +155,23 @@ class VolumeTypeService:
             if target_idx is None or target_idx < 1:
                 return None
             
-            target_volume = daily_data[target_idx]['volume']
-            
-            # 收集所有匹配的类型
-            matched_types = []
-            
-            # 计算类型A: 当日为前1日成交均量的2倍-3倍
-            if target_idx >= 1:
-                prev_volume = daily_data[target_idx - 1]['volume']
-                if prev_volume > 0:
-                    ratio = target_volume / prev_volume
-                    if 2.0 <= ratio <= 3.0:
-                        matched_types.append('A')
-            
-            # 计算类型B: 当日为前3日成交均量的2倍及以上
-            if target_idx >= 3:
-                prev_3_volumes = [daily_data[i]['volume'] for i in range(target_idx - 3, target_idx)]
-                avg_volume = sum(prev_3_volumes) / len(prev_3_volumes)
-                if avg_volume > 0:
-                    ratio = target_volume / avg_volume
-                    if ratio >= 2.0:
-                        matched_types.append('B')
-            
-            # 计算类型C: 当日为前5日成交均量的2倍及以上
-            if target_idx >= 5:
-                prev_5_volumes = [daily_data[i]['volume'] for i in range(target_idx - 5, target_idx)]
-                avg_volume = sum(prev_5_volumes) / len(prev_5_volumes)
-                if avg_volume > 0:
-                    ratio = target_volume / avg_volume
-                    if ratio >= 2.0:
-                        matched_types.append('C')
-            
-            # 计算类型D: 前五日出现过ABC任意一种放量，标记为X日，今日的成交量为X日的1.2倍以上
-            if target_idx >= 5:
-                # 检查前5天是否有A/B/C类型的放量
-                x_day_volume = None
-                for i in range(max(0, target_idx - 5), target_idx):
-                    check_date = daily_data[i]['date']
-                    check_volume_type = VolumeTypeService._check_abc_volume_type(
-                        daily_data, i
-                    )
-                    if check_volume_type in ['A', 'B', 'C']:
-                        x_day_volume = daily_data[i]['volume']
-                        break
-                
-                if x_day_volume and x_day_volume > 0:
-                    ratio = target_volume / x_day_volume
-                    if ratio >= 1.2:
-                        matched_types.append('D')
-            
-            # 计算类型E: 当日为前1日以及前五日均值的4倍以上（前五日未出现ABCD任何一种放量）
-            if target_idx >= 5:
-                # 检查前5天是否有ABCD任意一种放量
-                has_abcd_in_prev_5 = False
-                for i in range(max(0, target_idx - 5), target_idx):
-                    check_types = VolumeTypeService._check_all_volume_types(daily_data, i)
-                    if check_types and any(t in check_types for t in ['A', 'B', 'C', 'D']):
-                        has_abcd_in_prev_5 = True
-                        break
-                
-                if not has_abcd_in_prev_5:
-                    # 前1日成交量
-                    prev_volume = daily_data[target_idx - 1]['volume'] if target_idx >= 1 else 0
-                    # 前5日均值
-                    prev_5_volumes = [daily_data[i]['volume'] for i in range(target_idx - 5, target_idx)]
-                    avg_5_volume = sum(prev_5_volumes) / len(prev_5_volumes)
-                    
-                    if prev_volume > 0 and avg_5_volume > 0:
-                        ratio_to_prev = target_volume / prev_volume
-                        ratio_to_avg5 = target_volume / avg_5_volume
-                        if ratio_to_prev >= 4.0 and ratio_to_avg5 >= 4.0:
-                            matched_types.append('E')
-            
-            # 计算类型F: 前五日出现过ABCD任意一种放量，标记为X日，今日成交量为X日的3倍以上，或今日成交量为前5日成交量均值的3倍以上
-            if target_idx >= 5:
-                # 检查前5天是否有ABCD任意一种放量
-                x_day_volume = None
-                for i in range(max(0, target_idx - 5), target_idx):
-                    check_types = VolumeTypeService._check_all_volume_types(daily_data, i)
-                    if check_types and any(t in check_types for t in ['A', 'B', 'C', 'D']):
-                        x_day_volume = daily_data[i]['volume']
-                        break
-                
-                prev_5_volumes = [daily_data[i]['volume'] for i in range(target_idx - 5, target_idx)]
-                avg_5_volume = sum(prev_5_volumes) / len(prev_5_volumes)
-                
-                # 条件1: 今日成交量为X日的3倍以上
-                condition1 = False
-                if x_day_volume and x_day_volume > 0:
-                    ratio = target_volume / x_day_volume
-                    if ratio >= 3.0:
-                        condition1 = True
-                
-                # 条件2: 今日成交量为前5日成交量均值的3倍以上
-                condition2 = False
-                if avg_5_volume > 0:
-                    ratio = target_volume / avg_5_volume
-                    if ratio >= 3.0:
-                        condition2 = True
-                
-                if condition1 or condition2:
-                    matched_types.append('F')
-            
-            # 计算类型G: 前五日中某日（设X日）出现任意一种放量（ABCD)放量，今日的量能为X日的0.7倍及以上
-            if target_idx >= 5:
-                for i in range(max(0, target_idx - 5), target_idx):
-                    check_types = VolumeTypeService._check_all_volume_types(daily_data, i)
-                    if check_types and any(t in check_types for t in ['A', 'B', 'C', 'D']):
-                        x_day_volume = daily_data[i]['volume']
-                        if x_day_volume > 0:
-                            ratio = target_volume / x_day_volume
-                            if ratio >= 0.7:
-                                matched_types.append('G')
-                                break
-            
-            # 计算类型H: 前五日中某日（设X日）出现任意一种放量（ABCD)放量，今日的量能大于X日
-            if target_idx >= 5:
-                for i in range(max(0, target_idx - 5), target_idx):
-                    check_types = VolumeTypeService._check_all_volume_types(daily_data, i)
-                    if check_types and any(t in check_types for t in ['A', 'B', 'C', 'D']):
-                        x_day_volume = daily_data[i]['volume']
-                        if target_volume > x_day_volume:
-                            matched_types.append('H')
-                            break
-            
-            # 计算类型X: 当日为前3日成交均量的1.5倍及以上
-            if target_idx >= 3:
-                prev_3_volumes = [daily_data[i]['volume'] for i in range(target_idx - 3, target_idx)]
-                avg_volume = sum(prev_3_volumes) / len(prev_3_volumes)
-                if avg_volume > 0:
-                    ratio = target_volume / avg_volume
-                    if ratio >= 1.5:
-                        matched_types.append('X')
-            
-            # 计算类型Y: 当日为前5日成交均量的1.5倍及以上
-            if target_idx >= 5:
-                prev_5_volumes = [daily_data[i]['volume'] for i in range(target_idx - 5, target_idx)]
-                avg_volume = sum(prev_5_volumes) / len(prev_5_volumes)
-                if avg_volume > 0:
-                    ratio = target_volume / avg_volume
-                    if ratio >= 1.5:
-                        matched_types.append('Y')
-            
-            # 计算类型Z: 前10日出现出现过（ABC）任何一种放量，且昨日量能相较于前三日均量出现1.3倍以上的放量，今日的量相较于昨日能量能的1.08倍以上
-            if target_idx >= 10:
-                # 检查前10天是否有ABC任意一种放量
-                has_abc_in_prev_10 = False
-                for i in range(max(0, target_idx - 10), target_idx):
-                    check_types = VolumeTypeService._check_abc_volume_type(daily_data, i)
-                    if check_types in ['A', 'B', 'C']:
-                        has_abc_in_prev_10 = True
-                        break
-                
-                if has_abc_in_prev_10 and target_idx >= 4:
-                    # 昨日量能
-                    yesterday_volume = daily_data[target_idx - 1]['volume']
-                    # 前3日均量（不包括昨日）
-                    prev_3_volumes = [daily_data[i]['volume'] for i in range(target_idx - 4, target_idx - 1)]
-                    avg_3_volume = sum(prev_3_volumes) / len(prev_3_volumes)
-                    
-                    # 条件1: 昨日量能相较于前三日均量出现1.3倍以上的放量
-                    condition1 = False
-                    if avg_3_volume > 0:
-                        ratio = yesterday_volume / avg_3_volume
-                        if ratio >= 1.3:
-                            condition1 = True
-                    
-                    # 条件2: 今日的量相较于昨日能量能的1.08倍以上
-                    condition2 = False
-                    if yesterday_volume > 0:
-                        ratio = target_volume / yesterday_volume
-                        if ratio >= 1.08:
-                            condition2 = True
-                    
-                    if condition1 and condition2:
-                        matched_types.append('Z')
-            
-            # 返回所有匹配的类型，用逗号连接（按A、B、C、D、E、F、G、H、X、Y、Z的顺序）
-            if matched_types:
-                # 去重并保持顺序
-                seen = set()
-                unique_types = []
-                for t in ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'X', 'Y', 'Z']:
-                    if t in matched_types and t not in seen:
-                        unique_types.append(t)
-                        seen.add(t)
-                return ','.join(unique_types)
-            
-            return None
+            volumes = [data['volume'] for data in daily_data[:target_idx + 1]]
+            return VolumeTypeService.classify_series(volumes)[target_idx]
             
         except Exception as e:
             logger.error(f"计算成交量类型失败: {table_name} {target_date}: {e}", exc_info=True)
             return None
     
     @staticmethod
-    def _check_abc_volume_type(daily_data: List[Dict], idx: int) -> Optional[str]:
-        """
-        检查指定索引位置的成交量是否为A/B/C类型
-        
-        Args:
-            daily_data: 日线数据列表
-            idx: 索引位置
-            
-        Returns:
-            'A', 'B', 'C' 或 None
-        """
-        if idx < 1:
-            return None
-        
-        target_volume = daily_data[idx]['volume']
-        
-        # 检查类型A
-        if idx >= 1:
-            prev_volume = daily_data[idx - 1]['volume']
-            if prev_volume > 0:
-                ratio = target_volume / prev_volume
-                if 2.0 <= ratio <= 3.0:
-                    return 'A'
-        
-        # 检查类型B
-        if idx >= 3:
-            prev_3_volumes = [daily_data[i]['volume'] for i in range(idx - 3, idx)]
-            avg_volume = sum(prev_3_volumes) / len(prev_3_volumes)
-            if avg_volume > 0:
-                ratio = target_volume / avg_volume
-                if ratio >= 2.0:
-                    return 'B'
-        
-        # 检查类型C
-        if idx >= 5:
-            prev_5_volumes = [daily_data[i]['volume'] for i in range(idx - 5, idx)]
-            avg_volume = sum(prev_5_volumes) / len(prev_5_volumes)
-            if avg_volume > 0:
-                ratio = target_volume / avg_volume
-                if ratio >= 2.0:
-                    return 'C'
-        
-        return None
-    
-    @staticmethod
-    def _check_all_volume_types(daily_data: List[Dict], idx: int) -> Optional[str]:
-        """
-        检查指定索引位置的成交量是否为A/B/C/D类型（返回所有匹配的类型）
-        
-        Args:
-            daily_data: 日线数据列表
-            idx: 索引位置
-            
-        Returns:
-            匹配的类型字符串，多个类型用逗号连接，如 'A,B' 或 None
-        """
-        if idx < 1:
-            return None
-        
-        target_volume = daily_data[idx]['volume']
-        matched_types = []
-        
-        # 检查类型A
-        if idx >= 1:
-            prev_volume = daily_data[idx - 1]['volume']
-            if prev_volume > 0:
-                ratio = target_volume / prev_volume
-                if 2.0 <= ratio <= 3.0:
-                    matched_types.append('A')
-        
-        # 检查类型B
-        if idx >= 3:
-            prev_3_volumes = [daily_data[i]['volume'] for i in range(idx - 3, idx)]
-            avg_volume = sum(prev_3_volumes) / len(prev_3_volumes)
-            if avg_volume > 0:
-                ratio = target_volume / avg_volume
-                if ratio >= 2.0:
-                    matched_types.append('B')
-        
-        # 检查类型C
-        if idx >= 5:
-            prev_5_volumes = [daily_data[i]['volume'] for i in range(idx - 5, idx)]
-            avg_volume = sum(prev_5_volumes) / len(prev_5_volumes)
-            if avg_volume > 0:
-                ratio = target_volume / avg_volume
-                if ratio >= 2.0:
-                    matched_types.append('C')
-        
-        # 检查类型D（需要检查前5天是否有ABC放量）
-        if idx >= 5:
-            x_day_volume = None
-            for i in range(max(0, idx - 5), idx):
-                check_volume_type = VolumeTypeService._check_abc_volume_type(daily_data, i)
-                if check_volume_type in ['A', 'B', 'C']:
-                    x_day_volume = daily_data[i]['volume']
-                    break
-            
-            if x_day_volume and x_day_volume > 0:
-                ratio = target_volume / x_day_volume
-                if ratio >= 1.2:
-                    matched_types.append('D')
-        
-        if matched_types:
-            # 去重并保持顺序
-            seen = set()
-            unique_types = []
-            for t in ['A', 'B', 'C', 'D']:
-                if t in matched_types and t not in seen:
-                    unique_types.append(t)
-                    seen.add(t)
-            return ','.join(unique_types)
-        
-        return None
-    
-    @staticmethod
-    def _get_daily_volumes(table_name: str, start_date: datetime, end_date: datetime) -> List[Dict]:
+    def _get_daily_volumes(table_name: str, start_date: Optional[datetime],
+                           end_date: Optional[datetime]) -> List[Dict]:
         """
         获取指定日期范围内的日线成交量数据
         
         Args:
             table_name: 股票表名
-            start_date: 开始日期
-            end_date: 结束日期
+            start_date: 开始日期（None表示不限）
+            end_date: 结束日期（None表示不限）
             
         Returns:
             日线数据列表，包含date和volume字段
@@ -376,16 +182,24 @@ class VolumeTypeService:
             with DatabaseConnection.get_connection_context() as conn:
                 cursor = conn.cursor(pymysql.cursors.DictCursor)
                 
+                where_clauses = ["peroid_type = %s"]
+                params = [period_code]
+                if start_date:
+                    where_clauses.append("shi_jian >= %s")
+                    params.append(start_date)
+                if end_date:
+                    where_clauses.append("shi_jian <= %s")
+                    params.append(end_date)
+                
+                source = get_kline_source(table_name)
                 query = f"""
                     SELECT shi_jian as date, cheng_jiao_liang as volume
-                    FROM {table_name}
-                    WHERE peroid_type = %s 
-                      AND shi_jian >= %s 
-                      AND shi_jian <= %s
+                    FROM {source.table}
+                    {source.where(*where_clauses)}
                     ORDER BY shi_jian ASC
                 """
                 
-                cursor.execute(query, (period_code, start_date, end_date))
+                cursor.execute(query, source.params(*params))
                 results = cursor.fetchall()
                 
                 return [
@@ -410,6 +224,8 @@ class VolumeTypeService:
         """
         批量计算指定日期范围内的成交量类型
         
+        一次查询加载日线成交量（含目标区间之前15天的历史），整段序列一次遍历分类
+        
         Args:
             table_name: 股票表名
             stock_code: 股票代码
@@ -420,265 +236,48 @@ class VolumeTypeService:
             日期到成交量类型的字典
         """
         try:
-            period_code = PeriodService.get_period_code('day')
+            # 获取足够的历史数据（需要前10天的数据，因为Z类型需要前10天）
+            history_days = timedelta(days=15)
+            daily_data = VolumeTypeService._get_daily_volumes(
+                table_name,
+                start_date - history_days if start_date else None,
+                end_date
+            )
             
-            with DatabaseConnection.get_connection_context() as conn:
-                cursor = conn.cursor(pymysql.cursors.DictCursor)
-                
-                # 构建查询条件
-                where_clauses = [f"peroid_type = %s"]
-                params = [period_code]
-                
-                if start_date:
-                    where_clauses.append("shi_jian >= %s")
-                    params.append(start_date)
-                
-                if end_date:
-                    where_clauses.append("shi_jian <= %s")
-                    params.append(end_date)
-                
-                query = f"""
-                    SELECT DISTINCT shi_jian as date
-                    FROM {table_name}
-                    WHERE {' AND '.join(where_clauses)}
-                    ORDER BY shi_jian ASC
-                """
-                
-                cursor.execute(query, params)
-                date_rows = cursor.fetchall()
-                
-                # 获取所有日期的成交量数据
-                all_dates = [row['date'] for row in date_rows]
-                if not all_dates:
-                    return {}
-                
-                # 获取足够的历史数据（需要前10天的数据，因为Z类型需要前10天）
-                data_start_date = all_dates[0] - timedelta(days=15)
-                daily_data = VolumeTypeService._get_daily_volumes(
-                    table_name, data_start_date, all_dates[-1]
-                )
-                
-                if not daily_data:
-                    return {}
-                
-                # 按日期排序
-                daily_data.sort(key=lambda x: x['date'])
-                
-                # 为每个日期计算成交量类型
-                result = {}
-                
-                for target_date in all_dates:
-                    # 转换为datetime对象
-                    if isinstance(target_date, datetime):
-                        target_date_obj = target_date
-                    else:
-                        target_date_obj = datetime.combine(target_date, datetime.min.time())
-                    
-                    # 在daily_data中找到目标日期的索引
-                    target_idx = None
-                    for i, data in enumerate(daily_data):
-                        data_date = data['date']
-                        if isinstance(data_date, datetime):
-                            if data_date.date() == target_date_obj.date():
-                                target_idx = i
-                                break
-                        else:
-                            if data_date == target_date_obj.date():
-                                target_idx = i
-                                break
-                    
-                    if target_idx is None or target_idx < 1:
-                        continue
-                    
-                    # 使用已获取的数据计算成交量类型
-                    target_volume = daily_data[target_idx]['volume']
-                    matched_types = []
-                    
-                    # 计算类型A: 当日为前1日成交均量的2倍-3倍
-                    if target_idx >= 1:
-                        prev_volume = daily_data[target_idx - 1]['volume']
-                        if prev_volume > 0:
-                            ratio = target_volume / prev_volume
-                            if 2.0 <= ratio <= 3.0:
-                                matched_types.append('A')
-                    
-                    # 计算类型B: 当日为前3日成交均量的2倍及以上
-                    if target_idx >= 3:
-                        prev_3_volumes = [daily_data[i]['volume'] for i in range(target_idx - 3, target_idx)]
-                        avg_volume = sum(prev_3_volumes) / len(prev_3_volumes)
-                        if avg_volume > 0:
-                            ratio = target_volume / avg_volume
-                            if ratio >= 2.0:
-                                matched_types.append('B')
-                    
-                    # 计算类型C: 当日为前5日成交均量的2倍及以上
-                    if target_idx >= 5:
-                        prev_5_volumes = [daily_data[i]['volume'] for i in range(target_idx - 5, target_idx)]
-                        avg_volume = sum(prev_5_volumes) / len(prev_5_volumes)
-                        if avg_volume > 0:
-                            ratio = target_volume / avg_volume
-                            if ratio >= 2.0:
-                                matched_types.append('C')
-                    
-                    # 计算类型D: 前五日出现过ABC任意一种放量，标记为X日，今日的成交量为X日的1.2倍以上
-                    if target_idx >= 5:
-                        # 检查前5天是否有A/B/C类型的放量
-                        x_day_volume = None
-                        for i in range(max(0, target_idx - 5), target_idx):
-                            check_volume_type = VolumeTypeService._check_abc_volume_type(
-                                daily_data, i
-                            )
-                            if check_volume_type in ['A', 'B', 'C']:
-                                x_day_volume = daily_data[i]['volume']
-                                break
-                        
-                        if x_day_volume and x_day_volume > 0:
-                            ratio = target_volume / x_day_volume
-                            if ratio >= 1.2:
-                                matched_types.append('D')
-                    
-                    # 计算类型E: 当日为前1日以及前五日均值的4倍以上（前五日未出现ABCD任何一种放量）
-                    if target_idx >= 5:
-                        # 检查前5天是否有ABCD任意一种放量
-                        has_abcd_in_prev_5 = False
-                        for i in range(max(0, target_idx - 5), target_idx):
-                            check_types = VolumeTypeService._check_all_volume_types(daily_data, i)
-                            if check_types and any(t in check_types for t in ['A', 'B', 'C', 'D']):
-                                has_abcd_in_prev_5 = True
-                                break
-                        
-                        if not has_abcd_in_prev_5:
-                            # 前1日成交量
-                            prev_volume = daily_data[target_idx - 1]['volume'] if target_idx >= 1 else 0
-                            # 前5日均值
-                            prev_5_volumes = [daily_data[i]['volume'] for i in range(target_idx - 5, target_idx)]
-                            avg_5_volume = sum(prev_5_volumes) / len(prev_5_volumes)
-                            
-                            if prev_volume > 0 and avg_5_volume > 0:
-                                ratio_to_prev = target_volume / prev_volume
-                                ratio_to_avg5 = target_volume / avg_5_volume
-                                if ratio_to_prev >= 4.0 and ratio_to_avg5 >= 4.0:
-                                    matched_types.append('E')
-                    
-                    # 计算类型F: 前五日出现过ABCD任意一种放量，标记为X日，今日成交量为X日的3倍以上，或今日成交量为前5日成交量均值的3倍以上
-                    if target_idx >= 5:
-                        # 检查前5天是否有ABCD任意一种放量
-                        x_day_volume = None
-                        for i in range(max(0, target_idx - 5), target_idx):
-                            check_types = VolumeTypeService._check_all_volume_types(daily_data, i)
-                            if check_types and any(t in check_types for t in ['A', 'B', 'C', 'D']):
-                                x_day_volume = daily_data[i]['volume']
-                                break
-                        
-                        prev_5_volumes = [daily_data[i]['volume'] for i in range(target_idx - 5, target_idx)]
-                        avg_5_volume = sum(prev_5_volumes) / len(prev_5_volumes)
-                        
-                        # 条件1: 今日成交量为X日的3倍以上
-                        condition1 = False
-                        if x_day_volume and x_day_volume > 0:
-                            ratio = target_volume / x_day_volume
-                            if ratio >= 3.0:
-                                condition1 = True
-                        
-                        # 条件2: 今日成交量为前5日成交量均值的3倍以上
-                        condition2 = False
-                        if avg_5_volume > 0:
-                            ratio = target_volume / avg_5_volume
-                            if ratio >= 3.0:
-                                condition2 = True
-                        
-                        if condition1 or condition2:
-                            matched_types.append('F')
-                    
-                    # 计算类型G: 前五日中某日（设X日）出现任意一种放量（ABCD)放量，今日的量能为X日的0.7倍及以上
-                    if target_idx >= 5:
-                        for i in range(max(0, target_idx - 5), target_idx):
-                            check_types = VolumeTypeService._check_all_volume_types(daily_data, i)
-                            if check_types and any(t in check_types for t in ['A', 'B', 'C', 'D']):
-                                x_day_volume = daily_data[i]['volume']
-                                if x_day_volume > 0:
-                                    ratio = target_volume / x_day_volume
-                                    if ratio >= 0.7:
-                                        matched_types.append('G')
-                                        break
-                    
-                    # 计算类型H: 前五日中某日（设X日）出现任意一种放量（ABCD)放量，今日的量能大于X日
-                    if target_idx >= 5:
-                        for i in range(max(0, target_idx - 5), target_idx):
-                            check_types = VolumeTypeService._check_all_volume_types(daily_data, i)
-                            if check_types and any(t in check_types for t in ['A', 'B', 'C', 'D']):
-                                x_day_volume = daily_data[i]['volume']
-                                if target_volume > x_day_volume:
-                                    matched_types.append('H')
-                                    break
-                    
-                    # 计算类型X: 当日为前3日成交均量的1.5倍及以上
-                    if target_idx >= 3:
-                        prev_3_volumes = [daily_data[i]['volume'] for i in range(target_idx - 3, target_idx)]
-                        avg_volume = sum(prev_3_volumes) / len(prev_3_volumes)
-                        if avg_volume > 0:
-                            ratio = target_volume / avg_volume
-                            if ratio >= 1.5:
-                                matched_types.append('X')
-                    
-                    # 计算类型Y: 当日为前5日成交均量的1.5倍及以上
-                    if target_idx >= 5:
-                        prev_5_volumes = [daily_data[i]['volume'] for i in range(target_idx - 5, target_idx)]
-                        avg_volume = sum(prev_5_volumes) / len(prev_5_volumes)
-                        if avg_volume > 0:
-                            ratio = target_volume / avg_volume
-                            if ratio >= 1.5:
-                                matched_types.append('Y')
-                    
-                    # 计算类型Z: 前10日出现出现过（ABC）任何一种放量，且昨日量能相较于前三日均量出现1.3倍以上的放量，今日的量相较于昨日能量能的1.08倍以上
-                    if target_idx >= 10:
-                        # 检查前10天是否有ABC任意一种放量
-                        has_abc_in_prev_10 = False
-                        for i in range(max(0, target_idx - 10), target_idx):
-                            check_types = VolumeTypeService._check_abc_volume_type(daily_data, i)
-                            if check_types in ['A', 'B', 'C']:
-                                has_abc_in_prev_10 = True
-                                break
-                        
-                        if has_abc_in_prev_10 and target_idx >= 4:
-                            # 昨日量能
-                            yesterday_volume = daily_data[target_idx - 1]['volume']
-                            # 前3日均量（不包括昨日）
-                            prev_3_volumes = [daily_data[i]['volume'] for i in range(target_idx - 4, target_idx - 1)]
-                            avg_3_volume = sum(prev_3_volumes) / len(prev_3_volumes)
-                            
-                            # 条件1: 昨日量能相较于前三日均量出现1.3倍以上的放量
-                            condition1 = False
-                            if avg_3_volume > 0:
-                                ratio = yesterday_volume / avg_3_volume
-                                if ratio >= 1.3:
-                                    condition1 = True
-                            
-                            # 条件2: 今日的量相较于昨日能量能的1.08倍以上
-                            condition2 = False
-                            if yesterday_volume > 0:
-                                ratio = target_volume / yesterday_volume
-                                if ratio >= 1.08:
-                                    condition2 = True
-                            
-                            if condition1 and condition2:
-                                matched_types.append('Z')
-                    
-                    # 返回所有匹配的类型，用逗号连接（按A、B、C、D、E、F、G、H、X、Y、Z的顺序）
-                    if matched_types:
-                        # 去重并保持顺序
-                        seen = set()
-                        unique_types = []
-                        for t in ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'X', 'Y', 'Z']:
-                            if t in matched_types and t not in seen:
-                                unique_types.append(t)
-                                seen.add(t)
-                        volume_type = ','.join(unique_types)
-                        result[target_date_obj] = volume_type
+            # 目标日期：区间内的全部交易日
+            all_dates = [d['date'] for d in daily_data if not start_date or d['date'] >= start_date]
+            if not all_dates:
+                return {}
+            
+            # 历史数据从第一个目标交易日往前15天开始
+            data_start_date = all_dates[0] - history_days
+            daily_data = [d for d in daily_data if d['date'] >= data_start_date]
+            
+            volume_types = VolumeTypeService.classify_series([d['volume'] for d in daily_data])
+            
+            # 同一自然日取第一条数据的结果
+            index_by_day = {}
+            for i, data in enumerate(daily_data):
+                data_date = data['date']
+                index_by_day.setdefault(data_date.date() if isinstance(data_date, datetime) else data_date, i)
+            
+            result = {}
+            for target_date in all_dates:
+                # 转换为datetime对象
+                if isinstance(target_date, datetime):
+                    target_date_obj = target_date
+                else:
+                    target_date_obj = datetime.combine(target_date, datetime.min.time())
                 
-                return result
+                target_idx = index_by_day.get(target_date_obj.date())
+                if target_idx is None or target_idx < 1:
+                    continue
                 
+                if volume_types[target_idx]:
+                    result[target_date_obj] = volume_types[target_idx]
+            
+            return result
+            
         except Exception as e:
             logger.error(f"批量计算成交量类型失败: {table_name}: {e}", exc_info=True)
             return {}
-
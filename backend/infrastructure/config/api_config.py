@@ -6,3 +6,23 @@ EXTERNAL_API_CONFIG = {
     'timeout': 15
 }
 
+
+# 股票分析（益损比、支撑线、压力线）数据来源配置
+STOCK_ANALYSIS_CONFIG = {
+    'mode': 'local',      # local: 本地K线计算；remote: 调用外部API
+    'kline_limit': 500,   # 本地计算每个周期使用的最近K线数量
+    'cache_size': 1000    # 本地计算结果缓存条数（按 股票+周期 计）
+}
+
+
+# 每日机会API配置
+DAILY_CHANCE_API_CONFIG = {
+    'url': 'http://121.5.174.81:8005/stock/getDailyChanceWithBeauty',
+    'connect_timeout': 5,        # 建立连接超时（秒）
+    'timeout': 30,               # 读取超时（秒）
+    'max_workers': 8,            # 并发同步的股票数，1表示串行
+    'rate_limit_per_second': 5,  # 每个host每秒最多发起的请求数，0表示不限
+    'max_retries': 3,            # 超时、连接失败、429/5xx 的最大重试次数
+    'backoff_base': 0.5,         # 重试退避基数（秒），第n次重试在 [0, base*2^n] 内随机
+    'backoff_max': 8             # 单次退避上限（秒）
+}
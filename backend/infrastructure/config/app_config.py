@@ -6,6 +6,17 @@ SERVER_CONFIG = {
     'debug': True
 }
 
+# API响应编码
+# - json_encoder: auto（已安装orjson时使用，否则为标准库）或 stdlib；均输出紧凑、不转义中文的JSON
+# - compression: 按 Accept-Encoding 协商压缩 /api/* 的响应（已安装brotli时优先br，否则gzip），流式响应不压缩
+API_RESPONSE_CONFIG = {
+    'json_encoder': 'auto',
+    'compression': True,
+    'min_compress_bytes': 1024,   # 小于该大小的响应不压缩
+    'gzip_level': 6,
+    'brotli_quality': 5
+}
+
 # 周期类型映射（数据库字段值）
 PERIOD_TYPE_MAP = {
     '30min': '30min',
@@ -22,3 +33,84 @@ TIME_RANGE_CONFIG = {
     'month': 1825   # 月K线：最近5年
 }
 
+# 时间范围起点对齐（单位：天）：窗口起点按固定网格向前取整，同一网格周期内起点不变、只在末尾追加新K线，
+# CR分析可以从上次的检查点续算（见 CR_INCREMENTAL_CONFIG）；0 表示不对齐（起点每天滚动）
+TIME_RANGE_ALIGN_CONFIG = {
+    '30min': 7,
+    'day': 30,
+    'week': 28,
+    'month': 92
+}
+
+# 批量回测配置
+BATCH_BACKTEST_CONFIG = {
+    'max_workers': 8,       # 进程池最大进程数（不超过CPU核数）
+    'default_period': 'day'  # 默认分析周期
+}
+
+# 全市场信号筛选配置（插件/策略信号，按批加载日线和每日机会，多进程并行）
+# - chunk_size: 每个任务处理的股票数（一次批量查询的股票数）
+# - lookback_days: 开始日期之前额外加载的历史日线天数（插件最多回看30个交易日，需覆盖长假）
+SCREENER_CONFIG = {
+    'max_workers': 8,       # 进程池最大进程数（不超过CPU核数），1 表示在当前进程内执行
+    'chunk_size': 50,
+    'lookback_days': 60,
+    'default_universe': 'database'  # 默认股票范围：'database'（basic_stock 全部股票）或 'config'（配置文件分组）
+}
+
+# 每日机会衍生特征（成交量类型、多空组合）增量计算配置
+FEATURE_PIPELINE_CONFIG = {
+    'max_workers': 4,     # 并行处理的股票数（线程池，主要耗时在数据库IO）
+    'overlap_days': 10,   # 每次从水位往前重算的天数（覆盖被修正的K线和重新同步的记录）
+    'history_days': 45    # 额外加载的日线历史（成交量类型最多回看15根K线，需覆盖长假）
+}
+
+# K线存储布局
+# - per_table: 每只股票一张 basic_data_<code> 表（默认）
+# - unified: 所有股票一张按时间分区的统一K线表，多股票查询为一次主键范围扫描
+#   （先执行 scripts/init_kline_table.py 建表、scripts/migrate_kline_to_unified.py 迁移数据）
+KLINE_STORAGE_CONFIG = {
+    'layout': 'per_table',
+    'unified_table': 'kline',
+    'table_prefix': 'basic_data_'
+}
+
+# 股票注册表（进程内共享的 代码 -> 名称/表名/分组/板块/阈值）
+# - source: config 读取 stock_config.json（文件修改时间变化后自动重新加载）；
+#           database 读取 basic_stock 表（按股性 nature 分组，每 reload_interval 秒重新加载）
+# - check_interval: 两次检查配置文件修改时间的最小间隔（秒），避免热路径上频繁stat
+STOCK_REGISTRY_CONFIG = {
+    'source': 'config',
+    'check_interval': 1.0,
+    'reload_interval': 300,
+    'nature_groups': {'长线': '中长线'}  # basic_stock.nature 与配置文件分组名不一致时的映射
+}
+
+# CR点分析结果缓存（LRU，键含K线窗口版本、每日机会版本和策略配置版本，数据或配置变化后自动失效）
+CR_RESULT_CACHE_CONFIG = {
+    'enabled': True,
+    'max_entries': 300,               # 最多缓存的分析结果数（按 股票+周期 计）
+    'max_bytes': 256 * 1024 * 1024    # 缓存结果的估算总大小上限（按JSON序列化长度估算）
+}
+
+# CR点增量分析（保存状态机在最后一根K线处的检查点，新K线到来后只分析新增的K线）
+# 检查点按已分析K线、指标和每日机会数据的摘要校验，任何一项变化都回退为全量分析
+# - verify: 校验模式，续算后再全量分析一次并比较，不一致时记录错误并返回全量结果
+# - lookback_days: 续算时为新K线加载的历史日线天数（插件最多回看30个交易日，需覆盖长假）
+CR_INCREMENTAL_CONFIG = {
+    'enabled': True,
+    'verify': False,
+    'lookback_days': 90,
+    'max_entries': 300,               # 内存中最多保存的检查点数（按 股票+周期 计）
+    'max_bytes': 128 * 1024 * 1024
+}
+
+# 本地磁盘缓存（内存缓存之下的一层，服务重启后仍可复用）
+# 存放K线+指标窗口和CR分析结果，版本键与内存缓存相同，另含分析代码指纹（部署新代码后自动失效）
+# - path: SQLite文件路径（相对路径相对于项目根目录）
+# - max_bytes: 压缩后总大小上限，超出时按最近访问时间淘汰
+DISK_CACHE_CONFIG = {
+    'enabled': False,
+    'path': 'cache/analysis_cache.db',
+    'max_bytes': 1024 * 1024 * 1024
+}
@@ -9,3 +9,10 @@ DATABASE_CONFIG = {
     'charset': 'utf8mb4'
 }
 
+# 连接池配置
+DATABASE_POOL_CONFIG = {
+    'max_size': 10,               # 最大连接数（空闲 + 使用中）
+    'max_idle_time': 300,         # 空闲连接最长保留时间（秒），超过即淘汰
+    'checkout_timeout': 10,       # 获取连接的最长等待时间（秒）
+    'health_check_interval': 30   # 空闲超过该时间的连接在借出前先 ping 检查（秒）
+}
@@ -0,0 +1,174 @@
+"""进程内共享的股票注册表：代码 -> 名称、表名、分组、板块、阈值"""
+import os
+import threading
+import time
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Optional
+from domain.models.stock import Stock, StockGroups, StockInfo
+from infrastructure.config.app_config import STOCK_REGISTRY_CONFIG
+from infrastructure.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@lru_cache(maxsize=4096)
+def _derive_info(stock_code: str) -> StockInfo:
+    """未注册的股票按代码推导（表名按约定、名称取代码）"""
+    return StockInfo.create(stock_code)
+
+
+class StockRegistry:
+    """
+    股票注册表快照（不可变）
+
+    重新加载时整体替换为新快照，持有旧快照的调用方不受影响，读取无需加锁。
+    """
+
+    def __init__(self, groups: Dict[str, List[Stock]], source: str):
+        infos = {}
+        for group_name, stocks in groups.items():
+            for stock in stocks:
+                # 同一只股票出现在多个分组时以第一个为准（与原先线性查找的结果一致）
+                if stock.code not in infos:
+                    infos[stock.code] = StockInfo.create(stock.code, stock.name, stock.table_name, group_name)
+
+        self.source = source
+        self._infos = MappingProxyType(infos)
+        self._groups = MappingProxyType(
+            {name: tuple(stocks) for name, stocks in groups.items()}
+        )
+
+    def __len__(self) -> int:
+        return len(self._infos)
+
+    def __contains__(self, stock_code: str) -> bool:
+        return stock_code in self._infos
+
+    def get(self, stock_code: str) -> Optional[StockInfo]:
+        """已注册股票的信息，未注册返回None"""
+        return self._infos.get(stock_code)
+
+    def info(self, stock_code: str) -> StockInfo:
+        """股票信息，未注册的按代码推导"""
+        return self._infos.get(stock_code) or _derive_info(stock_code)
+
+    def table_name(self, stock_code: str) -> str:
+        """K线表名，未注册的按 basic_data_<代码小写> 约定"""
+        return self.info(stock_code).table_name
+
+    def is_main_board(self, stock_code: str) -> bool:
+        """是否主板（C/R点插件口径）"""
+        return self.info(stock_code).is_main_board
+
+    def all_stocks(self) -> List[StockInfo]:
+        """所有已注册股票（按配置顺序）"""
+        return list(self._infos.values())
+
+    def get_all_groups(self) -> Dict[str, List[Stock]]:
+        """所有股票分组（每次返回新列表，调用方修改不影响注册表）"""
+        return {name: list(stocks) for name, stocks in self._groups.items()}
+
+
+class _RegistryHolder:
+    """当前快照及其来源版本（配置文件修改时间 / 数据库加载时间）"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.registry: Optional[StockRegistry] = None
+        self.version = None
+        self.checked_at = 0.0
+
+
+_holder = _RegistryHolder()
+
+
+def _load_from_database() -> Dict[str, List[Stock]]:
+    """从 basic_stock 表加载，按股性 nature 分组"""
+    import pymysql.cursors
+    from infrastructure.persistence.database import DatabaseConnection
+
+    nature_groups = STOCK_REGISTRY_CONFIG.get('nature_groups', {})
+    groups: Dict[str, List[Stock]] = {}
+    with DatabaseConnection.get_connection_context() as conn:
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        cursor.execute("""
+            SELECT code, name, nature FROM basic_stock
+            WHERE code IS NOT NULL AND code != ''
+            ORDER BY id
+        """)
+        rows = cursor.fetchall()
+        cursor.close()
+
+    for row in rows:
+        code = row['code'].strip().upper()
+        nature = (row['nature'] or '').strip()
+        group = nature_groups.get(nature, nature) or '未分类'
+        groups.setdefault(group, []).append(Stock(name=row['name'], code=code,
+                                                  table_name=f"basic_data_{code.lower()}"))
+    return groups
+
+
+def load_stock_registry(source: str) -> StockRegistry:
+    """
+    从指定数据源加载一份新的注册表快照（不影响进程内共享的注册表）
+
+    Args:
+        source: 'config'（股票分组配置文件）或 'database'（basic_stock 表）
+    """
+    if source == 'database':
+        return StockRegistry(_load_from_database(), source)
+    return StockRegistry(StockGroups.load_from_config(StockGroups.default_config_path()), source)
+
+
+def _current_version(source: str, now: float):
+    """数据源当前版本：配置文件取修改时间，数据库按 reload_interval 分段"""
+    if source == 'database':
+        return int(now // STOCK_REGISTRY_CONFIG['reload_interval'])
+    return os.stat(StockGroups.default_config_path()).st_mtime_ns
+
+
+def get_stock_registry() -> StockRegistry:
+    """
+    获取进程内共享的股票注册表
+
+    最多每 check_interval 秒检查一次数据源版本，变化时重新加载；
+    重新加载失败时保留上一版快照。
+    """
+    now = time.monotonic()
+    registry = _holder.registry
+    if registry is not None and now - _holder.checked_at < STOCK_REGISTRY_CONFIG['check_interval']:
+        return registry
+
+    with _holder.lock:
+        if _holder.registry is not None and now - _holder.checked_at < STOCK_REGISTRY_CONFIG['check_interval']:
+            return _holder.registry
+
+        source = STOCK_REGISTRY_CONFIG['source']
+        try:
+            version = _current_version(source, time.time())
+            if _holder.registry is None or version != _holder.version:
+                reloaded = _holder.registry is not None
+                _holder.registry = load_stock_registry(source)
+                _holder.version = version
+                logger.info(f"股票注册表{'重新' if reloaded else ''}加载完成: "
+                            f"{len(_holder.registry)} 只股票, 来源 {source}")
+        except Exception as e:
+            if _holder.registry is None:
+                # 首次加载失败时使用空注册表（所有股票按代码推导），下次检查时重试
+                logger.error(f"加载股票注册表失败，暂按代码推导股票信息: {e}")
+                _holder.registry = StockRegistry({}, source)
+                _holder.version = None
+            else:
+                logger.error(f"重新加载股票注册表失败，继续使用上一版: {e}")
+        _holder.checked_at = now
+        return _holder.registry
+
+
+def reload_stock_registry() -> StockRegistry:
+    """立即重新加载股票注册表（忽略检查间隔和版本）"""
+    with _holder.lock:
+        _holder.registry = None
+        _holder.version = None
+        _holder.checked_at = 0.0
+    return get_stock_registry()
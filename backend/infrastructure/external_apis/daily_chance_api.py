@@ -1,18 +1,77 @@
 """每日机会外部API客户端"""
+import random
+import threading
+import time
 import requests
-from typing import List, Dict, Any
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.parse import urlparse
+from infrastructure.config.api_config import DAILY_CHANCE_API_CONFIG
 from infrastructure.logging.logger import get_external_api_logger
 import re
 
 logger = get_external_api_logger()
 
 
+class HostRateLimiter:
+    """按host限流：同一host相邻两次请求至少间隔 1/rate 秒（线程安全）"""
+    
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second and rate_per_second > 0 else 0.0
+        self._next_time: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def acquire(self, host: str) -> float:
+        """
+        等待直到允许向host发起请求
+        
+        Returns:
+            等待的秒数
+        """
+        if self.interval <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_time.get(host, now))
+            self._next_time[host] = slot + self.interval
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
 class DailyChanceApiClient:
-    """每日机会API客户端"""
+    """
+    每日机会API客户端
     
-    def __init__(self):
-        self.api_url = 'http://121.5.174.81:8005/stock/getDailyChanceWithBeauty'
-        self.timeout = 30
+    - 复用 requests.Session 连接池（keep-alive），连接池大小不小于并发数
+    - 按host限流，超时、连接失败、429/5xx 按抖动指数退避重试
+    - 连接超时与读取超时分开设置，单只股票慢不会长时间占住连接
+    """
+    
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+    
+    def __init__(self, api_url: Optional[str] = None, config: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            api_url: 接口地址，None使用配置（测试时可指向本地服务）
+            config: 覆盖 DAILY_CHANCE_API_CONFIG 中的部分配置
+        """
+        config = {**DAILY_CHANCE_API_CONFIG, **(config or {})}
+        self.api_url = api_url or config['url']
+        self.connect_timeout = config['connect_timeout']
+        self.timeout = config['timeout']
+        self.max_retries = config['max_retries']
+        self.backoff_base = config['backoff_base']
+        self.backoff_max = config['backoff_max']
+        self.host = urlparse(self.api_url).netloc
+        self.rate_limiter = HostRateLimiter(config['rate_limit_per_second'])
+        
+        pool_size = max(int(config['max_workers']), 1)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
     
     def get_daily_chance(self, stock_code: str) -> List[Dict[str, Any]]:
         """
@@ -24,34 +83,93 @@ class DailyChanceApiClient:
         Returns:
             每日机会数据列表
         """
+        data, _ = self.fetch_daily_chance(stock_code)
+        return data
+    
+    def fetch_daily_chance(self, stock_code: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        获取股票每日机会数据并返回请求统计
+        
+        Args:
+            stock_code: 股票代码，如SZ300188
+            
+        Returns:
+            (每日机会数据列表, 统计) 统计包含 attempts、status、elapsed、rate_wait、error
+        """
+        stats = {'attempts': 0, 'status': None, 'elapsed': 0.0, 'rate_wait': 0.0, 'error': None}
+        start_time = time.time()
+        
         try:
-            logger.info(f"调用每日机会API: 股票代码={stock_code}")
+            for attempt in range(self.max_retries + 1):
+                stats['attempts'] = attempt + 1
+                stats['rate_wait'] += self.rate_limiter.acquire(self.host)
+                retry_after = None
+                
+                try:
+                    logger.info(f"调用每日机会API: 股票代码={stock_code}, 第{attempt + 1}次")
+                    
+                    # 接口需要POST请求，请求体是股票代码字符串
+                    response = self.session.post(
+                        self.api_url,
+                        data=stock_code,
+                        headers={'Content-Type': 'application/json'},
+                        timeout=(self.connect_timeout, self.timeout)
+                    )
+                    stats['status'] = response.status_code
+                    
+                    if response.status_code == 200:
+                        data = response.json()
+                        stats['error'] = None
+                        logger.info(f"成功获取每日机会数据: 股票={stock_code}, "
+                                    f"记录数={len(data) if isinstance(data, list) else 0}")
+                        return (data if isinstance(data, list) else []), stats
+                    
+                    stats['error'] = f"status={response.status_code}"
+                    if response.status_code not in self.RETRY_STATUS:
+                        logger.warning(f"每日机会API请求失败: 股票={stock_code}, status={response.status_code}")
+                        return [], stats
+                    retry_after = self._parse_retry_after(response.headers.get('Retry-After'))
+                    
+                except (requests.Timeout, requests.ConnectionError) as e:
+                    stats['error'] = f"{type(e).__name__}: {e}"
+                except requests.RequestException as e:
+                    stats['error'] = str(e)
+                    logger.error(f"每日机会API请求异常: 股票={stock_code}, 错误={str(e)}")
+                    return [], stats
+                
+                if attempt < self.max_retries:
+                    delay = self._backoff(attempt, retry_after)
+                    logger.warning(f"每日机会API请求失败，{delay:.2f}秒后重试: 股票={stock_code}, "
+                                   f"错误={stats['error']}")
+                    time.sleep(delay)
             
-            # 接口需要POST请求，请求体是股票代码字符串
-            response = requests.post(
-                self.api_url,
-                data=stock_code,
-                headers={'Content-Type': 'application/json'},
-                timeout=self.timeout
-            )
+            logger.warning(f"每日机会API重试{self.max_retries}次后仍失败: 股票={stock_code}, 错误={stats['error']}")
+            return [], stats
             
-            if response.status_code == 200:
-                data = response.json()
-                logger.info(f"成功获取每日机会数据: 股票={stock_code}, 记录数={len(data) if isinstance(data, list) else 0}")
-                return data if isinstance(data, list) else []
-            else:
-                logger.warning(f"每日机会API请求失败: 股票={stock_code}, status={response.status_code}")
-                return []
-                
-        except requests.Timeout:
-            logger.warning(f"每日机会API超时: 股票={stock_code}, 超时时间={self.timeout}秒")
-            return []
-        except requests.RequestException as e:
-            logger.error(f"每日机会API请求异常: 股票={stock_code}, 错误={str(e)}")
-            return []
         except Exception as e:
+            stats['error'] = str(e)
             logger.error(f"每日机会API处理异常: 股票={stock_code}, 错误={str(e)}", exc_info=True)
-            return []
+            return [], stats
+        finally:
+            stats['elapsed'] = round(time.time() - start_time, 3)
+    
+    def _backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """抖动指数退避：[0, base*2^attempt] 内随机，服务端给出 Retry-After 时不少于该值"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return min(delay, self.backoff_max)
+    
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        try:
+            return float(value) if value else None
+        except ValueError:
+            return None
+    
+    def close(self):
+        """关闭连接池"""
+        self.session.close()
     
     @staticmethod
     def parse_win_ratio_description(description: str) -> tuple:
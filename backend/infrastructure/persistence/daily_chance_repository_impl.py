@@ -1,5 +1,5 @@
 """每日机会仓储实现"""
-from typing import List, Optional
+from typing import List, Optional, Dict, Tuple
 from datetime import datetime
 import pymysql.cursors
 from domain.repositories.daily_chance_repository import IDailyChanceRepository
@@ -9,6 +9,12 @@ from infrastructure.logging.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 版本校验和的每行内容：API数据内容哈希 + 衍生特征（NULL 替换为字面量，避免 CONCAT_WS 跳过 NULL 造成错位）
+_VERSION_ROW_EXPR = "CONCAT_WS('|', " + ', '.join(
+    f"IFNULL({column}, 'NULL')" for column in ('date', 'content_hash', 'volume_type', 'bullish_pattern',
+                                               'bearish_pattern')
+) + ")"
+
 
 class DailyChanceRepositoryImpl(IDailyChanceRepository):
     """每日机会仓储实现"""
@@ -23,9 +29,10 @@ class DailyChanceRepositoryImpl(IDailyChanceRepository):
                     INSERT INTO daily_chance (
                         stock_code, stock_name, stock_nature, date, chance,
                         day_win_ratio_score, week_win_ratio_score, total_win_ratio_score,
-                        support_price, pressure_price, volume_type, bullish_pattern, bearish_pattern
+                        support_price, pressure_price, volume_type, bullish_pattern, bearish_pattern,
+                        content_hash
                     ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
                     ) ON DUPLICATE KEY UPDATE
                         stock_name = VALUES(stock_name),
                         stock_nature = VALUES(stock_nature),
@@ -37,7 +44,8 @@ class DailyChanceRepositoryImpl(IDailyChanceRepository):
                         pressure_price = VALUES(pressure_price),
                         volume_type = VALUES(volume_type),
                         bullish_pattern = VALUES(bullish_pattern),
-                        bearish_pattern = VALUES(bearish_pattern)
+                        bearish_pattern = VALUES(bearish_pattern),
+                        content_hash = VALUES(content_hash)
                 """
                 
                 cursor.execute(sql, (
@@ -53,7 +61,8 @@ class DailyChanceRepositoryImpl(IDailyChanceRepository):
                     daily_chance.pressure_price,
                     daily_chance.volume_type,
                     daily_chance.bullish_pattern,
-                    daily_chance.bearish_pattern
+                    daily_chance.bearish_pattern,
+                    daily_chance.content_hash()
                 ))
                 
                 logger.debug(f"保存每日机会数据成功: {daily_chance.stock_code} {daily_chance.date}")
@@ -64,7 +73,7 @@ class DailyChanceRepositoryImpl(IDailyChanceRepository):
             return False
     
     def save_batch(self, daily_chances: List[DailyChance]) -> int:
-        """批量保存每日机会数据"""
+        """批量保存每日机会数据（衍生特征为None时保留已计算的值）"""
         if not daily_chances:
             return 0
         
@@ -76,9 +85,10 @@ class DailyChanceRepositoryImpl(IDailyChanceRepository):
                     INSERT INTO daily_chance (
                         stock_code, stock_name, stock_nature, date, chance,
                         day_win_ratio_score, week_win_ratio_score, total_win_ratio_score,
-                        support_price, pressure_price, volume_type, bullish_pattern, bearish_pattern
+                        support_price, pressure_price, volume_type, bullish_pattern, bearish_pattern,
+                        content_hash
                     ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
                     ) ON DUPLICATE KEY UPDATE
                         stock_name = VALUES(stock_name),
                         stock_nature = VALUES(stock_nature),
@@ -88,9 +98,10 @@ class DailyChanceRepositoryImpl(IDailyChanceRepository):
                         total_win_ratio_score = VALUES(total_win_ratio_score),
                         support_price = VALUES(support_price),
                         pressure_price = VALUES(pressure_price),
-                        volume_type = VALUES(volume_type),
-                        bullish_pattern = VALUES(bullish_pattern),
-                        bearish_pattern = VALUES(bearish_pattern)
+                        volume_type = COALESCE(VALUES(volume_type), volume_type),
+                        bullish_pattern = COALESCE(VALUES(bullish_pattern), bullish_pattern),
+                        bearish_pattern = COALESCE(VALUES(bearish_pattern), bearish_pattern),
+                        content_hash = VALUES(content_hash)
                 """
                 
                 values = []
@@ -108,7 +119,8 @@ class DailyChanceRepositoryImpl(IDailyChanceRepository):
                         dc.pressure_price,
                         dc.volume_type,
                         dc.bullish_pattern,
-                        dc.bearish_pattern
+                        dc.bearish_pattern,
+                        dc.content_hash()
                     ))
                 
                 cursor.executemany(sql, values)
@@ -176,6 +188,31 @@ class DailyChanceRepositoryImpl(IDailyChanceRepository):
             logger.error(f"查询每日机会数据失败: {e}", exc_info=True)
             return []
     
+    def find_by_stock_codes(self, stock_codes: List[str], start_date: str,
+                            end_date: str) -> Dict[str, List[DailyChance]]:
+        """批量查询多只股票同一日期范围的数据（走 (stock_code, date) 唯一索引），查询失败返回空字典"""
+        result: Dict[str, List[DailyChance]] = {code: [] for code in stock_codes}
+        if not stock_codes:
+            return result
+        try:
+            with DatabaseConnection.get_connection_context() as conn:
+                cursor = conn.cursor(pymysql.cursors.DictCursor)
+                
+                sql = f"""
+                    SELECT * FROM daily_chance 
+                    WHERE stock_code IN ({', '.join(['%s'] * len(stock_codes))}) AND date BETWEEN %s AND %s
+                    ORDER BY stock_code, date DESC
+                """
+                cursor.execute(sql, list(stock_codes) + [start_date, end_date])
+                
+                for row in cursor.fetchall():
+                    result.setdefault(row['stock_code'], []).append(self._row_to_daily_chance(row))
+                return result
+                
+        except Exception as e:
+            logger.error(f"批量查询每日机会数据失败: {e}", exc_info=True)
+            return {}
+    
     def find_by_date(self, date: str) -> List[DailyChance]:
         """根据日期查询"""
         try:
@@ -218,6 +255,59 @@ class DailyChanceRepositoryImpl(IDailyChanceRepository):
             logger.error(f"查询最新日期失败: {e}", exc_info=True)
             return None
     
+    def find_version(self, stock_code: str) -> Optional[Tuple]:
+        """
+        获取股票每日机会数据的版本
+        
+        updated_at 只精确到秒，且修改较早的记录不一定改变其最大值，因此另加各行内容
+        （内容哈希和衍生特征）CRC32 的异或与求和；记录数覆盖删除的情况。查询失败返回None
+        
+        Returns:
+            (记录数, 最新日期, 最近更新时间, 内容CRC32异或, 内容CRC32之和)
+        """
+        try:
+            with DatabaseConnection.get_connection_context() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f"""
+                    SELECT COUNT(*), MAX(date), MAX(updated_at),
+                           BIT_XOR(CRC32({_VERSION_ROW_EXPR})), SUM(CRC32({_VERSION_ROW_EXPR}))
+                    FROM daily_chance
+                    WHERE stock_code = %s
+                """, (stock_code,))
+                row_count, latest_date, updated_at, crc_xor, crc_sum = cursor.fetchone()
+                return (row_count, latest_date, updated_at, int(crc_xor or 0), int(crc_sum or 0))
+                
+        except Exception as e:
+            logger.error(f"查询每日机会版本失败: {e}", exc_info=True)
+            return None
+    
+    def find_stock_codes(self) -> List[str]:
+        """获取有每日机会数据的所有股票代码（包括不在股票分组配置中的股票）"""
+        try:
+            with DatabaseConnection.get_connection_context() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT DISTINCT stock_code FROM daily_chance ORDER BY stock_code")
+                return [row[0] for row in cursor.fetchall()]
+                
+        except Exception as e:
+            logger.error(f"查询每日机会股票列表失败: {e}", exc_info=True)
+            return []
+    
+    def find_content_hashes(self, stock_code: str) -> Dict[str, Optional[str]]:
+        """获取股票每个日期已保存的内容哈希"""
+        try:
+            with DatabaseConnection.get_connection_context() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT date, content_hash FROM daily_chance WHERE stock_code = %s",
+                    (stock_code,)
+                )
+                return {row[0].strftime('%Y-%m-%d'): row[1] for row in cursor.fetchall()}
+                
+        except Exception as e:
+            logger.error(f"查询内容哈希失败: {e}", exc_info=True)
+            return {}
+    
     def update_volume_type(self, stock_code: str, date: str, volume_type: str) -> bool:
         """更新成交量类型"""
         try:
@@ -343,6 +433,75 @@ class DailyChanceRepositoryImpl(IDailyChanceRepository):
             logger.error(f"批量更新成交量类型失败: {e}", exc_info=True)
             return 0
     
+    def find_feature_watermark(self, stock_code: str) -> Optional[datetime]:
+        """获取衍生特征已计算到的最后日期（表结构见 sql/create_daily_chance_feature_state_table.sql）"""
+        try:
+            with DatabaseConnection.get_connection_context() as conn:
+                cursor = conn.cursor(pymysql.cursors.DictCursor)
+                cursor.execute(
+                    "SELECT last_date FROM daily_chance_feature_state WHERE stock_code = %s",
+                    (stock_code,)
+                )
+                row = cursor.fetchone()
+                
+                if not row or not row['last_date']:
+                    return None
+                last_date = row['last_date']
+                return last_date if isinstance(last_date, datetime) else datetime.combine(last_date, datetime.min.time())
+                
+        except Exception as e:
+            logger.error(f"查询衍生特征水位失败: {stock_code}: {e}", exc_info=True)
+            return None
+    
+    def save_features(self, stock_code: str, daily_chances: List[DailyChance], last_date: datetime) -> int:
+        """
+        批量写入衍生特征并更新水位
+        
+        一条批量upsert覆盖成交量类型和多空组合三列（None会清空旧值），与水位在同一连接中写入
+        
+        Args:
+            stock_code: 股票代码
+            daily_chances: 已计算好特征的每日机会数据
+            last_date: 本次计算到的最后日期
+            
+        Returns:
+            写入的记录数
+        """
+        sql = """
+            INSERT INTO daily_chance (
+                stock_code, stock_name, stock_nature, date, volume_type, bullish_pattern, bearish_pattern
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                volume_type = VALUES(volume_type),
+                bullish_pattern = VALUES(bullish_pattern),
+                bearish_pattern = VALUES(bearish_pattern)
+        """
+        state_sql = """
+            INSERT INTO daily_chance_feature_state (stock_code, last_date)
+            VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE last_date = VALUES(last_date)
+        """
+        
+        values = [(
+            dc.stock_code,
+            dc.stock_name,
+            dc.stock_nature,
+            dc.date.strftime('%Y-%m-%d'),
+            dc.volume_type,
+            dc.bullish_pattern,
+            dc.bearish_pattern
+        ) for dc in daily_chances if dc.date]
+        
+        with DatabaseConnection.get_connection_context() as conn:
+            cursor = conn.cursor()
+            if values:
+                cursor.executemany(sql, values)
+            cursor.execute(state_sql, (stock_code, last_date.strftime('%Y-%m-%d')))
+            cursor.close()
+        
+        logger.debug(f"保存衍生特征成功: {stock_code} {len(values)}条, 水位{last_date.strftime('%Y-%m-%d')}")
+        return len(values)
+    
     def _row_to_daily_chance(self, row: dict) -> DailyChance:
         """将数据库行转换为DailyChance对象"""
         return DailyChance(
@@ -1,8 +1,11 @@
 """日线数据仓储实现"""
-from typing import List, Optional
-from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from infrastructure.config.app_config import KLINE_STORAGE_CONFIG
 from infrastructure.persistence.database import DatabaseConnection
-from domain.models.stock import StockGroups
+from infrastructure.persistence.kline_storage import get_kline_source, is_unified_layout
+from infrastructure.config.stock_registry import get_stock_registry
+from domain.services.period_service import PeriodService
 from infrastructure.logging.logger import get_logger
 
 logger = get_logger(__name__)
@@ -22,6 +25,17 @@ class DailyData:
         self.pre_close = pre_close
 
 
+def _day_bounds(start_date, end_date=None) -> Tuple[datetime, datetime]:
+    """
+    日期（'YYYY-MM-DD'、date或datetime）转换为 [开始日0点, 结束日次日0点) 的时间区间
+    
+    查询条件写成 shi_jian 的范围而不是 DATE(shi_jian)，才能使用 (peroid_type, shi_jian) 索引。
+    """
+    start = datetime.strptime(str(start_date)[:10], '%Y-%m-%d')
+    end = datetime.strptime(str(end_date)[:10], '%Y-%m-%d') if end_date is not None else start
+    return start, end + timedelta(days=1)
+
+
 class DailyRepositoryImpl:
     """日线数据仓储实现"""
     
@@ -30,16 +44,19 @@ class DailyRepositoryImpl:
         try:
             # 从stock_code提取表名
             table_name = self._get_table_name(stock_code)
+            source = get_kline_source(table_name)
             
             with DatabaseConnection.get_connection_context() as conn:
                 cursor = conn.cursor()
+                day_start, day_end = _day_bounds(date_str)
                 sql = f"""
                     SELECT shi_jian, kai_pan_jia, zui_gao_jia, zui_di_jia, shou_pan_jia, cheng_jiao_liang, shang_yu_bi
-                    FROM `{table_name}`
-                    WHERE DATE(shi_jian) = %s
+                    FROM `{source.table}`
+                    {source.where('peroid_type = %s', 'shi_jian >= %s', 'shi_jian < %s')}
+                    ORDER BY shi_jian ASC
                     LIMIT 1
                 """
-                cursor.execute(sql, (date_str,))
+                cursor.execute(sql, source.params(PeriodService.get_period_code('day'), day_start, day_end))
                 row = cursor.fetchone()
                 
                 if row:
@@ -73,73 +90,122 @@ class DailyRepositoryImpl:
         """根据日期范围查询日线数据"""
         try:
             table_name = self._get_table_name(stock_code)
+            source = get_kline_source(table_name)
             
             with DatabaseConnection.get_connection_context() as conn:
                 cursor = conn.cursor()
+                range_start, range_end = _day_bounds(start_date, end_date)
                 sql = f"""
                     SELECT shi_jian, kai_pan_jia, zui_gao_jia, zui_di_jia, shou_pan_jia, cheng_jiao_liang, shang_yu_bi
-                    FROM `{table_name}`
-                    WHERE DATE(shi_jian) BETWEEN %s AND %s
-                      AND HOUR(shi_jian) = 0 AND MINUTE(shi_jian) = 0 AND SECOND(shi_jian) = 0
+                    FROM `{source.table}`
+                    {source.where('peroid_type = %s', 'shi_jian >= %s', 'shi_jian < %s')}
                     ORDER BY shi_jian ASC
                 """
-                cursor.execute(sql, (start_date, end_date))
-                rows = cursor.fetchall()
-                
-                result = []
-                prev_close = 0  # 前一日收盘价
-                
-                for i, row in enumerate(rows):
-                    close_price = float(row[4]) if row[4] else 0
-                    change_pct = float(row[6]) if row[6] else 0
-                    
-                    # 计算pre_close的策略：
-                    # 1. 如果shang_yu_bi不为NULL且不为0，从涨跌幅反推
-                    # 2. 否则，使用前一日的收盘价（按时间顺序）
-                    if change_pct != 0 and close_price > 0:
-                        # 从涨跌幅反推昨收价
-                        pre_close = close_price / (1 + change_pct / 100)
-                    elif i > 0:
-                        # 使用前一日的收盘价
-                        pre_close = prev_close
-                    else:
-                        # 第一条数据，无前一日数据
-                        pre_close = 0
-                    
-                    result.append(DailyData(
-                        stock_code=stock_code,
-                        date=row[0] if row[0] else None,
-                        open=float(row[1]) if row[1] else 0,
-                        high=float(row[2]) if row[2] else 0,
-                        low=float(row[3]) if row[3] else 0,
-                        close=close_price,
-                        volume=int(row[5]) if row[5] else 0,
-                        pre_close=pre_close
-                    ))
-                    
-                    # 保存当前收盘价，作为下一条记录的pre_close
-                    prev_close = close_price
-                
-                return result
+                cursor.execute(sql, source.params(PeriodService.get_period_code('day'), range_start, range_end))
+                return self._rows_to_daily(stock_code, cursor.fetchall())
                 
         except Exception as e:
             logger.error(f"查询日期范围数据失败: {e}")
             return []
     
-    def _get_table_name(self, stock_code: str) -> str:
-        """根据股票代码获取表名"""
+    def find_by_date_range_batch(self, stock_codes: List[str], start_date: str,
+                                 end_date: str) -> Dict[str, List[DailyData]]:
+        """
+        批量查询多只股票同一日期范围的日线数据（全市场扫描按批加载）
+        
+        统一K线表布局下一条SQL完成（stock_code IN (...) 走主键范围扫描）；分表布局下在同一连接上逐表查询。
+        单只股票查询失败时该股票返回空列表。
+        
+        Returns:
+            {股票代码: 日线数据列表（按日期升序）}
+        """
+        result: Dict[str, List[DailyData]] = {code: [] for code in stock_codes}
+        if not stock_codes:
+            return result
+        range_start, range_end = _day_bounds(start_date, end_date)
+        period_code = PeriodService.get_period_code('day')
+        columns = "shi_jian, kai_pan_jia, zui_gao_jia, zui_di_jia, shou_pan_jia, cheng_jiao_liang, shang_yu_bi"
+        
         try:
-            # 从stock_config.json获取表名
-            stock_groups = StockGroups()
-            all_groups = stock_groups.get_all_groups()
+            with DatabaseConnection.get_connection_context() as conn:
+                cursor = conn.cursor()
+                try:
+                    if is_unified_layout():
+                        cursor.execute(f"""
+                            SELECT stock_code, {columns}
+                            FROM `{KLINE_STORAGE_CONFIG['unified_table']}`
+                            WHERE stock_code IN ({', '.join(['%s'] * len(stock_codes))})
+                              AND peroid_type = %s AND shi_jian >= %s AND shi_jian < %s
+                            ORDER BY stock_code, shi_jian ASC
+                        """, list(stock_codes) + [period_code, range_start, range_end])
+                        rows_by_code: Dict[str, list] = {}
+                        for row in cursor.fetchall():
+                            rows_by_code.setdefault(row[0], []).append(row[1:])
+                        for code, rows in rows_by_code.items():
+                            if code in result:
+                                result[code] = self._rows_to_daily(code, rows)
+                    else:
+                        for code in stock_codes:
+                            try:
+                                cursor.execute(f"""
+                                    SELECT {columns}
+                                    FROM `{self._get_table_name(code)}`
+                                    WHERE peroid_type = %s AND shi_jian >= %s AND shi_jian < %s
+                                    ORDER BY shi_jian ASC
+                                """, (period_code, range_start, range_end))
+                                result[code] = self._rows_to_daily(code, cursor.fetchall())
+                            except Exception as e:
+                                logger.warning(f"批量查询日线数据失败，跳过: {code} {e}")
+                finally:
+                    cursor.close()
+        except Exception as e:
+            logger.error(f"批量查询日期范围数据失败: {e}")
+        return result
+    
+    @staticmethod
+    def _rows_to_daily(stock_code: str, rows) -> List[DailyData]:
+        """查询行 (shi_jian, 开, 高, 低, 收, 量, 涨跌幅) 转换为日线数据，按需推算昨收价"""
+        result = []
+        prev_close = 0  # 前一日收盘价
+        
+        for i, row in enumerate(rows):
+            close_price = float(row[4]) if row[4] else 0
+            change_pct = float(row[6]) if row[6] else 0
             
-            for group_name, stock_list in all_groups.items():
-                for stock in stock_list:
-                    if stock.code == stock_code:
-                        return stock.table_name
+            # 计算pre_close的策略：
+            # 1. 如果shang_yu_bi不为NULL且不为0，从涨跌幅反推
+            # 2. 否则，使用前一日的收盘价（按时间顺序）
+            if change_pct != 0 and close_price > 0:
+                # 从涨跌幅反推昨收价
+                pre_close = close_price / (1 + change_pct / 100)
+            elif i > 0:
+                # 使用前一日的收盘价
+                pre_close = prev_close
+            else:
+                # 第一条数据，无前一日数据
+                pre_close = 0
             
-            # 如果找不到，使用默认格式
-            return f"basic_data_{stock_code.lower()}"
+            result.append(DailyData(
+                stock_code=stock_code,
+                date=row[0] if row[0] else None,
+                open=float(row[1]) if row[1] else 0,
+                high=float(row[2]) if row[2] else 0,
+                low=float(row[3]) if row[3] else 0,
+                close=close_price,
+                volume=int(row[5]) if row[5] else 0,
+                pre_close=pre_close
+            ))
+            
+            # 保存当前收盘价，作为下一条记录的pre_close
+            prev_close = close_price
+        
+        return result
+    
+    def _get_table_name(self, stock_code: str) -> str:
+        """根据股票代码获取表名"""
+        try:
+            # 进程内共享的股票注册表，找不到时按默认格式
+            return get_stock_registry().table_name(stock_code)
         except Exception as e:
             logger.error(f"获取表名失败: {e}")
             # 降级方案：使用默认格式
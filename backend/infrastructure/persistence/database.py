@@ -1,46 +1,329 @@
 """数据库连接管理"""
+import os
+import time
+import threading
+import weakref
 import pymysql
-from typing import Optional
+from collections import deque
+from typing import Optional, Dict, Any
 from contextlib import contextmanager
-from infrastructure.config.database_config import DATABASE_CONFIG
+from infrastructure.config.database_config import DATABASE_CONFIG, DATABASE_POOL_CONFIG
 from infrastructure.logging.logger import get_database_logger
 
 logger = get_database_logger()
 
 
+class PooledConnection:
+    """池化连接代理 - close() 时归还连接池而不是断开"""
+
+    def __init__(self, pool: 'ConnectionPool', raw_connection):
+        self._pool = pool
+        self._raw = raw_connection
+        self._released = False
+        # 调用方没有 close() 就丢弃代理时，由垃圾回收交给连接池销毁，避免永久占用连接池名额
+        self._finalizer = weakref.finalize(self, pool.reclaim_leaked, raw_connection)
+        self._finalizer.atexit = False
+
+    def close(self):
+        """归还连接到连接池"""
+        if not self._released:
+            self._released = True
+            self._finalizer.detach()
+            self._pool.release(self._raw)
+
+    def __getattr__(self, name):
+        if self._released:
+            raise pymysql.err.InterfaceError(0, '连接已归还连接池，不能继续使用')
+        return getattr(self._raw, name)
+
+
+class ConnectionPool:
+    """有界、线程安全的MySQL连接池"""
+
+    def __init__(self, db_config: Dict[str, Any], max_size: int = 10, max_idle_time: float = 300,
+                 checkout_timeout: float = 10, health_check_interval: float = 30):
+        """
+        初始化连接池
+
+        Args:
+            db_config: pymysql.connect 参数
+            max_size: 最大连接数（空闲 + 使用中）
+            max_idle_time: 空闲连接最长保留时间（秒）
+            checkout_timeout: 默认获取连接超时时间（秒）
+            health_check_interval: 空闲超过该时间的连接借出前先 ping 检查（秒）
+        """
+        self._db_config = db_config
+        self.max_size = max_size
+        self.max_idle_time = max_idle_time
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle = deque()  # [(connection, last_used)]，右端为最近归还
+        self._leaked = deque()  # 未归还就被垃圾回收的连接，等待销毁
+        self._size = 0  # 已创建且未销毁的连接数
+        self._in_use = 0
+        self._pid = os.getpid()
+
+        # 统计指标
+        self._stats = {
+            'created': 0,
+            'closed': 0,
+            'checkouts': 0,
+            'reused': 0,
+            'evicted_idle': 0,
+            'leaked': 0,
+            'health_check_failures': 0,
+            'timeouts': 0,
+            'total_wait_ms': 0.0,
+            'max_wait_ms': 0.0
+        }
+
+    def acquire(self, timeout: Optional[float] = None):
+        """
+        从连接池借出一个原始连接
+
+        Args:
+            timeout: 等待超时时间（秒），None 使用默认值
+
+        Returns:
+            pymysql 连接
+
+        Raises:
+            TimeoutError: 在超时时间内没有可用连接
+        """
+        self._check_fork()
+        timeout = self.checkout_timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+
+        while True:
+            conn = None
+            last_used = None
+            create_new = False
+
+            with self._cond:
+                while True:
+                    self._reclaim_leaked_locked()
+                    self._evict_idle_locked()
+                    if self._idle:
+                        conn, last_used = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        create_new = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise TimeoutError(
+                            f"获取数据库连接超时({timeout}秒): 连接池已满 {self._in_use}/{self.max_size}"
+                        )
+                    # 被垃圾回收的连接不会唤醒等待者（finalizer 不能加锁），定期醒来检查
+                    self._cond.wait(min(remaining, 1.0))
+
+            # 建连和健康检查在锁外进行，避免阻塞其他线程
+            if create_new:
+                try:
+                    conn = self._create_connection()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif time.monotonic() - last_used > self.health_check_interval and not self._is_healthy(conn):
+                self._discard(conn)
+                continue
+
+            wait_ms = (time.monotonic() - start) * 1000
+            with self._cond:
+                self._in_use += 1
+                self._stats['checkouts'] += 1
+                if not create_new:
+                    self._stats['reused'] += 1
+                self._stats['total_wait_ms'] += wait_ms
+                self._stats['max_wait_ms'] = max(self._stats['max_wait_ms'], wait_ms)
+            return conn
+
+    def release(self, conn):
+        """
+        归还连接
+
+        归还前回滚未提交的事务，避免下一个使用者看到旧的事务快照
+        """
+        if os.getpid() != self._pid:
+            return
+
+        healthy = True
+        try:
+            if conn.open:
+                conn.rollback()
+            else:
+                healthy = False
+        except Exception as e:
+            logger.warning(f"归还连接时回滚失败，丢弃该连接: {e}")
+            healthy = False
+
+        with self._cond:
+            self._in_use -= 1
+            if healthy:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+                return
+        self._discard(conn)
+
+    def reclaim_leaked(self, conn):
+        """
+        回收未调用 close() 就被垃圾回收的池化连接（PooledConnection 的 finalizer）
+
+        finalizer 可能在任意线程、甚至在持有连接池锁时触发，这里只入队不加锁，
+        由下一次借出连接时销毁该连接（事务状态未知，不放回空闲队列）并释放名额
+        """
+        if os.getpid() != self._pid:
+            return
+        self._leaked.append(conn)
+        logger.warning("数据库连接未调用 close() 就被回收，连接池将销毁该连接")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取连接池统计指标"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                'max_size': self.max_size,
+                'size': self._size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'avg_wait_ms': round(stats['total_wait_ms'] / stats['checkouts'], 3) if stats['checkouts'] else 0
+            })
+        stats['total_wait_ms'] = round(stats['total_wait_ms'], 3)
+        stats['max_wait_ms'] = round(stats['max_wait_ms'], 3)
+        return stats
+
+    def close_all(self):
+        """关闭所有空闲连接（使用中的连接归还时再关闭）"""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def _create_connection(self):
+        logger.debug(f"正在连接数据库: {self._db_config['host']}:{self._db_config['port']}/{self._db_config['database']}")
+        conn = pymysql.connect(**self._db_config)
+        with self._cond:
+            self._stats['created'] += 1
+        logger.debug("数据库连接成功")
+        return conn
+
+    def _is_healthy(self, conn) -> bool:
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception as e:
+            logger.warning(f"连接健康检查失败，丢弃该连接: {e}")
+            with self._cond:
+                self._stats['health_check_failures'] += 1
+            return False
+
+    def _discard(self, conn):
+        """销毁连接并释放名额"""
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._stats['closed'] += 1
+            self._cond.notify()
+
+    def _reclaim_leaked_locked(self):
+        """销毁被垃圾回收的连接并释放名额（调用方需持有锁）"""
+        while self._leaked:
+            conn = self._leaked.popleft()
+            self._size -= 1
+            self._in_use -= 1
+            self._stats['leaked'] += 1
+            self._stats['closed'] += 1
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _evict_idle_locked(self):
+        """淘汰空闲过久的连接（调用方需持有锁）"""
+        now = time.monotonic()
+        # 左端是最早归还的连接
+        while self._idle and now - self._idle[0][1] > self.max_idle_time:
+            conn, _ = self._idle.popleft()
+            self._size -= 1
+            self._stats['evicted_idle'] += 1
+            self._stats['closed'] += 1
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _check_fork(self):
+        """fork 后的子进程不能复用父进程的 socket，重置连接池"""
+        pid = os.getpid()
+        if pid != self._pid:
+            with self._cond:
+                if pid != self._pid:
+                    self._pid = pid
+                    self._idle.clear()
+                    self._leaked.clear()
+                    self._size = 0
+                    self._in_use = 0
+
+
 class DatabaseConnection:
-    """数据库连接管理器"""
-    
-    @staticmethod
-    def get_connection():
-        """获取数据库连接"""
+    """数据库连接管理器（基于连接池）"""
+
+    _pool: Optional[ConnectionPool] = None
+    _pool_lock = threading.Lock()
+
+    @classmethod
+    def get_pool(cls) -> ConnectionPool:
+        """获取进程级连接池单例"""
+        if cls._pool is None:
+            with cls._pool_lock:
+                if cls._pool is None:
+                    cls._pool = ConnectionPool(DATABASE_CONFIG, **DATABASE_POOL_CONFIG)
+                    logger.info(f"数据库连接池已创建: max_size={cls._pool.max_size}")
+        return cls._pool
+
+    @classmethod
+    def get_connection(cls, timeout: Optional[float] = None) -> PooledConnection:
+        """获取数据库连接（调用 close() 归还连接池）"""
         try:
-            logger.debug(f"正在连接数据库: {DATABASE_CONFIG['host']}:{DATABASE_CONFIG['port']}/{DATABASE_CONFIG['database']}")
-            connection = pymysql.connect(**DATABASE_CONFIG)
-            logger.debug("数据库连接成功")
-            return connection
+            return PooledConnection(cls.get_pool(), cls.get_pool().acquire(timeout))
         except Exception as e:
             logger.error(f"数据库连接失败: {str(e)}", exc_info=True)
             raise
-    
-    @staticmethod
+
+    @classmethod
     @contextmanager
-    def get_connection_context():
+    def get_connection_context(cls, timeout: Optional[float] = None):
         """获取数据库连接上下文管理器"""
-        connection = None
+        pool = cls.get_pool()
+        connection = pool.acquire(timeout)
         try:
             logger.debug("开始数据库事务")
-            connection = pymysql.connect(**DATABASE_CONFIG)
             yield connection
             connection.commit()
             logger.debug("数据库事务提交成功")
         except Exception as e:
-            if connection:
+            try:
                 connection.rollback()
                 logger.error("数据库事务回滚", exc_info=True)
+            except Exception:
+                pass
             raise e
         finally:
-            if connection:
-                connection.close()
-                logger.debug("数据库连接已关闭")
+            pool.release(connection)
+            logger.debug("数据库连接已归还连接池")
 
+    @classmethod
+    def get_pool_stats(cls) -> Dict[str, Any]:
+        """获取连接池统计指标"""
+        return cls.get_pool().get_stats()
@@ -0,0 +1,197 @@
+"""本地磁盘缓存（SQLite单文件）：重启后仍可复用的K线/指标和CR分析结果"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+from infrastructure.config.app_config import DISK_CACHE_CONFIG
+from infrastructure.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+_BACKEND_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+def code_version() -> str:
+    """
+    分析代码指纹（domain、application 下全部源码的哈希）
+
+    计入缓存版本，部署了新的策略/插件代码后旧的缓存结果自动失效
+    """
+    digest = hashlib.sha1()
+    for package in ('domain', 'application'):
+        for path in sorted((_BACKEND_DIR / package).rglob('*.py')):
+            digest.update(str(path.relative_to(_BACKEND_DIR)).encode('utf-8'))
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class DiskCache:
+    """
+    本地磁盘缓存（线程安全，多进程共用同一文件）
+
+    每条记录按 (命名空间, 键) 存放一个版本的JSON结果（zlib压缩），版本与内存缓存相同；
+    读取时校验版本和SHA-256摘要，损坏或过期的记录直接删除并视为未命中。
+    总大小超过上限时按最近访问时间淘汰（LRU）。
+    """
+
+    # 命中时最多每隔多少秒刷新一次访问时间，避免每次读取都写库
+    TOUCH_INTERVAL = 60
+
+    def __init__(self, path: str, max_bytes: int = 1024 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.code_version = code_version()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = None
+        self._stats = {'hits': 0, 'misses': 0, 'stale': 0, 'corrupted': 0, 'puts': 0, 'evictions': 0, 'errors': 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        """进程内共用一个连接（调用方需持有锁），fork/spawn 出的子进程各自重新打开"""
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entry (
+                    namespace TEXT NOT NULL,
+                    cache_key TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    checksum TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, cache_key)
+                )
+            """)
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_accessed_at ON cache_entry (accessed_at)')
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def _version_key(self, version) -> str:
+        return f"{self.code_version}|{version!r}"
+
+    def get(self, namespace: str, key: str, version) -> Optional[Any]:
+        """读取缓存，不存在、版本不符或校验失败返回None"""
+        version_key = self._version_key(version)
+        try:
+            with self._lock:
+                conn = self._connection()
+                row = conn.execute(
+                    'SELECT version, payload, checksum, accessed_at FROM cache_entry '
+                    'WHERE namespace = ? AND cache_key = ?', (namespace, key)
+                ).fetchone()
+                if row is None:
+                    self._stats['misses'] += 1
+                    return None
+                stored_version, payload, checksum, accessed_at = row
+                if stored_version != version_key:
+                    self._stats['misses'] += 1
+                    self._stats['stale'] += 1
+                    return None
+                if hashlib.sha256(payload).hexdigest() != checksum:
+                    self._stats['corrupted'] += 1
+                    conn.execute('DELETE FROM cache_entry WHERE namespace = ? AND cache_key = ?', (namespace, key))
+                    logger.warning(f"磁盘缓存记录校验失败，已删除: {namespace} {key}")
+                    return None
+                now = time.time()
+                if now - accessed_at > self.TOUCH_INTERVAL:
+                    conn.execute('UPDATE cache_entry SET accessed_at = ? WHERE namespace = ? AND cache_key = ?',
+                                 (now, namespace, key))
+                self._stats['hits'] += 1
+            return json.loads(zlib.decompress(payload).decode('utf-8'))
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.warning(f"读取磁盘缓存失败，按未命中处理: {namespace} {key}: {e}")
+            return None
+
+    def put(self, namespace: str, key: str, version, value: Any):
+        """写入缓存（覆盖同键的旧版本），超出大小上限时淘汰最久未访问的记录"""
+        try:
+            payload = zlib.compress(json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+            if len(payload) > self.max_bytes:
+                return
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    'REPLACE INTO cache_entry (namespace, cache_key, version, payload, checksum, size, accessed_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (namespace, key, self._version_key(version), payload, hashlib.sha256(payload).hexdigest(),
+                     len(payload), time.time())
+                )
+                self._stats['puts'] += 1
+                self._evict_locked(conn)
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.warning(f"写入磁盘缓存失败: {namespace} {key}: {e}")
+
+    def _evict_locked(self, conn: sqlite3.Connection):
+        """总大小超过上限时，按访问时间从旧到新删除，直到不超过上限的90%"""
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM cache_entry').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        rows = conn.execute('SELECT namespace, cache_key, size FROM cache_entry ORDER BY accessed_at ASC').fetchall()
+        evicted = []
+        for namespace, key, size in rows:
+            if total <= target:
+                break
+            evicted.append((namespace, key))
+            total -= size
+        conn.executemany('DELETE FROM cache_entry WHERE namespace = ? AND cache_key = ?', evicted)
+        self._stats['evictions'] += len(evicted)
+
+    def invalidate(self, namespace: str, key_prefix: str = '') -> int:
+        """删除命名空间下指定前缀的记录（前缀为空表示整个命名空间）"""
+        try:
+            with self._lock:
+                cursor = self._connection().execute(
+                    'DELETE FROM cache_entry WHERE namespace = ? AND substr(cache_key, 1, ?) = ?',
+                    (namespace, len(key_prefix), key_prefix)
+                )
+                return cursor.rowcount
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.warning(f"删除磁盘缓存失败: {namespace} {key_prefix}: {e}")
+            return 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计指标"""
+        stats = dict(self._stats)
+        try:
+            with self._lock:
+                entries, total = self._connection().execute(
+                    'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entry').fetchone()
+            stats.update({'entries': entries, 'bytes': total})
+        except Exception as e:
+            stats['error'] = str(e)
+        stats.update({'path': self.path, 'max_bytes': self.max_bytes, 'code_version': self.code_version})
+        return stats
+
+
+_disk_cache: Optional[DiskCache] = None
+_disk_cache_lock = threading.Lock()
+
+
+def get_disk_cache() -> Optional[DiskCache]:
+    """获取进程内共享的磁盘缓存，未启用时返回None"""
+    global _disk_cache
+    if not DISK_CACHE_CONFIG['enabled']:
+        return None
+    if _disk_cache is None:
+        with _disk_cache_lock:
+            if _disk_cache is None:
+                path = DISK_CACHE_CONFIG['path']
+                if not os.path.isabs(path):
+                    path = str(_BACKEND_DIR.parent / path)
+                _disk_cache = DiskCache(path, DISK_CACHE_CONFIG['max_bytes'])
+                logger.info(f"磁盘缓存已启用: {path}, 上限 {DISK_CACHE_CONFIG['max_bytes']} 字节, "
+                            f"代码版本 {_disk_cache.code_version}")
+    return _disk_cache
@@ -0,0 +1,105 @@
+"""技术指标仓储实现"""
+import json
+from datetime import datetime
+from typing import List, Optional, Dict
+import pymysql.cursors
+from domain.repositories.indicator_repository import IIndicatorRepository
+from domain.models.indicator import IndicatorState, IndicatorPoint
+from infrastructure.persistence.database import DatabaseConnection
+from infrastructure.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class IndicatorRepositoryImpl(IIndicatorRepository):
+    """技术指标仓储实现（表结构见 sql/create_kline_indicator_tables.sql）"""
+
+    BATCH_SIZE = 1000
+
+    def find_state(self, table_name: str, period_type: str) -> Optional[IndicatorState]:
+        """查询增量计算状态"""
+        with DatabaseConnection.get_connection_context() as conn:
+            cursor = conn.cursor(pymysql.cursors.DictCursor)
+            cursor.execute(
+                "SELECT state FROM kline_indicator_state WHERE table_name = %s AND period_type = %s",
+                (table_name, period_type)
+            )
+            row = cursor.fetchone()
+            cursor.close()
+
+        if not row:
+            return None
+        return IndicatorState.from_dict(json.loads(row['state']))
+
+    def save(self, table_name: str, period_type: str, state: IndicatorState,
+             points: List[IndicatorPoint]) -> int:
+        """在同一事务中保存新增的指标值和最新状态"""
+        values_sql = """
+            INSERT INTO kline_indicator (
+                table_name, period_type, shi_jian, ma1, ma2, ma3, dif, dea, macd
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                ma1 = VALUES(ma1), ma2 = VALUES(ma2), ma3 = VALUES(ma3),
+                dif = VALUES(dif), dea = VALUES(dea), macd = VALUES(macd)
+        """
+        state_sql = """
+            INSERT INTO kline_indicator_state (table_name, period_type, last_time, state)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE last_time = VALUES(last_time), state = VALUES(state)
+        """
+
+        rows = []
+        for point in points:
+            ma = (list(point.ma) + [None, None, None])[:3]
+            rows.append((table_name, period_type, point.time, ma[0], ma[1], ma[2],
+                         point.dif, point.dea, point.macd))
+
+        with DatabaseConnection.get_connection_context() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(rows), self.BATCH_SIZE):
+                cursor.executemany(values_sql, rows[start:start + self.BATCH_SIZE])
+            cursor.execute(state_sql, (table_name, period_type, state.last_time,
+                                       json.dumps(state.to_dict())))
+            cursor.close()
+
+        logger.debug(f"保存指标成功: {table_name} {period_type} 新增{len(rows)}条")
+        return len(rows)
+
+    def find_points(self, table_name: str, period_type: str,
+                    start_time: datetime) -> Dict[datetime, IndicatorPoint]:
+        """查询 start_time 及之后的指标值"""
+        with DatabaseConnection.get_connection_context() as conn:
+            cursor = conn.cursor(pymysql.cursors.DictCursor)
+            cursor.execute(
+                """
+                SELECT shi_jian, ma1, ma2, ma3, dif, dea, macd
+                FROM kline_indicator
+                WHERE table_name = %s AND period_type = %s AND shi_jian >= %s
+                ORDER BY shi_jian ASC
+                """,
+                (table_name, period_type, start_time)
+            )
+            results = cursor.fetchall()
+            cursor.close()
+
+        return {
+            row['shi_jian']: IndicatorPoint(
+                time=row['shi_jian'],
+                ma=[row['ma1'], row['ma2'], row['ma3']],
+                dif=row['dif'],
+                dea=row['dea'],
+                macd=row['macd']
+            )
+            for row in results
+        }
+
+    def delete(self, table_name: str, period_type: str) -> None:
+        """删除状态和指标值"""
+        with DatabaseConnection.get_connection_context() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM kline_indicator WHERE table_name = %s AND period_type = %s",
+                           (table_name, period_type))
+            cursor.execute("DELETE FROM kline_indicator_state WHERE table_name = %s AND period_type = %s",
+                           (table_name, period_type))
+            cursor.close()
+        logger.info(f"已删除指标数据: {table_name} {period_type}")
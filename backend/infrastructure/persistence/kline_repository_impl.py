@@ -1,20 +1,30 @@
 """K线数据仓储实现"""
 import pymysql
-from typing import List
+from typing import List, Optional, Dict, Tuple
 from datetime import datetime
 from domain.repositories.kline_repository import IKLineRepository
 from domain.models.kline import KLineData, PeriodInfo
 from infrastructure.persistence.database import DatabaseConnection
+from infrastructure.persistence.kline_storage import (
+    KLINE_STORAGE_CONFIG, get_kline_source, is_unified_layout, stock_code_for_table
+)
 from domain.services.period_service import PeriodService
 
+# K线窗口版本校验和的每行内容（NULL 替换为字面量，避免 CONCAT_WS 跳过 NULL 造成错位）
+_VERSION_ROW_EXPR = "CONCAT_WS('|', " + ', '.join(
+    f"IFNULL({column}, 'NULL')" for column in ('shi_jian', 'kai_pan_jia', 'zui_gao_jia', 'zui_di_jia',
+                                               'shou_pan_jia', 'cheng_jiao_liang', 'liang_bi', 'wei_bi')
+) + ")"
+
 
 class KLineRepositoryImpl(IKLineRepository):
-    """K线数据仓储实现"""
+    """K线数据仓储实现（分表或统一K线表，由 KLINE_STORAGE_CONFIG 决定）"""
     
     def get_kline_data(self, table_name: str, period_type: str, 
                       start_date: datetime, limit: int = 2000) -> List[KLineData]:
         """获取K线数据"""
         period_code = PeriodService.get_period_code(period_type)
+        source = get_kline_source(table_name)
         
         conn = DatabaseConnection.get_connection()
         cursor = conn.cursor(pymysql.cursors.DictCursor)
@@ -23,51 +33,155 @@ class KLineRepositoryImpl(IKLineRepository):
             query = f"""
                 SELECT shi_jian, kai_pan_jia, zui_gao_jia, zui_di_jia, shou_pan_jia, 
                        cheng_jiao_liang, liang_bi, wei_bi
-                FROM {table_name}
-                WHERE peroid_type = %s AND shi_jian >= %s
+                FROM {source.table}
+                {source.where('peroid_type = %s', 'shi_jian >= %s')}
                 ORDER BY shi_jian DESC
                 LIMIT %s
             """
             
-            cursor.execute(query, (period_code, start_date, limit))
+            cursor.execute(query, source.params(period_code, start_date, limit))
             results = cursor.fetchall()
             
             # 反转顺序，从旧到新
             results.reverse()
             
             # 转换为领域模型
-            kline_list = []
-            for row in results:
-                kline = KLineData(
-                    time=row['shi_jian'],
-                    open=float(row['kai_pan_jia']) if row['kai_pan_jia'] else 0,
-                    high=float(row['zui_gao_jia']) if row['zui_gao_jia'] else 0,
-                    low=float(row['zui_di_jia']) if row['zui_di_jia'] else 0,
-                    close=float(row['shou_pan_jia']) if row['shou_pan_jia'] else 0,
-                    volume=int(row['cheng_jiao_liang']) if row['cheng_jiao_liang'] else 0,
-                    liangbi=float(row['liang_bi']) if row['liang_bi'] else 0,
-                    weibi=float(row['wei_bi']) if row['wei_bi'] else 0
-                )
-                kline_list.append(kline)
+            return [self._row_to_kline(row) for row in results]
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def get_kline_data_after(self, table_name: str, period_type: str,
+                             after_time: Optional[datetime] = None) -> List[KLineData]:
+        """获取指定时间之后的全部K线数据（按时间升序），after_time为None时返回全部"""
+        period_code = PeriodService.get_period_code(period_type)
+        source = get_kline_source(table_name)
+        
+        conn = DatabaseConnection.get_connection()
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        
+        try:
+            conditions = ['peroid_type = %s']
+            params = [period_code]
+            if after_time is not None:
+                conditions.append('shi_jian > %s')
+                params.append(after_time)
+            query = f"""
+                SELECT shi_jian, kai_pan_jia, zui_gao_jia, zui_di_jia, shou_pan_jia, 
+                       cheng_jiao_liang, liang_bi, wei_bi
+                FROM {source.table}
+                {source.where(*conditions)}
+                ORDER BY shi_jian ASC
+            """
             
-            return kline_list
+            cursor.execute(query, source.params(*params))
+            return [self._row_to_kline(row) for row in cursor.fetchall()]
         finally:
             cursor.close()
             conn.close()
     
+    def get_kline_data_batch(self, table_names: List[str], period_type: str,
+                             start_date: datetime, end_date: Optional[datetime] = None) -> Dict[str, List[KLineData]]:
+        """
+        获取多只股票同一时间范围的K线数据
+        
+        统一K线表布局下一条SQL完成（stock_code IN (...) 走主键范围扫描，时间条件裁剪分区）；
+        分表布局下逐表查询。
+        """
+        if not table_names:
+            return {}
+        period_code = PeriodService.get_period_code(period_type)
+        conditions = ['peroid_type = %s', 'shi_jian >= %s']
+        params = [period_code, start_date]
+        if end_date is not None:
+            conditions.append('shi_jian <= %s')
+            params.append(end_date)
+        columns = """shi_jian, kai_pan_jia, zui_gao_jia, zui_di_jia, shou_pan_jia, 
+                     cheng_jiao_liang, liang_bi, wei_bi"""
+        
+        result = {table_name: [] for table_name in table_names}
+        with DatabaseConnection.get_connection_context() as conn:
+            cursor = conn.cursor(pymysql.cursors.DictCursor)
+            try:
+                if is_unified_layout():
+                    tables_by_code = {stock_code_for_table(table_name): table_name for table_name in table_names}
+                    cursor.execute(f"""
+                        SELECT stock_code, {columns}
+                        FROM {KLINE_STORAGE_CONFIG['unified_table']}
+                        WHERE stock_code IN ({', '.join(['%s'] * len(tables_by_code))})
+                          AND {' AND '.join(conditions)}
+                        ORDER BY stock_code, shi_jian ASC
+                    """, list(tables_by_code) + params)
+                    for row in cursor.fetchall():
+                        result[tables_by_code[row['stock_code']]].append(self._row_to_kline(row))
+                else:
+                    for table_name in table_names:
+                        cursor.execute(f"""
+                            SELECT {columns}
+                            FROM {table_name}
+                            WHERE {' AND '.join(conditions)}
+                            ORDER BY shi_jian ASC
+                        """, params)
+                        result[table_name] = [self._row_to_kline(row) for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+        return result
+    
+    def get_kline_version(self, table_name: str, period_type: str,
+                          start_date: datetime) -> Optional[Tuple]:
+        """
+        K线窗口版本：数量、首尾时间和窗口内各行内容的校验和（一条聚合查询，走 (peroid_type, shi_jian) 索引范围）
+        
+        校验和覆盖窗口内每根K线的开高低收量、量比、尾比，盘中更新的最后一根和被修复的历史K线都会改变版本
+        """
+        period_code = PeriodService.get_period_code(period_type)
+        source = get_kline_source(table_name)
+        
+        with DatabaseConnection.get_connection_context() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"""
+                    SELECT COUNT(*), MIN(shi_jian), MAX(shi_jian),
+                           BIT_XOR(CRC32({_VERSION_ROW_EXPR})), SUM(CRC32({_VERSION_ROW_EXPR}))
+                    FROM {source.table}
+                    {source.where('peroid_type = %s', 'shi_jian >= %s')}
+                """, source.params(period_code, start_date))
+                bar_count, first_time, last_time, crc_xor, crc_sum = cursor.fetchone()
+                if not bar_count:
+                    return None
+                return (bar_count, first_time, last_time, int(crc_xor), int(crc_sum))
+            finally:
+                cursor.close()
+    
+    @staticmethod
+    def _row_to_kline(row: dict) -> KLineData:
+        """数据库行转换为K线领域模型"""
+        return KLineData(
+            time=row['shi_jian'],
+            open=float(row['kai_pan_jia']) if row['kai_pan_jia'] else 0,
+            high=float(row['zui_gao_jia']) if row['zui_gao_jia'] else 0,
+            low=float(row['zui_di_jia']) if row['zui_di_jia'] else 0,
+            close=float(row['shou_pan_jia']) if row['shou_pan_jia'] else 0,
+            volume=int(row['cheng_jiao_liang']) if row['cheng_jiao_liang'] else 0,
+            liangbi=float(row['liang_bi']) if row['liang_bi'] else 0,
+            weibi=float(row['wei_bi']) if row['wei_bi'] else 0
+        )
+    
     def get_available_periods(self, table_name: str) -> List[PeriodInfo]:
         """获取可用的周期类型"""
+        source = get_kline_source(table_name)
         conn = DatabaseConnection.get_connection()
         cursor = conn.cursor()
         
         try:
             query = f"""
                 SELECT DISTINCT peroid_type, COUNT(*) as count
-                FROM {table_name}
+                FROM {source.table}
+                {source.where()}
                 GROUP BY peroid_type
             """
             
-            cursor.execute(query)
+            cursor.execute(query, source.params() or None)
             results = cursor.fetchall()
             
             # 转换为领域模型
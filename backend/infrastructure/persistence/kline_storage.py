@@ -0,0 +1,135 @@
+"""K线存储布局：按配置在 basic_data_<code> 分表和统一K线表之间切换"""
+from typing import List, Optional
+from infrastructure.config.app_config import KLINE_STORAGE_CONFIG
+
+# 分表与统一表共有的K线列（统一表另有 stock_code）
+KLINE_COLUMNS = ['peroid_type', 'shi_jian', 'kai_pan_jia', 'zui_gao_jia', 'zui_di_jia', 'shou_pan_jia',
+                 'cheng_jiao_liang', 'liang_bi', 'wei_bi', 'shang_yu_bi']
+
+
+def is_unified_layout() -> bool:
+    """是否使用统一K线表"""
+    return KLINE_STORAGE_CONFIG['layout'] == 'unified'
+
+
+def stock_code_for_table(table_name: str) -> str:
+    """分表表名 -> 股票代码（basic_data_sz300188 -> SZ300188）"""
+    prefix = KLINE_STORAGE_CONFIG['table_prefix']
+    if table_name.startswith(prefix):
+        return table_name[len(prefix):].upper()
+    return table_name.upper()
+
+
+class KLineSource:
+    """
+    一只股票K线的查询来源
+    
+    调用方仍以分表表名标识股票，SQL中用 table 代替表名、where() 拼接条件、params() 拼接参数：
+    分表布局下与原SQL完全相同；统一表布局下自动加上 stock_code 条件（主键前缀）。
+    """
+    
+    def __init__(self, table: str, stock_code: Optional[str] = None):
+        self.table = table
+        self.stock_code = stock_code
+    
+    def where(self, *conditions: str) -> str:
+        """WHERE 子句（没有任何条件时返回空串）"""
+        clauses = (['stock_code = %s'] if self.stock_code else []) + list(conditions)
+        return f"WHERE {' AND '.join(clauses)}" if clauses else ''
+    
+    def params(self, *values) -> List:
+        """与 where() 对应的参数"""
+        return ([self.stock_code] if self.stock_code else []) + list(values)
+
+
+def get_kline_source(table_name: str) -> KLineSource:
+    """按配置的存储布局获取股票的K线查询来源"""
+    if is_unified_layout():
+        return KLineSource(KLINE_STORAGE_CONFIG['unified_table'], stock_code_for_table(table_name))
+    return KLineSource(table_name)
+
+
+def copy_table_to_unified(conn, table_name: str, period_code: Optional[str] = None,
+                          incremental: bool = True) -> int:
+    """
+    在数据库内把一张分表的K线复制到统一K线表（INSERT ... SELECT，数据不经过客户端）
+    
+    Args:
+        conn: 数据库连接（调用方负责提交）
+        table_name: 分表表名
+        period_code: 只复制指定周期代码（None表示全部周期）
+        incremental: 每个周期只复制统一表中已有最大时间及之后的K线（最后一根可能是盘中未走完的，
+                     需要覆盖）；False时整表覆盖
+        
+    Returns:
+        受影响的行数（MySQL口径：新插入计1，更新计2）
+    """
+    unified_table = KLINE_STORAGE_CONFIG['unified_table']
+    stock_code = stock_code_for_table(table_name)
+    cursor = conn.cursor()
+    
+    try:
+        latest = {}
+        if incremental:
+            cursor.execute(f"""
+                SELECT peroid_type, MAX(shi_jian)
+                FROM {unified_table}
+                WHERE stock_code = %s
+                GROUP BY peroid_type
+            """, (stock_code,))
+            latest = {row[0]: row[1] for row in cursor.fetchall()}
+            if period_code:
+                latest = {code: value for code, value in latest.items() if code == period_code}
+        
+        # 每个已有周期从最大时间开始复制；其余周期（或全量时）整段复制
+        batches = [(["peroid_type = %s", "shi_jian >= %s"], [code, value]) for code, value in latest.items()]
+        rest_conditions, rest_params = [], []
+        if period_code:
+            if period_code not in latest:
+                batches.append((["peroid_type = %s"], [period_code]))
+        else:
+            if latest:
+                rest_conditions.append(f"peroid_type NOT IN ({', '.join(['%s'] * len(latest))})")
+                rest_params.extend(latest)
+            batches.append((rest_conditions, rest_params))
+        
+        affected = 0
+        for conditions, params in batches:
+            cursor.execute(f"""
+                INSERT INTO {unified_table} (stock_code, {', '.join(KLINE_COLUMNS)})
+                SELECT %s, {', '.join(KLINE_COLUMNS)}
+                FROM {table_name}
+                {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+                ON DUPLICATE KEY UPDATE
+                    {', '.join(f'{column} = VALUES({column})' for column in KLINE_COLUMNS[2:])}
+            """, [stock_code] + params)
+            affected += cursor.rowcount
+        return affected
+    finally:
+        cursor.close()
+
+
+def replace_unified_range(conn, table_name: str, period_code: str, start, end) -> int:
+    """
+    用分表 [start, end) 区间的K线替换统一表中的同一区间（历史K线被修正时使用，调用方负责提交）
+    
+    Returns:
+        复制的行数
+    """
+    unified_table = KLINE_STORAGE_CONFIG['unified_table']
+    stock_code = stock_code_for_table(table_name)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"""
+            DELETE FROM {unified_table}
+            WHERE stock_code = %s AND peroid_type = %s AND shi_jian >= %s AND shi_jian < %s
+        """, (stock_code, period_code, start, end))
+        cursor.execute(f"""
+            INSERT INTO {unified_table} (stock_code, {', '.join(KLINE_COLUMNS)})
+            SELECT %s, {', '.join(KLINE_COLUMNS)}
+            FROM {table_name}
+            WHERE peroid_type = %s AND shi_jian >= %s AND shi_jian < %s
+        """, (stock_code, period_code, start, end))
+        return cursor.rowcount
+    finally:
+        cursor.close()
@@ -0,0 +1,125 @@
+"""股票分析数据仓储实现（本地K线计算）"""
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional
+from domain.repositories.stock_analysis_repository import IStockAnalysisRepository
+from domain.repositories.kline_repository import IKLineRepository
+from domain.models.kline import StockAnalysis
+from domain.services.support_pressure_algorithm import SupportPressureAlgorithm
+from infrastructure.config.api_config import STOCK_ANALYSIS_CONFIG
+from infrastructure.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class AnalysisResultCache:
+    """
+    本地分析结果缓存（LRU，线程安全）
+
+    键为 (股票代码, 周期)，值带最新K线版本（时间和开高低收量）；盘中最新K线被更新或出现新K线后旧结果自动失效
+    """
+
+    def __init__(self, max_size: int = 1000):
+        self.max_size = max_size
+        self._data: 'OrderedDict[tuple, tuple]' = OrderedDict()  # {(股票代码, 周期): (最新K线版本, 分析结果)}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, stock_code: str, period: str, last_bar: tuple) -> Optional[StockAnalysis]:
+        """获取缓存结果，不存在或最新K线已变化返回None"""
+        key = (stock_code, period)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] != last_bar:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, stock_code: str, period: str, last_bar: tuple, analysis: StockAnalysis):
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        key = (stock_code, period)
+        with self._lock:
+            self._data[key] = (last_bar, analysis)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+
+class LocalStockAnalysisRepositoryImpl(IStockAnalysisRepository):
+    """股票分析数据仓储实现（基于本地K线和 SupportPressureAlgorithm，不依赖外部API）"""
+
+    PERIODS = ['30min', 'day', 'week', 'month']
+
+    # 取最近N根K线时使用的起始时间（足够早，只靠 limit 截取）
+    EARLIEST_DATE = datetime(1990, 1, 1)
+
+    def __init__(self, kline_repository: IKLineRepository, cache: Optional[AnalysisResultCache] = None):
+        """
+        Args:
+            kline_repository: K线仓储
+            cache: 结果缓存（可选，不传则按配置创建）
+        """
+        self.kline_repository = kline_repository
+        self.algorithm = SupportPressureAlgorithm()
+        self.kline_limit = STOCK_ANALYSIS_CONFIG['kline_limit']
+        self.cache = cache or AnalysisResultCache(STOCK_ANALYSIS_CONFIG['cache_size'])
+
+    def get_stock_analysis(self, stock_code: str) -> Dict[str, StockAnalysis]:
+        """获取股票分析数据（各周期单独计算，某个周期失败时返回空数据）"""
+        table_name = self._resolve_table_name(stock_code)
+
+        result = {}
+        for period in self.PERIODS:
+            try:
+                result[period] = self._analyze_period(stock_code, table_name, period)
+            except Exception as e:
+                logger.error(f"本地计算股票分析失败: {stock_code} {period}, 错误={str(e)}", exc_info=True)
+                result[period] = StockAnalysis()
+        return result
+
+    def _analyze_period(self, stock_code: str, table_name: str, period: str) -> StockAnalysis:
+        """计算单个周期的益损比、支撑线、压力线"""
+        klines = self.kline_repository.get_kline_data(
+            table_name=table_name,
+            period_type=period,
+            start_date=self.EARLIEST_DATE,
+            limit=self.kline_limit
+        )
+        if not klines:
+            logger.debug(f"{stock_code} {period} 无K线数据")
+            return StockAnalysis()
+
+        # 最新K线盘中会被更新（时间不变），按时间和开高低收量判断结果是否仍有效
+        last = klines[-1]
+        last_bar = (last.time, last.open, last.high, last.low, last.close, last.volume)
+        cached = self.cache.get(stock_code, period, last_bar)
+        if cached is not None:
+            return cached
+
+        # 算法要求按时间倒序（最新在前）
+        klines.reverse()
+        lines = self.algorithm.calculate_support_pressure_lines(klines, period)
+        win_lose_ratio = self.algorithm.calculate_win_lose_ratio(lines.support, lines.pressure, klines[0].close)
+
+        analysis = StockAnalysis(
+            win_lose_ratio=win_lose_ratio,
+            support_price=round(lines.support, 2) if lines.support else 0,
+            pressure_price=round(lines.pressure, 2) if lines.pressure else 0
+        )
+        self.cache.put(stock_code, period, last_bar, analysis)
+        logger.info(f"本地计算股票分析: {stock_code} {period} 益损比={win_lose_ratio}, "
+                    f"支撑线={lines.support}, 压力线={lines.pressure}")
+        return analysis
+
+    def _resolve_table_name(self, stock_code: str) -> str:
+        """股票代码转换为K线表名：优先使用股票配置，未配置的按 basic_data_<代码小写> 约定"""
+        try:
+            from infrastructure.config.stock_registry import get_stock_registry
+            return get_stock_registry().table_name(stock_code)
+        except Exception as e:
+            logger.warning(f"加载股票配置失败，使用默认表名规则: {str(e)}")
+            return f"basic_data_{stock_code.lower()}"
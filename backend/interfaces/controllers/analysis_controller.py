@@ -2,6 +2,9 @@
 from flask import jsonify, request
 from application.services.analysis_service import AnalysisApplicationService
 from infrastructure.external_apis.stock_analysis_repository_impl import StockAnalysisRepositoryImpl
+from infrastructure.persistence.local_stock_analysis_repository_impl import LocalStockAnalysisRepositoryImpl
+from infrastructure.persistence.kline_repository_impl import KLineRepositoryImpl
+from infrastructure.config.api_config import STOCK_ANALYSIS_CONFIG
 from interfaces.dto.response import ResponseBuilder
 from infrastructure.logging.logger import get_api_logger
 
@@ -12,7 +15,12 @@ class AnalysisController:
     """股票分析控制器"""
     
     def __init__(self):
-        analysis_repository = StockAnalysisRepositoryImpl()
+        # 数据来源可配置：local 为本地K线计算（默认），remote 为外部API
+        if STOCK_ANALYSIS_CONFIG['mode'] == 'remote':
+            analysis_repository = StockAnalysisRepositoryImpl()
+        else:
+            analysis_repository = LocalStockAnalysisRepositoryImpl(KLineRepositoryImpl())
+        logger.info(f"股票分析数据来源: {STOCK_ANALYSIS_CONFIG['mode']}")
         self.analysis_service = AnalysisApplicationService(analysis_repository)
     
     def get_stock_analysis(self):
@@ -1,7 +1,9 @@
 """回测控制器"""
-from flask import request, jsonify
+import json
+from flask import request, jsonify, Response, stream_with_context
 from typing import Dict, Any
 from application.services.backtest_service import BacktestService
+from application.services.batch_backtest_service import BatchBacktestService
 from interfaces.dto.response import ResponseBuilder
 from infrastructure.logging.logger import get_logger
 
@@ -13,6 +15,7 @@ class BacktestController:
     
     def __init__(self):
         self.backtest_service = BacktestService()
+        self.batch_backtest_service = BatchBacktestService()
     
     def run_backtest(self):
         """
@@ -60,3 +63,57 @@ class BacktestController:
             logger.error(f"执行回测失败: {e}", exc_info=True)
             return jsonify(ResponseBuilder.error(f'执行回测失败: {str(e)}')), 500
 
+    
+    def run_batch_backtest(self):
+        """
+        批量回测（服务端并行执行CR分析和回测，流式返回）
+        
+        请求参数:
+            stocks: 股票列表 [{code, name, table_name}]（与group二选一）
+            group: 股票分组名，'all' 表示全部分组
+            limit: 最多回测的股票数量（可选）
+            period: 分析周期（默认day）
+            format: 返回格式 ndjson（默认）或 sse
+        
+        返回:
+            每完成一只股票输出一条 {event: 'result', ...}，最后输出 {event: 'summary', ...}
+        """
+        try:
+            data = request.get_json() or {}
+            stream_format = data.get('format', 'ndjson')
+            if stream_format not in ('ndjson', 'sse'):
+                return jsonify(ResponseBuilder.error('format只支持ndjson或sse')), 400
+            
+            limit = int(data['limit']) if data.get('limit') else None
+            stocks = self.batch_backtest_service.resolve_stocks(
+                stocks=data.get('stocks'), group=data.get('group'), limit=limit
+            )
+            if not stocks:
+                return jsonify(ResponseBuilder.error('股票列表为空')), 400
+        except ValueError as e:
+            return jsonify(ResponseBuilder.error(str(e))), 400
+        except Exception as e:
+            logger.error(f"批量回测参数解析失败: {e}", exc_info=True)
+            return jsonify(ResponseBuilder.error(f'批量回测失败: {str(e)}')), 500
+        
+        period = data.get('period')
+        logger.info(f"开始批量回测: {len(stocks)}只股票, 格式:{stream_format}")
+        
+        def generate():
+            try:
+                for event in self.batch_backtest_service.run(stocks, period):
+                    payload = json.dumps(event, ensure_ascii=False, default=str)
+                    if stream_format == 'sse':
+                        yield f"event: {event['event']}\ndata: {payload}\n\n"
+                    else:
+                        yield payload + '\n'
+            except Exception as e:
+                logger.error(f"批量回测失败: {e}", exc_info=True)
+                payload = json.dumps({'event': 'error', 'message': str(e)}, ensure_ascii=False)
+                yield f"event: error\ndata: {payload}\n\n" if stream_format == 'sse' else payload + '\n'
+        
+        mimetype = 'text/event-stream' if stream_format == 'sse' else 'application/x-ndjson'
+        response = Response(stream_with_context(generate()), mimetype=mimetype)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
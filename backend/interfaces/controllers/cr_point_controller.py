@@ -3,9 +3,12 @@ from flask import request, jsonify
 from typing import Dict, Any
 from application.services.cr_point_service import CRPointService
 from application.services.kline_service import KLineApplicationService
+from application.services.indicator_service import IndicatorApplicationService
 from infrastructure.persistence.kline_repository_impl import KLineRepositoryImpl
+from infrastructure.persistence.indicator_repository_impl import IndicatorRepositoryImpl
 from infrastructure.persistence.daily_chance_repository_impl import DailyChanceRepositoryImpl
 from interfaces.dto.response import ResponseBuilder
+from interfaces.dto.cr_result_columnar import to_columnar, COLUMNAR_FORMAT
 from infrastructure.logging.logger import get_logger
 
 logger = get_logger(__name__)
@@ -15,10 +18,11 @@ class CRPointController:
     """CR点控制器"""
     
     def __init__(self):
-        self.cr_service = CRPointService()
         kline_repository = KLineRepositoryImpl()
-        self.kline_service = KLineApplicationService(kline_repository)
+        indicator_service = IndicatorApplicationService(kline_repository, IndicatorRepositoryImpl())
+        self.kline_service = KLineApplicationService(kline_repository, indicator_service)
         self.daily_chance_repo = DailyChanceRepositoryImpl()
+        self.cr_service = CRPointService(self.kline_service, self.daily_chance_repo)
     
     def analyze_cr_points(self):
         """
@@ -29,6 +33,7 @@ class CRPointController:
             stock_name: 股票名称
             table_name: K线数据表名
             period: 周期类型（day/week/month等）
+            format: 返回格式，rows（默认）或 columnar（列式，见 interfaces/dto/cr_result_columnar.py）
         
         返回:
             CR点分析结果
@@ -39,6 +44,7 @@ class CRPointController:
             stock_name = data.get('stockName', '')
             table_name = data.get('tableName')
             period = data.get('period', 'day')
+            response_format = data.get('format', 'rows')
             
             if not stock_code:
                 return jsonify(ResponseBuilder.error('股票代码不能为空')), 400
@@ -46,77 +52,19 @@ class CRPointController:
             if not table_name:
                 return jsonify(ResponseBuilder.error('表名不能为空')), 400
             
+            if response_format not in ('rows', COLUMNAR_FORMAT):
+                return jsonify(ResponseBuilder.error('format只支持rows或columnar')), 400
+            
             logger.info(f"开始分析CR点: {stock_code} {stock_name} 表:{table_name} 周期:{period}")
             
-            # 获取K线数据及技术指标
-            result = self.kline_service.get_kline_data(table_name, period)
-            kline_data_list = result.get('kline_data', [])
-            macd_data = result.get('macd', {})
-            ma_data = result.get('ma', {})
+            # 获取K线数据、技术指标并实时分析CR点（不保存）
+            cr_result = self.cr_service.analyze_stock(stock_code, stock_name, table_name, period)
             
-            if not kline_data_list:
+            if cr_result is None:
                 return jsonify(ResponseBuilder.error('K线数据为空')), 404
             
-            # 转换为KLineData对象
-            from domain.models.kline import KLineData
-            from datetime import datetime
-            
-            kline_objects = []
-            for kline in kline_data_list:
-                kline_obj = KLineData(
-                    time=datetime.strptime(kline['time'], '%Y-%m-%d %H:%M:%S'),
-                    open=kline['open'],
-                    high=kline['high'],
-                    low=kline['low'],
-                    close=kline['close'],
-                    volume=kline['volume'],
-                    liangbi=kline.get('liangbi', 0),
-                    weibi=kline.get('weibi', 0)
-                )
-                kline_objects.append(kline_obj)
-            
-            # 加载成交量类型和多头组合（用于策略2）
-            # 注意：所有周期都加载，因为策略2需要根据日期匹配成交量数据
-            volume_types = {}
-            bullish_patterns = {}
-            
-            if kline_data_list:
-                try:
-                    start_date = kline_data_list[0]['time'].split(' ')[0]
-                    end_date = kline_data_list[-1]['time'].split(' ')[0]
-                    
-                    # 使用正确的方法名：find_by_stock_code
-                    daily_chances = self.daily_chance_repo.find_by_stock_code(
-                        stock_code, start_date, end_date
-                    )
-                    
-                    for dc in daily_chances:
-                        date_str = dc.date.strftime('%Y-%m-%d')
-                        if dc.volume_type:
-                            volume_types[date_str] = dc.volume_type
-                        if dc.bullish_pattern:
-                            bullish_patterns[date_str] = dc.bullish_pattern
-                    
-                    logger.info(f"[策略2] 加载数据成功(周期:{period}): 成交量{len(volume_types)}个, 多头组合{len(bullish_patterns)}个")
-                except Exception as e:
-                    logger.error(f"[策略2] 加载数据失败: {e}", exc_info=True)
-            
-            # 实时分析CR点（不保存）
-            cr_result = self.cr_service.analyze_cr_points(
-                stock_code, 
-                stock_name, 
-                kline_objects,
-                ma_data=ma_data,
-                macd_data=macd_data,
-                volume_types=volume_types,
-                bullish_patterns=bullish_patterns
-            )
-            
-            # 将MACD和MA数据添加到返回结果中
-            cr_result['macd'] = macd_data
-            cr_result['ma'] = ma_data
-            
-            return jsonify(ResponseBuilder.success(cr_result, f'CR点实时分析完成，发现C点{cr_result["c_points_count"]}个，R点{cr_result["r_points_count"]}个')), 200
+            payload = to_columnar(cr_result) if response_format == COLUMNAR_FORMAT else cr_result
+            return jsonify(ResponseBuilder.success(payload, f'CR点实时分析完成，发现C点{cr_result["c_points_count"]}个，R点{cr_result["r_points_count"]}个')), 200
             
         except Exception as e:
             logger.error(f"分析CR点失败: {e}", exc_info=True)
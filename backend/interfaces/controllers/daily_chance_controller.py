@@ -27,6 +27,9 @@ class DailyChanceController:
                 'success_count': result['success_count'],
                 'failed_count': len(result['failed_stocks']),
                 'total_saved': result['total_saved'],
+                'total_inserted': result['total_inserted'],
+                'total_updated': result['total_updated'],
+                'total_skipped': result['total_skipped'],
                 'failed_stocks': result['failed_stocks']
             }, "同步完成")
             
@@ -43,29 +46,21 @@ class DailyChanceController:
             if not stock_code:
                 return ResponseBuilder.error("缺少参数: stockCode", code=400)
             
-            # 从股票分组中查找股票信息
-            from domain.models.stock import StockGroups
-            stock_groups = StockGroups()
-            all_groups = stock_groups.get_all_groups()
+            # 从股票注册表中查找股票信息
+            from infrastructure.config.stock_registry import get_stock_registry
+            stock_info = get_stock_registry().get(stock_code)
+            stock_name = stock_info.name if stock_info else stock_code
+            stock_nature = stock_info.group if stock_info else ''
             
-            stock_name = stock_code
-            stock_nature = ''
-            
-            for nature, stocks in all_groups.items():
-                for stock in stocks:
-                    if stock.code == stock_code:
-                        stock_name = stock.name
-                        stock_nature = nature
-                        break
-                if stock_nature:
-                    break
-            
-            saved_count = self.service.sync_stock_daily_chance(stock_code, stock_name, stock_nature)
+            stats = self.service.sync_stock_with_stats(stock_code, stock_name, stock_nature)
             
             return ResponseBuilder.success({
                 'stock_code': stock_code,
-                'saved_count': saved_count
-            }, f"同步完成，保存 {saved_count} 条记录")
+                'saved_count': stats['saved'],
+                'inserted_count': stats['inserted'],
+                'updated_count': stats['updated'],
+                'skipped_count': stats['skipped']
+            }, f"同步完成，新增 {stats['inserted']} 条，更新 {stats['updated']} 条，未变化 {stats['skipped']} 条")
             
         except Exception as e:
             logger.error(f"同步失败: {str(e)}", exc_info=True)
@@ -1,7 +1,9 @@
 """K线数据控制器"""
 from flask import jsonify, request
 from application.services.kline_service import KLineApplicationService
+from application.services.indicator_service import IndicatorApplicationService
 from infrastructure.persistence.kline_repository_impl import KLineRepositoryImpl
+from infrastructure.persistence.indicator_repository_impl import IndicatorRepositoryImpl
 from interfaces.dto.response import ResponseBuilder
 from infrastructure.logging.logger import get_api_logger
 
@@ -13,7 +15,8 @@ class KLineController:
     
     def __init__(self):
         kline_repository = KLineRepositoryImpl()
-        self.kline_service = KLineApplicationService(kline_repository)
+        indicator_service = IndicatorApplicationService(kline_repository, IndicatorRepositoryImpl())
+        self.kline_service = KLineApplicationService(kline_repository, indicator_service)
     
     def get_available_periods(self):
         """获取股票可用的周期类型"""
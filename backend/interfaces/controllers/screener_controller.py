@@ -0,0 +1,64 @@
+"""信号筛选控制器"""
+from datetime import datetime
+from flask import request, jsonify
+from application.services.screener_service import ScreenerService
+from interfaces.dto.response import ResponseBuilder
+from infrastructure.logging.logger import get_api_logger
+
+logger = get_api_logger()
+
+
+class ScreenerController:
+    """信号筛选控制器"""
+    
+    def __init__(self):
+        self.screener_service = ScreenerService()
+    
+    def list_signals(self):
+        """获取可筛选的信号列表"""
+        return jsonify(ResponseBuilder.success(self.screener_service.list_signals()))
+    
+    def scan(self):
+        """
+        信号筛选
+        
+        请求参数:
+            signals: 信号键列表
+            startDate: 开始日期（默认今天）
+            endDate: 结束日期（默认今天）
+            universe: 股票范围 database/config/group/codes（可选）
+            group: 股票分组名（universe为group时）
+            codes: 股票代码列表（universe为codes时）
+            period: 策略信号的分析周期（默认day）
+            top: 最多返回的排序结果数（默认100）
+        
+        返回:
+            {ranked, hits_count, scanned, errors, elapsed}
+        """
+        try:
+            data = request.get_json() or {}
+            today = datetime.now().strftime('%Y-%m-%d')
+            end_date = data.get('endDate') or today
+            start_date = data.get('startDate') or end_date
+            for date_str in (start_date, end_date):
+                datetime.strptime(date_str, '%Y-%m-%d')
+            
+            stocks = self.screener_service.resolve_universe(
+                data.get('universe'), data.get('group'), data.get('codes')
+            )
+            if not stocks:
+                return jsonify(ResponseBuilder.error('股票列表为空', 400)), 400
+            
+            logger.info(f"收到请求: 信号筛选 {data.get('signals')} {start_date} 至 {end_date}, {len(stocks)}只股票")
+            result = self.screener_service.scan(
+                stocks, data.get('signals') or [], start_date, end_date,
+                period=data.get('period', 'day'), top=int(data.get('top', 100)) or None
+            )
+            return jsonify(ResponseBuilder.success(
+                result, f"筛选完成，命中{len(result['ranked'])}个股票交易日"
+            )), 200
+        except ValueError as e:
+            return jsonify(ResponseBuilder.error(str(e), 400)), 400
+        except Exception as e:
+            logger.error(f"信号筛选失败: {e}", exc_info=True)
+            return jsonify(ResponseBuilder.error(f'信号筛选失败: {str(e)}')), 500
@@ -0,0 +1,139 @@
+"""CR点分析结果的列式响应格式（可选，请求参数 format=columnar）
+
+默认格式中逐K线评分是 {日期: {字段: 值}} 的嵌套字典，插件结果字典和较长的中文原因逐K线重复。
+列式格式把每组数据转换为按字段的并行数组，字符串和插件结果各存一张去重表，数组中只放下标：
+
+    {
+        'format': 'columnar',
+        'c_points_count': ..., （各计数字段与默认格式相同）
+        'strings': [字符串表],
+        'plugins': [插件结果表（去重后的插件字典）],
+        'c_points' / 'r_points' / 'rejected_c_points' / 'strategy2_c_points': {字段: [值]}，
+            字符串字段为字符串表下标，plugins 为插件结果表下标列表,
+        'strategy1_scores': {'dates': [日期], 'score': [...], 'base_score': [...], 'plugins': [[下标]], ...},
+        'strategy2_scores': {'dates': [日期], 'score': [...], 'reason': [字符串表下标], 'triggered': [...]},
+        'macd' / 'ma': 与默认格式相同（本身即为数组）
+    }
+
+from_columnar 可还原为默认格式（用于校验和Python客户端）。
+"""
+from typing import Any, Dict, List
+
+COLUMNAR_FORMAT = 'columnar'
+
+# CRPoint.to_dict 的字段（字符串字段按字符串表编码）
+_POINT_FIELDS = ('id', 'stockCode', 'stockName', 'pointType', 'triggerDate', 'triggerPrice', 'openPrice',
+                 'highPrice', 'lowPrice', 'closePrice', 'volume', 'aValue', 'bValue', 'cValue', 'score',
+                 'strategyName', 'plugins', 'createdAt')
+_POINT_STRING_FIELDS = ('stockCode', 'stockName', 'pointType', 'strategyName')
+_POINT_LISTS = ('c_points', 'r_points', 'rejected_c_points', 'strategy2_c_points')
+_STRATEGY1_FIELDS = ('score', 'base_score', 'plugins', 'is_c_point', 'is_rejected')
+_STRATEGY2_FIELDS = ('score', 'reason', 'triggered')
+_STRATEGY2_STRING_FIELDS = ('reason',)
+
+
+class _Interner:
+    """去重表：相同的值只保存一次，返回下标"""
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self._index: Dict[Any, int] = {}
+
+    def add(self, value: Any, key: Any = None) -> int:
+        key = value if key is None else key
+        index = self._index.get(key)
+        if index is None:
+            index = self._index[key] = len(self.values)
+            self.values.append(value)
+        return index
+
+
+def _plugin_key(plugin: Dict[str, Any]) -> tuple:
+    # 0、0.0、False 相等且哈希相同，键中带上值的类型，避免不同类型的插件结果被合并
+    return tuple((k, type(v).__name__, v) for k, v in plugin.items())
+
+
+def _encode_rows(rows: List[Dict[str, Any]], fields: tuple, string_fields: tuple,
+                 strings: _Interner, plugins: _Interner) -> Dict[str, List[Any]]:
+    columns: Dict[str, List[Any]] = {name: [] for name in fields}
+    for row in rows:
+        for name in fields:
+            value = row[name]
+            if name in string_fields and value is not None:
+                value = strings.add(value)
+            elif name == 'plugins':
+                value = [plugins.add(p, _plugin_key(p)) for p in value]
+            columns[name].append(value)
+    return columns
+
+
+def _decode_rows(columns: Dict[str, List[Any]], fields: tuple, string_fields: tuple,
+                 strings: List[str], plugins: List[Dict[str, Any]], size: int) -> List[Dict[str, Any]]:
+    rows = []
+    for i in range(size):
+        row = {}
+        for name in fields:
+            value = columns[name][i]
+            if name in string_fields and value is not None:
+                value = strings[value]
+            elif name == 'plugins':
+                value = [dict(plugins[index]) for index in value]
+            row[name] = value
+        rows.append(row)
+    return rows
+
+
+def to_columnar(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    默认格式的分析结果转换为列式格式（不修改传入的结果，可直接用于缓存中的共享对象）
+
+    Args:
+        result: CRPointService.analyze_stock 的返回值
+
+    Returns:
+        列式格式的结果
+    """
+    strings, plugins = _Interner(), _Interner()
+    payload: Dict[str, Any] = {'format': COLUMNAR_FORMAT}
+    for name, value in result.items():
+        if name.endswith('_count'):
+            payload[name] = value
+
+    for name in _POINT_LISTS:
+        payload[name] = _encode_rows(result.get(name, []), _POINT_FIELDS, _POINT_STRING_FIELDS, strings, plugins)
+
+    for name, fields, string_fields in (('strategy1_scores', _STRATEGY1_FIELDS, ()),
+                                        ('strategy2_scores', _STRATEGY2_FIELDS, _STRATEGY2_STRING_FIELDS)):
+        scores = result.get(name, {})
+        payload[name] = _encode_rows(list(scores.values()), fields, string_fields, strings, plugins)
+        payload[name]['dates'] = list(scores.keys())
+
+    for name in ('macd', 'ma'):
+        if name in result:
+            payload[name] = result[name]
+
+    payload['strings'] = strings.values
+    payload['plugins'] = plugins.values
+    return payload
+
+
+def from_columnar(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """列式格式还原为默认格式"""
+    strings, plugins = payload['strings'], payload['plugins']
+    result: Dict[str, Any] = {name: value for name, value in payload.items() if name.endswith('_count')}
+
+    for name in _POINT_LISTS:
+        columns = payload[name]
+        result[name] = _decode_rows(columns, _POINT_FIELDS, _POINT_STRING_FIELDS, strings, plugins,
+                                    len(columns['triggerDate']))
+
+    for name, fields, string_fields in (('strategy1_scores', _STRATEGY1_FIELDS, ()),
+                                        ('strategy2_scores', _STRATEGY2_FIELDS, _STRATEGY2_STRING_FIELDS)):
+        columns = payload[name]
+        rows = _decode_rows(columns, fields, string_fields, strings, plugins, len(columns['dates']))
+        result[name] = dict(zip(columns['dates'], rows))
+
+    for name in ('macd', 'ma'):
+        if name in payload:
+            result[name] = payload[name]
+    return result
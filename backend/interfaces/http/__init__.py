@@ -0,0 +1 @@
+"""HTTP响应编码模块"""
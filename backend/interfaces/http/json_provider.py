@@ -0,0 +1,60 @@
+"""Flask集成：更快的JSON响应序列化和 /api/* 响应压缩"""
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from infrastructure.config.app_config import API_RESPONSE_CONFIG
+from interfaces.http.response_encoding import encode_json, negotiate_encoding, compress_body
+
+# 可压缩的响应类型（流式响应无论类型都不压缩）
+_COMPRESSIBLE_MIMETYPES = ('application/json', 'text/plain', 'text/html', 'text/csv')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    jsonify 使用的JSON序列化
+
+    已安装orjson时使用orjson，否则为标准库；始终输出紧凑格式，中文不转义，不排序键
+    （调试模式下也不缩进）。日期时间等类型仍由 DefaultJSONProvider.default 转换，输出格式不变。
+    """
+
+    ensure_ascii = False
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs:
+            # 指定了 indent 等参数时使用标准库
+            return super().dumps(obj, **kwargs)
+        return encode_json(obj, self.default).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(encode_json(obj, self.default) + b'\n', mimetype=self.mimetype)
+
+
+def register_response_compression(app):
+    """
+    按 Accept-Encoding 压缩 /api/* 的响应（br 或 gzip）
+
+    流式响应（批量回测的NDJSON/SSE）、已编码的响应和小于 min_compress_bytes 的响应不压缩。
+    """
+    if not API_RESPONSE_CONFIG['compression']:
+        return
+
+    @app.after_request
+    def compress_api_response(response):
+        if not request.path.startswith('/api/'):
+            return response
+        response.vary.add('Accept-Encoding')
+        if response.direct_passthrough or response.is_streamed or 'Content-Encoding' in response.headers \
+                or response.status_code in (204, 304) or response.status_code < 200 \
+                or response.mimetype not in _COMPRESSIBLE_MIMETYPES:
+            return response
+
+        encoding = negotiate_encoding(request.headers.get('Accept-Encoding'))
+        if encoding is None:
+            return response
+        body = response.get_data()
+        if len(body) < API_RESPONSE_CONFIG['min_compress_bytes']:
+            return response
+        response.set_data(compress_body(body, encoding))
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,87 @@
+"""API响应编码 - JSON序列化和压缩协商（不依赖Flask，Flask集成见 json_provider）"""
+import gzip
+import json
+from typing import Any, Callable, Optional
+from infrastructure.config.app_config import API_RESPONSE_CONFIG
+
+# 可选依赖：orjson（更快的JSON序列化）、brotli（br压缩），未安装时分别回退为标准库json和gzip
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def get_json_engine() -> str:
+    """当前使用的JSON序列化实现：'orjson' 或 'stdlib'"""
+    if orjson is not None and API_RESPONSE_CONFIG['json_encoder'] == 'auto':
+        return 'orjson'
+    return 'stdlib'
+
+
+def encode_json(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    序列化为紧凑的UTF-8 JSON（中文不转义为 \\uXXXX，键保持原有顺序）
+
+    orjson 不支持的类型（包括日期时间，与标准库保持同一种输出格式）交给 default 处理；
+    NaN/Infinity 在 orjson 下输出为 null（标准库输出 NaN，浏览器 JSON.parse 无法解析）。
+
+    Args:
+        obj: 待序列化的对象
+        default: 不支持类型的转换函数（如 Flask 的 DefaultJSONProvider.default）
+    """
+    if get_json_engine() == 'orjson':
+        return orjson.dumps(obj, default=default,
+                            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(obj, default=default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _parse_accept_encoding(header: str) -> dict:
+    """Accept-Encoding 解析为 {编码: q值}"""
+    qualities = {}
+    for item in header.split(','):
+        parts = item.strip().split(';')
+        coding = parts[0].strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in parts[1:]:
+            name, _, value = param.strip().partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    按请求的 Accept-Encoding 选择压缩编码
+
+    Returns:
+        'br'（已安装brotli且客户端接受度不低于gzip）、'gzip' 或 None（不压缩）
+    """
+    if not accept_encoding:
+        return None
+    qualities = _parse_accept_encoding(accept_encoding)
+    wildcard = qualities.get('*', 0.0)
+    br = qualities.get('br', wildcard) if brotli is not None else 0.0
+    gz = qualities.get('gzip', qualities.get('x-gzip', wildcard))
+    if br > 0 and br >= gz:
+        return 'br'
+    if gz > 0:
+        return 'gzip'
+    return None
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    """按编码压缩响应体"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=API_RESPONSE_CONFIG['brotli_quality'])
+    return gzip.compress(body, compresslevel=API_RESPONSE_CONFIG['gzip_level'], mtime=0)
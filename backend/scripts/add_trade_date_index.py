@@ -0,0 +1,77 @@
+"""为K线分表添加交易日期列和 (周期, 时间) 复合索引（可重复执行，只补充缺少的部分）"""
+import sys
+import os
+
+# 添加项目根目录到路径
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from infrastructure.persistence.database import DatabaseConnection
+from infrastructure.config.app_config import KLINE_STORAGE_CONFIG
+
+# 与 sql/add_trade_date_column.sql 一致
+TRADE_DATE_COLUMN = "ADD COLUMN trade_date DATE AS (DATE(shi_jian)) STORED COMMENT '交易日期（由shi_jian生成）'"
+INDEXES = {
+    'idx_period_time': "ADD KEY idx_period_time (peroid_type, shi_jian) COMMENT '周期+时间索引（按周期的时间范围查询）'",
+    'idx_period_trade_date': "ADD KEY idx_period_trade_date (peroid_type, trade_date) COMMENT '周期+交易日期索引'"
+}
+
+
+def missing_parts(cursor, table_name: str) -> list:
+    """该表还缺少的列和索引（ALTER TABLE 子句）"""
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = 'trade_date'
+    """, (table_name,))
+    parts = [] if cursor.fetchone()[0] else [TRADE_DATE_COLUMN]
+    
+    cursor.execute("""
+        SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table_name,))
+    existing = {row[0] for row in cursor.fetchall()}
+    parts.extend(clause for name, clause in INDEXES.items() if name not in existing)
+    return parts
+
+
+def add_trade_date_index(table_names=None) -> bool:
+    """逐表执行 ALTER TABLE，已完成的表跳过"""
+    with DatabaseConnection.get_connection_context() as conn:
+        cursor = conn.cursor()
+        if not table_names:
+            cursor.execute("SHOW TABLES LIKE %s", (KLINE_STORAGE_CONFIG['table_prefix'] + '%',))
+            table_names = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+    
+    failed = []
+    for i, table_name in enumerate(table_names, 1):
+        try:
+            with DatabaseConnection.get_connection_context() as conn:
+                cursor = conn.cursor()
+                parts = missing_parts(cursor, table_name)
+                if parts:
+                    cursor.execute(f"ALTER TABLE {table_name} {', '.join(parts)}")
+                cursor.close()
+            print(f"[{i}/{len(table_names)}] {table_name}: {'添加 ' + str(len(parts)) + ' 项' if parts else '已完成，跳过'}")
+        except Exception as e:
+            print(f"[{i}/{len(table_names)}] {table_name}: 失败 {e}")
+            failed.append(table_name)
+    
+    if failed:
+        print(f"失败的表: {', '.join(failed)}")
+    return not failed
+
+
+if __name__ == '__main__':
+    if '-h' in sys.argv or '--help' in sys.argv:
+        print("用法: python add_trade_date_index.py [表名 ...]")
+        print("示例: python add_trade_date_index.py                       # 所有 basic_data_ 开头的表")
+        print("      python add_trade_date_index.py basic_data_sz300188")
+        sys.exit(0)
+    
+    print("开始为K线分表添加交易日期列和索引...")
+    if add_trade_date_index(sys.argv[1:]):
+        print("完成！")
+    else:
+        print("部分表失败！")
+        sys.exit(1)
@@ -4,6 +4,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from datetime import datetime, timedelta
+from infrastructure.config.stock_registry import get_stock_registry
 from infrastructure.persistence.daily_repository_impl import DailyRepositoryImpl
 from infrastructure.persistence.daily_chance_repository_impl import DailyChanceRepositoryImpl
 
@@ -35,7 +36,7 @@ def analyze_stock_gains(stock_code: str, start_date_str: str, end_date_str: str)
     print(f"查询到 {len(daily_data_list)} 条日线数据\n")
     
     # 主板还是非主板
-    is_main_board = stock_code.startswith(('SH600', 'SH601', 'SH603', 'SH605', 'SZ000', 'SZ001'))
+    is_main_board = get_stock_registry().is_main_board(stock_code)
     board_type = "主板" if is_main_board else "创业板/科创板"
     print(f"股票类型: {board_type}\n")
     
@@ -0,0 +1,116 @@
+"""CR点分析接口响应对比：默认格式/列式格式 × Flask默认jsonify/新JSON序列化 × 不压缩/gzip/br 的大小和序列化耗时"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import gzip
+import json
+import statistics
+import time
+from application.services.cr_point_service import CRPointService
+from infrastructure.config.stock_registry import get_stock_registry
+from interfaces.dto.cr_result_columnar import to_columnar, from_columnar
+from interfaces.dto.response import ResponseBuilder
+from interfaces.http.response_encoding import encode_json, compress_body, get_json_engine, brotli
+
+
+def flask_default_dumps(obj) -> bytes:
+    """Flask 3 默认 jsonify（非调试模式）的等价序列化：排序键、中文转义为 \\uXXXX"""
+    return json.dumps(obj, default=str, ensure_ascii=True, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def flask_debug_dumps(obj) -> bytes:
+    """Flask 3 默认 jsonify（调试模式，SERVER_CONFIG['debug']=True）：另外缩进2格"""
+    return json.dumps(obj, default=str, ensure_ascii=True, sort_keys=True, indent=2).encode('utf-8')
+
+
+def stdlib_dumps(obj) -> bytes:
+    """未安装orjson时的回退序列化（紧凑、中文不转义、不排序键）"""
+    return json.dumps(obj, default=str, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def median_ms(func, rounds: int):
+    timings = []
+    result = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ('-h', '--help'):
+        print("用法: python benchmark_cr_response.py [股票代码] [周期] [次数]")
+        print("示例: python benchmark_cr_response.py SZ300188 day 20")
+        sys.exit(0)
+
+    registry = get_stock_registry()
+    stock = registry.info(sys.argv[1]) if len(sys.argv) > 1 else registry.all_stocks()[0]
+    period = sys.argv[2] if len(sys.argv) > 2 else 'day'
+    rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    cr_result = CRPointService().analyze_stock(stock.code, stock.name, stock.table_name, period)
+    if cr_result is None:
+        print(f"❌ K线数据为空: {stock.code} {stock.table_name}")
+        sys.exit(1)
+    bars = len(cr_result['strategy1_scores'])
+
+    columnar_ms, columnar = median_ms(lambda: to_columnar(cr_result), rounds)
+    failures = []
+    if json.loads(json.dumps(from_columnar(columnar))) != json.loads(json.dumps(cr_result)):
+        failures.append("列式格式还原后与默认格式不一致")
+    # 只有值类型不同（0 / 0.0 / False）的插件结果不能合并为同一项
+    plugins = [{'name': '插件', 'triggered': False, 'scoreAdjustment': 0},
+               {'name': '插件', 'triggered': 0, 'scoreAdjustment': 0.0},
+               {'name': '插件', 'triggered': False, 'scoreAdjustment': 0.0}]
+    sample = {'strategy1_scores': {'2025-01-02': {'score': 0, 'base_score': 0, 'plugins': plugins,
+                                                  'is_c_point': False, 'is_rejected': False}}}
+    restored = from_columnar(to_columnar(sample))['strategy1_scores']['2025-01-02']['plugins']
+    if json.dumps(restored) != json.dumps(plugins):
+        failures.append("值类型不同的插件结果还原后不一致")
+
+    cases = [
+        ('默认格式 + Flask调试模式jsonify', cr_result, flask_debug_dumps),
+        ('默认格式 + Flask默认jsonify', cr_result, flask_default_dumps),
+        ('默认格式 + stdlib', cr_result, stdlib_dumps),
+        ('列式格式 + stdlib', columnar, stdlib_dumps),
+    ]
+    if get_json_engine() != 'stdlib':
+        cases += [(f'默认格式 + {get_json_engine()}', cr_result, encode_json),
+                  (f'列式格式 + {get_json_engine()}', columnar, encode_json)]
+    print("=" * 100)
+    print(f"{stock.code} {period}: {bars}根K线, C点{cr_result['c_points_count']}个, R点{cr_result['r_points_count']}个, "
+          f"列式转换 {columnar_ms:.2f}ms")
+    print(f"{'方案':<36} {'序列化':>9} {'大小':>10} {'gzip':>10} {'gzip耗时':>9} {'br':>10} {'br耗时':>9}")
+    print("-" * 100)
+    baseline = None
+    for name, payload, dumps in cases:
+        response = ResponseBuilder.success(payload)
+        dumps_ms, body = median_ms(lambda: dumps(response), rounds)
+        gzip_ms, gzipped = median_ms(lambda: compress_body(body, 'gzip'), max(1, rounds // 4))
+        if gzip.decompress(gzipped) != body:
+            failures.append(f"{name}: gzip解压后不一致")
+        if brotli is not None:
+            br_ms, br_body = median_ms(lambda: compress_body(body, 'br'), max(1, rounds // 4))
+            br_text = f"{len(br_body):>10,} {br_ms:>7.1f}ms"
+        else:
+            br_text = f"{'未安装':>10} {'-':>9}"
+        print(f"{name:<36} {dumps_ms:>7.1f}ms {len(body):>10,} {len(gzipped):>10,} {gzip_ms:>7.1f}ms {br_text}")
+        if json.loads(body)['data'] != json.loads(json.dumps(response, default=str))['data']:
+            failures.append(f"{name}: 序列化结果解析后与原始数据不一致")
+        if name.startswith('默认格式 + Flask默认'):
+            baseline = (dumps_ms, len(body))
+        elif baseline is not None:
+            print(f"{'':<36} 相对Flask默认: 序列化 {dumps_ms / baseline[0]:.2f}x, 大小 {len(body) / baseline[1]:.2f}x, "
+                  f"gzip后大小 {len(gzipped) / baseline[1]:.3f}x")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ 列式格式可无损还原，各序列化方案结果一致")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""极值点计算微基准：逐点窗口比较（原实现） vs 单调队列滑动最值，结果必须完全一致"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import random
+import time
+from datetime import datetime, timedelta
+from domain.models.kline import KLineData
+from domain.services.support_pressure_algorithm import ExtremeValueAlgorithm, IndexedLine
+
+
+def reference_extreme_points(klines, before, after, start, stop, peak_enabled, valley_enabled, use_min_max):
+    """原实现：每个候选点与窗口内所有K线逐一比较，O(n·w)"""
+    result = []
+    if peak_enabled:
+        for i in range(start, stop):
+            current_price = klines[i].high if use_min_max else max(klines[i].open, klines[i].close)
+            is_peak = True
+            for j in range(max(0, i - before), min(len(klines), i + after + 1)):
+                if j == i:
+                    continue
+                compare_price = klines[j].high if use_min_max else max(klines[j].open, klines[j].close)
+                if current_price < compare_price:
+                    is_peak = False
+                    break
+            if is_peak:
+                result.append(IndexedLine(index=i, price=current_price))
+    if valley_enabled:
+        for i in range(start, stop):
+            current_price = klines[i].low if use_min_max else min(klines[i].open, klines[i].close)
+            is_valley = True
+            for j in range(max(0, i - before), min(len(klines), i + after + 1)):
+                if j == i:
+                    continue
+                compare_price = klines[j].low if use_min_max else min(klines[j].open, klines[j].close)
+                if current_price > compare_price:
+                    is_valley = False
+                    break
+            if is_valley:
+                result.append(IndexedLine(index=i, price=current_price))
+    result.sort(key=lambda x: x.index)
+    return result
+
+
+def reference_symmetric(klines, window_size, peak_enabled=True, valley_enabled=True,
+                        use_min_max=False, side_ignored_count=0):
+    if len(klines) < window_size:
+        return []
+    half_window = window_size // 2
+    return reference_extreme_points(klines, half_window, half_window, max(half_window, side_ignored_count),
+                                    len(klines) - half_window, peak_enabled, valley_enabled, use_min_max)
+
+
+def reference_asymmetric(klines, left_window, right_window, peak_enabled=True, valley_enabled=True,
+                         use_min_max=False, side_ignored_count=0):
+    if len(klines) < (left_window + right_window):
+        return []
+    return reference_extreme_points(klines, right_window, left_window, max(left_window // 2, side_ignored_count),
+                                    len(klines) - 2, peak_enabled, valley_enabled, use_min_max)
+
+
+def build_klines(count: int, seed: int):
+    """生成随机K线（价格保留2位小数，制造大量相等价格）"""
+    rnd = random.Random(seed)
+    klines = []
+    price = 20.0
+    start = datetime(2024, 1, 1, 10, 0, 0)
+    for i in range(count):
+        open_price = round(price * (1 + rnd.gauss(0, 0.005)), 2)
+        close = round(price * (1 + rnd.gauss(0, 0.01)), 2) if rnd.random() > 0.1 else open_price
+        high = round(max(open_price, close) * (1 + abs(rnd.gauss(0, 0.005))), 2)
+        low = round(min(open_price, close) * (1 - abs(rnd.gauss(0, 0.005))), 2)
+        klines.append(KLineData(start - timedelta(minutes=30 * i), open_price, high, low, close, 0, 0, 0))
+        price = close
+    return klines
+
+
+def same(a, b) -> bool:
+    return [(x.index, x.price) for x in a] == [(x.index, x.price) for x in b]
+
+
+def timed(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("用法: python benchmark_extreme_points.py <K线数量> [随机种子数量] [重复次数]")
+        print("示例: python benchmark_extreme_points.py 2000 20 10")
+        sys.exit(1)
+
+    count = int(sys.argv[1])
+    seeds = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    # 一致性检查
+    mismatches = 0
+    for seed in range(seeds):
+        klines = build_klines(count, seed)
+        for use_min_max in (False, True):
+            for window_size in (1, 3, 5, 9, 13, 21, 41):
+                for side_ignored_count in (0, 3, 15):
+                    for peak_enabled, valley_enabled in ((True, True), (True, False), (False, True)):
+                        args = (peak_enabled, valley_enabled, use_min_max, side_ignored_count)
+                        if not same(reference_symmetric(klines, window_size, *args),
+                                    ExtremeValueAlgorithm.calculate_extreme_points(klines, window_size, *args)):
+                            mismatches += 1
+                            print(f"❌ 对称窗口不一致: seed={seed} window={window_size} args={args}")
+            for left_window, right_window in ((6, 3), (10, 2), (20, 5), (3, 6), (0, 4)):
+                args = (True, True, use_min_max, 0)
+                if not same(reference_asymmetric(klines, left_window, right_window, *args),
+                            ExtremeValueAlgorithm.calculate_extreme_points_asymmetric(
+                                klines, left_window, right_window, *args)):
+                    mismatches += 1
+                    print(f"❌ 不对称窗口不一致: seed={seed} left={left_window} right={right_window}")
+
+    # 耗时对比
+    klines = build_klines(count, 0)
+    print("=" * 70)
+    print(f"{'窗口':<16}{'原实现(ms)':>14}{'单调队列(ms)':>16}{'加速比':>10}")
+    for window_size in (5, 13, 21, 41):
+        old_ms = timed(lambda: reference_symmetric(klines, window_size), repeat)
+        new_ms = timed(lambda: ExtremeValueAlgorithm.calculate_extreme_points(klines, window_size), repeat)
+        print(f"{'对称 ' + str(window_size):<16}{old_ms:>14.3f}{new_ms:>16.3f}{old_ms / new_ms:>9.1f}x")
+    for left_window, right_window in ((10, 2), (20, 5)):
+        old_ms = timed(lambda: reference_asymmetric(klines, left_window, right_window), repeat)
+        new_ms = timed(lambda: ExtremeValueAlgorithm.calculate_extreme_points_asymmetric(
+            klines, left_window, right_window), repeat)
+        label = f"不对称 {left_window}/{right_window}"
+        print(f"{label:<16}{old_ms:>14.3f}{new_ms:>16.3f}{old_ms / new_ms:>9.1f}x")
+    print("=" * 70)
+
+    if mismatches:
+        print(f"❌ 发现 {mismatches} 处不一致")
+        sys.exit(1)
+    print("✅ 单调队列实现与原实现结果完全一致")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""股票分析延迟对比：外部API vs 本地计算（冷启动 / 缓存命中）"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import statistics
+from infrastructure.external_apis.stock_analysis_repository_impl import StockAnalysisRepositoryImpl
+from infrastructure.persistence.local_stock_analysis_repository_impl import (
+    LocalStockAnalysisRepositoryImpl, AnalysisResultCache
+)
+from infrastructure.persistence.kline_repository_impl import KLineRepositoryImpl
+
+
+def measure(func, rounds: int):
+    """执行多次，返回每次耗时（毫秒）和最后一次结果"""
+    timings = []
+    result = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings, result
+
+
+def report(name: str, timings):
+    print(f"{name:<16} 次数={len(timings):<4} 平均={statistics.mean(timings):9.1f}ms  "
+          f"中位数={statistics.median(timings):9.1f}ms  最大={max(timings):9.1f}ms")
+
+
+def format_result(result) -> str:
+    return ", ".join(f"{period}: 益损比{a.win_lose_ratio} 支撑{a.support_price} 压力{a.pressure_price}"
+                     for period, a in result.items())
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("用法: python benchmark_stock_analysis.py <股票代码> [次数] [--no-remote]")
+        print("示例: python benchmark_stock_analysis.py SZ300188 5")
+        sys.exit(1)
+
+    stock_code = sys.argv[1]
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 and sys.argv[2].isdigit() else 5
+    kline_repository = KLineRepositoryImpl()
+
+    # 本地计算（每次使用新缓存，相当于冷启动）
+    cold_timings, local_result = measure(
+        lambda: LocalStockAnalysisRepositoryImpl(kline_repository, AnalysisResultCache()).get_stock_analysis(stock_code),
+        rounds
+    )
+    # 本地计算（共享缓存，第一次之后最新K线不变即命中）
+    warm_repository = LocalStockAnalysisRepositoryImpl(kline_repository, AnalysisResultCache())
+    warm_repository.get_stock_analysis(stock_code)
+    warm_timings, _ = measure(lambda: warm_repository.get_stock_analysis(stock_code), rounds)
+
+    print("=" * 80)
+    report("本地(冷启动)", cold_timings)
+    report("本地(缓存命中)", warm_timings)
+    print(f"本地结果: {format_result(local_result)}")
+
+    if '--no-remote' not in sys.argv:
+        remote_repository = StockAnalysisRepositoryImpl()
+        remote_timings, remote_result = measure(lambda: remote_repository.get_stock_analysis(stock_code), rounds)
+        report("外部API", remote_timings)
+        print(f"外部API结果: {format_result(remote_result)}")
+        print(f"本地冷启动加速比: {statistics.mean(remote_timings) / statistics.mean(cold_timings):.1f}x")
+    print("=" * 80)
+
+
+if __name__ == '__main__':
+    main()
@@ -78,17 +78,18 @@ def calculate_stock_bearish_patterns(
         
         logger.info(f"股票 {stock_code} 共有 {len(daily_chances)} 条记录需要计算")
         
+        # 一次加载整段日线，按滑动窗口识别所有日期的空头组合
+        patterns_by_date = BearishPatternService.identify_bearish_patterns_series(
+            stock_code=stock_code,
+            table_name=table_name,
+            target_dates=[dc.date for dc in daily_chances if dc.date]
+        )
+        
         # 准备批量更新数据
         updates = []
         for dc in daily_chances:
             if dc.date:
-                # 识别空头组合
-                patterns = BearishPatternService.identify_bearish_patterns(
-                    stock_code=stock_code,
-                    table_name=table_name,
-                    target_date=dc.date
-                )
-                
+                patterns = patterns_by_date.get(dc.date)
                 if patterns:
                     # 多个组合用逗号连接
                     bearish_pattern = ','.join(patterns)
@@ -66,6 +66,12 @@ def calculate_stock_bullish_patterns(
             logger.warning(f"股票 {stock_code} 在daily_chance表中没有数据")
             return 0
         
+        # 成交量类型（一阳穿三阴使用），避免逐日查询daily_chance
+        volume_types = {}
+        for dc in daily_chances:
+            if dc.date:
+                volume_types.setdefault(dc.date.date() if isinstance(dc.date, datetime) else dc.date, dc.volume_type)
+        
         # 过滤日期范围
         if start_date:
             daily_chances = [dc for dc in daily_chances if dc.date and dc.date >= start_date]
@@ -78,17 +84,19 @@ def calculate_stock_bullish_patterns(
         
         logger.info(f"股票 {stock_code} 共有 {len(daily_chances)} 条记录需要计算")
         
+        # 一次加载整段日线，按滑动窗口识别所有日期的多头组合
+        patterns_by_date = BullishPatternService.identify_bullish_patterns_series(
+            stock_code=stock_code,
+            table_name=table_name,
+            target_dates=[dc.date for dc in daily_chances if dc.date],
+            volume_types=volume_types
+        )
+        
         # 准备批量更新数据
         updates = []
         for dc in daily_chances:
             if dc.date:
-                # 识别多头组合
-                patterns = BullishPatternService.identify_bullish_patterns(
-                    stock_code=stock_code,
-                    table_name=table_name,
-                    target_date=dc.date
-                )
-                
+                patterns = patterns_by_date.get(dc.date)
                 if patterns:
                     # 多个组合用逗号连接
                     bullish_pattern = ','.join(patterns)
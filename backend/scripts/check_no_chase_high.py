@@ -4,6 +4,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from datetime import datetime, timedelta
+from infrastructure.config.stock_registry import get_stock_registry
 from infrastructure.persistence.daily_repository_impl import DailyRepositoryImpl
 from infrastructure.persistence.database import DatabaseConnection
 
@@ -49,7 +50,7 @@ def check_no_chase_high(stock_code: str, target_date: str):
             return
         
         # 判断主板还是非主板
-        is_main_board = stock_code.startswith(('SH600', 'SH601', 'SH603', 'SH605', 'SZ000', 'SZ001'))
+        is_main_board = get_stock_registry().is_main_board(stock_code)
         board_type = "主板" if is_main_board else "非主板"
         
         print(f"股票类型：{board_type}")
@@ -0,0 +1,39 @@
+"""初始化每日机会衍生特征水位表"""
+import sys
+import os
+
+# 添加项目根目录到路径
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from infrastructure.persistence.database import DatabaseConnection
+
+SQL_FILE = os.path.join(os.path.dirname(backend_dir), 'sql', 'create_daily_chance_feature_state_table.sql')
+
+
+def init_feature_state_table():
+    """执行 sql/create_daily_chance_feature_state_table.sql 创建衍生特征水位表"""
+    with open(SQL_FILE, 'r', encoding='utf-8') as f:
+        content = f.read()
+    lines = [line for line in content.splitlines() if not line.strip().startswith('--')]
+    statements = [s.strip() for s in '\n'.join(lines).split(';') if s.strip()]
+    
+    try:
+        with DatabaseConnection.get_connection_context() as conn:
+            cursor = conn.cursor()
+            for statement in statements:
+                cursor.execute(statement)
+            print("衍生特征水位表创建成功")
+            return True
+    except Exception as e:
+        print(f"衍生特征水位表创建失败: {e}")
+        return False
+
+
+if __name__ == '__main__':
+    print("开始初始化衍生特征水位表...")
+    if init_feature_state_table():
+        print("初始化完成！")
+    else:
+        print("初始化失败！")
+        sys.exit(1)
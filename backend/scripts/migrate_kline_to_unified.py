@@ -0,0 +1,109 @@
+"""把 basic_data_<code> 分表的K线迁移到统一K线表（可重复执行，默认增量）"""
+import sys
+import os
+import time
+
+# 添加项目根目录到路径
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from infrastructure.persistence.database import DatabaseConnection
+from infrastructure.persistence.kline_storage import (
+    KLINE_STORAGE_CONFIG, copy_table_to_unified, stock_code_for_table
+)
+from domain.models.stock import StockGroups
+from infrastructure.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def list_source_tables(all_tables: bool):
+    """待迁移的分表：股票配置中的表，或数据库中所有 basic_data_ 开头的表"""
+    if not all_tables:
+        return [stock.table_name for stocks in StockGroups().get_all_groups().values() for stock in stocks]
+    with DatabaseConnection.get_connection_context() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SHOW TABLES LIKE %s", (KLINE_STORAGE_CONFIG['table_prefix'] + '%',))
+        tables = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+    return tables
+
+
+def verify_table(conn, table_name: str) -> bool:
+    """按周期比较分表与统一表的行数和最大时间"""
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT peroid_type, COUNT(*), MAX(shi_jian) FROM {table_name} GROUP BY peroid_type
+    """)
+    source = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+    cursor.execute(f"""
+        SELECT peroid_type, COUNT(*), MAX(shi_jian) FROM {KLINE_STORAGE_CONFIG['unified_table']}
+        WHERE stock_code = %s GROUP BY peroid_type
+    """, (stock_code_for_table(table_name),))
+    unified = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+    cursor.close()
+    
+    if source != unified:
+        logger.warning(f"⚠️  校验不一致 {table_name}: 分表 {source}, 统一表 {unified}")
+        return False
+    return True
+
+
+def migrate(table_names, full: bool = False, verify: bool = False) -> dict:
+    """逐表在数据库内 INSERT ... SELECT 到统一表，每表一个事务"""
+    start_time = time.time()
+    total_affected = 0
+    failed = []
+    
+    for i, table_name in enumerate(table_names, 1):
+        try:
+            with DatabaseConnection.get_connection_context() as conn:
+                affected = copy_table_to_unified(conn, table_name, incremental=not full)
+                conn.commit()
+                total_affected += affected
+                ok = verify_table(conn, table_name) if verify else True
+            logger.info(f"[{i}/{len(table_names)}] {table_name}: 影响 {affected} 行{'' if ok else '，校验不一致'}")
+            if not ok:
+                failed.append(table_name)
+        except Exception as e:
+            logger.error(f"[{i}/{len(table_names)}] 迁移失败 {table_name}: {e}", exc_info=True)
+            failed.append(table_name)
+    
+    return {
+        'total_tables': len(table_names),
+        'total_affected': total_affected,
+        'failed': failed,
+        'elapsed': round(time.time() - start_time, 2)
+    }
+
+
+def main():
+    args = sys.argv[1:]
+    if '-h' in args or '--help' in args:
+        print("用法: python migrate_kline_to_unified.py [--full] [--verify] [--all] [表名 ...]")
+        print("示例: python migrate_kline_to_unified.py --verify          # 配置中的股票，增量迁移并校验")
+        print("      python migrate_kline_to_unified.py --full basic_data_sz300188")
+        print("      --all: 迁移数据库中所有 basic_data_ 开头的表")
+        sys.exit(0)
+    
+    full = '--full' in args
+    table_names = [arg for arg in args if not arg.startswith('--')] or list_source_tables('--all' in args)
+    
+    logger.info("=" * 60)
+    logger.info(f"开始迁移K线到统一表 {KLINE_STORAGE_CONFIG['unified_table']}: {len(table_names)} 张分表, "
+                f"{'全量' if full else '增量'}")
+    logger.info("=" * 60)
+    
+    result = migrate(table_names, full=full, verify='--verify' in args)
+    
+    logger.info(f"迁移完成: 共 {result['total_tables']} 张表, 影响 {result['total_affected']} 行, "
+                f"失败 {len(result['failed'])} 张, 耗时 {result['elapsed']}秒")
+    if result['failed']:
+        logger.warning(f"失败的表: {', '.join(result['failed'])}")
+        sys.exit(1)
+    if KLINE_STORAGE_CONFIG['layout'] != 'unified':
+        logger.info("如需切换读取，将 app_config.KLINE_STORAGE_CONFIG['layout'] 改为 'unified'")
+
+
+if __name__ == '__main__':
+    main()
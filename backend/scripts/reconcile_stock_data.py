@@ -0,0 +1,254 @@
+"""生产环境与本地K线数据校验修复：按时间分桶比较校验和，只重新复制不一致的区间"""
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Tuple
+import pymysql
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from scripts.sync_stock_data import (
+    PROD_DB_CONFIG, LOCAL_DB_CONFIG, REPLICATION_CONFIG, PERIOD_TYPE_MAP, KLINE_COLUMNS,
+    get_all_table_names, check_table_exists, build_upsert_query, close_quietly,
+    create_indicator_service, refresh_indicators
+)
+from infrastructure.persistence.kline_storage import is_unified_layout, replace_unified_range, stock_code_for_table
+from infrastructure.persistence.disk_cache import get_disk_cache
+from infrastructure.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 分桶粒度：MySQL DATE_FORMAT 与 Python strftime 的格式一致
+BUCKET_FORMATS = {
+    'year': '%Y',
+    'month': '%Y-%m',
+    'day': '%Y-%m-%d'
+}
+
+# 校验和修复的列：同步的K线列加上涨跌幅 shang_yu_bi（日线仓储读取该列，修复区间时不能丢失）
+RECONCILE_COLUMNS = KLINE_COLUMNS + ['shang_yu_bi']
+
+# 每行参与校验的字段（NULL 替换为字面量，避免 CONCAT_WS 跳过 NULL 造成错位）
+ROW_EXPR = "CONCAT_WS('|', " + ', '.join(
+    f"IFNULL({column}, 'NULL')" for column in RECONCILE_COLUMNS if column != 'peroid_type'
+) + ")"
+
+
+def bucket_range(bucket: str, granularity: str) -> Tuple[datetime, datetime]:
+    """分桶对应的时间区间 [start, end)"""
+    start = datetime.strptime(bucket, BUCKET_FORMATS[granularity])
+    if granularity == 'year':
+        end = start.replace(year=start.year + 1)
+    elif granularity == 'month':
+        end = (start + timedelta(days=32)).replace(day=1)
+    else:
+        end = start + timedelta(days=1)
+    return start, end
+
+
+def fetch_checksums(conn, table_name: str, period_code: str, since: datetime,
+                    granularity: str) -> Dict[str, Tuple[int, int, int]]:
+    """
+    在数据库端按分桶计算校验和，只返回聚合结果
+    
+    Returns:
+        {分桶: (行数, 各行CRC32的异或, 各行CRC32之和)}
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT DATE_FORMAT(shi_jian, %s) AS bucket,
+               COUNT(*),
+               BIT_XOR(CRC32({ROW_EXPR})),
+               SUM(CRC32({ROW_EXPR}))
+        FROM {table_name}
+        WHERE peroid_type = %s AND shi_jian >= %s
+        GROUP BY bucket
+    """, (BUCKET_FORMATS[granularity], period_code, since))
+    checksums = {row[0]: (int(row[1]), int(row[2]), int(row[3])) for row in cursor.fetchall()}
+    cursor.close()
+    return checksums
+
+
+def recopy_range(prod_conn, local_conn, table_name: str, period_code: str,
+                 start: datetime, end: datetime) -> int:
+    """
+    用生产环境数据替换本地 [start, end) 区间（同一事务内先删后写，本地多出的行一并删除；
+    统一K线表布局下同时替换统一表的该区间）
+    
+    Returns:
+        复制的记录数
+    """
+    prod_cursor = prod_conn.cursor()
+    prod_cursor.execute(f"""
+        SELECT {', '.join(RECONCILE_COLUMNS)}
+        FROM {table_name}
+        WHERE peroid_type = %s AND shi_jian >= %s AND shi_jian < %s
+        ORDER BY shi_jian ASC
+    """, (period_code, start, end))
+    rows = prod_cursor.fetchall()
+    prod_cursor.close()
+    
+    local_cursor = local_conn.cursor()
+    try:
+        local_cursor.execute(f"""
+            DELETE FROM {table_name}
+            WHERE peroid_type = %s AND shi_jian >= %s AND shi_jian < %s
+        """, (period_code, start, end))
+        if rows:
+            local_cursor.executemany(build_upsert_query(table_name, RECONCILE_COLUMNS), rows)
+        if is_unified_layout():
+            replace_unified_range(local_conn, table_name, period_code, start, end)
+        local_conn.commit()
+    except Exception:
+        local_conn.rollback()
+        raise
+    finally:
+        local_cursor.close()
+    return len(rows)
+
+
+def invalidate_cached_analysis(table_name: str, period_type: str) -> int:
+    """
+    历史K线修复后删除磁盘缓存中该股票该周期的K线+指标窗口和CR分析结果
+    
+    服务进程的内存缓存按K线窗口版本（含窗口内容校验和）自行失效；脚本进程没有这些内存缓存，
+    只能直接删除共享的磁盘缓存记录（未启用磁盘缓存时不做任何事）
+    
+    Returns:
+        删除的记录数
+    """
+    disk_cache = get_disk_cache()
+    if disk_cache is None:
+        return 0
+    removed = disk_cache.invalidate('kline', f"{table_name}:{period_type}") \
+        + disk_cache.invalidate('cr', f"{stock_code_for_table(table_name)}:{period_type}")
+    if removed:
+        logger.info(f"🗑️  删除磁盘缓存 {table_name} {period_type}: {removed} 条")
+    return removed
+
+
+def reconcile_table(table_name: str, since: datetime, granularity: str, dry_run: bool,
+                    indicator_service) -> Dict:
+    """
+    校验并修复单个表的所有周期
+    
+    Returns:
+        {'buckets': 比较的分桶数, 'drifted': ['表名 周期 分桶', ...], 'copied': 复制的记录数, 'failed': [...]}
+    """
+    result = {'buckets': 0, 'drifted': [], 'copied': 0, 'failed': []}
+    prod_conn = local_conn = None
+    try:
+        prod_conn = pymysql.connect(**PROD_DB_CONFIG)
+        local_conn = pymysql.connect(**LOCAL_DB_CONFIG)
+        if not check_table_exists(prod_conn, table_name) or not check_table_exists(local_conn, table_name):
+            logger.warning(f"⚠️  生产环境或本地表不存在: {table_name}，跳过")
+            return result
+        
+        for period_type, period_code in PERIOD_TYPE_MAP.items():
+            try:
+                prod_sums = fetch_checksums(prod_conn, table_name, period_code, since, granularity)
+                local_sums = fetch_checksums(local_conn, table_name, period_code, since, granularity)
+                buckets = sorted(set(prod_sums) | set(local_sums))
+                drifted = [b for b in buckets if prod_sums.get(b) != local_sums.get(b)]
+                result['buckets'] += len(buckets)
+                
+                for bucket in drifted:
+                    prod_count = prod_sums.get(bucket, (0,))[0]
+                    local_count = local_sums.get(bucket, (0,))[0]
+                    logger.info(f"🔍 不一致 {table_name} {period_type} {bucket}: "
+                                f"生产 {prod_count} 条, 本地 {local_count} 条")
+                    result['drifted'].append(f"{table_name} {period_type} {bucket}")
+                    if not dry_run:
+                        start, end = bucket_range(bucket, granularity)
+                        result['copied'] += recopy_range(prod_conn, local_conn, table_name, period_code, start, end)
+                
+                # 历史K线被修正后增量指标状态失效，重新全量计算；磁盘缓存中的窗口和分析结果一并删除
+                if drifted and not dry_run:
+                    refresh_indicators(indicator_service, table_name, period_type, rebuild=True)
+                    invalidate_cached_analysis(table_name, period_type)
+            except Exception as e:
+                logger.error(f"❌ 校验失败 {table_name} {period_type}: {str(e)}", exc_info=True)
+                result['failed'].append(f"{table_name} {period_type}")
+        
+        return result
+    except Exception as e:
+        logger.error(f"❌ 校验表失败 {table_name}: {str(e)}", exc_info=True)
+        result['failed'].append(table_name)
+        return result
+    finally:
+        for conn in (prod_conn, local_conn):
+            if conn is not None:
+                close_quietly(conn)
+
+
+def reconcile_all_stocks(granularity: str = 'month', days: Optional[int] = None, dry_run: bool = False,
+                         table_names: Optional[List[str]] = None, max_workers: Optional[int] = None) -> Dict:
+    """
+    校验并修复所有股票表
+    
+    Args:
+        granularity: 分桶粒度 year / month / day
+        days: 只校验最近多少天（按分桶对齐，默认与全量同步范围一致）
+        dry_run: 只报告不一致的分桶，不复制
+        table_names: 只校验指定表（None表示全部）
+        max_workers: 同时校验的表数
+        
+    Returns:
+        校验结果统计
+    """
+    days = days or REPLICATION_CONFIG['full_days']
+    max_workers = max_workers or REPLICATION_CONFIG['prod_readers']
+    fmt = BUCKET_FORMATS[granularity]
+    since = datetime.strptime((datetime.now() - timedelta(days=days)).strftime(fmt), fmt)
+    table_names = table_names or get_all_table_names()
+    
+    logger.info("=" * 60)
+    logger.info(f"开始校验K线数据: {len(table_names)} 个表, 按{granularity}分桶, 自 {since.strftime('%Y-%m-%d')}, "
+                f"{'只报告' if dry_run else '修复不一致区间'}, 并发 {max_workers}")
+    logger.info("=" * 60)
+    
+    indicator_service = None if dry_run else create_indicator_service()
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(
+            lambda table_name: reconcile_table(table_name, since, granularity, dry_run, indicator_service),
+            table_names
+        ))
+    
+    summary = {
+        'total_tables': len(table_names),
+        'total_buckets': sum(r['buckets'] for r in results),
+        'drifted': [bucket for r in results for bucket in r['drifted']],
+        'total_copied': sum(r['copied'] for r in results),
+        'failed': [failed for r in results for failed in r['failed']],
+        'elapsed': round(time.time() - start_time, 2)
+    }
+    
+    logger.info("=" * 60)
+    logger.info(f"校验完成！比较 {summary['total_buckets']} 个分桶，不一致 {len(summary['drifted'])} 个，"
+                f"{'' if dry_run else '重新复制 ' + str(summary['total_copied']) + ' 条记录，'}耗时 {summary['elapsed']}秒")
+    if summary['failed']:
+        logger.warning(f"失败 {len(summary['failed'])} 个: {', '.join(summary['failed'])}")
+    logger.info("=" * 60)
+    return summary
+
+
+if __name__ == '__main__':
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='按分桶校验和比较生产环境与本地K线数据，只重新复制不一致的区间')
+    parser.add_argument('tables', nargs='*', help='只校验指定表（默认全部）')
+    parser.add_argument('--bucket', choices=list(BUCKET_FORMATS), default='month', help='分桶粒度（默认month）')
+    parser.add_argument('--days', type=int, help=f"校验最近多少天（默认{REPLICATION_CONFIG['full_days']}）")
+    parser.add_argument('--workers', type=int, help='同时校验的表数')
+    parser.add_argument('--dry-run', action='store_true', help='只报告不一致的分桶，不复制')
+    args = parser.parse_args()
+    
+    if PROD_DB_CONFIG.get('host') in ['生产环境IP', '192.168.1.100'] or not PROD_DB_CONFIG.get('host'):
+        print("⚠️  警告：请先配置生产环境数据库连接信息（backend/scripts/sync_config.py）")
+        sys.exit(1)
+    
+    summary = reconcile_all_stocks(args.bucket, args.days, args.dry_run, args.tables or None, args.workers)
+    sys.exit(1 if summary['failed'] else 0)
@@ -0,0 +1,48 @@
+"""增量计算每日机会衍生特征（成交量类型、多头组合、空头组合）脚本"""
+import sys
+import os
+from datetime import datetime
+
+# 添加项目根目录到路径
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from infrastructure.persistence.daily_chance_repository_impl import DailyChanceRepositoryImpl
+from application.services.daily_chance_feature_service import DailyChanceFeatureService
+from infrastructure.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def main():
+    """主函数"""
+    args = sys.argv[1:]
+    if '-h' in args or '--help' in args:
+        print("用法: python refresh_daily_chance_features.py [--full] [股票代码 ...]")
+        print("示例: python refresh_daily_chance_features.py              # 所有股票，从水位增量计算")
+        print("      python refresh_daily_chance_features.py --full SZ300564")
+        sys.exit(0)
+    
+    full = '--full' in args
+    stock_codes = [arg for arg in args if not arg.startswith('--')] or None
+    
+    logger.info("=" * 60)
+    logger.info(f"开始计算每日机会衍生特征（{'全量' if full else '增量'}）")
+    logger.info(f"执行时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    logger.info("=" * 60)
+    
+    try:
+        service = DailyChanceFeatureService(DailyChanceRepositoryImpl())
+        result = service.refresh_all_stocks(full=full, stock_codes=stock_codes)
+        
+        if result['failed_stocks']:
+            logger.warning(f"失败的股票: {', '.join(result['failed_stocks'])}")
+            sys.exit(1)
+        
+    except Exception as e:
+        logger.error(f"计算衍生特征失败: {str(e)}", exc_info=True)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,7 @@ sys.path.insert(0, backend_dir)
 
 from infrastructure.persistence.daily_chance_repository_impl import DailyChanceRepositoryImpl
 from application.services.daily_chance_service import DailyChanceService
+from application.services.daily_chance_feature_service import DailyChanceFeatureService
 from infrastructure.logging.logger import get_logger
 
 logger = get_logger(__name__)
@@ -37,13 +38,18 @@ def sync_job():
         logger.info(f"总股票数: {result['total_stocks']}")
         logger.info(f"成功: {result['success_count']} 只")
         logger.info(f"失败: {len(result['failed_stocks'])} 只")
-        logger.info(f"保存记录数: {result['total_saved']}")
+        logger.info(f"保存记录数: {result['total_saved']} "
+                    f"(新增 {result['total_inserted']}，更新 {result['total_updated']}，未变化跳过 {result['total_skipped']})")
+        logger.info(f"耗时: {result['elapsed']}秒, API请求次数: {result['total_attempts']}")
         
         if result['failed_stocks']:
             logger.warning(f"失败的股票: {', '.join(result['failed_stocks'])}")
         
         logger.info("=" * 60)
         
+        # 增量计算新同步日期的成交量类型和多空组合
+        DailyChanceFeatureService(repository).refresh_all_stocks()
+        
     except Exception as e:
         logger.error(f"定时任务执行失败: {str(e)}", exc_info=True)
 
@@ -0,0 +1,77 @@
+"""全市场信号筛选：对任意股票范围按日期区间筛选插件/策略信号，输出排序结果"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import csv
+from datetime import datetime
+from application.services.screener_service import ScreenerService, SCREENER_SIGNALS
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='全市场信号筛选',
+        epilog='示例: python screen_signals.py --signals sharp_drop_rebound,no_chase_high --start 2025-11-01 '
+               '--universe database --top 50\n可选信号: ' + ', '.join(SCREENER_SIGNALS),
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--signals', type=str, required=True, help='信号列表，逗号分隔')
+    parser.add_argument('--start', type=str, help='开始日期，格式：2025-11-01（默认今天）')
+    parser.add_argument('--end', type=str, help='结束日期，格式：2025-11-18（默认今天）')
+    parser.add_argument('--universe', type=str, choices=['database', 'config', 'group', 'codes'],
+                        help='股票范围：database（basic_stock全部股票）、config（配置文件全部分组）、group、codes')
+    parser.add_argument('--group', type=str, help='股票分组名（--universe group）')
+    parser.add_argument('--codes', type=str, help='股票代码，逗号分隔（--universe codes）')
+    parser.add_argument('--period', type=str, default='day', help='策略信号的分析周期（默认day）')
+    parser.add_argument('--workers', type=int, help='进程数（默认按配置，1为当前进程内执行）')
+    parser.add_argument('--top', type=int, default=100, help='输出前N条（默认100，0为全部）')
+    parser.add_argument('--output', type=str, help='同时写入CSV文件')
+    args = parser.parse_args()
+
+    today = datetime.now().strftime('%Y-%m-%d')
+    start_date = args.start or args.end or today
+    end_date = args.end or today
+    service = ScreenerService()
+    try:
+        stocks = service.resolve_universe(args.universe, args.group,
+                                          args.codes.split(',') if args.codes else None)
+        result = service.scan(stocks, args.signals.split(','), start_date, end_date,
+                              period=args.period, top=args.top or None, max_workers=args.workers)
+    except ValueError as e:
+        print(f"参数错误: {e}")
+        sys.exit(1)
+
+    print(f"\n{'='*100}")
+    print(f"信号筛选：{args.signals}  {start_date} 至 {end_date}")
+    print(f"扫描 {result['scanned']} 只股票，命中 {result['hits_count']} 次，失败 {len(result['errors'])} 只，"
+          f"耗时 {result['elapsed']} 秒")
+    print(f"{'='*100}\n")
+
+    if result['ranked']:
+        print(f"{'日期':<12} {'代码':<10} {'名称':<10} {'得分':<8} {'信号'}")
+        print("-" * 100)
+        for entry in result['ranked']:
+            print(f"{entry['date']:<12} {entry['code']:<10} {entry['name']:<10} {entry['score']:<8.1f} "
+                  f"{', '.join(entry['signals'])}")
+            for signal, reason in entry['reasons'].items():
+                if reason:
+                    print(f"{'':<12} - {SCREENER_SIGNALS[signal]['name']}: {reason}")
+    else:
+        print("区间内没有命中信号")
+
+    for error in result['errors'][:20]:
+        print(f"失败: {error['code']} {error['error']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['date', 'code', 'name', 'score', 'signals', 'reasons'])
+            for entry in result['ranked']:
+                writer.writerow([entry['date'], entry['code'], entry['name'], round(entry['score'], 2),
+                                 '|'.join(entry['signals']),
+                                 '|'.join(f"{s}:{r}" for s, r in entry['reasons'].items())])
+        print(f"\n已写入: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -24,3 +24,10 @@ LOCAL_DB_CONFIG = {
     'charset': 'utf8mb4'
 }
 
+# 并行复制配置（sync_stock_data.py --parallel，只需列出要修改的项）
+REPLICATION_CONFIG = {
+    'prod_readers': 4,          # 同时读取生产环境的连接数
+    'local_writers': 2,         # 同时写入本地的连接数
+    'batch_size': 5000,         # 每批写入行数
+    'load_method': 'insert'     # insert 或 load_data
+}
@@ -35,7 +35,9 @@ def main():
         logger.info(f"总股票数: {result['total_stocks']}")
         logger.info(f"成功: {result['success_count']} 只")
         logger.info(f"失败: {len(result['failed_stocks'])} 只")
-        logger.info(f"保存记录数: {result['total_saved']}")
+        logger.info(f"保存记录数: {result['total_saved']} "
+                    f"(新增 {result['total_inserted']}，更新 {result['total_updated']}，未变化跳过 {result['total_skipped']})")
+        logger.info(f"耗时: {result['elapsed']}秒, API请求次数: {result['total_attempts']}")
         
         if result['failed_stocks']:
             logger.warning(f"失败的股票: {', '.join(result['failed_stocks'])}")
@@ -1,18 +1,26 @@
 """从生产环境同步股票数据到本地数据库（增量同步）"""
 import sys
 import os
+import io
 import json
+import queue
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import pymysql
-from pymysql.cursors import DictCursor
+from pymysql.cursors import DictCursor, SSCursor
 
 # 添加项目路径
 backend_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_dir))
 
 from infrastructure.logging.logger import get_logger
+from infrastructure.persistence.kline_storage import is_unified_layout, copy_table_to_unified
 
 logger = get_logger(__name__)
 
@@ -48,6 +56,22 @@ except ImportError:
             'charset': 'utf8mb4'
         }
 
+# 并行复制配置（可在 sync_config.py 中定义 REPLICATION_CONFIG 覆盖其中的项）
+REPLICATION_CONFIG = {
+    'prod_readers': 4,          # 同时读取生产环境的连接数（即同时复制的表数）
+    'local_writers': 2,         # 同时写入本地的连接数
+    'batch_size': 5000,         # 每批写入行数，每批提交后记录一次检查点
+    'load_method': 'insert',    # insert: 多行INSERT ... ON DUPLICATE KEY UPDATE; load_data: LOAD DATA LOCAL INFILE
+    'full_days': 730,           # 全量同步的天数
+    'net_write_timeout': 600,   # 流式读取时生产端等待客户端取数的超时（秒），本地写入排队时不断开
+    'journal_path': str(backend_dir / 'scripts' / 'sync_journal.json')
+}
+try:
+    from scripts.sync_config import REPLICATION_CONFIG as _CUSTOM_REPLICATION_CONFIG
+    REPLICATION_CONFIG.update(_CUSTOM_REPLICATION_CONFIG)
+except ImportError:
+    pass
+
 # 周期类型映射
 PERIOD_TYPE_MAP = {
     '30min': '30min',
@@ -56,6 +80,10 @@ PERIOD_TYPE_MAP = {
     'month': '1month'
 }
 
+# 同步的K线列（生产与本地表结构一致）
+KLINE_COLUMNS = ['shi_jian', 'kai_pan_jia', 'zui_gao_jia', 'zui_di_jia', 'shou_pan_jia',
+                 'cheng_jiao_liang', 'liang_bi', 'wei_bi', 'peroid_type']
+
 
 def load_stock_config() -> Dict[str, List[Dict]]:
     """加载股票配置文件"""
@@ -97,6 +125,29 @@ def get_local_max_time(conn, table_name: str, period_code: str) -> Optional[date
         return None
 
 
+def build_upsert_query(table_name: str, columns: List[str] = KLINE_COLUMNS) -> str:
+    """
+    构建K线写入语句
+    
+    使用 ON DUPLICATE KEY UPDATE 去重（假设表有基于 (shi_jian, peroid_type) 的唯一索引）。
+    PyMySQL 的 executemany 会把 INSERT ... VALUES 改写为多行INSERT，一批只发送少数几条语句。
+    
+    Args:
+        table_name: 表名
+        columns: 写入的列（参数顺序与之一致），默认为同步的K线列
+    """
+    updates = ',\n            '.join(
+        f"{column} = VALUES({column})" for column in columns if column not in ('shi_jian', 'peroid_type')
+    )
+    return f"""
+        INSERT INTO {table_name} 
+        ({', '.join(columns)})
+        VALUES ({', '.join(['%s'] * len(columns))})
+        ON DUPLICATE KEY UPDATE
+            {updates}
+    """
+
+
 def sync_table_data(
     prod_conn,
     local_conn,
@@ -146,22 +197,7 @@ def sync_table_data(
         
         # 批量插入到本地数据库
         local_cursor = local_conn.cursor()
-        # 使用 INSERT IGNORE 或 ON DUPLICATE KEY UPDATE
-        # 假设表有基于 (shi_jian, peroid_type) 的唯一索引
-        insert_query = f"""
-            INSERT INTO {table_name} 
-            (shi_jian, kai_pan_jia, zui_gao_jia, zui_di_jia, shou_pan_jia,
-             cheng_jiao_liang, liang_bi, wei_bi, peroid_type)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-                kai_pan_jia = VALUES(kai_pan_jia),
-                zui_gao_jia = VALUES(zui_gao_jia),
-                zui_di_jia = VALUES(zui_di_jia),
-                shou_pan_jia = VALUES(shou_pan_jia),
-                cheng_jiao_liang = VALUES(cheng_jiao_liang),
-                liang_bi = VALUES(liang_bi),
-                wei_bi = VALUES(wei_bi)
-        """
+        insert_query = build_upsert_query(table_name)
         
         count = 0
         batch = []
@@ -225,6 +261,41 @@ def check_table_exists(conn, table_name: str) -> bool:
         return False
 
 
+def create_indicator_service():
+    """创建增量指标服务，失败时返回None（不影响K线同步）"""
+    try:
+        from application.services.indicator_service import IndicatorApplicationService
+        from infrastructure.persistence.kline_repository_impl import KLineRepositoryImpl
+        from infrastructure.persistence.indicator_repository_impl import IndicatorRepositoryImpl
+        return IndicatorApplicationService(KLineRepositoryImpl(), IndicatorRepositoryImpl())
+    except Exception as e:
+        logger.warning(f"⚠️  增量指标服务初始化失败，跳过指标更新: {str(e)}")
+        return None
+
+
+def mirror_to_unified(local_conn, table_name: str, period_type: str):
+    """统一K线表布局下，把刚同步到分表的K线增量复制到统一表（需在指标更新之前）"""
+    if not is_unified_layout():
+        return
+    try:
+        copy_table_to_unified(local_conn, table_name, PERIOD_TYPE_MAP[period_type])
+        local_conn.commit()
+    except Exception as e:
+        local_conn.rollback()
+        logger.error(f"❌ 复制到统一K线表失败 {table_name} {period_type}: {str(e)}")
+
+
+def refresh_indicators(indicator_service, table_name: str, period_type: str, rebuild: bool = False):
+    """同步后推进该表该周期的MA/MACD指标（历史K线被修正时 rebuild=True 重新全量计算）"""
+    if indicator_service is None:
+        return
+    try:
+        count = indicator_service.refresh(table_name, period_type, rebuild=rebuild)
+        logger.info(f"📈 指标更新完成 {table_name} {period_type}: {count} 根K线")
+    except Exception as e:
+        logger.error(f"❌ 指标更新失败 {table_name} {period_type}: {str(e)}")
+
+
 def sync_all_stocks():
     """同步所有股票数据"""
     logger.info("=" * 60)
@@ -257,6 +328,9 @@ def sync_all_stocks():
         # 支持的周期类型
         periods = ['30min', 'day', 'week', 'month']
         
+        # 新K线入库后增量推进MA/MACD指标
+        indicator_service = create_indicator_service()
+        
         total_synced = 0
         total_tables = 0
         
@@ -286,6 +360,8 @@ def sync_all_stocks():
                 total_synced += count
                 if count > 0:
                     total_tables += 1
+                    mirror_to_unified(local_conn, table_name, period_type)
+                    refresh_indicators(indicator_service, table_name, period_type)
         
         logger.info("\n" + "=" * 60)
         logger.info(f"同步完成！")
@@ -298,7 +374,393 @@ def sync_all_stocks():
         logger.info("数据库连接已关闭")
 
 
+class SyncJournal:
+    """
+    并行复制的检查点日志（JSON文件）
+    
+    按 表名:周期 记录状态、已提交到本地的最后一根K线时间和行数，每批提交后原子改写。
+    运行中断后再次执行会读取日志：已完成的组合跳过，未完成的从检查点继续；全部成功后删除日志。
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = {'full': False, 'started_at': None, 'entries': {}}
+    
+    def load(self) -> bool:
+        """读取上次未完成的日志，返回是否存在"""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+            return True
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️  检查点日志损坏，忽略: {self.path}, 错误={str(e)}")
+            return False
+    
+    def start(self, full: bool):
+        """开始新的一轮复制"""
+        with self.lock:
+            self.data = {'full': full, 'started_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'entries': {}}
+            self._flush()
+    
+    @property
+    def full(self) -> bool:
+        return bool(self.data.get('full'))
+    
+    def get(self, table_name: str, period_type: str) -> Dict:
+        with self.lock:
+            return dict(self.data['entries'].get(f"{table_name}:{period_type}", {}))
+    
+    def record(self, table_name: str, period_type: str, status: str, rows: int, last_time=None):
+        """
+        记录检查点
+        
+        Args:
+            status: running（已提交部分批次）/ done / failed
+            rows: 该组合累计写入行数
+            last_time: 已提交到本地的最后一根K线时间（None表示不变）
+        """
+        with self.lock:
+            entry = self.data['entries'].setdefault(f"{table_name}:{period_type}", {'last_time': None})
+            entry['status'] = status
+            entry['rows'] = rows
+            if last_time is not None:
+                entry['last_time'] = str(last_time)
+            entry['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self._flush()
+    
+    @staticmethod
+    def checkpoint_time(entry: Dict) -> Optional[datetime]:
+        return datetime.fromisoformat(entry['last_time']) if entry.get('last_time') else None
+    
+    def remove(self):
+        with self.lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+    
+    def _flush(self):
+        # 先写临时文件再替换，进程崩溃时不会留下半个日志
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+class LocalWriterPool:
+    """本地写入连接池：最多 size 个连接同时写入，连接在批次间复用"""
+    
+    def __init__(self, size: int, connect_kwargs: Dict):
+        self.connect_kwargs = connect_kwargs
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+    
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+                conn.ping(reconnect=True)
+            except queue.Empty:
+                conn = pymysql.connect(**self.connect_kwargs)
+            
+            try:
+                yield conn
+            except Exception:
+                try:
+                    conn.rollback()
+                    self._idle.put(conn)
+                except Exception:
+                    close_quietly(conn)
+                raise
+            self._idle.put(conn)
+        finally:
+            self._slots.release()
+    
+    def close(self):
+        while True:
+            try:
+                close_quietly(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+def close_quietly(conn):
+    """关闭连接，忽略已断开等错误"""
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def connect_prod(config: Dict):
+    """创建生产环境读取连接"""
+    conn = pymysql.connect(**PROD_DB_CONFIG)
+    cursor = conn.cursor()
+    cursor.execute("SET SESSION net_write_timeout = %s", (config['net_write_timeout'],))
+    cursor.close()
+    return conn
+
+
+def _tsv_field(value) -> str:
+    """LOAD DATA 默认格式的字段（\\N 表示NULL）"""
+    if value is None:
+        return '\\N'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+
+def load_data_batch(cursor, table_name: str, rows: List[tuple]):
+    """
+    用 LOAD DATA LOCAL INFILE 加载一批K线（REPLACE 覆盖已存在的行）
+    
+    数据先在内存中拼成制表符分隔文本；PyMySQL 按文件名读取 LOCAL INFILE，
+    因此一次性写入临时文件后加载，加载完即删除。
+    """
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(_tsv_field(value) for value in row))
+        buffer.write('\n')
+    
+    fd, path = tempfile.mkstemp(prefix=f'{table_name}_', suffix='.tsv')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(buffer.getvalue())
+        cursor.execute(f"""
+            LOAD DATA LOCAL INFILE %s
+            REPLACE INTO TABLE {table_name}
+            CHARACTER SET utf8mb4
+            FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n'
+            ({', '.join(KLINE_COLUMNS)})
+        """, (path.replace('\\', '/'),))
+    finally:
+        os.remove(path)
+
+
+def write_batch(conn, table_name: str, rows: List[tuple], load_method: str):
+    """写入一批K线并提交"""
+    cursor = conn.cursor()
+    try:
+        if load_method == 'load_data':
+            load_data_batch(cursor, table_name, rows)
+        else:
+            cursor.executemany(build_upsert_query(table_name), rows)
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def replicate_period(
+    prod_conn,
+    writer_pool: LocalWriterPool,
+    journal: SyncJournal,
+    table_name: str,
+    period_type: str,
+    config: Dict
+) -> int:
+    """
+    流式复制单个表单个周期的数据
+    
+    生产端使用服务端游标（SSCursor）逐批读取，不在内存中缓存整个结果集；
+    每批借用一个本地写入连接提交后记录检查点。
+    
+    Returns:
+        本次写入的记录数
+    """
+    period_code = PERIOD_TYPE_MAP[period_type]
+    entry = journal.get(table_name, period_type)
+    checkpoint = SyncJournal.checkpoint_time(entry)
+    rows_done = entry.get('rows', 0)
+    
+    if journal.full:
+        # 全量复制会覆盖本地已有数据，本地最大时间不代表进度，只能依据检查点
+        start_time = checkpoint or datetime.now() - timedelta(days=config['full_days'])
+    else:
+        with writer_pool.connection() as local_conn:
+            local_max_time = get_local_max_time(local_conn, table_name, period_code)
+        known_times = [t for t in (checkpoint, local_max_time) if t]
+        start_time = max(known_times) if known_times else datetime.now() - timedelta(days=config['full_days'])
+    
+    logger.info(f"{'续传' if checkpoint else '开始'}复制 {table_name} {period_type}: 从 {start_time} 开始")
+    
+    # 流式结果未读完时出错，游标不关闭（关闭会读完剩余结果），由调用方直接断开连接
+    prod_cursor = prod_conn.cursor(SSCursor)
+    prod_cursor.execute(f"""
+        SELECT {', '.join(KLINE_COLUMNS)}
+        FROM {table_name}
+        WHERE peroid_type = %s AND shi_jian > %s
+        ORDER BY shi_jian ASC
+    """, (period_code, start_time))
+    
+    count = 0
+    while True:
+        rows = prod_cursor.fetchmany(config['batch_size'])
+        if not rows:
+            break
+        with writer_pool.connection() as local_conn:
+            write_batch(local_conn, table_name, rows, config['load_method'])
+        count += len(rows)
+        journal.record(table_name, period_type, 'running', rows_done + count, rows[-1][0])
+        logger.debug(f"已复制 {table_name} {period_type}: {rows_done + count} 条记录")
+    prod_cursor.close()
+    
+    return count
+
+
+def replicate_table(
+    table_name: str,
+    writer_pool: LocalWriterPool,
+    journal: SyncJournal,
+    indicator_service,
+    config: Dict
+) -> Dict:
+    """
+    复制单个表的所有周期（全程占用一个生产读取连接）
+    
+    Returns:
+        {'synced': 写入记录数, 'periods': 有新数据的周期数, 'failed': 失败的 表名 周期}
+    """
+    result = {'synced': 0, 'periods': 0, 'failed': []}
+    prod_conn = None
+    try:
+        prod_conn = connect_prod(config)
+        if not check_table_exists(prod_conn, table_name):
+            logger.warning(f"⚠️  生产环境表不存在: {table_name}，跳过")
+            return result
+        with writer_pool.connection() as local_conn:
+            if not check_table_exists(local_conn, table_name):
+                logger.warning(f"⚠️  本地表不存在: {table_name}，跳过")
+                return result
+        
+        for period_type in PERIOD_TYPE_MAP:
+            entry = journal.get(table_name, period_type)
+            if entry.get('status') == 'done':
+                logger.info(f"ℹ️  {table_name} {period_type}: 检查点显示已完成，跳过")
+                continue
+            
+            start = time.time()
+            try:
+                count = replicate_period(prod_conn, writer_pool, journal, table_name, period_type, config)
+            except Exception as e:
+                logger.error(f"❌ 复制失败 {table_name} {period_type}: {str(e)}", exc_info=True)
+                journal.record(table_name, period_type, 'failed', journal.get(table_name, period_type).get('rows', 0))
+                result['failed'].append(f"{table_name} {period_type}")
+                # 连接上可能还有未读完的流式结果，换新连接继续下一个周期
+                close_quietly(prod_conn)
+                prod_conn = connect_prod(config)
+                continue
+            
+            if count > 0:
+                logger.info(f"✅ 复制完成 {table_name} {period_type}: {count} 条记录, "
+                            f"耗时 {time.time() - start:.2f}秒")
+                result['synced'] += count
+                result['periods'] += 1
+                with writer_pool.connection() as local_conn:
+                    mirror_to_unified(local_conn, table_name, period_type)
+                refresh_indicators(indicator_service, table_name, period_type)
+            else:
+                logger.info(f"ℹ️  {table_name} {period_type}: 无新数据")
+            journal.record(table_name, period_type, 'done', entry.get('rows', 0) + count)
+        
+        return result
+    except Exception as e:
+        logger.error(f"❌ 复制表失败 {table_name}: {str(e)}", exc_info=True)
+        result['failed'].append(table_name)
+        return result
+    finally:
+        if prod_conn is not None:
+            close_quietly(prod_conn)
+
+
+def replicate_all_stocks(full: bool = False, restart: bool = False, config: Optional[Dict] = None) -> Dict:
+    """
+    并行复制所有股票数据
+    
+    - 最多 prod_readers 个表同时从生产环境流式读取
+    - 最多 local_writers 个连接同时向本地写入
+    - 每批提交后记录检查点，中断后再次运行从检查点继续（restart=True 时丢弃检查点重新开始）
+    
+    Args:
+        full: 是否全量复制最近 full_days 天的数据（覆盖本地已有数据）
+        restart: 是否忽略未完成的检查点日志
+        config: 覆盖 REPLICATION_CONFIG 的配置项
+        
+    Returns:
+        复制结果统计
+    """
+    config = dict(REPLICATION_CONFIG, **(config or {}))
+    
+    logger.info("=" * 60)
+    logger.info("开始并行复制股票数据（从生产环境到本地）")
+    logger.info("=" * 60)
+    
+    journal = SyncJournal(config['journal_path'])
+    # 未完成的全量复制总是续传；未完成的增量复制遇到 --full 时重新开始
+    if not restart and journal.load() and (journal.full or not full):
+        logger.info(f"发现未完成的检查点日志 {config['journal_path']}，从检查点继续"
+                    f"（{'全量' if journal.full else '增量'}，开始于 {journal.data.get('started_at')}）")
+    else:
+        journal.start(full)
+    
+    table_names = get_all_table_names()
+    logger.info(f"找到 {len(table_names)} 个股票表需要复制, {'全量' if journal.full else '增量'}, "
+                f"读取并发 {config['prod_readers']}, 写入并发 {config['local_writers']}, "
+                f"每批 {config['batch_size']} 行, 加载方式 {config['load_method']}")
+    
+    local_config = dict(LOCAL_DB_CONFIG)
+    if config['load_method'] == 'load_data':
+        local_config['local_infile'] = True
+    writer_pool = LocalWriterPool(config['local_writers'], local_config)
+    indicator_service = create_indicator_service()
+    
+    start_time = time.time()
+    try:
+        with ThreadPoolExecutor(max_workers=config['prod_readers']) as executor:
+            results = list(executor.map(
+                lambda table_name: replicate_table(table_name, writer_pool, journal, indicator_service, config),
+                table_names
+            ))
+    finally:
+        writer_pool.close()
+    
+    summary = {
+        'total_tables': len(table_names),
+        'total_synced': sum(r['synced'] for r in results),
+        'total_periods': sum(r['periods'] for r in results),
+        'failed': [failed for r in results for failed in r['failed']],
+        'elapsed': round(time.time() - start_time, 2)
+    }
+    
+    logger.info("\n" + "=" * 60)
+    logger.info(f"复制完成！共写入 {summary['total_synced']} 条记录，涉及 {summary['total_periods']} 个表/周期组合，"
+                f"耗时 {summary['elapsed']}秒")
+    if summary['failed']:
+        logger.warning(f"失败 {len(summary['failed'])} 个: {', '.join(summary['failed'])}")
+        logger.warning(f"检查点日志已保留: {config['journal_path']}，重新运行将从检查点继续")
+    else:
+        journal.remove()
+    logger.info("=" * 60)
+    return summary
+
+
 if __name__ == '__main__':
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='从生产环境同步股票K线数据到本地数据库')
+    parser.add_argument('--parallel', action='store_true',
+                        help='并行复制：多表并发、流式读取、批量加载、检查点续传')
+    parser.add_argument('--full', action='store_true', help='（并行）重新复制最近 full_days 天的数据')
+    parser.add_argument('--restart', action='store_true', help='（并行）忽略未完成的检查点日志重新开始')
+    parser.add_argument('--readers', type=int, help='（并行）生产环境读取并发数')
+    parser.add_argument('--writers', type=int, help='（并行）本地写入并发数')
+    parser.add_argument('--batch-size', type=int, help='（并行）每批写入行数')
+    parser.add_argument('--load-data', action='store_true',
+                        help='（并行）使用 LOAD DATA LOCAL INFILE 加载（本地MySQL需开启 local_infile）')
+    args = parser.parse_args()
+    
     # 检查配置
     if PROD_DB_CONFIG.get('host') in ['生产环境IP', '192.168.1.100'] or not PROD_DB_CONFIG.get('host'):
         print("=" * 60)
@@ -314,5 +776,18 @@ if __name__ == '__main__':
     print(f"本地环境: {LOCAL_DB_CONFIG['host']}:{LOCAL_DB_CONFIG['port']}")
     print("=" * 60)
     
+    if args.parallel:
+        overrides = {}
+        if args.readers:
+            overrides['prod_readers'] = args.readers
+        if args.writers:
+            overrides['local_writers'] = args.writers
+        if args.batch_size:
+            overrides['batch_size'] = args.batch_size
+        if args.load_data:
+            overrides['load_method'] = 'load_data'
+        summary = replicate_all_stocks(full=args.full, restart=args.restart, config=overrides)
+        sys.exit(1 if summary['failed'] else 0)
+    
     sync_all_stocks()
 
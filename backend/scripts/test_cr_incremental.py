@@ -0,0 +1,105 @@
+"""CR增量分析测试：前N根K线的检查点续算到最后一根，结果与对全部K线从头分析逐字段一致"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import time
+from datetime import datetime
+from application.services.cr_point_service import CRPointService, CRResultCache
+from domain.models.kline import KLineData
+from infrastructure.config.stock_registry import get_stock_registry
+
+
+def canonical(result) -> str:
+    return json.dumps(result, sort_keys=True, default=str)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ('-h', '--help'):
+        print("用法: python test_cr_incremental.py [股票代码] [周期] [新增K线数,...]")
+        print("示例: python test_cr_incremental.py SZ300188 day 1,5,20,120")
+        sys.exit(0)
+
+    registry = get_stock_registry()
+    stock = registry.info(sys.argv[1]) if len(sys.argv) > 1 else registry.all_stocks()[0]
+    period = sys.argv[2] if len(sys.argv) > 2 else 'day'
+    new_bar_counts = [int(n) for n in sys.argv[3].split(',')] if len(sys.argv) > 3 else [1, 5, 20, 120]
+
+    service = CRPointService(result_cache=CRResultCache(), checkpoint_store=CRResultCache(namespace='cr_checkpoint'))
+    # 首次分析：加载K线、指标、每日机会，并生成检查点
+    cold, cold_ms = timed(lambda: service.analyze_stock(stock.code, stock.name, stock.table_name, period))
+    if cold is None:
+        print(f"❌ K线数据为空: {stock.code} {stock.table_name}")
+        sys.exit(1)
+
+    kline_result = service.kline_service.get_kline_data(stock.table_name, period)
+    kline_list, ma_data, macd_data = kline_result['kline_data'], kline_result['ma'], kline_result['macd']
+    klines = [KLineData(time=datetime.strptime(k['time'], '%Y-%m-%d %H:%M:%S'), open=k['open'], high=k['high'],
+                        low=k['low'], close=k['close'], volume=k['volume'], liangbi=k.get('liangbi', 0),
+                        weibi=k.get('weibi', 0)) for k in kline_list]
+    volume_types, bullish_patterns = {}, {}
+    for dc in service.daily_chance_repo.find_by_stock_code(stock.code, kline_list[0]['time'].split(' ')[0],
+                                                           kline_list[-1]['time'].split(' ')[0]):
+        if dc.volume_type:
+            volume_types[dc.date.strftime('%Y-%m-%d')] = dc.volume_type
+        if dc.bullish_pattern:
+            bullish_patterns[dc.date.strftime('%Y-%m-%d')] = dc.bullish_pattern
+    inputs = {'volume_types': volume_types, 'bullish_patterns': bullish_patterns}
+    n = len(klines)
+    failures = []
+
+    full_state, full_ms = timed(lambda: service.resume_cr_analysis(
+        stock.code, stock.name, klines, ma_data=ma_data, macd_data=macd_data, **inputs))
+    full = canonical(full_state.to_result())
+    if full != canonical({k: v for k, v in cold.items() if k not in ('macd', 'ma')}):
+        failures.append("analyze_stock 与全量分析结果不一致")
+    print(f"{stock.code} {period}: {n}根K线, 全量分析 {full_ms:.1f}ms (analyze_stock 首次 {cold_ms:.1f}ms)")
+
+    for new_bars in new_bar_counts:
+        k = n - new_bars
+        if k <= 0:
+            continue
+        # 检查点生成时的窗口只有前k根K线（指标也只算到第k根）
+        checkpoint = service.resume_cr_analysis(
+            stock.code, stock.name, klines[:k],
+            ma_data={name: values[:k] for name, values in ma_data.items()},
+            macd_data={name: values[:k] for name, values in macd_data.items()}, **inputs)
+        # 经过序列化（检查点存储）后续算
+        stored = type(checkpoint).from_dict(json.loads(json.dumps(checkpoint.to_dict())))
+        resumed, resume_ms = timed(lambda: service.resume_cr_analysis(
+            stock.code, stock.name, klines, stored, ma_data=ma_data, macd_data=macd_data, **inputs))
+        same_result = canonical(resumed.to_result()) == full
+        same_state = resumed.to_dict() == full_state.to_dict()
+        print(f"  新增{new_bars}根: 续算 {resume_ms:.1f}ms, 结果{'一致' if same_result else '不一致'}, "
+              f"状态{'一致' if same_state else '不一致'}")
+        if not (same_result and same_state):
+            failures.append(f"新增{new_bars}根K线时续算结果与全量分析不一致")
+        if checkpoint.to_dict() != stored.to_dict():
+            failures.append("检查点序列化后不一致")
+
+    # 再次分析（结果缓存清空、没有新K线）：直接使用检查点，结果不变
+    service.result_cache.clear()
+    again = service.analyze_stock(stock.code, stock.name, stock.table_name, period)
+    if canonical(again) != canonical(cold):
+        failures.append("从检查点恢复的结果与首次分析不一致")
+    stats = service.checkpoint_store.get_stats()
+    print(f"检查点存储: {stats['entries']} 条, 命中 {stats['hits']} 次")
+    if stats['hits'] != 1:
+        failures.append("再次分析未使用检查点")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ 从检查点续算的结果与全量分析完全一致")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""CR分析结果缓存测试：同一股票重复分析命中缓存且结果一致，配置重新加载、同步失效后重新计算"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import time
+from application.services.cr_point_service import CRPointService, CRResultCache
+from domain.services.config_service import get_config_service
+from infrastructure.config.stock_registry import get_stock_registry
+from infrastructure.persistence.database import DatabaseConnection
+from infrastructure.persistence.kline_storage import get_kline_source
+from domain.services.period_service import PeriodService
+
+
+def update_close(table_name: str, period: str, bar_time: str, delta: float):
+    """修改窗口内一根历史K线的收盘价（模拟数据校验修复了历史K线）"""
+    source = get_kline_source(table_name)
+    with DatabaseConnection.get_connection_context() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            UPDATE {source.table} SET shou_pan_jia = shou_pan_jia + %s
+            {source.where('peroid_type = %s', 'shi_jian = %s')}
+        """, [delta] + source.params(PeriodService.get_period_code(period), bar_time))
+        conn.commit()
+        cursor.close()
+
+
+def swap_volume_type(stock_code: str, volume_type):
+    """
+    原地修改最早一条每日机会的成交量类型（记录数、最新日期不变），返回原值
+
+    显式保留 updated_at，模拟同一秒内的写回或修改较早记录时最大更新时间不变的情况
+    """
+    with DatabaseConnection.get_connection_context() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT date, volume_type FROM daily_chance WHERE stock_code = %s ORDER BY date LIMIT 1",
+                       (stock_code,))
+        row = cursor.fetchone()
+        if row is None:
+            cursor.close()
+            return None
+        cursor.execute("""
+            UPDATE daily_chance SET volume_type = %s, updated_at = updated_at
+            WHERE stock_code = %s AND date = %s
+        """, (volume_type, stock_code, row[0]))
+        conn.commit()
+        cursor.close()
+        return row
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ('-h', '--help'):
+        print("用法: python test_cr_result_cache.py [股票代码] [周期] [重复次数]")
+        print("示例: python test_cr_result_cache.py SZ300188 day 20")
+        sys.exit(0)
+
+    registry = get_stock_registry()
+    stock = registry.info(sys.argv[1]) if len(sys.argv) > 1 else registry.all_stocks()[0]
+    period = sys.argv[2] if len(sys.argv) > 2 else 'day'
+    repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    cache = CRResultCache(max_entries=10)
+    get_config_service().add_change_listener(cache.clear)
+    service = CRPointService(result_cache=cache)
+    analyze = lambda: service.analyze_stock(stock.code, stock.name, stock.table_name, period)
+    failures = []
+
+    cold, cold_ms = timed(analyze)
+    if cold is None:
+        print(f"❌ K线数据为空: {stock.code} {stock.table_name}")
+        sys.exit(1)
+    snapshot = json.dumps(cold, default=str, sort_keys=True)
+
+    warm_times = []
+    for _ in range(repeat):
+        warm, warm_ms = timed(analyze)
+        warm_times.append(warm_ms)
+        if warm is not cold:
+            failures.append("重复分析未命中缓存")
+            break
+    warm_times.sort()
+    print(f"{stock.code} {period}: 首次 {cold_ms:.1f}ms, 命中缓存 中位数 {warm_times[len(warm_times) // 2]:.2f}ms, "
+          f"最大 {warm_times[-1]:.2f}ms")
+    if warm_times[len(warm_times) // 2] >= 10:
+        failures.append(f"命中缓存耗时过长: {warm_times[len(warm_times) // 2]:.2f}ms")
+
+    # 重新加载策略配置后版本变化，重新计算的结果与首次一致
+    get_config_service().reload_config()
+    recomputed, recompute_ms = timed(analyze)
+    if recomputed is cold:
+        failures.append("配置重新加载后仍返回旧结果")
+    if json.dumps(recomputed, default=str, sort_keys=True) != snapshot:
+        failures.append("重新计算的结果与首次不一致")
+    print(f"配置重新加载后重新计算: {recompute_ms:.1f}ms")
+
+    # 同步写入后失效
+    cache.invalidate(stock.code)
+    if cache.get_stats()['entries']:
+        failures.append("失效后仍有缓存条目")
+    analyze()
+
+    # 窗口内历史K线被修正（K线数量、首尾时间不变）后版本变化，不再命中旧结果
+    current = analyze()
+    bar_time = current['c_points'][0]['triggerDate'] + ' 00:00:00' if current['c_points'] else None
+    if bar_time is not None:
+        update_close(stock.table_name, period, bar_time, 0.01)
+        try:
+            corrected = analyze()
+            if corrected is current:
+                failures.append("历史K线修正后仍返回旧结果")
+        finally:
+            update_close(stock.table_name, period, bar_time, -0.01)
+        if json.dumps(analyze(), default=str, sort_keys=True) != snapshot:
+            failures.append("恢复历史K线后的结果与首次不一致")
+        print(f"修正历史K线 {bar_time} 后重新计算")
+
+    # 较早的每日机会记录被原地修改（记录数、最新日期、最近更新时间不变）后版本变化
+    current = analyze()
+    original = swap_volume_type(stock.code, 'A,B,C,D,E,F,G,H')
+    if original is not None:
+        try:
+            changed = analyze()
+            if changed is current:
+                failures.append("每日机会记录原地修改后仍返回旧结果")
+        finally:
+            swap_volume_type(stock.code, original[1])
+        if json.dumps(analyze(), default=str, sort_keys=True) != snapshot:
+            failures.append("恢复每日机会记录后的结果与首次不一致")
+        print(f"原地修改每日机会 {original[0]} 后重新计算")
+
+    stats = cache.get_stats()
+    print(f"缓存统计: {stats}")
+    if stats['hits'] != repeat + 2:
+        failures.append(f"命中次数 {stats['hits']} != {repeat + 2}")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ 缓存命中、失效和结果一致性符合预期")
+
+
+if __name__ == '__main__':
+    main()
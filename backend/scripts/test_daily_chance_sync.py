@@ -0,0 +1,199 @@
+"""每日机会并发同步测试：对本地桩HTTP服务分别串行、并发同步，校验重试、连接复用、结果一致性和增量写入"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from application.services.daily_chance_service import DailyChanceService
+from domain.models.stock import StockGroups
+from infrastructure.external_apis.daily_chance_api import DailyChanceApiClient
+
+
+class StubState:
+    """桩服务状态：按股票代码注入延迟和故障，记录请求和连接"""
+
+    def __init__(self, latency: float, read_timeout: float):
+        self.latency = latency
+        self.read_timeout = read_timeout
+        self.version = 1  # 第2版：尾号4的股票修改最后一天并新增一天
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.connections = set()
+
+    def count(self, stock_code: str, client_address) -> int:
+        with self.lock:
+            self.requests[stock_code] = self.requests.get(stock_code, 0) + 1
+            self.connections.add(client_address)
+            return self.requests[stock_code]
+
+
+def make_handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # 支持keep-alive
+
+        def do_POST(self):
+            stock_code = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode()
+            n = state.count(stock_code, self.client_address)
+
+            if stock_code.endswith('1') and n <= 2:
+                return self._reply(503, [])  # 前两次503，第三次成功
+            if stock_code.endswith('2') and n == 1:
+                time.sleep(state.read_timeout * 2)  # 第一次读取超时
+            if stock_code.endswith('3'):
+                return self._reply(404, [])  # 不可重试
+            time.sleep(state.latency)
+
+            changed = state.version == 2 and stock_code.endswith('4')
+            days = [{'day': f"2024-06-{d:02d} 00:00:00", 'chance': 0.5 + d / 100,
+                     'winRatioDescription': f"日线赔率得分：{d}.10，周线赔率得分：2.00，赔率总分：{d + 2}.10",
+                     'supportPrice': 10.0, 'pressurePrice': 12.5 if changed and d == 20 else 12.0}
+                    for d in range(1, 22 if changed else 21)]
+            self._reply(200, days)
+
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode()
+            try:
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # 客户端已超时断开
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class MemoryRepository:
+    """内存仓储，只实现同步用到的方法，并记录写入次数"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rows = {}
+        self.hashes = {}
+        self.written = 0
+
+    def find_latest_date(self, stock_code: str):
+        with self.lock:
+            dates = [date for code, date in self.hashes if code == stock_code]
+        return max(dates) if dates else None
+
+    def find_content_hashes(self, stock_code: str):
+        with self.lock:
+            return {date: value for (code, date), value in self.hashes.items() if code == stock_code}
+
+    def save_batch(self, daily_chances) -> int:
+        with self.lock:
+            for dc in daily_chances:
+                date_str = dc.date.strftime('%Y-%m-%d')
+                self.rows[(dc.stock_code, date_str)] = dc.to_dict()
+                self.hashes[(dc.stock_code, date_str)] = dc.content_hash()
+            self.written += len(daily_chances)
+        return len(daily_chances)
+
+
+def run_sync(url: str, stock_groups: StockGroups, state: StubState, max_workers: int,
+             repository: MemoryRepository = None) -> dict:
+    state.requests.clear()
+    state.connections.clear()
+    client = DailyChanceApiClient(url, {
+        'max_workers': max_workers, 'connect_timeout': 1, 'timeout': state.read_timeout,
+        'rate_limit_per_second': 200, 'max_retries': 3, 'backoff_base': 0.05, 'backoff_max': 0.2
+    })
+    repository = repository or MemoryRepository()
+    try:
+        result = DailyChanceService(repository, client, stock_groups).sync_all_stocks_daily_chance(max_workers)
+    finally:
+        client.close()
+    result['rows'] = dict(repository.rows)
+    result['connections'] = len(state.connections)
+    result['requests'] = sum(state.requests.values())
+    return result
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ('-h', '--help'):
+        print("用法: python test_daily_chance_sync.py [股票数量] [并发数] [单次延迟秒]")
+        print("示例: python test_daily_chance_sync.py 40 8 0.1")
+        sys.exit(0)
+
+    stock_count = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.1
+
+    state = StubState(latency, read_timeout=0.5)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/stock/getDailyChanceWithBeauty"
+
+    config = {'波段': [{'name': f"测试{i}", 'code': f"SZ3000{i:02d}", 'table': f"basic_data_sz3000{i:02d}"}
+                     for i in range(stock_count)]}
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8') as f:
+        json.dump(config, f, ensure_ascii=False)
+    stock_groups = StockGroups(f.name)
+    os.unlink(f.name)
+
+    failures = []
+    serial = run_sync(url, stock_groups, state, 1)
+    repository = MemoryRepository()
+    concurrent = run_sync(url, stock_groups, state, max_workers, repository)
+
+    # 再同步两次：数据不变时不写入；尾号4的股票修改一天、新增一天
+    written = repository.written
+    unchanged = run_sync(url, stock_groups, state, max_workers, repository)
+    unchanged_written = repository.written - written
+    state.version = 2
+    delta = run_sync(url, stock_groups, state, max_workers, repository)
+    server.shutdown()
+
+    for name, result in (('串行', serial), ('并发', concurrent)):
+        print(f"{name}: 耗时 {result['elapsed']}秒, 成功 {result['success_count']}/{result['total_stocks']}, "
+              f"请求 {result['requests']} 次, TCP连接 {result['connections']} 个")
+        expected_failed = sorted(f"SZ3000{i:02d}(测试{i})" for i in range(stock_count) if i % 10 == 3)
+        if sorted(result['failed_stocks']) != expected_failed:
+            failures.append(f"{name}失败股票不符: {result['failed_stocks']}")
+        if result['connections'] > max(2 * max_workers, 4) + stock_count // 10:
+            failures.append(f"{name}连接未复用: {result['connections']} 个连接")
+        for stats in result['stock_stats']:
+            code = stats['stock_code']
+            if code.endswith('1') and stats['attempts'] != 3:
+                failures.append(f"{name} {code} 503重试次数 {stats['attempts']} != 3")
+            if code.endswith('2') and stats['attempts'] != 2:
+                failures.append(f"{name} {code} 超时重试次数 {stats['attempts']} != 2")
+            if code.endswith('3') and stats['attempts'] != 1:
+                failures.append(f"{name} {code} 404不应重试")
+
+    changed_stocks = sum(1 for i in range(stock_count) if i % 10 == 4)
+    print(f"重复同步: 写入 {unchanged_written} 条, 跳过 {unchanged['total_skipped']} 条; "
+          f"变化后: 新增 {delta['total_inserted']} 条, 更新 {delta['total_updated']} 条, "
+          f"跳过 {delta['total_skipped']} 条")
+    if unchanged_written or unchanged['total_skipped'] != concurrent['total_inserted']:
+        failures.append("数据未变化时仍有写入")
+    if delta['total_inserted'] != changed_stocks or delta['total_updated'] != changed_stocks:
+        failures.append(f"增量写入数量不符: 新增 {delta['total_inserted']}, 更新 {delta['total_updated']}, "
+                        f"期望各 {changed_stocks}")
+    if serial['rows'] != concurrent['rows']:
+        failures.append("串行与并发同步的结果不一致")
+    if concurrent['elapsed'] >= serial['elapsed']:
+        failures.append("并发同步没有比串行快")
+
+    slowest = sorted(concurrent['stock_stats'], key=lambda stats: stats['elapsed'], reverse=True)[:3]
+    print("并发最慢: " + ", ".join(f"{s['stock_code']} {s['elapsed']}秒/{s['attempts']}次" for s in slowest))
+    print(f"加速比: {serial['elapsed'] / concurrent['elapsed']:.1f}x")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ 并发同步结果与串行一致，重试、连接复用和增量写入符合预期")
+
+
+if __name__ == '__main__':
+    main()
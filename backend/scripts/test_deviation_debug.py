@@ -4,7 +4,9 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from datetime import datetime, timedelta
+from domain.models.analysis_context import AnalysisContext
 from domain.services.r_point_plugin_service import RPointPluginService
+from infrastructure.config.stock_registry import get_stock_registry
 from infrastructure.persistence.daily_repository_impl import DailyRepositoryImpl
 from infrastructure.persistence.daily_chance_repository_impl import DailyChanceRepositoryImpl
 from infrastructure.logging.logger import get_logger
@@ -61,12 +63,12 @@ def test_deviation_plugin(stock_code: str, start_date_str: str, end_date_str: st
         
         # 初始化R点服务
         r_service = RPointPluginService()
-        r_service.init_cache(stock_code, query_start, query_end)
+        context = AnalysisContext.load(stock_code, query_start, query_end)
         
-        print(f"缓存已初始化: daily={len(r_service._daily_cache)}条, daily_chance={len(r_service._daily_chance_cache)}条\n")
+        print(f"缓存已初始化: daily={len(context.bars)}条, daily_chance={len(context.daily_chance_cache)}条\n")
         
         # 主板还是非主板
-        is_main_board = stock_code.startswith(('SH600', 'SH601', 'SH603', 'SH605', 'SZ000', 'SZ001'))
+        is_main_board = get_stock_registry().is_main_board(stock_code)
         board_type = "主板" if is_main_board else "创业板/科创板"
         print(f"股票类型: {board_type}")
         print(f"涨停阈值: {'9.9%' if is_main_board else '19.8%'}")
@@ -82,17 +84,17 @@ def test_deviation_plugin(stock_code: str, start_date_str: str, end_date_str: st
             date_str = test_date.strftime('%Y-%m-%d')
             
             # 检查缓存数据
-            if date_str not in r_service._daily_cache:
+            if context.bars.index_of(date_str) is None:
                 continue
             
-            if date_str not in r_service._daily_chance_cache:
+            if date_str not in context.daily_chance_cache:
                 continue
             
-            current_data = r_service._daily_cache[date_str]
-            current_chance = r_service._daily_chance_cache[date_str]
+            current_data = context.get_daily(date_str)
+            current_chance = context.daily_chance_cache[date_str]
             
             # 获取前20日数据
-            prev_dates = r_service._get_previous_trading_dates_from_cache(date_str)
+            prev_dates = context.get_previous_trading_dates(date_str)
             if len(prev_dates) < 20:
                 continue
             
@@ -100,9 +102,9 @@ def test_deviation_plugin(stock_code: str, start_date_str: str, end_date_str: st
             change_pcts = []
             for i in range(min(20, len(prev_dates))):
                 prev_date = prev_dates[i]
-                if prev_date not in r_service._daily_cache:
+                if context.bars.index_of(prev_date) is None:
                     break
-                data = r_service._daily_cache[prev_date]
+                data = context.get_daily(prev_date)
                 if data.pre_close and data.pre_close > 0:
                     pct = (data.close - data.pre_close) / data.pre_close * 100
                     change_pcts.append(pct)
@@ -141,7 +143,7 @@ def test_deviation_plugin(stock_code: str, start_date_str: str, end_date_str: st
                 print(f"  当日K线: O={current_data.open:.2f}, C={current_data.close:.2f}, H={current_data.high:.2f}, L={current_data.low:.2f}")
                 
                 # 执行完整的R点检测
-                plugin_result = r_service._check_deviation(stock_code, test_date)
+                plugin_result = r_service._check_deviation(stock_code, test_date, context)
                 if plugin_result.triggered:
                     print(f"  ✓✓✓ 触发乖离率偏离: {plugin_result.reason}")
                 else:
@@ -151,8 +153,6 @@ def test_deviation_plugin(stock_code: str, start_date_str: str, end_date_str: st
         print("测试完成")
         print("="*100)
         
-        r_service.clear_cache()
-        
     except Exception as e:
         logger.error(f"测试失败: {e}", exc_info=True)
 
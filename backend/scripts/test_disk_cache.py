@@ -0,0 +1,121 @@
+"""磁盘缓存测试：模拟服务重启后，未变化的股票只查询版本、不再读取K线和指标；校验损坏检测和LRU淘汰"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import sqlite3
+import tempfile
+import time
+from application.services.cr_point_service import CRPointService, CRResultCache
+from application.services.kline_service import KLineApplicationService
+from application.services.indicator_service import IndicatorApplicationService
+from infrastructure.config.stock_registry import get_stock_registry
+from infrastructure.persistence.disk_cache import DiskCache
+from infrastructure.persistence.indicator_repository_impl import IndicatorRepositoryImpl
+from infrastructure.persistence.kline_repository_impl import KLineRepositoryImpl
+from test_query_plans import install_recorder
+from test_cr_result_cache import update_close
+
+
+def new_process_services(cache_path: str) -> CRPointService:
+    """相当于一次服务重启：新的磁盘缓存连接、空的内存缓存"""
+    disk = DiskCache(cache_path)
+    kline_repository = KLineRepositoryImpl()
+    kline_service = KLineApplicationService(
+        kline_repository, IndicatorApplicationService(kline_repository, IndicatorRepositoryImpl()), disk)
+    return CRPointService(kline_service, result_cache=CRResultCache(disk=disk))
+
+
+def cold_close(result, bar_time: str) -> float:
+    """首次分析时该K线的收盘价（取自C点记录）"""
+    return next(p['closePrice'] for p in result['c_points'] if p['triggerDate'] + ' 00:00:00' == bar_time)
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ('-h', '--help'):
+        print("用法: python test_disk_cache.py [股票代码] [周期]")
+        print("示例: python test_disk_cache.py SZ300188 day")
+        sys.exit(0)
+
+    registry = get_stock_registry()
+    stock = registry.info(sys.argv[1]) if len(sys.argv) > 1 else registry.all_stocks()[0]
+    period = sys.argv[2] if len(sys.argv) > 2 else 'day'
+    cache_path = os.path.join(tempfile.mkdtemp(), 'analysis_cache.db')
+    failures = []
+
+    recorder = []
+    install_recorder(recorder)
+
+    def analyze(service):
+        recorder.clear()
+        start = time.perf_counter()
+        result = service.analyze_stock(stock.code, stock.name, stock.table_name, period)
+        return result, (time.perf_counter() - start) * 1000, len(recorder)
+
+    cold, cold_ms, cold_queries = analyze(new_process_services(cache_path))
+    if cold is None:
+        print(f"❌ K线数据为空: {stock.code} {stock.table_name}")
+        sys.exit(1)
+    warm, warm_ms, warm_queries = analyze(new_process_services(cache_path))
+    print(f"冷启动: {cold_ms:.1f}ms, 查询 {cold_queries} 条; 重启后: {warm_ms:.1f}ms, 查询 {warm_queries} 条")
+    if json.dumps(warm, sort_keys=True) != json.dumps(cold, sort_keys=True):
+        failures.append("重启后读取的结果与首次计算不一致")
+    if warm_queries > 3:
+        failures.append(f"重启后仍查询了 {warm_queries} 条（应只查询K线窗口和每日机会的版本）")
+
+    # 窗口内历史K线被修正（数量、首尾时间不变）后，重启也不再读取旧的K线窗口和分析结果
+    bar_time = cold['c_points'][0]['triggerDate'] + ' 00:00:00' if cold['c_points'] else None
+    if bar_time is not None:
+        update_close(stock.table_name, period, bar_time, 0.01)
+        try:
+            corrected, _, corrected_queries = analyze(new_process_services(cache_path))
+            if corrected_queries <= warm_queries:
+                failures.append("历史K线修正后重启仍直接读取磁盘缓存")
+            bars = new_process_services(cache_path).kline_service.get_kline_data(stock.table_name, period)
+            if not any(k['time'] == bar_time and abs(k['close'] - cold_close(cold, bar_time) - 0.01) < 1e-6
+                       for k in bars['kline_data']):
+                failures.append("历史K线修正后磁盘缓存仍返回旧的K线窗口")
+        finally:
+            update_close(stock.table_name, period, bar_time, -0.01)
+        restored, _, _ = analyze(new_process_services(cache_path))
+        if json.dumps(restored, sort_keys=True) != json.dumps(cold, sort_keys=True):
+            failures.append("恢复历史K线后的结果与首次不一致")
+        print(f"修正历史K线 {bar_time} 后重启: 重新查询并计算")
+
+    # 损坏的记录被丢弃，重新计算
+    conn = sqlite3.connect(cache_path)
+    conn.execute("UPDATE cache_entry SET payload = zeroblob(length(payload)) WHERE namespace = 'cr'")
+    conn.commit()
+    conn.close()
+    disk = DiskCache(cache_path)
+    service = new_process_services(cache_path)
+    service.result_cache.disk = disk
+    repaired, _, _ = analyze(service)
+    if disk.get_stats()['corrupted'] != 1:
+        failures.append(f"未检测到损坏记录: {disk.get_stats()}")
+    if json.dumps(repaired, sort_keys=True) != json.dumps(cold, sort_keys=True):
+        failures.append("损坏后重新计算的结果不一致")
+
+    # 超出大小上限时淘汰最久未访问的记录
+    small = DiskCache(os.path.join(os.path.dirname(cache_path), 'small.db'), max_bytes=4096)
+    for i in range(20):
+        small.put('test', f"k{i}", 1, {'values': [i * 7919 % 1000 + j / 7 for j in range(100)]})
+        time.sleep(0.001)
+    stats = small.get_stats()
+    print(f"淘汰测试: {stats['entries']} 条, {stats['bytes']} 字节, 淘汰 {stats['evictions']} 条")
+    if stats['bytes'] > 4096 or not stats['evictions'] or small.get('test', 'k19', 1) is None:
+        failures.append("LRU淘汰不符合预期")
+    if small.get('test', 'k19', 2) is not None:
+        failures.append("版本不同仍命中")
+
+    print(f"磁盘缓存统计: {disk.get_stats()}")
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ 重启后未变化的股票直接读取磁盘缓存，损坏检测和LRU淘汰符合预期")
+
+
+if __name__ == '__main__':
+    main()
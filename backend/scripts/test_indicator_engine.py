@@ -0,0 +1,93 @@
+"""增量指标一致性测试：逐根推进（含状态序列化往返）与 MAService/MACDService 全量计算结果必须逐位相等"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from domain.models.kline import KLineData
+from domain.models.indicator import IndicatorState
+from domain.services.indicator_engine import IndicatorEngine
+from domain.services.ma_service import MAService
+from domain.services.macd_service import MACDService
+
+
+def build_random_klines(count: int, seed: int):
+    """生成随机收盘价K线"""
+    rnd = random.Random(seed)
+    klines = []
+    price = 20.0
+    start = datetime(2020, 1, 1, 15, 0, 0)
+    for i in range(count):
+        price = max(0.5, round(price * (1 + rnd.gauss(0, 0.03)), 2))
+        klines.append(KLineData(start + timedelta(days=i), price, price, price, price, 0, 0, 0))
+    return klines
+
+
+def incremental(klines, period_type: str, split_every: int):
+    """每 split_every 根K线把状态序列化为JSON再恢复，模拟同步脚本分批推进"""
+    state = IndicatorEngine.new_state(period_type)
+    points = []
+    for start in range(0, len(klines), split_every):
+        state = IndicatorState.from_dict(json.loads(json.dumps(state.to_dict())))
+        points.extend(IndicatorEngine.replay(state, klines[start:start + split_every]))
+    return IndicatorEngine.to_series(state.ma_periods, points)
+
+
+def compare(klines, period_type: str, split_every: int) -> int:
+    """返回不一致的数值个数"""
+    closes = [k.close for k in klines]
+    expected_ma = MAService.calculate_multiple_ma(closes, IndicatorEngine.get_ma_periods(period_type))
+    expected_macd = MACDService.calculate_macd(closes)
+    actual = incremental(klines, period_type, split_every)
+
+    mismatches = 0
+    for key, values in list(expected_ma.items()) + list(expected_macd.items()):
+        got = actual['ma'][key] if key in expected_ma else actual['macd'][key]
+        for i, (a, b) in enumerate(zip(values, got)):
+            if a != b:
+                mismatches += 1
+                print(f"  [{period_type}] {key}[{i}] 全量={a} 增量={b}")
+    return mismatches
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("用法: python test_indicator_engine.py <K线数量> [随机种子数量]")
+        print("示例: python test_indicator_engine.py 2000 10")
+        sys.exit(1)
+
+    count = int(sys.argv[1])
+    seeds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    mismatches = 0
+    for seed in range(seeds):
+        klines = build_random_klines(count, seed)
+        for period_type in IndicatorEngine.MA_PERIODS:
+            # 冷启动一次推完 / 每根一批 / 随机批大小
+            for split_every in (count or 1, 1, random.Random(seed).randint(2, 50)):
+                mismatches += compare(klines, period_type, split_every)
+
+    # 耗时对比：全量重算 vs 推进一根新K线
+    klines = build_random_klines(count, 0)
+    closes = [k.close for k in klines]
+    begin = time.perf_counter()
+    MAService.calculate_multiple_ma(closes, [5, 10, 20])
+    MACDService.calculate_macd(closes)
+    full_ms = (time.perf_counter() - begin) * 1000
+    state = IndicatorEngine.new_state('day')
+    IndicatorEngine.replay(state, klines[:-1])
+    begin = time.perf_counter()
+    IndicatorEngine.update(state, klines[-1].time, klines[-1].close)
+    step_ms = (time.perf_counter() - begin) * 1000
+    print(f"全量重算{count}根: {full_ms:.3f}ms, 增量推进1根: {step_ms:.4f}ms")
+
+    if mismatches:
+        print(f"❌ 发现 {mismatches} 处不一致")
+        sys.exit(1)
+    print("✅ 增量计算与全量计算结果完全一致")
+
+
+if __name__ == '__main__':
+    main()
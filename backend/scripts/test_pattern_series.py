@@ -0,0 +1,272 @@
+"""K线组合一致性测试：逐日识别与整段序列滑动窗口识别（identify_*_patterns_series）的结果必须完全一致"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import random
+import time
+from datetime import datetime, timedelta
+from domain.services.bullish_pattern_service import BullishPatternService
+from domain.services.bearish_pattern_service import BearishPatternService
+from domain.services.pattern_window import iter_pattern_windows
+
+VOLUME_TYPES = [None, None, 'A', 'B', 'X', 'Y', 'X,Y', 'A,B,X', 'C,Y', 'H,Z']
+
+
+def build_random_daily(days: int, seed: int):
+    """
+    生成随机日线（与 load_daily_data 的结构相同）和日期到成交量类型的映射
+
+    混入急涨、急跌、十字星、跳空、连续停牌等情况。停牌后的第一根K线常成为窗口第一根，
+    且跳空使其 prev_close 与 close 相差较大，用于覆盖窗口首根K线去掉 prev_close 的情况。
+    """
+    rnd = random.Random(seed)
+    daily_data = []
+    volume_types = {}
+    date = datetime(2024, 1, 2)
+    price = 20.0
+    volume = 100000
+    regime, regime_left = 'normal', 0
+
+    while len(daily_data) < days:
+        date += timedelta(days=1)
+        if date.weekday() >= 5:
+            continue
+        if rnd.random() < 0.04:
+            # 停牌若干个交易日
+            date += timedelta(days=rnd.randint(3, 9))
+            if date.weekday() >= 5:
+                continue
+
+        if regime_left == 0:
+            regime = rnd.choice(['normal', 'normal', 'crash', 'rally', 'doji', 'gap'])
+            regime_left = rnd.randint(2, 6)
+        regime_left -= 1
+
+        pre_close = price
+        open_price = pre_close * (1 + rnd.gauss(0, 0.01))
+        if regime == 'gap':
+            open_price = pre_close * (1 + rnd.choice([-1, 1]) * rnd.uniform(0.04, 0.09))
+        if regime == 'crash':
+            close = open_price * (1 - rnd.uniform(0.03, 0.09))
+        elif regime == 'rally':
+            close = open_price * (1 + rnd.uniform(0.03, 0.09))
+        elif regime == 'doji':
+            close = open_price * (1 + rnd.uniform(-0.002, 0.002))
+        else:
+            close = open_price * (1 + rnd.gauss(0, 0.03))
+        spread = 0.04 if regime in ('doji', 'gap') else 0.015
+        high = max(open_price, close) * (1 + abs(rnd.gauss(0, spread)))
+        low = min(open_price, close) * (1 - abs(rnd.gauss(0, spread)))
+        volume = max(1000, int(volume * rnd.uniform(0.6, 1.4))) if rnd.random() < 0.8 else rnd.randint(50000, 400000)
+
+        day = {
+            'date': date,
+            'open': round(open_price, 2),
+            'close': round(close, 2),
+            'high': round(high, 2),
+            'low': round(low, 2),
+            'volume': volume
+        }
+        if daily_data:
+            day['prev_close'] = daily_data[-1]['close']
+        daily_data.append(day)
+        volume_types[date.date()] = rnd.choice(VOLUME_TYPES)
+        price = day['close']
+
+    return daily_data, volume_types
+
+
+def build_prev_close_case():
+    """
+    构造窗口首根K线 prev_close 决定结果的日线（主板）
+
+    停牌后复牌的第一根K线是窗口第一根，按收盘价算振幅满足条件、按前一日收盘价算则不满足：
+    - 2024-03-12 十字星+中阳线：03-11 十字星振幅 0.42/8.00=5.25%（按 prev_close 10.00 为 4.2%）
+    - 2024-04-02 冲高回落阴线+阴线：04-01 冲高回落阴线振幅 0.60/8.05=7.5%（按 prev_close 12.50 为 4.8%）
+
+    Returns:
+        (日线, 成交量类型映射, 目标日期, 无K线的目标日期)
+    """
+    bars = [
+        (datetime(2024, 3, 1), 10.00, 10.00, 10.10, 9.90),
+        (datetime(2024, 3, 11), 8.00, 8.00, 8.21, 7.79),
+        (datetime(2024, 3, 12), 8.00, 8.20, 8.30, 7.85),
+        (datetime(2024, 3, 13), 12.00, 12.50, 12.60, 11.90),
+        (datetime(2024, 4, 1), 8.20, 8.05, 8.60, 8.00),
+        (datetime(2024, 4, 2), 8.00, 7.70, 8.05, 7.65),
+    ]
+    daily_data = []
+    for date, open_price, close, high, low in bars:
+        day = {'date': date, 'open': open_price, 'close': close, 'high': high, 'low': low, 'volume': 100000}
+        if daily_data:
+            day['prev_close'] = daily_data[-1]['close']
+        daily_data.append(day)
+    no_bar = [datetime(2024, 2, 28), datetime(2024, 3, 5), datetime(2024, 3, 9), datetime(2024, 3, 25)]
+    return daily_data, {}, [day['date'] for day in daily_data] + no_bar, no_bar
+
+
+def query_daily(daily_data, start_date, end_date):
+    """模拟 load_daily_data：按区间查询，结果的第一行没有前一行，因此不带 prev_close"""
+    rows = [dict(day) for day in daily_data
+            if (start_date is None or day['date'] >= start_date) and (end_date is None or day['date'] <= end_date)]
+    if rows:
+        rows[0].pop('prev_close', None)
+    return rows
+
+
+def build_target_dates(daily_data, rnd: random.Random):
+    """目标日期：全部交易日，加上没有K线的日期（周末、停牌日、第一根K线之前）"""
+    bar_days = {day['date'].date() for day in daily_data}
+    first, last = daily_data[0]['date'], daily_data[-1]['date']
+    no_bar = [first - timedelta(days=rnd.randint(1, 3))]
+    day = first
+    while day <= last:
+        if day.date() not in bar_days and rnd.random() < 0.3:
+            no_bar.append(day)
+        day += timedelta(days=1)
+    targets = [day['date'] for day in daily_data] + no_bar
+    rnd.shuffle(targets)
+    return targets, no_bar
+
+
+def count_prev_close_sensitive(match, daily_data, target_dates, window_days: int) -> int:
+    """
+    统计窗口首根K线保留 prev_close 时结果会变化的日期数
+
+    大于0说明数据覆盖了“首根K线去掉 prev_close”这一分支，逐日与序列结果一致才有意义
+
+    Returns:
+        (结果会变化的日期数, 首根K线未去掉 prev_close 的窗口数)
+    """
+    by_date = {day['date']: day for day in daily_data}
+    sensitive = not_stripped = 0
+    for target_date, window, target_idx in iter_pattern_windows(daily_data, target_dates, window_days):
+        if target_idx is None or target_idx < 1:
+            continue
+        if 'prev_close' in window[0]:
+            not_stripped += 1
+            print(f"  {target_date:%Y-%m-%d} 窗口首根K线 {window[0]['date']:%Y-%m-%d} 未去掉 prev_close")
+            continue
+        unstripped = [by_date[window[0]['date']]] + window[1:]
+        if 'prev_close' in unstripped[0] and match(window, target_idx) != match(unstripped, target_idx):
+            sensitive += 1
+    return sensitive, not_stripped
+
+
+def compare_patterns(name, per_date, series, target_dates, no_bar_dates):
+    """
+    对比逐日与序列的识别结果
+
+    Returns:
+        (不一致的数量, 逐日耗时ms, 序列耗时ms, 逐日识别出的组合数)
+    """
+    start = time.perf_counter()
+    expected = {}
+    for target_date in target_dates:
+        patterns = per_date(target_date)
+        if patterns:
+            expected[target_date] = patterns
+    per_date_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    actual = series(target_dates)
+    series_ms = (time.perf_counter() - start) * 1000
+
+    mismatches = 0
+    for target_date in sorted(set(expected) | set(actual)):
+        if expected.get(target_date) != actual.get(target_date):
+            mismatches += 1
+            print(f"  [{name}] {target_date:%Y-%m-%d} 逐日={expected.get(target_date)}, "
+                  f"序列={actual.get(target_date)}")
+    for target_date in no_bar_dates:
+        if target_date in actual:
+            mismatches += 1
+            print(f"  [{name}] {target_date:%Y-%m-%d} 没有K线却识别出组合: {actual[target_date]}")
+    return mismatches, per_date_ms, series_ms, sum(len(p) for p in expected.values())
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ('-h', '--help'):
+        print("用法: python test_pattern_series.py [K线数量] [随机种子数量]")
+        print("示例: python test_pattern_series.py 300 20")
+        sys.exit(0)
+
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    seeds = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    mismatches = 0
+    hits = {'多头': 0, '空头': 0}
+    sensitive = {'多头': 0, '空头': 0}
+    timings = {'多头': [0.0, 0.0], '空头': [0.0, 0.0]}
+    no_bar_total = 0
+
+    # 固定用例（首根K线prev_close决定结果）+ 随机数据；主板/非主板阈值不同，随机数据交替测试
+    datasets = [('固定用例', 'SH600000') + build_prev_close_case()]
+    for seed in range(seeds):
+        daily_data, volume_types = build_random_daily(days, seed)
+        target_dates, no_bar_dates = build_target_dates(daily_data, random.Random(seed))
+        datasets.append((f'种子{seed}', 'SH600000' if seed % 2 == 0 else 'SZ300001',
+                         daily_data, volume_types, target_dates, no_bar_dates))
+
+    originals = (BullishPatternService._get_daily_data, BullishPatternService._get_volume_type,
+                 BearishPatternService._get_daily_data)
+    try:
+        for label, stock_code, daily_data, volume_types, target_dates, no_bar_dates in datasets:
+            no_bar_total += len(no_bar_dates)
+
+            # 日线查询和成交量类型查询替换为构造的数据
+            load = staticmethod(lambda table_name, start_date, end_date: query_daily(daily_data, start_date, end_date))
+            BullishPatternService._get_daily_data = load
+            BearishPatternService._get_daily_data = load
+            BullishPatternService._get_volume_type = staticmethod(
+                lambda table_name, code, date: volume_types.get(date.date()))
+
+            cases = [
+                ('多头',
+                 lambda d: BullishPatternService.identify_bullish_patterns(stock_code, 'random', d),
+                 lambda ds: BullishPatternService.identify_bullish_patterns_series(
+                     stock_code, 'random', ds, volume_types=volume_types),
+                 lambda window, idx: BullishPatternService._match_patterns(
+                     stock_code, 'random', window, idx, volume_types),
+                 BullishPatternService.WINDOW_DAYS),
+                ('空头',
+                 lambda d: BearishPatternService.identify_bearish_patterns(stock_code, 'random', d),
+                 lambda ds: BearishPatternService.identify_bearish_patterns_series(stock_code, 'random', ds),
+                 lambda window, idx: BearishPatternService._match_patterns(stock_code, window, idx),
+                 BearishPatternService.WINDOW_DAYS),
+            ]
+            for name, per_date, series, match, window_days in cases:
+                count, per_date_ms, series_ms, hit_count = compare_patterns(
+                    name, per_date, series, target_dates, no_bar_dates)
+                mismatches += count
+                hits[name] += hit_count
+                timings[name][0] += per_date_ms
+                timings[name][1] += series_ms
+                count, not_stripped = count_prev_close_sensitive(match, daily_data, target_dates, window_days)
+                sensitive[name] += count
+                mismatches += not_stripped
+
+            if any('prev_close' not in day for day in daily_data[1:]):
+                mismatches += 1
+                print(f"  {label}: 滑动窗口修改了传入的日线（prev_close 被删除）")
+    finally:
+        (BullishPatternService._get_daily_data, BullishPatternService._get_volume_type,
+         BearishPatternService._get_daily_data) = originals
+
+    print(f"固定用例 + {seeds}组 × {days}根K线, 无K线的目标日期 {no_bar_total} 个")
+    for name in hits:
+        per_date_ms, series_ms = timings[name]
+        print(f"  {name}组合: 命中 {hits[name]} 次, 首根K线prev_close影响结果 {sensitive[name]} 次, "
+              f"逐日 {per_date_ms:.1f}ms, 序列 {series_ms:.1f}ms ({per_date_ms / max(series_ms, 1e-6):.1f}x)")
+
+    if not sensitive['多头'] or not sensitive['空头']:
+        print("❌ 未覆盖窗口首根K线去掉 prev_close 的情况")
+        sys.exit(1)
+    if mismatches:
+        print(f"❌ 发现 {mismatches} 处不一致")
+        sys.exit(1)
+    print("✅ 逐日识别与序列识别结果完全一致")
+
+
+if __name__ == '__main__':
+    main()
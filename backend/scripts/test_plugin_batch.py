@@ -0,0 +1,200 @@
+"""插件批量计算一致性测试：逐日计算与整段序列批量计算的结果必须完全一致"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import random
+from datetime import datetime, timedelta
+from domain.models.analysis_context import AnalysisContext
+from domain.models.daily_chance import DailyChance
+from domain.services.c_point_plugin_service import CPointPluginService, CPointPluginBatch
+from domain.services.r_point_plugin_service import RPointPluginService, RPointPluginBatch
+from infrastructure.persistence.daily_repository_impl import DailyData
+from infrastructure.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+VOLUME_TYPES = [None, '', 'A', 'B', 'C', 'D', 'A,B', 'E', 'F', 'G', 'H', 'X', 'Y', 'Z', 'X,Y', 'H,Z']
+BULLISH_PATTERNS = [None, None, '十字星+中阳线', '阳包阴', '触底反弹阳线+阳线']
+BEARISH_PATTERNS = [None, None, '乌云盖顶', '看跌吞没', '黄昏之星']
+
+
+def build_random_context(stock_code: str, days: int, seed: int) -> AnalysisContext:
+    """
+    生成随机日线和daily_chance数据
+
+    混入急涨、急跌、十字星、缩量、缺失daily_chance等情况，尽量覆盖各插件分支
+    """
+    rnd = random.Random(seed)
+    daily_list = []
+    chance_list = []
+    date = datetime(2024, 1, 2, 15, 0, 0)
+    price = 20.0
+    regime, regime_left = 'normal', 0
+
+    while len(daily_list) < days:
+        date += timedelta(days=1)
+        if date.weekday() >= 5:
+            continue
+
+        if regime_left == 0:
+            regime = rnd.choice(['normal', 'normal', 'normal', 'crash', 'rally', 'doji'])
+            regime_left = rnd.randint(3, 7)
+        regime_left -= 1
+
+        if regime == 'crash':
+            change = rnd.uniform(-0.10, -0.03)
+        elif regime == 'rally':
+            change = rnd.uniform(0.03, 0.10)
+        else:
+            change = rnd.gauss(0, 0.025)
+
+        pre_close = price
+        open_price = pre_close * (1 + rnd.gauss(0, 0.01))
+        close = pre_close * (1 + change)
+        if regime == 'doji':
+            close = open_price * (1 + rnd.uniform(-0.005, 0.005))
+        high = max(open_price, close) * (1 + abs(rnd.gauss(0, 0.02)))
+        low = min(open_price, close) * (1 - abs(rnd.gauss(0, 0.02)))
+        if rnd.random() < 0.02:
+            # 一字跌停 / T字跌停
+            close = open_price = low = pre_close * (0.9 if stock_code.startswith('SH60') else 0.8)
+            high = close * rnd.choice([1, 1.03])
+        volume = rnd.choice([rnd.randint(100, 5000), rnd.randint(100000, 9000000)])
+        if rnd.random() < 0.05:
+            volume = 0
+
+        daily_list.append(DailyData(stock_code, date, round(open_price, 2), round(high, 2), round(low, 2),
+                                    round(close, 2), volume, 0 if rnd.random() < 0.02 else pre_close))
+        price = close
+
+        if rnd.random() < 0.9:
+            chance_list.append(DailyChance(
+                stock_code=stock_code,
+                date=date,
+                total_win_ratio_score=rnd.choice([10, 20, 30, 40]),
+                volume_type=rnd.choice(VOLUME_TYPES),
+                bullish_pattern=rnd.choice(BULLISH_PATTERNS),
+                bearish_pattern=rnd.choice(BEARISH_PATTERNS),
+                support_price=round(price * rnd.uniform(0.85, 1.0), 2),
+                pressure_price=round(price * rnd.uniform(1.0, 1.15), 2)
+            ))
+
+    return AnalysisContext(stock_code, daily_list, chance_list)
+
+
+def _same(a, b) -> bool:
+    return a.to_dict() == b.to_dict()
+
+
+def compare_c_point_plugins(stock_code: str, context: AnalysisContext) -> int:
+    """
+    逐K线对比C点插件1-5的逐日结果与批量结果
+
+    Returns:
+        不一致的数量
+    """
+    service = CPointPluginService(use_batch=False)
+    batch = service.build_batch(stock_code, context)
+    checks = [service._check_bearish_line, service._check_high_ratio_low_win, service._check_risk_kline,
+              service._check_no_chase_high, service._check_sharp_drop_rebound]
+
+    mismatches = 0
+    triggered = [0] * len(checks)
+    for index, date_str in enumerate(context.bars.dates):
+        date = context.bars.row(index).date
+        for k, check in enumerate(checks):
+            batch_result = batch.results[k][index]
+            if batch_result is None:
+                continue
+            expected = check(stock_code, date, context)
+            triggered[k] += expected.triggered
+            if not _same(expected, batch_result):
+                mismatches += 1
+                logger.error(f"[{CPointPluginBatch.PLUGIN_NAMES[k]}] {date_str} 不一致: "
+                             f"逐日={expected.to_dict()}, 批量={batch_result.to_dict()}")
+
+    summary = ", ".join(f"{name}:{count}" for name, count in zip(CPointPluginBatch.PLUGIN_NAMES, triggered))
+    logger.info(f"C点插件 {stock_code}: {len(context.bars)}根K线, 触发次数 {summary}, 不一致 {mismatches}")
+    return mismatches
+
+
+def compare_r_point_plugins(stock_code: str, context: AnalysisContext) -> int:
+    """
+    逐K线对比R点插件的逐日结果与批量结果
+
+    插件4（上冲乏力）依赖C点日期，对每根K线取之前的若干交易日作为C点分别对比
+
+    Returns:
+        不一致的数量
+    """
+    service = RPointPluginService(use_batch=False)
+    batch = service.build_batch(stock_code, context)
+    checks = [service._check_deviation, service._check_pressure_stagnation, service._check_fundamental_negative]
+    names = RPointPluginBatch.PLUGIN_NAMES + ("上冲乏力",)
+
+    mismatches = 0
+    triggered = [0] * len(names)
+    bars = context.bars
+    for index, date_str in enumerate(bars.dates):
+        date = bars.row(index).date
+        for k, check in enumerate(checks):
+            batch_result = batch.results[k][index]
+            if batch_result is None:
+                continue
+            expected = check(stock_code, date, context)
+            triggered[k] += expected.triggered
+            if not _same(expected, batch_result):
+                mismatches += 1
+                logger.error(f"[{names[k]}] {date_str} 不一致: "
+                             f"逐日={expected.to_dict()}, 批量={batch_result.to_dict()}")
+
+        for c_index in range(max(0, index - 10), index):
+            c_date = bars.row(c_index).date
+            batch_result = service._evaluate_weak_breakout(stock_code, batch, context, index, c_date)
+            if batch_result is None:
+                continue
+            expected = service._check_weak_breakout(stock_code, date, c_date, context)
+            triggered[3] += expected.triggered
+            if not _same(expected, batch_result):
+                mismatches += 1
+                logger.error(f"[上冲乏力] {date_str} C点{bars.dates[c_index]} 不一致: "
+                             f"逐日={expected.to_dict()}, 批量={batch_result.to_dict()}")
+
+    summary = ", ".join(f"{name}:{count}" for name, count in zip(names, triggered))
+    logger.info(f"R点插件 {stock_code}: {len(bars)}根K线, 触发次数 {summary}, 不一致 {mismatches}")
+    return mismatches
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("用法: python test_plugin_batch.py <股票代码> <开始日期> <结束日期>")
+        print("      python test_plugin_batch.py --random <K线数量> [随机种子数量]")
+        print("示例: python test_plugin_batch.py SZ300564 2024-01-01 2025-11-30")
+        print("      python test_plugin_batch.py --random 500 20")
+        sys.exit(1)
+
+    mismatches = 0
+    if sys.argv[1] == '--random':
+        days = int(sys.argv[2])
+        seeds = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+        for seed in range(seeds):
+            # 主板/非主板阈值不同，交替测试
+            stock_code = 'SH600000' if seed % 2 == 0 else 'SZ300001'
+            context = build_random_context(stock_code, days, seed)
+            mismatches += compare_c_point_plugins(stock_code, context)
+            mismatches += compare_r_point_plugins(stock_code, context)
+    else:
+        stock_code, start_date, end_date = sys.argv[1], sys.argv[2], sys.argv[3]
+        context = AnalysisContext.load(stock_code, start_date, end_date)
+        mismatches += compare_c_point_plugins(stock_code, context)
+        mismatches += compare_r_point_plugins(stock_code, context)
+
+    if mismatches:
+        print(f"❌ 发现 {mismatches} 处不一致")
+        sys.exit(1)
+    print("✅ 逐日计算与批量计算结果完全一致")
+
+
+if __name__ == '__main__':
+    main()
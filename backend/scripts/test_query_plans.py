@@ -0,0 +1,151 @@
+"""持久层热点查询执行计划测试：记录各仓储实际发出的SELECT，逐条EXPLAIN，断言都走索引（没有全表扫描）"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import pymysql.cursors
+from infrastructure.persistence.database import DatabaseConnection
+from infrastructure.persistence.kline_repository_impl import KLineRepositoryImpl
+from infrastructure.persistence.daily_repository_impl import DailyRepositoryImpl
+from infrastructure.persistence.daily_chance_repository_impl import DailyChanceRepositoryImpl
+from infrastructure.persistence.indicator_repository_impl import IndicatorRepositoryImpl
+from domain.services.pattern_window import load_daily_data
+from domain.services.volume_type_service import VolumeTypeService
+from application.services.backtest_service import BacktestService
+from domain.models.stock import StockGroups
+
+
+class RecordingCursor:
+    """记录执行过的SELECT（查询语句和参数），其余操作原样转发"""
+    
+    def __init__(self, cursor, recorder: list):
+        self._cursor = cursor
+        self._recorder = recorder
+    
+    def execute(self, query, args=None):
+        if query.lstrip().upper().startswith('SELECT'):
+            self._recorder.append((query, args))
+        return self._cursor.execute(query, args)
+    
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class RecordingConnection:
+    def __init__(self, conn, recorder: list):
+        self._conn = conn
+        self._recorder = recorder
+    
+    def cursor(self, *args, **kwargs):
+        return RecordingCursor(self._conn.cursor(*args, **kwargs), self._recorder)
+    
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def install_recorder(recorder: list):
+    """让 DatabaseConnection 借出的连接记录SELECT"""
+    get_connection = DatabaseConnection.get_connection
+    get_connection_context = DatabaseConnection.get_connection_context
+    
+    @contextmanager
+    def recording_context(*args, **kwargs):
+        with get_connection_context(*args, **kwargs) as conn:
+            yield RecordingConnection(conn, recorder)
+    
+    DatabaseConnection.get_connection = lambda *args, **kwargs: RecordingConnection(get_connection(*args, **kwargs), recorder)
+    DatabaseConnection.get_connection_context = recording_context
+
+
+def hot_paths(stock_code: str, table_name: str):
+    """持久层热点调用（名称, 调用）"""
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    month_ago = today - timedelta(days=30)
+    year_ago = today - timedelta(days=365)
+    date_str = (today - timedelta(days=7)).strftime('%Y-%m-%d')
+    kline_repo = KLineRepositoryImpl()
+    daily_repo = DailyRepositoryImpl()
+    chance_repo = DailyChanceRepositoryImpl()
+    indicator_repo = IndicatorRepositoryImpl()
+    return [
+        ('K线-按周期取最近', lambda: kline_repo.get_kline_data(table_name, 'day', year_ago)),
+        ('K线-增量读取', lambda: kline_repo.get_kline_data_after(table_name, '30min', month_ago)),
+        ('K线-多股票范围', lambda: kline_repo.get_kline_data_batch([table_name], 'day', month_ago, today)),
+        ('K线-可用周期', lambda: kline_repo.get_available_periods(table_name)),
+        ('K线-窗口版本', lambda: kline_repo.get_kline_version(table_name, 'day', year_ago)),
+        ('日线-单日', lambda: daily_repo.find_by_date(stock_code, date_str)),
+        ('日线-日期范围', lambda: daily_repo.find_by_date_range(stock_code, year_ago.strftime('%Y-%m-%d'), date_str)),
+        ('日线-组合识别窗口', lambda: load_daily_data(table_name, year_ago, today)),
+        ('日线-成交量', lambda: VolumeTypeService._get_daily_volumes(table_name, year_ago, today)),
+        ('回测-价格', lambda: BacktestService()._load_prices(table_name, [date_str])),
+        ('每日机会-单日', lambda: chance_repo.find_by_stock_and_date(stock_code, date_str)),
+        ('每日机会-股票范围', lambda: chance_repo.find_by_stock_code(stock_code, year_ago.strftime('%Y-%m-%d'))),
+        ('每日机会-全市场单日', lambda: chance_repo.find_by_date(date_str)),
+        ('每日机会-最新日期', lambda: chance_repo.find_latest_date(stock_code)),
+        ('每日机会-内容摘要', lambda: chance_repo.find_content_hashes(stock_code)),
+        ('每日机会-版本', lambda: chance_repo.find_version(stock_code)),
+        ('指标-状态', lambda: indicator_repo.find_state(table_name, 'day')),
+        ('指标-逐K线值', lambda: indicator_repo.find_points(table_name, 'day', year_ago)),
+    ]
+
+
+def explain(query: str, args) -> list:
+    with DatabaseConnection.get_connection_context() as conn:
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        cursor.execute('EXPLAIN ' + query, args)
+        rows = cursor.fetchall()
+        cursor.close()
+    return rows
+
+
+def is_full_scan(row: dict) -> bool:
+    """全表扫描：type=ALL，或访问了表却没有使用任何索引"""
+    if row.get('table') is None or row.get('type') in (None, 'system', 'const'):
+        return False  # 无需访问表（如 Select tables optimized away / Impossible WHERE）
+    return row.get('type') == 'ALL' or not row.get('key')
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ('-h', '--help'):
+        print("用法: python test_query_plans.py [股票代码]")
+        print("示例: python test_query_plans.py SZ300188    # 需连接有真实数据的数据库（表太小时优化器可能选择全表扫描）")
+        sys.exit(0)
+    
+    stocks = {stock.code: stock for stocks in StockGroups().get_all_groups().values() for stock in stocks}
+    stock = stocks[sys.argv[1]] if len(sys.argv) > 1 else next(iter(stocks.values()))
+    
+    recorder = []
+    install_recorder(recorder)
+    
+    failures = []
+    checked = 0
+    for name, call in hot_paths(stock.code, stock.table_name):
+        recorder.clear()
+        try:
+            call()
+        except Exception as e:
+            failures.append(f"{name}: 调用失败 {e}")
+            continue
+        if not recorder:
+            failures.append(f"{name}: 未捕获到查询")
+            continue
+        for query, args in list(recorder):
+            for row in explain(query, args):
+                checked += 1
+                full_scan = is_full_scan(row)
+                print(f"{'❌' if full_scan else '✅'} {name}: table={row.get('table')} type={row.get('type')} "
+                      f"key={row.get('key')} rows={row.get('rows')} {row.get('Extra') or ''}")
+                if full_scan:
+                    failures.append(f"{name}: {row.get('table')} 全表扫描\n{' '.join(query.split())}")
+    
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print(f"✅ {stock.code} 的 {checked} 个执行计划都使用了索引")
+
+
+if __name__ == '__main__':
+    main()
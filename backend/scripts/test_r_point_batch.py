@@ -4,6 +4,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from datetime import datetime, timedelta
+from domain.models.analysis_context import AnalysisContext
 from domain.services.r_point_plugin_service import RPointPluginService
 from infrastructure.persistence.daily_repository_impl import DailyRepositoryImpl
 from infrastructure.persistence.daily_chance_repository_impl import DailyChanceRepositoryImpl
@@ -63,9 +64,9 @@ def test_r_point_batch(stock_code: str, start_date_str: str, end_date_str: str):
         
         # 初始化R点服务
         r_service = RPointPluginService()
-        r_service.init_cache(stock_code, query_start, query_end)
+        context = AnalysisContext.load(stock_code, query_start, query_end)
         
-        logger.info(f"缓存已初始化: daily={len(r_service._daily_cache)}条, daily_chance={len(r_service._daily_chance_cache)}条")
+        logger.info(f"缓存已初始化: daily={len(context.bars)}条, daily_chance={len(context.daily_chance_cache)}条")
         
         # 统计信息
         total_checked = 0
@@ -81,7 +82,7 @@ def test_r_point_batch(stock_code: str, start_date_str: str, end_date_str: str):
         missing_daily_chance = []
         for test_date in test_dates:
             date_str = test_date.strftime('%Y-%m-%d')
-            if date_str not in r_service._daily_chance_cache:
+            if date_str not in context.daily_chance_cache:
                 missing_daily_chance.append(date_str)
         
         if missing_daily_chance:
@@ -104,7 +105,7 @@ def test_r_point_batch(stock_code: str, start_date_str: str, end_date_str: str):
             date_str = test_date.strftime('%Y-%m-%d')
             
             # 检查R点
-            is_r_point, r_plugins = r_service.check_r_point(stock_code, test_date, last_c_date)
+            is_r_point, r_plugins = r_service.check_r_point(stock_code, test_date, last_c_date, context=context)
             
             if is_r_point:
                 r_point_triggered += 1
@@ -152,8 +153,6 @@ def test_r_point_batch(stock_code: str, start_date_str: str, end_date_str: str):
             for item in r_point_dates:
                 logger.info(f"  {item['date']}: {', '.join(item['plugins'])}")
         
-        # 清空缓存
-        r_service.clear_cache()
         
     except Exception as e:
         logger.error(f"批量测试失败: {e}", exc_info=True)
@@ -4,6 +4,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from datetime import datetime, timedelta
+from domain.models.analysis_context import AnalysisContext
 from domain.services.r_point_plugin_service import RPointPluginService
 from infrastructure.logging.logger import get_logger
 import logging
@@ -35,19 +36,19 @@ def test_r_point_deviation(stock_code: str, test_date_str: str):
         start_date = (test_date - timedelta(days=30)).strftime('%Y-%m-%d')
         end_date = test_date.strftime('%Y-%m-%d')
         logger.info(f"初始化缓存: {start_date} 至 {end_date}")
-        r_service.init_cache(stock_code, start_date, end_date)
+        context = AnalysisContext.load(stock_code, start_date, end_date)
         
-        logger.info(f"缓存已初始化: daily={len(r_service._daily_cache)}条, daily_chance={len(r_service._daily_chance_cache)}条")
+        logger.info(f"缓存已初始化: daily={len(context.bars)}条, daily_chance={len(context.daily_chance_cache)}条")
         
         # 检查缓存中的数据
-        if test_date_str in r_service._daily_cache:
-            daily = r_service._daily_cache[test_date_str]
+        if context.bars.index_of(test_date_str) is not None:
+            daily = context.get_daily(test_date_str)
             logger.info(f"当日K线数据: close={daily.close}, high={daily.high}, low={daily.low}, volume={daily.volume}")
         else:
             logger.warning(f"缓存中无当日K线数据")
         
-        if test_date_str in r_service._daily_chance_cache:
-            chance = r_service._daily_chance_cache[test_date_str]
+        if test_date_str in context.daily_chance_cache:
+            chance = context.daily_chance_cache[test_date_str]
             logger.info(f"当日daily_chance数据: volume_type={chance.volume_type}, bearish_pattern={chance.bearish_pattern}")
         else:
             logger.warning(f"缓存中无当日daily_chance数据")
@@ -56,7 +57,7 @@ def test_r_point_deviation(stock_code: str, test_date_str: str):
         logger.info("-"*80)
         logger.info("开始执行R点检测...")
         logger.info("-"*80)
-        is_r_point, r_plugins = r_service.check_r_point(stock_code, test_date)
+        is_r_point, r_plugins = r_service.check_r_point(stock_code, test_date, context=context)
         
         # 输出结果
         logger.info("="*80)
@@ -69,8 +70,6 @@ def test_r_point_deviation(stock_code: str, test_date_str: str):
             logger.info(f"✗ 未触发R点")
         logger.info("="*80)
         
-        # 清空缓存
-        r_service.clear_cache()
         
     except Exception as e:
         logger.error(f"测试失败: {e}", exc_info=True)
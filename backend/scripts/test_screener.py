@@ -0,0 +1,106 @@
+"""信号筛选测试：按批加载+批量计算的插件信号与逐只股票、逐日调用插件的结果一致，排序符合预期"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+from datetime import datetime, timedelta
+from application.services.screener_service import ScreenerService, SCREENER_SIGNALS
+from domain.models.analysis_context import AnalysisContext
+from domain.services.c_point_plugin_service import CPointPluginService
+from domain.services.r_point_plugin_service import RPointPluginService
+from infrastructure.config.app_config import SCREENER_CONFIG
+
+
+def per_day_hits(stocks, signals, start_date, end_date):
+    """对照组：逐只股票加载上下文，逐日调用插件（不使用批量结果）"""
+    services = {'c_plugin': CPointPluginService(use_batch=False), 'r_plugin': RPointPluginService(use_batch=False)}
+    load_start = (datetime.strptime(start_date, '%Y-%m-%d')
+                  - timedelta(days=SCREENER_CONFIG['lookback_days'])).strftime('%Y-%m-%d')
+    hits = set()
+    for stock in stocks:
+        context = AnalysisContext.load(stock['code'], load_start, end_date)
+        for signal in signals:
+            spec = SCREENER_SIGNALS[signal]
+            for date_str, result in services[spec['type']].check_plugin_range(
+                    stock['code'], spec['index'], context, start_date, end_date):
+                if result.triggered:
+                    hits.add((stock['code'], date_str, signal, result.reason))
+    return hits
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ('-h', '--help'):
+        print("用法: python test_screener.py [股票代码,...] [开始日期] [结束日期]")
+        print("示例: python test_screener.py SZ300188,SH600037 2025-01-01 2025-11-18")
+        sys.exit(0)
+
+    codes = sys.argv[1].split(',') if len(sys.argv) > 1 else None
+    end_date = sys.argv[3] if len(sys.argv) > 3 else datetime.now().strftime('%Y-%m-%d')
+    start_date = sys.argv[2] if len(sys.argv) > 2 else \
+        (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
+    failures = []
+
+    service = ScreenerService()
+    stocks = service.resolve_universe('codes' if codes else 'config', codes=codes)
+    plugin_signals = [key for key, spec in SCREENER_SIGNALS.items() if spec['type'] != 'strategy']
+
+    start = time.perf_counter()
+    result = service.scan(stocks, list(SCREENER_SIGNALS), start_date, end_date, max_workers=1)
+    scan_ms = (time.perf_counter() - start) * 1000
+    print(f"筛选: {result['scanned']}只股票, 命中 {result['hits_count']} 次/{len(result['ranked'])}个股票交易日, "
+          f"{scan_ms:.1f}ms")
+
+    start = time.perf_counter()
+    expected = per_day_hits(stocks, plugin_signals, start_date, end_date)
+    baseline_ms = (time.perf_counter() - start) * 1000
+    actual = {(e['code'], e['date'], signal, e['reasons'][signal])
+              for e in result['ranked'] for signal in e['signals'] if signal in plugin_signals}
+    print(f"逐日对照: 插件命中 {len(expected)} 次, {baseline_ms:.1f}ms")
+    if actual != expected:
+        for hit in sorted(expected - actual)[:10]:
+            print(f"  缺少: {hit}")
+        for hit in sorted(actual - expected)[:10]:
+            print(f"  多出: {hit}")
+        failures.append("插件信号与逐日检查结果不一致")
+
+    for signal in plugin_signals + ['c_point', 'strategy2', 'r_point']:
+        count = sum(signal in e['signals'] for e in result['ranked'])
+        print(f"  {SCREENER_SIGNALS[signal]['name']}: {count}")
+
+    ranked = result['ranked']
+    keys = [(-len(e['signals']), -int(e['date'].replace('-', '')), -e['score']) for e in ranked]
+    if keys != sorted(keys):
+        failures.append("排序不符合 命中信号数、日期、得分 顺序")
+    if any(not (start_date <= e['date'] <= end_date) for e in ranked):
+        failures.append("存在区间外的命中")
+    for entry in ranked[:5]:
+        print(f"  {entry['date']} {entry['code']} 得分{entry['score']:.1f} {entry['signals']}")
+
+    top = service.scan(stocks, ['no_chase_high', 'c_point'], start_date, end_date, top=3, max_workers=1)
+    if len(top['ranked']) > 3:
+        failures.append("top 未生效")
+    try:
+        service.scan(stocks, ['unknown'], start_date, end_date, max_workers=1)
+        failures.append("未知信号未报错")
+    except ValueError:
+        pass
+
+    # 加载失败时批量与对照结果都为空，一致性检查会空通过
+    if result['errors']:
+        print(f"失败股票: {result['errors'][:5]}")
+        failures.append(f"{len(result['errors'])}只股票筛选失败")
+    if result['scanned'] != len(stocks):
+        failures.append(f"只扫描了 {result['scanned']}/{len(stocks)} 只股票")
+    if not actual:
+        failures.append("批量筛选没有任何插件信号命中，无法验证一致性")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ 批量筛选结果与逐日检查一致，排序符合预期")
+
+
+if __name__ == '__main__':
+    main()
@@ -55,8 +55,8 @@ def test_sharp_drop_rebound():
         print(f"{'-' * 70}")
         
         try:
-            # 初始化缓存（实际测试时需要）
-            # plugin_service.init_cache(test_case['stock_code'], '2024-10-01', '2024-11-14')
+            # 预加载分析上下文（实际测试时需要）
+            # context = AnalysisContext.load(test_case['stock_code'], '2024-10-01', '2024-11-14')
             
             # 调用插件检查
             date_obj = datetime.strptime(test_case['date'], '%Y-%m-%d')
@@ -4,6 +4,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from datetime import datetime, timedelta
+from domain.models.analysis_context import AnalysisContext
 from domain.services.r_point_plugin_service import RPointPluginService
 from infrastructure.logging.logger import get_logger
 
@@ -26,13 +27,13 @@ def test_single_day(stock_code: str, date_str: str):
     end_date = date_str
     
     print(f"初始化缓存: {start_date} 至 {end_date}")
-    r_service.init_cache(stock_code, start_date, end_date)
+    context = AnalysisContext.load(stock_code, start_date, end_date)
     
-    print(f"缓存数据: daily={len(r_service._daily_cache)}条, daily_chance={len(r_service._daily_chance_cache)}条\n")
+    print(f"缓存数据: daily={len(context.bars)}条, daily_chance={len(context.daily_chance_cache)}条\n")
     
     # 检查当日缓存数据
-    if date_str in r_service._daily_cache:
-        daily = r_service._daily_cache[date_str]
+    if context.bars.index_of(date_str) is not None:
+        daily = context.get_daily(date_str)
         print(f"当日K线数据:")
         print(f"  日期: {daily.date}")
         print(f"  开盘: {daily.open}, 收盘: {daily.close}")
@@ -41,8 +42,8 @@ def test_single_day(stock_code: str, date_str: str):
     else:
         print(f"警告: 缓存中无当日K线数据")
     
-    if date_str in r_service._daily_chance_cache:
-        chance = r_service._daily_chance_cache[date_str]
+    if date_str in context.daily_chance_cache:
+        chance = context.daily_chance_cache[date_str]
         print(f"\n当日daily_chance数据:")
         print(f"  volume_type: {chance.volume_type}")
         print(f"  bearish_pattern: {chance.bearish_pattern}")
@@ -55,7 +56,7 @@ def test_single_day(stock_code: str, date_str: str):
     print("执行R点检测...")
     print("-"*100)
     
-    is_r_point, r_plugins = r_service.check_r_point(stock_code, test_date)
+    is_r_point, r_plugins = r_service.check_r_point(stock_code, test_date, context=context)
     
     print("\n" + "="*100)
     if is_r_point:
@@ -67,7 +68,6 @@ def test_single_day(stock_code: str, date_str: str):
         print(f"[NO] 未触发R点")
     print("="*100)
     
-    r_service.clear_cache()
 
 
 if __name__ == '__main__':
@@ -5,6 +5,7 @@ import os
 # 添加backend目录到Python路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+from domain.models.analysis_context import AnalysisContext
 from domain.services.strategy2_service import Strategy2Service
 from domain.services.ma_service import MAService
 from domain.services.macd_service import MACDService
@@ -48,6 +49,7 @@ def test_strategy2():
     
     # 创建策略2服务
     strategy2_service = Strategy2Service()
+    context = AnalysisContext('TEST001')
     
     # 测试几个典型场景
     test_cases = [
@@ -84,7 +86,8 @@ def test_strategy2():
             volume_type=test_case['volume_type'],
             bullish_pattern=test_case['bullish_pattern'],
             daily_data_30=daily_data_30 if len(daily_data_30) >= 30 else [],
-            index=index
+            index=index,
+            context=context
         )
         
         print(f"场景{idx}: {test_case['description']}")
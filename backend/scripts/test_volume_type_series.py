@@ -0,0 +1,241 @@
+"""成交量类型一致性测试：逐日算法（优化前的实现）与 classify_series / batch_calculate_volume_types 的结果必须完全一致"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import random
+import time
+from datetime import datetime, timedelta
+from domain.services.volume_type_service import VolumeTypeService
+
+TYPE_ORDER = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'X', 'Y', 'Z']
+
+
+def baseline_abc(volumes, idx):
+    """对照组：_check_abc_volume_type，返回第一个匹配的 A/B/C"""
+    if idx < 1:
+        return None
+    target_volume = volumes[idx]
+    prev_volume = volumes[idx - 1]
+    if prev_volume > 0 and 2.0 <= target_volume / prev_volume <= 3.0:
+        return 'A'
+    if idx >= 3:
+        avg_volume = sum(volumes[idx - 3:idx]) / 3
+        if avg_volume > 0 and target_volume / avg_volume >= 2.0:
+            return 'B'
+    if idx >= 5:
+        avg_volume = sum(volumes[idx - 5:idx]) / 5
+        if avg_volume > 0 and target_volume / avg_volume >= 2.0:
+            return 'C'
+    return None
+
+
+def baseline_abcd(volumes, idx):
+    """对照组：_check_all_volume_types，前五日ABC放量在每次调用时重新计算"""
+    if idx < 1:
+        return None
+    target_volume = volumes[idx]
+    matched = []
+    prev_volume = volumes[idx - 1]
+    if prev_volume > 0 and 2.0 <= target_volume / prev_volume <= 3.0:
+        matched.append('A')
+    if idx >= 3:
+        avg_volume = sum(volumes[idx - 3:idx]) / 3
+        if avg_volume > 0 and target_volume / avg_volume >= 2.0:
+            matched.append('B')
+    if idx >= 5:
+        avg_volume = sum(volumes[idx - 5:idx]) / 5
+        if avg_volume > 0 and target_volume / avg_volume >= 2.0:
+            matched.append('C')
+        x_day_volume = next((volumes[i] for i in range(idx - 5, idx) if baseline_abc(volumes, i)), None)
+        if x_day_volume and x_day_volume > 0 and target_volume / x_day_volume >= 1.2:
+            matched.append('D')
+    return ','.join(matched) if matched else None
+
+
+def baseline_volume_type(volumes, target_idx):
+    """对照组：优化前 batch_calculate_volume_types 对单个日期的逐日计算"""
+    if target_idx < 1:
+        return None
+    target_volume = volumes[target_idx]
+    matched = []
+
+    prev_volume = volumes[target_idx - 1]
+    if prev_volume > 0 and 2.0 <= target_volume / prev_volume <= 3.0:
+        matched.append('A')
+    if target_idx >= 3:
+        avg_volume = sum(volumes[target_idx - 3:target_idx]) / 3
+        if avg_volume > 0 and target_volume / avg_volume >= 2.0:
+            matched.append('B')
+        if avg_volume > 0 and target_volume / avg_volume >= 1.5:
+            matched.append('X')
+    if target_idx >= 5:
+        window = range(target_idx - 5, target_idx)
+        avg_5_volume = sum(volumes[target_idx - 5:target_idx]) / 5
+        if avg_5_volume > 0 and target_volume / avg_5_volume >= 2.0:
+            matched.append('C')
+        if avg_5_volume > 0 and target_volume / avg_5_volume >= 1.5:
+            matched.append('Y')
+
+        x_day_volume = next((volumes[i] for i in window if baseline_abc(volumes, i)), None)
+        if x_day_volume and x_day_volume > 0 and target_volume / x_day_volume >= 1.2:
+            matched.append('D')
+
+        abcd_days = [i for i in window if baseline_abcd(volumes, i)]
+        if not abcd_days and prev_volume > 0 and avg_5_volume > 0:
+            if target_volume / prev_volume >= 4.0 and target_volume / avg_5_volume >= 4.0:
+                matched.append('E')
+
+        x_day_volume = volumes[abcd_days[0]] if abcd_days else None
+        if (x_day_volume and x_day_volume > 0 and target_volume / x_day_volume >= 3.0) or \
+                (avg_5_volume > 0 and target_volume / avg_5_volume >= 3.0):
+            matched.append('F')
+
+        for i in abcd_days:
+            if volumes[i] > 0 and target_volume / volumes[i] >= 0.7:
+                matched.append('G')
+                break
+        for i in abcd_days:
+            if target_volume > volumes[i]:
+                matched.append('H')
+                break
+
+    if target_idx >= 10 and any(baseline_abc(volumes, i) for i in range(target_idx - 10, target_idx)):
+        yesterday_volume = volumes[target_idx - 1]
+        avg_3_volume = sum(volumes[target_idx - 4:target_idx - 1]) / 3
+        condition1 = avg_3_volume > 0 and yesterday_volume / avg_3_volume >= 1.3
+        condition2 = yesterday_volume > 0 and target_volume / yesterday_volume >= 1.08
+        if condition1 and condition2:
+            matched.append('Z')
+
+    if not matched:
+        return None
+    return ','.join(t for t in TYPE_ORDER if t in matched)
+
+
+def baseline_batch(daily_data, start_date, end_date):
+    """对照组：优化前的 batch_calculate_volume_types（目标区间前15天开始的数据上逐日计算）"""
+    all_dates = [d['date'] for d in daily_data if start_date <= d['date'] <= end_date]
+    if not all_dates:
+        return {}
+    window = [d for d in daily_data if all_dates[0] - timedelta(days=15) <= d['date'] <= all_dates[-1]]
+    volumes = [d['volume'] for d in window]
+    result = {}
+    for target_date in all_dates:
+        target_idx = next(i for i, d in enumerate(window) if d['date'].date() == target_date.date())
+        volume_type = baseline_volume_type(volumes, target_idx)
+        if volume_type:
+            result[target_date] = volume_type
+    return result
+
+
+def build_random_daily(days: int, seed: int):
+    """
+    生成随机日线成交量
+
+    混入放量、倍量边界（恰好2倍/3倍）、连续放量、停牌（成交量为0）等情况，尽量覆盖各类型分支
+    """
+    rnd = random.Random(seed)
+    daily_data = []
+    date = datetime(2024, 1, 2, 15, 0, 0)
+    volume = rnd.randint(10000, 100000)
+    while len(daily_data) < days:
+        date += timedelta(days=1)
+        if date.weekday() >= 5:
+            continue
+        roll = rnd.random()
+        if roll < 0.05:
+            volume = 0
+        elif roll < 0.15:
+            volume = max(volume, 1000) * rnd.choice([2, 3, 4, 5])
+        elif roll < 0.25:
+            volume = int(max(volume, 1000) * rnd.uniform(1.05, 2.5))
+        else:
+            volume = max(0, int(rnd.randint(10000, 100000) * rnd.uniform(0.3, 1.5)))
+        daily_data.append({'date': date, 'volume': volume})
+    return daily_data
+
+
+def median_ms(func, rounds: int):
+    timings = []
+    result = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2], result
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ('-h', '--help'):
+        print("用法: python test_volume_type_series.py [K线数量] [随机种子数量]")
+        print("示例: python test_volume_type_series.py 500 200")
+        sys.exit(0)
+
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    seeds = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    mismatches = 0
+    counts = dict.fromkeys(TYPE_ORDER, 0)
+    baseline_total = series_total = batch_total = 0.0
+
+    original_get_daily_volumes = VolumeTypeService._get_daily_volumes
+    try:
+        for seed in range(seeds):
+            rnd = random.Random(seed)
+            daily_data = build_random_daily(days, seed)
+            volumes = [d['volume'] for d in daily_data]
+
+            start = time.perf_counter()
+            expected = [baseline_volume_type(volumes, i) for i in range(len(volumes))]
+            baseline_total += (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            actual = VolumeTypeService.classify_series(volumes)
+            series_total += (time.perf_counter() - start) * 1000
+
+            for i, (a, b) in enumerate(zip(expected, actual)):
+                if a != b:
+                    mismatches += 1
+                    print(f"  [classify_series] 种子{seed} {daily_data[i]['date']:%Y-%m-%d} 逐日={a}, 序列={b}")
+                for t in (a or '').split(','):
+                    if t:
+                        counts[t] += 1
+
+            # 批量接口：成交量查询替换为随机数据，目标区间取随机子区间（含区间起点前历史不足15天的情况）
+            VolumeTypeService._get_daily_volumes = staticmethod(
+                lambda table_name, start_date, end_date: [
+                    dict(d) for d in daily_data
+                    if (start_date is None or d['date'] >= start_date) and (end_date is None or d['date'] <= end_date)
+                ])
+            first = rnd.randrange(len(daily_data))
+            last = rnd.randrange(first, len(daily_data))
+            start_date = daily_data[first]['date'].replace(hour=0)
+            end_date = daily_data[last]['date']
+            expected_batch = baseline_batch(daily_data, start_date, end_date)
+            start = time.perf_counter()
+            actual_batch = VolumeTypeService.batch_calculate_volume_types('random', 'random', start_date, end_date)
+            batch_total += (time.perf_counter() - start) * 1000
+            if actual_batch != expected_batch:
+                mismatches += 1
+                diff = sorted(set(actual_batch.items()) ^ set(expected_batch.items()))[:5]
+                print(f"  [batch_calculate_volume_types] 种子{seed} {start_date:%Y-%m-%d}~{end_date:%Y-%m-%d} 不一致: {diff}")
+    finally:
+        VolumeTypeService._get_daily_volumes = original_get_daily_volumes
+
+    print(f"{seeds}组 × {days}根K线, 类型命中次数: " + ", ".join(f"{t}:{c}" for t, c in counts.items()))
+    print(f"逐日算法 {baseline_total:.1f}ms, classify_series {series_total:.1f}ms "
+          f"({baseline_total / max(series_total, 1e-6):.0f}x), batch_calculate_volume_types {batch_total:.1f}ms")
+
+    volumes = [d['volume'] for d in build_random_daily(5000, 0)]
+    baseline_ms, _ = median_ms(lambda: [baseline_volume_type(volumes, i) for i in range(len(volumes))], 3)
+    series_ms, _ = median_ms(lambda: VolumeTypeService.classify_series(volumes), 10)
+    print(f"5000根K线: 逐日算法 {baseline_ms:.1f}ms, classify_series {series_ms:.2f}ms")
+
+    if mismatches:
+        print(f"❌ 发现 {mismatches} 处不一致")
+        sys.exit(1)
+    print("✅ 逐日算法与 classify_series / batch_calculate_volume_types 结果完全一致")
+
+
+if __name__ == '__main__':
+    main()
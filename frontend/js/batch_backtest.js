@@ -104,45 +104,42 @@ async function startBatchBacktest() {
     runBtn.disabled = true;
     runBtn.innerHTML = '<span class="loading-spinner"></span> 回测中...';
     
-    // 执行批量回测
-    const results = [];
+    // 执行批量回测（服务端并行，按完成顺序流式返回）
+    const results = new Array(selectedStocks.length);
     let successCount = 0;
     let failCount = 0;
+    let finished = 0;
     
-    for (let i = 0; i < selectedStocks.length; i++) {
-        const stock = selectedStocks[i];
-        const progress = ((i + 1) / selectedStocks.length * 100).toFixed(1);
-        
-        updateProgress(progress, `正在回测: ${stock.name} (${stock.code}) - ${i + 1}/${selectedStocks.length}`);
-        
-        try {
-            const result = await backtestSingleStock(stock);
-            if (result.success) {
+    updateProgress(0, `正在回测: 0/${selectedStocks.length}`);
+    
+    try {
+        await streamBatchBacktest(selectedStocks, (event) => {
+            if (event.event !== 'result') {
+                return;
+            }
+            finished++;
+            const stock = selectedStocks[event.index];
+            if (event.success) {
                 successCount++;
-                results.push({
-                    stock: stock,
-                    data: result.data,
-                    success: true
-                });
+                results[event.index] = { stock: stock, data: event.data, success: true };
             } else {
                 failCount++;
-                results.push({
-                    stock: stock,
-                    error: result.message,
-                    success: false
-                });
+                results[event.index] = { stock: stock, error: event.error, success: false };
             }
-        } catch (error) {
+            const progress = (finished / selectedStocks.length * 100).toFixed(1);
+            updateProgress(progress, `已完成: ${stock.name} (${stock.code}) - ${finished}/${selectedStocks.length}`);
+        });
+    } catch (error) {
+        console.error('批量回测失败:', error);
+        showError('批量回测失败: ' + error.message);
+    }
+    
+    // 未返回结果的股票记为失败
+    for (let i = 0; i < selectedStocks.length; i++) {
+        if (!results[i]) {
             failCount++;
-            results.push({
-                stock: stock,
-                error: error.message,
-                success: false
-            });
+            results[i] = { stock: selectedStocks[i], error: '未返回结果', success: false };
         }
-        
-        // 避免请求过快
-        await sleep(100);
     }
     
     // 隐藏进度条
@@ -159,104 +156,54 @@ async function startBatchBacktest() {
     updateStatus(true, '回测完成');
 }
 
-// 回测单个股票
-async function backtestSingleStock(stock) {
-    try {
-        console.log('开始回测股票:', stock.code, stock.name);
-        
-        // 首先获取CR点数据
-        const requestBody = {
-            stockCode: stock.code,
-            stockName: stock.name,
-            tableName: stock.table_name,
-            period: 'day'
-        };
-        
-        console.log('CR分析请求参数:', requestBody);
-        
-        const crResponse = await fetch(`${API_BASE_URL}/cr_analysis`, {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify(requestBody)
-        });
-        
-        console.log('CR分析响应状态:', crResponse.status, crResponse.statusText);
-        
-        // 检查响应是否是JSON
-        const contentType = crResponse.headers.get('content-type');
-        console.log('CR分析响应Content-Type:', contentType);
-        
-        if (!contentType || !contentType.includes('application/json')) {
-            const text = await crResponse.text();
-            console.error('API返回非JSON响应:', text.substring(0, 500));
-            throw new Error(`API返回格式错误 (状态码: ${crResponse.status})`);
-        }
-        
-        const crResult = await crResponse.json();
-        console.log('CR分析结果:', crResult);
-        
-        if (crResult.code !== 200) {
-            console.error('CR分析失败:', crResult.message);
-            throw new Error(crResult.message || 'CR分析失败');
-        }
-        
-        const cPoints = crResult.data.c_points || [];
-        const rPoints = crResult.data.r_points || [];
-        
-        console.log(`找到C点${cPoints.length}个, R点${rPoints.length}个`);
-        
-        if (cPoints.length === 0) {
-            console.warn('没有C点数据，跳过回测');
-            return {
-                success: false,
-                message: '没有C点数据'
-            };
+// 调用批量回测接口，逐行解析NDJSON结果
+async function streamBatchBacktest(stocks, onEvent) {
+    const response = await fetch(`${API_BASE_URL}/backtest/batch`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({
+            stocks: stocks,
+            period: 'day',
+            format: 'ndjson'
+        })
+    });
+    
+    const contentType = response.headers.get('content-type') || '';
+    if (!response.ok || !contentType.includes('application/x-ndjson')) {
+        let message = `批量回测接口返回错误 (状态码: ${response.status})`;
+        if (contentType.includes('application/json')) {
+            const result = await response.json();
+            message = result.message || message;
         }
-        
-        // 执行回测
-        const backtestResponse = await fetch(`${API_BASE_URL}/backtest`, {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({
-                stockCode: stock.code,
-                tableName: stock.table_name,
-                cPoints: cPoints,
-                rPoints: rPoints
-            })
-        });
-        
-        // 检查响应是否是JSON
-        const contentType2 = backtestResponse.headers.get('content-type');
-        if (!contentType2 || !contentType2.includes('application/json')) {
-            const text = await backtestResponse.text();
-            console.error('回测API返回非JSON响应:', text.substring(0, 200));
-            throw new Error('回测API返回格式错误');
+        throw new Error(message);
+    }
+    
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder('utf-8');
+    let buffer = '';
+    
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) {
+            break;
         }
+        buffer += decoder.decode(value, { stream: true });
         
-        const backtestResult = await backtestResponse.json();
-        
-        if (backtestResult.code === 200) {
-            return {
-                success: true,
-                data: backtestResult.data
-            };
-        } else {
-            return {
-                success: false,
-                message: backtestResult.message || '回测失败'
-            };
+        let newlineIndex;
+        while ((newlineIndex = buffer.indexOf('\n')) >= 0) {
+            const line = buffer.slice(0, newlineIndex).trim();
+            buffer = buffer.slice(newlineIndex + 1);
+            if (!line) {
+                continue;
+            }
+            const event = JSON.parse(line);
+            if (event.event === 'error') {
+                throw new Error(event.message || '批量回测失败');
+            }
+            onEvent(event);
         }
-        
-    } catch (error) {
-        console.error('回测失败:', stock.code, error);
-        return {
-            success: false,
-            message: error.message
-        };
     }
 }
 
@@ -355,11 +302,6 @@ function displayResults(results, successCount, failCount) {
     resultsContainer.scrollIntoView({ behavior: 'smooth', block: 'start' });
 }
 
-// 睡眠函数
-function sleep(ms) {
-    return new Promise(resolve => setTimeout(resolve, ms));
-}
-
 // 页面加载完成后初始化
 window.addEventListener('DOMContentLoaded', init);
 
@@ -0,0 +1,4 @@
+-- 添加内容哈希列到daily_chance表
+-- 同步时只写入新增或内容变化的记录（哈希覆盖API返回的字段，不含成交量类型、多空组合等衍生特征）
+ALTER TABLE daily_chance 
+ADD COLUMN content_hash CHAR(32) NULL COMMENT 'API数据内容哈希(MD5)' AFTER bearish_pattern;
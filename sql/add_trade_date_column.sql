@@ -0,0 +1,7 @@
+-- 为K线分表添加交易日期列和 (周期, 时间) 复合索引
+-- 每张 basic_data_<code> 表都需要执行（下面以 basic_data_sz300188 为例）；
+-- scripts/add_trade_date_index.py 会遍历所有分表，只补充缺少的列和索引
+ALTER TABLE basic_data_sz300188
+    ADD COLUMN trade_date DATE AS (DATE(shi_jian)) STORED COMMENT '交易日期（由shi_jian生成）',
+    ADD KEY idx_period_time (peroid_type, shi_jian) COMMENT '周期+时间索引（按周期的时间范围查询）',
+    ADD KEY idx_period_trade_date (peroid_type, trade_date) COMMENT '周期+交易日期索引';
@@ -0,0 +1,7 @@
+-- 创建每日机会衍生特征水位表（成交量类型、多头组合、空头组合增量计算）
+CREATE TABLE IF NOT EXISTS daily_chance_feature_state (
+    stock_code VARCHAR(20) NOT NULL COMMENT '股票代码',
+    last_date DATE NOT NULL COMMENT '衍生特征已计算到的最后日期',
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+    PRIMARY KEY (stock_code)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='每日机会衍生特征水位表';
@@ -0,0 +1,23 @@
+-- 创建K线技术指标表（增量MA/MACD）
+CREATE TABLE IF NOT EXISTS kline_indicator (
+    table_name VARCHAR(64) NOT NULL COMMENT 'K线数据表名',
+    period_type VARCHAR(20) NOT NULL COMMENT '周期类型（30min/day/week/month）',
+    shi_jian DATETIME NOT NULL COMMENT 'K线时间',
+    ma1 DOUBLE NULL COMMENT '第一条均线（周期见状态表ma_periods）',
+    ma2 DOUBLE NULL COMMENT '第二条均线',
+    ma3 DOUBLE NULL COMMENT '第三条均线',
+    dif DOUBLE NULL COMMENT 'MACD DIF',
+    dea DOUBLE NULL COMMENT 'MACD DEA',
+    macd DOUBLE NULL COMMENT 'MACD柱',
+    PRIMARY KEY (table_name, period_type, shi_jian)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='K线技术指标表';
+
+-- 创建K线技术指标增量状态表
+CREATE TABLE IF NOT EXISTS kline_indicator_state (
+    table_name VARCHAR(64) NOT NULL COMMENT 'K线数据表名',
+    period_type VARCHAR(20) NOT NULL COMMENT '周期类型（30min/day/week/month）',
+    last_time DATETIME NULL COMMENT '已计算到的最后一根K线时间',
+    state TEXT NOT NULL COMMENT '增量计算状态（JSON）',
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+    PRIMARY KEY (table_name, period_type)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='K线技术指标增量状态表';
@@ -0,0 +1,39 @@
+-- 创建统一K线表（所有股票、所有周期一张表，替代 basic_data_<code> 分表布局）
+-- 主键 (stock_code, peroid_type, shi_jian)：单只或多只股票的时间范围查询都是主键范围扫描
+-- 按K线时间分年RANGE分区，查询带时间条件时只扫描相关分区；新年份前可用
+-- ALTER TABLE kline REORGANIZE PARTITION pmax INTO (PARTITION p2031 VALUES LESS THAN ('2032-01-01'), PARTITION pmax VALUES LESS THAN (MAXVALUE)) 拆出新分区
+CREATE TABLE IF NOT EXISTS kline (
+    stock_code VARCHAR(20) NOT NULL COMMENT '股票代码',
+    peroid_type VARCHAR(20) NOT NULL COMMENT '周期代码（30min/1day/1week/1month，与分表一致）',
+    shi_jian DATETIME NOT NULL COMMENT 'K线时间',
+    kai_pan_jia DECIMAL(12, 4) NULL COMMENT '开盘价',
+    zui_gao_jia DECIMAL(12, 4) NULL COMMENT '最高价',
+    zui_di_jia DECIMAL(12, 4) NULL COMMENT '最低价',
+    shou_pan_jia DECIMAL(12, 4) NULL COMMENT '收盘价',
+    cheng_jiao_liang BIGINT NULL COMMENT '成交量',
+    liang_bi DECIMAL(12, 4) NULL COMMENT '量比',
+    wei_bi DECIMAL(12, 4) NULL COMMENT '委比',
+    shang_yu_bi DECIMAL(12, 4) NULL COMMENT '涨跌幅（%）',
+    trade_date DATE AS (DATE(shi_jian)) STORED COMMENT '交易日期（由shi_jian生成）',
+    PRIMARY KEY (stock_code, peroid_type, shi_jian),
+    KEY idx_period_trade_date (peroid_type, trade_date) COMMENT '按交易日跨股票查询'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='统一K线表'
+PARTITION BY RANGE COLUMNS (shi_jian) (
+    PARTITION p2015 VALUES LESS THAN ('2016-01-01'),
+    PARTITION p2016 VALUES LESS THAN ('2017-01-01'),
+    PARTITION p2017 VALUES LESS THAN ('2018-01-01'),
+    PARTITION p2018 VALUES LESS THAN ('2019-01-01'),
+    PARTITION p2019 VALUES LESS THAN ('2020-01-01'),
+    PARTITION p2020 VALUES LESS THAN ('2021-01-01'),
+    PARTITION p2021 VALUES LESS THAN ('2022-01-01'),
+    PARTITION p2022 VALUES LESS THAN ('2023-01-01'),
+    PARTITION p2023 VALUES LESS THAN ('2024-01-01'),
+    PARTITION p2024 VALUES LESS THAN ('2025-01-01'),
+    PARTITION p2025 VALUES LESS THAN ('2026-01-01'),
+    PARTITION p2026 VALUES LESS THAN ('2027-01-01'),
+    PARTITION p2027 VALUES LESS THAN ('2028-01-01'),
+    PARTITION p2028 VALUES LESS THAN ('2029-01-01'),
+    PARTITION p2029 VALUES LESS THAN ('2030-01-01'),
+    PARTITION p2030 VALUES LESS THAN ('2031-01-01'),
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);